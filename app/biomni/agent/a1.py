@@ -1,4 +1,3 @@
-import glob
 import inspect
 import os
 import re
@@ -14,6 +13,7 @@ from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, StateGraph
 
 from biomni.config import default_config
+from biomni.data_lake_catalog import get_data_lake_catalog
 from biomni.llm import SourceType, get_llm
 from biomni.model.retriever import ToolRetriever
 from biomni.tool.support_tools import run_python_repl
@@ -151,10 +151,11 @@ class A1:
 
         # Check and download missing data lake files
         print("Checking and downloading missing data lake files...")
+        self.data_lake_catalog = get_data_lake_catalog(data_lake_dir, self.data_lake_dict)
         check_and_download_s3_files(
             s3_bucket_url="https://biomni-release.s3.amazonaws.com",
             local_data_lake_path=data_lake_dir,
-            expected_files=expected_data_lake_files,
+            expected_files=self.data_lake_catalog.missing(expected_data_lake_files),
             folder="data_lake",
         )
 
@@ -963,6 +964,8 @@ class A1:
                 if isinstance(item, dict):
                     name = item.get("name", "")
                     description = self.data_lake_dict.get(name, f"Data lake item: {name}")
+                    if item.get("schema"):
+                        description += f" [{item['schema']}]"
                     data_lake_formatted.append(format_item_with_description(name, description))
                 # Check if the item already has a description (contains a colon)
                 elif isinstance(item, str) and ": " in item:
@@ -1201,6 +1204,26 @@ Each library is listed with its description to help you understand its functiona
 
         return formatted_prompt
 
+    def _data_lake_items(self, names=None):
+        """Data lake items with their descriptions and schema hints from the data lake catalog.
+
+        Args:
+            names: Item names to include; defaults to every file in the data lake
+
+        Returns:
+            List of {"name", "description", "schema"} dictionaries
+
+        """
+        available = self.data_lake_catalog.names()
+        return [
+            {
+                "name": name,
+                "description": self.data_lake_dict.get(name, f"Data lake item: {name}"),
+                "schema": self.data_lake_catalog.schema_hint(name),
+            }
+            for name in (available if names is None else names)
+        ]
+
     def configure(self, self_critic=False, test_time_scale_round=0):
         """Configure the agent with the initial system prompt and workflow.
 
@@ -1212,21 +1235,13 @@ Each library is listed with its description to help you understand its functiona
         # Store self_critic for later use
         self.self_critic = self_critic
 
-        # Get data lake content
-        data_lake_path = self.path + "/data_lake"
-        data_lake_content = glob.glob(data_lake_path + "/*")
-        data_lake_items = [x.split("/")[-1] for x in data_lake_content]
-
         # data_lake_dict and library_content_dict are already set in __init__
 
         # Prepare tool descriptions
         tool_desc = {i: [x for x in j if x["name"] != "run_python_repl"] for i, j in self.module2api.items()}
 
-        # Prepare data lake items with descriptions
-        data_lake_with_desc = []
-        for item in data_lake_items:
-            description = self.data_lake_dict.get(item, f"Data lake item: {item}")
-            data_lake_with_desc.append({"name": item, "description": description})
+        # Prepare data lake items with descriptions and schema hints from the catalog
+        data_lake_with_desc = self._data_lake_items()
 
         # Add custom data items if they exist
         if hasattr(self, "_custom_data") and self._custom_data:
@@ -1492,16 +1507,14 @@ Each library is listed with its description to help you understand its functiona
         # 1. Tools from the registry
         all_tools = self.tool_registry.tools if hasattr(self, "tool_registry") else []
 
-        # 2. Data lake items with descriptions
-        data_lake_path = self.path + "/data_lake"
-        data_lake_content = glob.glob(data_lake_path + "/*")
-        data_lake_items = [x.split("/")[-1] for x in data_lake_content]
-
-        # Create data lake descriptions for retrieval
-        data_lake_descriptions = []
-        for item in data_lake_items:
-            description = self.data_lake_dict.get(item, f"Data lake item: {item}")
-            data_lake_descriptions.append({"name": item, "description": description})
+        # 2. Data lake items with descriptions; the column names help match queries to tables
+        data_lake_descriptions = [
+            {
+                "name": item["name"],
+                "description": f"{item['description']} [{item['schema']}]" if item["schema"] else item["description"],
+            }
+            for item in self._data_lake_items()
+        ]
 
         # Add custom data items to retrieval if they exist
         if hasattr(self, "_custom_data") and self._custom_data:
@@ -1672,11 +1685,8 @@ Each library is listed with its description to help you understand its functiona
                 }
                 tool_desc[module_name].append(tool_dict)
 
-        # Prepare data lake items with descriptions
-        data_lake_with_desc = []
-        for item in selected_resources["data_lake"]:
-            description = self.data_lake_dict.get(item, f"Data lake item: {item}")
-            data_lake_with_desc.append({"name": item, "description": description})
+        # Prepare data lake items with descriptions and schema hints from the catalog
+        data_lake_with_desc = self._data_lake_items(selected_resources["data_lake"])
 
         # Prepare custom resources for highlighting
         custom_tools = []
@@ -1,4 +1,3 @@
-import glob
 import inspect
 import json
 import os
@@ -15,6 +14,7 @@ from langgraph.graph import END, StateGraph
 from langgraph.graph.message import add_messages
 
 from biomni.config import default_config
+from biomni.data_lake_catalog import get_data_lake_catalog
 from biomni.env_desc import data_lake_dict, library_content_dict
 from biomni.llm import get_llm
 from biomni.model.retriever import ToolRetriever
@@ -172,8 +172,6 @@ class react:
         library_access=False,
     ):
         data_lake_path = self.path + "/data_lake"
-        data_lake_content = glob.glob(data_lake_path + "/*")
-        data_lake_items = [x.split("/")[-1] for x in data_lake_content]
 
         if react_code_search:
             tools = [i for i in self.tools if i.name in ["run_python_repl", "search_google"]]
@@ -216,11 +214,13 @@ You can use them to solve the problem.
                 """
 
         if data_lake:
-            # Format data lake items with descriptions
+            # Format data lake items with descriptions and schema hints from the data lake catalog
+            catalog = get_data_lake_catalog(data_lake_path, self.data_lake_dict)
             data_lake_formatted = []
-            for item in data_lake_items:
+            for item in catalog.names():
                 description = data_lake_dict.get(item, f"Data lake item: {item}")
-                data_lake_formatted.append(f"{item}: {description}")
+                schema = catalog.schema_hint(item)
+                data_lake_formatted.append(f"{item}: {description} [{schema}]" if schema else f"{item}: {description}")
 
             prompt_modifier += """
 You can also access a biological data lake at the following path: {data_lake_path}. You can use the run_python_repl tool to write code to understand the data, process and utilize it for the task.
@@ -356,14 +356,15 @@ Here is the list of available libraries with their descriptions:
             all_tools = self.tool_registry.tools if hasattr(self, "tool_registry") else []
 
             # Get data lake items with descriptions
-            data_lake_path = self.path + "/data_lake"
-            data_lake_content = glob.glob(data_lake_path + "/*")
-            data_lake_items = [x.split("/")[-1] for x in data_lake_content]
+            catalog = get_data_lake_catalog(self.path + "/data_lake", self.data_lake_dict)
 
-            # Create data lake descriptions for retrieval
+            # Create data lake descriptions for retrieval; the column names help match queries to tables
             data_lake_descriptions = []
-            for item in data_lake_items:
+            for item in catalog.names():
                 description = self.data_lake_dict.get(item, f"Data lake item: {item}")
+                schema = catalog.schema_hint(item)
+                if schema:
+                    description += f" [{schema}]"
                 data_lake_descriptions.append({"name": item, "description": description})
 
             # Libraries with descriptions
@@ -0,0 +1,470 @@
+"""
+Biomni Association Index
+
+Indexed, memory-mapped stores for the association tables of the data lake: the GWAS Catalog
+(``gwas_catalog.pkl``) and the GeneBass gene burden results (``genebass_*_filtered.pkl``).
+Each pickle is converted once into an index directory next to it:
+
+- ``manifest.json``: source file, columns, row count and per-chromosome row ranges (written last)
+- ``col_<i>.npy``: one file per column, numeric columns as arrays and text columns as UTF-8
+  bytes plus ``col_<i>_offsets.npy``; rows are sorted by chromosome and position
+- ``gene_*.npy`` / ``trait_*.npy`` / ``efo_*.npy``: sorted keys with CSR posting lists of rows
+- ``rsid_keys.npy`` / ``rsid_rows.npy``: sorted numeric rsIDs and their rows
+- ``pos.npy``: positions of the sorted rows, for region windows
+
+Lookups by gene, trait, EFO term or rsID are ``np.searchsorted`` calls over the sorted keys,
+and region queries are two ``searchsorted`` calls over one chromosome's positions. Only the
+matched rows are decoded, and all files are memory-mapped, so sessions share the page cache
+instead of each unpickling the whole table.
+
+Columns are found by name (see the *_COLUMNS lists), so other association tables with gene,
+trait, rsID or chromosome/position columns can be indexed the same way.
+
+Usage:
+    from biomni.association_index import get_association_index
+
+    gwas = get_association_index("./data/data_lake", "gwas_catalog")
+    gwas.by_gene(["TCF7L2", "FTO"])
+    gwas.by_trait(["type 2 diabetes"], match="contains", max_p=5e-8)
+    gwas.window(["rs7903146"], flank=250_000)
+"""
+
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from biomni.interval_index import read_regions
+from biomni.utils import get_index_cache_path, is_index_stale
+from biomni.variant_index import normalize_chrom
+
+# Bump when the on-disk layout changes so old indexes are rebuilt
+INDEX_VERSION = 1
+
+# Association tables shipped with the data lake
+ASSOCIATION_FILES = {
+    "gwas_catalog": "gwas_catalog.pkl",
+    "genebass_pLoF": "genebass_pLoF_filtered.pkl",
+    "genebass_missense_LC": "genebass_missense_LC_filtered.pkl",
+    "genebass_synonymous": "genebass_synonymous_filtered.pkl",
+}
+
+# Columns indexed when present (compared case-insensitively). Gene and trait columns are all
+# indexed; for rsID, chromosome, position and p-value the first match is used.
+GENE_COLUMNS = ["MAPPED_GENE", "REPORTED GENE(S)", "gene_symbol", "gene", "gene_name", "symbol", "gene_id"]
+TRAIT_COLUMNS = ["DISEASE/TRAIT", "MAPPED_TRAIT", "description", "phenocode", "trait", "phenotype"]
+EFO_COLUMNS = ["MAPPED_TRAIT_URI", "efo_id", "efo"]
+RSID_COLUMNS = ["SNPS", "SNP_ID_CURRENT", "rsid", "snp", "variant_id"]
+CHROM_COLUMNS = ["CHR_ID", "chrom", "chr", "chromosome"]
+POSITION_COLUMNS = ["CHR_POS", "pos", "position", "bp", "start"]
+LOCUS_COLUMNS = ["locus", "interval"]
+PVALUE_COLUMNS = ["P-VALUE", "Pvalue", "Pvalue_Burden", "pvalue", "p_value"]
+
+# Placeholder gene names of the GWAS Catalog that are not genes
+_NOT_GENES = {"", "NR", "INTERGENIC", "NAN", "NONE"}
+_GENE_SEPARATORS = re.compile(r"\s*(?:,|;| - | x )\s*")
+_RSID = re.compile(r"rs(\d+)", re.IGNORECASE)
+_ONTOLOGY_ID = re.compile(r"([A-Za-z]+)[_:](\d+)$")
+_LOCUS = re.compile(r"^(?:chr)?(\w+):(\d+)", re.IGNORECASE)
+
+_indexes: dict = {}
+_indexes_lock = threading.Lock()
+
+
+def _find_column(columns, candidates) -> str | None:
+    lowered = {str(c).lower(): c for c in columns}
+    return next((lowered[c.lower()] for c in candidates if c.lower() in lowered), None)
+
+
+def _find_columns(columns, candidates) -> list[str]:
+    lowered = {str(c).lower(): c for c in columns}
+    return [lowered[c.lower()] for c in candidates if c.lower() in lowered]
+
+
+def _encode_strings(values) -> tuple[np.ndarray, np.ndarray]:
+    """Encode strings as one UTF-8 byte buffer and offsets (missing values become an empty string)."""
+    encoded = [b"" if v is None or (isinstance(v, float) and np.isnan(v)) else str(v).encode() for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _split_genes(value) -> list[str]:
+    if not isinstance(value, str):
+        return [] if value is None or pd.isna(value) else [str(value).upper()]
+    return [g for g in (p.upper() for p in _GENE_SEPARATORS.split(value.strip())) if g not in _NOT_GENES]
+
+
+def _split_traits(value) -> list[str]:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return []
+    value = str(value).strip().lower()
+    parts = [p.strip() for p in value.split(", ")] if ", " in value else []
+    return [value] + [p for p in parts if p and p != value]
+
+
+def _split_ontology_ids(value) -> list[str]:
+    if not isinstance(value, str):
+        return []
+    ids = []
+    for part in re.split(r"[,;\s]+", value):
+        match = _ONTOLOGY_ID.search(part.rstrip("/"))
+        if match:
+            ids.append(f"{match.group(1).upper()}_{match.group(2)}")
+    return ids
+
+
+def _first_int(value) -> int:
+    """First integer in a value such as "12345", "12345;67890" or 1.2345e4 (-1 if there is none)."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return -1 if np.isnan(value) else int(value)
+    match = re.search(r"\d+", str(value))
+    return int(match.group()) if match else -1
+
+
+def _first_chrom(value) -> str:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, (float, np.floating)):
+        value = int(value)
+    return normalize_chrom(re.split(r"[;,\sx]+", str(value).strip())[0])
+
+
+def _postings(keys: list, rows: list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sorted unique keys with CSR posting lists of their (sorted, unique) rows."""
+    pairs = pd.DataFrame({"key": pd.Series(keys, dtype=object), "row": np.asarray(rows, dtype=np.int64)})
+    pairs = pairs.drop_duplicates().sort_values(["key", "row"], kind="stable")
+    sorted_keys = pairs["key"].to_numpy(dtype=str)
+    unique_keys, starts = np.unique(sorted_keys, return_index=True)
+    indptr = np.append(starts, len(sorted_keys)).astype(np.int64)
+    return unique_keys, indptr, pairs["row"].to_numpy(dtype=np.int64)
+
+
+def _save(index_dir: str, name: str, array: np.ndarray):
+    np.save(os.path.join(index_dir, f"{name}.npy"), array)
+
+
+def build_association_index(source_path: str, index_dir: str) -> "AssociationIndex":
+    """
+    Convert an association table (pickled DataFrame, Parquet, CSV or TSV) into ``index_dir`` and
+    return the opened index. The manifest is written last, so an interrupted build leaves no index.
+    """
+    if source_path.endswith(".pkl"):
+        table = pd.read_pickle(source_path)
+    elif source_path.endswith(".parquet"):
+        table = pd.read_parquet(source_path)
+    else:
+        sep = "\t" if source_path.endswith((".tsv", ".tsv.gz", ".txt")) else ","
+        table = pd.read_csv(source_path, sep=sep, low_memory=False)
+    if not isinstance(table, pd.DataFrame):
+        raise ValueError(f"{source_path} does not contain a table")
+    # Keep a meaningful index (e.g. gene IDs) as a column; drop plain row numbers
+    table = table.reset_index(drop=table.index.name is None and pd.api.types.is_integer_dtype(table.index))
+    table.columns = [str(c) for c in table.columns]
+
+    # Chromosome and position of every row, from chrom/pos columns or a "chr:pos" locus column
+    chrom_column = _find_column(table.columns, CHROM_COLUMNS)
+    pos_column = _find_column(table.columns, POSITION_COLUMNS)
+    locus_column = _find_column(table.columns, LOCUS_COLUMNS)
+    if chrom_column is not None and pos_column is not None:
+        chroms = [_first_chrom(v) for v in table[chrom_column]]
+        positions = np.array([_first_int(v) for v in table[pos_column]], dtype=np.int64)
+    elif locus_column is not None:
+        matches = [_LOCUS.match(str(v)) for v in table[locus_column]]
+        chroms = [normalize_chrom(m.group(1)) if m else "" for m in matches]
+        positions = np.array([int(m.group(2)) if m else -1 for m in matches], dtype=np.int64)
+    else:
+        chroms, positions = [""] * len(table), np.full(len(table), -1, dtype=np.int64)
+
+    # Sort rows by chromosome (natural order) and position; rows without a position go last
+    chrom_names = sorted({c for c in chroms if c}, key=lambda c: (0, int(c)) if c.isdigit() else (1, c))
+    chrom_codes = {c: i for i, c in enumerate(chrom_names)}
+    codes = np.array([chrom_codes.get(c, len(chrom_names)) for c in chroms], dtype=np.int64)
+    positions[codes == len(chrom_names)] = -1
+    order = np.lexsort((positions, codes))
+    table = table.iloc[order].reset_index(drop=True)
+    codes, positions = codes[order], positions[order]
+    bounds = np.searchsorted(codes, np.arange(len(chrom_names) + 1))
+    chrom_rows = {c: [int(bounds[i]), int(bounds[i + 1])] for i, c in enumerate(chrom_names)}
+
+    os.makedirs(index_dir, exist_ok=True)
+    manifest_path = os.path.join(index_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    columns = []
+    for i, name in enumerate(table.columns):
+        values = table[name]
+        if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+            array = values.to_numpy(dtype=np.float64) if values.isna().any() else values.to_numpy()
+            if array.dtype == object:
+                array = array.astype(np.float64)
+            _save(index_dir, f"col_{i}", array)
+            columns.append({"name": name, "kind": "numeric"})
+        else:
+            data, offsets = _encode_strings(values.tolist())
+            _save(index_dir, f"col_{i}", data)
+            _save(index_dir, f"col_{i}_offsets", offsets)
+            columns.append({"name": name, "kind": "text"})
+    _save(index_dir, "pos", positions)
+
+    # Posting lists of the sorted rows
+    gene_columns = _find_columns(table.columns, GENE_COLUMNS)
+    trait_columns = _find_columns(table.columns, TRAIT_COLUMNS)
+    efo_columns = _find_columns(table.columns, EFO_COLUMNS)
+    for kind, key_columns, split in (
+        ("gene", gene_columns, _split_genes),
+        ("trait", trait_columns, _split_traits),
+        ("efo", efo_columns, _split_ontology_ids),
+    ):
+        keys, rows = [], []
+        for column in key_columns:
+            for row, value in enumerate(table[column].tolist()):
+                for key in split(value):
+                    keys.append(key)
+                    rows.append(row)
+        unique_keys, indptr, postings = _postings(keys, rows)
+        _save(index_dir, f"{kind}_keys", unique_keys)
+        _save(index_dir, f"{kind}_indptr", indptr)
+        _save(index_dir, f"{kind}_rows", postings)
+
+    rsid_column = _find_column(table.columns, RSID_COLUMNS)
+    rsids, rsid_rows = [], []
+    if rsid_column is not None:
+        for row, value in enumerate(table[rsid_column].tolist()):
+            if isinstance(value, str):
+                numbers = [int(n) for n in _RSID.findall(value)] or ([int(value)] if value.isdigit() else [])
+            else:
+                numbers = [] if pd.isna(value) else [int(value)]
+            rsids.extend(numbers)
+            rsid_rows.extend([row] * len(numbers))
+    rsid_order = np.lexsort((np.asarray(rsid_rows, dtype=np.int64), np.asarray(rsids, dtype=np.int64)))
+    _save(index_dir, "rsid_keys", np.asarray(rsids, dtype=np.int64)[rsid_order])
+    _save(index_dir, "rsid_rows", np.asarray(rsid_rows, dtype=np.int64)[rsid_order])
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "source": os.path.abspath(source_path),
+        "n_rows": len(table),
+        "columns": columns,
+        "chrom_rows": chrom_rows,
+        "gene_columns": gene_columns,
+        "trait_columns": trait_columns,
+        "efo_columns": efo_columns,
+        "rsid_column": rsid_column,
+        "pvalue_column": _find_column(table.columns, PVALUE_COLUMNS),
+    }
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return AssociationIndex(index_dir)
+
+
+class AssociationIndex:
+    """Read-only, memory-mapped association table with gene, trait, EFO, rsID and position indexes."""
+
+    def __init__(self, index_dir: str):
+        with open(os.path.join(index_dir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != INDEX_VERSION:
+            raise ValueError(f"Association index {index_dir} has an unsupported version; rebuild it")
+        self.index_dir = index_dir
+        self.columns = [c["name"] for c in self.manifest["columns"]]
+        self.pvalue_column = self.manifest["pvalue_column"]
+
+        def load(name):
+            return np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+
+        self._columns = {}
+        for i, column in enumerate(self.manifest["columns"]):
+            if column["kind"] == "numeric":
+                self._columns[column["name"]] = (load(f"col_{i}"), None)
+            else:
+                self._columns[column["name"]] = (load(f"col_{i}"), load(f"col_{i}_offsets"))
+        self._postings = {
+            kind: (load(f"{kind}_keys"), load(f"{kind}_indptr"), load(f"{kind}_rows"))
+            for kind in ("gene", "trait", "efo")
+        }
+        self._rsid_keys, self._rsid_rows = load("rsid_keys"), load("rsid_rows")
+        self._positions = load("pos")
+        chrom_rows = sorted((bounds[0], chrom) for chrom, bounds in self.manifest["chrom_rows"].items())
+        self._chrom_starts = np.array([start for start, _ in chrom_rows], dtype=np.int64)
+        self._chrom_names = [chrom for _, chrom in chrom_rows]
+
+    def __len__(self) -> int:
+        return self.manifest["n_rows"]
+
+    def keys(self, kind: str) -> np.ndarray:
+        """Indexed keys of a kind ("gene", "trait" or "efo"), sorted."""
+        return self._postings[kind][0]
+
+    def rows(self, rows, columns: list[str] | None = None) -> pd.DataFrame:
+        """Decode the given rows (in the given order) into a DataFrame."""
+        rows = np.asarray(rows, dtype=np.int64)
+        data = {}
+        for name in columns or self.columns:
+            values, offsets = self._columns[name]
+            if offsets is None:
+                data[name] = np.asarray(values[rows])
+            else:
+                decoded = [values[offsets[r] : offsets[r + 1]].tobytes().decode() for r in rows]
+                data[name] = [v if v else None for v in decoded]
+        return pd.DataFrame(data, index=pd.Index(rows, name="row"), columns=columns or self.columns)
+
+    def _lookup(self, kind: str, keys) -> dict[str, np.ndarray]:
+        """Rows of each key (exact match on normalized keys)."""
+        sorted_keys, indptr, postings = self._postings[kind]
+        results = {}
+        for key in keys:
+            i = int(np.searchsorted(sorted_keys, key))
+            found = i < len(sorted_keys) and sorted_keys[i] == key
+            results[key] = np.asarray(postings[indptr[i] : indptr[i + 1]]) if found else np.zeros(0, dtype=np.int64)
+        return results
+
+    def _result(self, matches: dict, query_name: str, columns, max_p, limit) -> pd.DataFrame:
+        """
+        Rows matched by each query, with the query in the first column and rows in position order.
+
+        Rows above ``max_p`` are dropped, and ``limit`` keeps the most significant rows of each
+        query (the first ones when the table has no p-value column). Only the p-value column is
+        read before the kept rows are decoded.
+        """
+        frames = []
+        for query, rows in matches.items():
+            if self.pvalue_column is not None and len(rows) and (max_p is not None or (limit and len(rows) > limit)):
+                pvalues = pd.to_numeric(self.rows(rows, [self.pvalue_column])[self.pvalue_column], errors="coerce")
+                pvalues = pvalues.to_numpy(dtype=np.float64)
+                if max_p is not None:
+                    rows, pvalues = rows[pvalues <= max_p], pvalues[pvalues <= max_p]
+                if limit is not None and len(rows) > limit:
+                    rows = np.sort(rows[np.argsort(pvalues, kind="stable")[:limit]])
+            elif limit is not None:
+                rows = rows[:limit]
+            frame = self.rows(rows, columns)
+            frame.insert(0, query_name, query)
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=[query_name] + list(columns or self.columns))
+        return pd.concat(frames)
+
+    def by_gene(self, genes, columns=None, max_p: float | None = None, limit: int | None = None) -> pd.DataFrame:
+        """Associations of each gene (symbols, case-insensitive)."""
+        genes = [genes] if isinstance(genes, str) else genes
+        matches = self._lookup("gene", [str(g).strip().upper() for g in genes])
+        return self._result(matches, "query_gene", columns, max_p, limit)
+
+    def by_trait(
+        self, traits, match: str = "exact", columns=None, max_p: float | None = None, limit: int | None = None
+    ) -> pd.DataFrame:
+        """
+        Associations of each trait, given as a trait name or an ontology term such as EFO_0001360.
+
+        With ``match="contains"``, a trait name matches every indexed trait containing it
+        (case-insensitive), e.g. "diabetes" matches "type 2 diabetes mellitus".
+        """
+        traits = [traits] if isinstance(traits, str) else traits
+        matches = {}
+        for trait in traits:
+            term = str(trait).strip()
+            ontology_id = _split_ontology_ids(term)
+            if ontology_id and ontology_id[0].lower() == term.lower().replace(":", "_"):
+                matches[trait] = self._lookup("efo", ontology_id)[ontology_id[0]]
+            elif match == "contains":
+                sorted_keys, indptr, postings = self._postings["trait"]
+                hits = np.flatnonzero(np.char.find(np.asarray(sorted_keys), term.lower()) >= 0)
+                rows = [postings[indptr[i] : indptr[i + 1]] for i in hits]
+                matches[trait] = np.unique(np.concatenate(rows)) if rows else np.zeros(0, dtype=np.int64)
+            else:
+                matches[trait] = self._lookup("trait", [term.lower()])[term.lower()]
+        return self._result(matches, "query_trait", columns, max_p, limit)
+
+    def by_rsid(self, rsids, columns=None, max_p: float | None = None, limit: int | None = None) -> pd.DataFrame:
+        """Associations reported for each rsID."""
+        rsids = [rsids] if isinstance(rsids, str) else rsids
+        matches = {}
+        for rsid in rsids:
+            number = _first_int(rsid)
+            lo, hi = np.searchsorted(self._rsid_keys, [number, number + 1])
+            matches[str(rsid)] = np.unique(np.asarray(self._rsid_rows[lo:hi]))
+        return self._result(matches, "query_rsid", columns, max_p, limit)
+
+    def region_rows(self, chrom, start: int, end: int) -> np.ndarray:
+        """Rows with a position in [start, end] on a chromosome."""
+        bounds = self.manifest["chrom_rows"].get(normalize_chrom(chrom))
+        if bounds is None:
+            return np.zeros(0, dtype=np.int64)
+        positions = self._positions[bounds[0] : bounds[1]]
+        lo, hi = np.searchsorted(positions, [start, end + 1])
+        return np.arange(bounds[0] + lo, bounds[0] + hi, dtype=np.int64)
+
+    def regions(self, regions, columns=None, max_p: float | None = None, limit: int | None = None) -> pd.DataFrame:
+        """
+        Associations inside each region, given as "chrom:start-end" strings, (chrom, start, end)
+        tuples, a BED file or a DataFrame with chrom/start/end columns.
+        """
+        table = read_regions(regions)
+        matches = {}
+        for region in table.itertuples():
+            name = region.name or f"{normalize_chrom(region.chrom)}:{region.start}-{region.end}"
+            matches[name] = self.region_rows(region.chrom, region.start, region.end)
+        return self._result(matches, "query_region", columns, max_p, limit)
+
+    def window(
+        self, rsids, flank: int = 500_000, columns=None, max_p: float | None = None, limit: int | None = None
+    ) -> pd.DataFrame:
+        """Associations within ``flank`` bp of each rsID's indexed position(s), e.g. to find a lead SNP's locus."""
+        rsids = [rsids] if isinstance(rsids, str) else rsids
+        matches = {}
+        for rsid in rsids:
+            number = _first_int(rsid)
+            lo, hi = np.searchsorted(self._rsid_keys, [number, number + 1])
+            rows = []
+            for row in np.unique(np.asarray(self._rsid_rows[lo:hi])):
+                position = int(self._positions[row])
+                if position < 0:
+                    continue
+                chrom = self._chrom_names[int(np.searchsorted(self._chrom_starts, row, side="right")) - 1]
+                rows.append(self.region_rows(chrom, position - flank, position + flank))
+            matches[str(rsid)] = np.unique(np.concatenate(rows)) if rows else np.zeros(0, dtype=np.int64)
+        return self._result(matches, "query_rsid", columns, max_p, limit)
+
+
+def load_association_index(source_path: str) -> AssociationIndex:
+    """Return the index of an association table, building and persisting it next to the file on first use.
+
+    The index is kept open per process and rebuilt only when the table file changes.
+    """
+    source_path = os.path.abspath(source_path)
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"Association table not found: {source_path}")
+    mtime = os.path.getmtime(source_path)
+
+    with _indexes_lock:
+        cached = _indexes.get(source_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        index_dir = get_index_cache_path(source_path, "associations")
+        index = None
+        if not is_index_stale(os.path.join(index_dir, "manifest.json"), source_path):
+            try:
+                index = AssociationIndex(index_dir)
+            except (OSError, ValueError, KeyError):
+                index = None
+        if index is None:
+            index = build_association_index(source_path, index_dir)
+        _indexes[source_path] = (mtime, index)
+        return index
+
+
+def get_association_index(data_lake_path: str, table: str = "gwas_catalog") -> AssociationIndex:
+    """Return the index of a data lake association table by name (see ASSOCIATION_FILES) or file name."""
+    file_name = ASSOCIATION_FILES.get(table, table)
+    path = file_name if os.path.isabs(file_name) else os.path.join(data_lake_path, file_name)
+    return load_association_index(path)
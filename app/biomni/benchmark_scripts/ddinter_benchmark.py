@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Benchmark the DDInter interaction engine: index build, cold loads and N-drug pairwise checks.
+
+Runs against the DDInter CSV files of a data lake, or against synthetic files of a similar shape:
+
+    python -m biomni.benchmark_scripts.ddinter_benchmark --data-lake-path ./data_lake
+    python -m biomni.benchmark_scripts.ddinter_benchmark --synthetic-drugs 2000 --synthetic-interactions 250000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from biomni.tool.pharmacology import DDINTER_CSV_FILES, DDInterEngine, _standardize_drug_name_processing
+
+
+def write_synthetic_ddinter(output_dir, n_drugs, n_interactions, seed=0):
+    """Write DDInter-shaped CSV files with random interactions spread over the category files."""
+    rng = np.random.default_rng(seed)
+    salts = ["", " hydrochloride", " sodium", " sulfate"]
+    ids = np.array([f"DDInter{i:05d}" for i in range(n_drugs)])
+    names = np.array([f"drug{i:05d}{salts[i % len(salts)]}" for i in range(n_drugs)])
+    a = rng.integers(0, n_drugs, n_interactions)
+    b = rng.integers(0, n_drugs, n_interactions)
+    keep = a != b
+    a, b = a[keep], b[keep]
+    levels = rng.choice(["Major", "Moderate", "Minor", "Unknown"], len(a), p=[0.15, 0.55, 0.2, 0.1])
+    files = rng.integers(0, len(DDINTER_CSV_FILES), len(a))
+    for i, csv_file in enumerate(DDINTER_CSV_FILES):
+        mask = files == i
+        pd.DataFrame(
+            {
+                "DDInterID_A": ids[a[mask]],
+                "Drug_A": names[a[mask]],
+                "DDInterID_B": ids[b[mask]],
+                "Drug_B": names[b[mask]],
+                "Level": levels[mask],
+            }
+        ).to_csv(os.path.join(output_dir, csv_file), index=False)
+
+
+def build_dict_baseline(data_lake_path):
+    """Nested dict of interactions keyed by standardized names, as the tools used before the engine."""
+    matrix = {}
+    for csv_file in DDINTER_CSV_FILES:
+        file_path = os.path.join(data_lake_path, csv_file)
+        if not os.path.exists(file_path):
+            continue
+        df = pd.read_csv(file_path)
+        category = csv_file.replace("ddinter_", "").replace(".csv", "")
+        for _, row in df.iterrows():
+            drug_a = _standardize_drug_name_processing(row["Drug_A"])
+            drug_b = _standardize_drug_name_processing(row["Drug_B"])
+            interaction = {"level": row["Level"], "category": category}
+            matrix.setdefault(drug_a, {}).setdefault(drug_b, []).append(interaction)
+            matrix.setdefault(drug_b, {}).setdefault(drug_a, []).append(interaction)
+    return matrix
+
+
+def baseline_pairwise(matrix, drugs):
+    """Nested-loop pairwise check over the dict baseline; returns the number of interactions."""
+    found = 0
+    for i, drug_a in enumerate(drugs):
+        for drug_b in drugs[i + 1 :]:
+            found += len(matrix.get(drug_a, {}).get(drug_b, []))
+    return found
+
+
+def timed(function, *args, repeat=1, **kwargs):
+    """Return (best seconds over ``repeat`` runs, last result)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DDInter engine build, load and pairwise checks.")
+    parser.add_argument("--data-lake-path", type=str, default=None, help="Directory with the DDInter CSV files")
+    parser.add_argument("--synthetic-drugs", type=int, default=2000, help="Drugs in the synthetic data set")
+    parser.add_argument("--synthetic-interactions", type=int, default=200000, help="Rows in the synthetic data set")
+    parser.add_argument("--list-sizes", type=int, nargs="*", default=[5, 20, 100, 500], help="Medication list sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per pairwise measurement (best is kept)")
+    parser.add_argument("--baseline", action="store_true", help="Also time the row-by-row dict baseline")
+    parser.add_argument("--output", type=str, default=None, help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        data_lake_path = args.data_lake_path
+        if data_lake_path is None:
+            data_lake_path = os.path.join(workdir, "data_lake")
+            os.makedirs(data_lake_path)
+            write_synthetic_ddinter(data_lake_path, args.synthetic_drugs, args.synthetic_interactions)
+
+        report = {"data_lake_path": args.data_lake_path or "synthetic"}
+        report["build_seconds"], engine = timed(DDInterEngine.from_csv, data_lake_path)
+        report["drugs"], report["interactions"] = len(engine), engine.n_interactions
+
+        index_dir = os.path.join(workdir, "index")
+        report["save_seconds"], _ = timed(engine.save, index_dir)
+        report["load_seconds"], _ = timed(DDInterEngine.load, index_dir, repeat=3)
+        report["load_mmap_seconds"], engine = timed(DDInterEngine.load, index_dir, mmap=True, repeat=3)
+
+        matrix = None
+        if args.baseline:
+            report["baseline_build_seconds"], matrix = timed(build_dict_baseline, data_lake_path)
+
+        rng = np.random.default_rng(1)
+        report["pairwise"] = {}
+        for size in args.list_sizes:
+            nodes = rng.choice(len(engine), min(size, len(engine)), replace=False)
+            seconds, (_, _, edges) = timed(engine.pairwise, nodes, repeat=args.repeat)
+            result = {"engine_seconds": seconds, "interactions": len(edges)}
+            if matrix is not None:
+                drugs = [engine.standardized[i] for i in nodes]
+                result["baseline_seconds"], _ = timed(baseline_pairwise, matrix, drugs, repeat=args.repeat)
+            report["pairwise"][size] = result
+
+    print(f"Drugs: {report['drugs']}  Interactions: {report['interactions']}")
+    print(f"Build: {report['build_seconds']:.3f}s  Save: {report['save_seconds']:.3f}s")
+    print(f"Load: {report['load_seconds']:.4f}s  Load (mmap): {report['load_mmap_seconds']:.4f}s")
+    if "baseline_build_seconds" in report:
+        print(f"Baseline build (iterrows): {report['baseline_build_seconds']:.3f}s")
+    print(f"\n{'drugs':>7}{'pairs':>10}{'found':>8}{'engine(ms)':>12}{'baseline(ms)':>14}")
+    for size, result in report["pairwise"].items():
+        baseline = f"{result['baseline_seconds'] * 1000:>14.3f}" if "baseline_seconds" in result else f"{'-':>14}"
+        pairs = size * (size - 1) // 2
+        print(f"{size:>7}{pairs:>10}{result['interactions']:>8}{result['engine_seconds'] * 1000:>12.3f}{baseline}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Benchmark the database, literature and OpenFDA tools against recorded HTTP traffic.
+
+Record a realistic agent query mix once with network access, then replay it offline (e.g. in CI)
+to measure the effect of caching, connection pooling, batching and fan-out changes. Replays run
+with rate limiting off, so the timings measure the tools and not the host quotas' waits:
+
+    python -m biomni.benchmark_scripts.http_replay_benchmark --mode record --cassette-dir ./cassettes
+    python -m biomni.benchmark_scripts.http_replay_benchmark --mode replay --cassette-dir ./cassettes --latency 0.05
+"""
+
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from biomni.http_transport import configure_http_transport, get_http_transport_stats
+from biomni.rate_limit import get_rate_limit_metrics, set_rate_limiting
+
+# Direct-endpoint calls (no LLM involved) modelled on the queries agents issue most often
+QUERY_MIX = [
+    ("uniprot_entry", "biomni.tool.database", "query_uniprot", {"endpoint": "uniprotkb/P04637"}),
+    (
+        "uniprot_search",
+        "biomni.tool.database",
+        "query_uniprot",
+        {"endpoint": "uniprotkb/search?query=gene_exact:BRCA1+AND+organism_id:9606&size=5"},
+    ),
+    (
+        "uniprot_batch",
+        "biomni.tool.database",
+        "query_uniprot_batch",
+        {"accessions": ["P04637", "P38398", "P51587", "P00533", "P01308"], "fields": ["accession", "gene_names"]},
+    ),
+    ("ensembl_lookup", "biomni.tool.database", "query_ensembl", {"endpoint": "lookup/symbol/homo_sapiens/BRCA2"}),
+    (
+        "ensembl_batch",
+        "biomni.tool.database",
+        "query_ensembl_batch",
+        {"identifiers": ["BRCA1", "BRCA2", "TP53", "EGFR", "KRAS"], "endpoint": "lookup/symbol"},
+    ),
+    ("pdb_entries", "biomni.tool.database", "query_pdb_identifiers", {"identifiers": ["4HHB", "1TUP", "6LU7"]}),
+    ("pdb_batch", "biomni.tool.database", "query_pdb_entries_batch", {"identifiers": ["4HHB", "1TUP", "6LU7"]}),
+    (
+        "clinvar_search",
+        "biomni.tool.database",
+        "query_clinvar",
+        {"search_term": "BRCA1[gene] AND clinsig_pathogenic[prop]"},
+    ),
+    ("dbsnp_search", "biomni.tool.database", "query_dbsnp", {"search_term": "rs6025[rs]"}),
+    (
+        "dbsnp_batch",
+        "biomni.tool.database",
+        "query_ncbi_batch",
+        {"database": "snp", "ids": ["rs6025", "rs1800562", "rs334"]},
+    ),
+    ("reactome_pathway", "biomni.tool.database", "query_reactome", {"endpoint": "data/pathways/R-HSA-73894"}),
+    ("gwas_studies", "biomni.tool.database", "query_gwas_catalog", {"endpoint": "studies/GCST000001"}),
+    (
+        "fda_adverse_events",
+        "biomni.tool.pharmacology",
+        "query_fda_adverse_events",
+        {"drug_name": "aspirin", "limit": 50},
+    ),
+    ("url_content", "biomni.tool.literature", "extract_url_content", {"url": "https://www.ncbi.nlm.nih.gov/gene/7157"}),
+]
+
+
+def run_query(module_name, function_name, kwargs):
+    """Run one tool call and return (seconds, error message or None)."""
+    import importlib
+
+    function = getattr(importlib.import_module(module_name), function_name)
+    start = time.perf_counter()
+    try:
+        result = function(**kwargs)
+        error = result.get("error") if isinstance(result, dict) and result.get("success") is False else None
+    except Exception as e:
+        error = str(e)
+    return time.perf_counter() - start, error
+
+
+def summarize(timings):
+    """Return summary statistics (in seconds) for a list of timings."""
+    ordered = sorted(timings)
+    return {
+        "calls": len(ordered),
+        "total": round(sum(ordered), 4),
+        "mean": round(statistics.mean(ordered), 4),
+        "p50": round(ordered[len(ordered) // 2], 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay the database tool query mix and report timings.")
+    parser.add_argument("--mode", choices=["record", "replay", "passthrough"], default="replay")
+    parser.add_argument("--cassette-dir", type=str, default="./http_cassettes", help="Directory of recorded responses")
+    parser.add_argument(
+        "--latency",
+        type=str,
+        default="0",
+        help='Simulated latency per replayed response in seconds, or "recorded" to use recorded response times',
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Number of times to run the whole mix")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of queries run in parallel")
+    parser.add_argument("--only", type=str, nargs="*", default=None, help="Restrict the mix to these query names")
+    parser.add_argument("--output", type=str, default=None, help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    latency = args.latency if args.latency == "recorded" else float(args.latency)
+    configure_http_transport(mode=args.mode, cassette_dir=args.cassette_dir, latency=latency)
+    # Replayed responses never reach the services, so their quotas would only add artificial sleeps
+    set_rate_limiting(args.mode != "replay")
+
+    mix = [q for q in QUERY_MIX if args.only is None or q[0] in args.only]
+    jobs = [q for _ in range(args.repeat) for q in mix]
+
+    timings = {name: [] for name, *_ in mix}
+    errors = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        futures = [(name, pool.submit(run_query, module, function, kwargs)) for name, module, function, kwargs in jobs]
+        for name, future in futures:
+            seconds, error = future.result()
+            timings[name].append(seconds)
+            if error:
+                errors.setdefault(name, error)
+    wall_time = time.perf_counter() - start
+
+    report = {
+        "mode": args.mode,
+        "latency": latency,
+        "repeat": args.repeat,
+        "concurrency": args.concurrency,
+        "wall_time_seconds": round(wall_time, 4),
+        "queries": {name: summarize(values) for name, values in timings.items() if values},
+        "errors": errors,
+        "transport": get_http_transport_stats(),
+        "rate_limits": get_rate_limit_metrics(),
+    }
+
+    print(f"{'query':<22}{'calls':>7}{'mean(s)':>10}{'p50(s)':>10}{'p95(s)':>10}")
+    for name, stats in report["queries"].items():
+        flag = "  !" if name in errors else ""
+        print(f"{name:<22}{stats['calls']:>7}{stats['mean']:>10.4f}{stats['p50']:>10.4f}{stats['p95']:>10.4f}{flag}")
+    print(f"\nWall time: {wall_time:.3f}s  Transport: {report['transport']}")
+    for name, error in errors.items():
+        print(f"! {name}: {error}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+Biomni Columnar Tables
+
+Converts large delimited data lake tables (BindingDB, the DepMap matrices, the evebio tables)
+once into Parquet datasets with typed columns, and queries them by reading only the columns and
+row groups a filter needs.
+
+Conversion streams the text file twice with ``pyarrow.csv``. The first pass fixes each column's
+type over the whole file: a column is int64 or float64 only if every non-empty value parses,
+otherwise it stays a string (BindingDB affinities such as ">10000" are strings). The second pass
+parses with those types and writes part files of ``rows_per_file`` rows with row groups of
+``row_group_size`` rows. Parquet keeps min/max statistics per row group, so sorting each part by
+a commonly filtered column (``sort_by``) lets queries skip almost every row group;
+``partition_by`` additionally writes one hive-style directory per value of a low-cardinality
+column. The ``_biomni_table.json`` manifest is written last.
+
+Usage:
+    from biomni.columnar import get_columnar_table
+
+    table = get_columnar_table("BindingDB_All_202409.tsv")  # sorted by target UniProt ID
+    for batch in table.scan(
+        columns=["Ligand SMILES", "Ki (nM)"],
+        filters=[("UniProt (SwissProt) Primary ID of Target Chain", "==", "P00533")],
+    ):
+        ...
+"""
+
+import csv
+import json
+import os
+import shutil
+import threading
+from difflib import get_close_matches
+
+import pandas as pd
+
+from biomni.utils import get_index_cache_path, is_index_stale
+
+# Bump when the on-disk layout changes so old conversions are redone
+TABLE_VERSION = 1
+
+MANIFEST_NAME = "_biomni_table.json"
+
+# Large delimited data lake tables by file name prefix, with the columns their parts are sorted by
+LARGE_TABLE_LAYOUTS = {
+    "BindingDB_": {"sort_by": ["UniProt (SwissProt) Primary ID of Target Chain"]},
+    "DepMap_": {"sort_by": None},
+    "evebio_": {"sort_by": None},
+}
+
+_tables: dict = {}
+_tables_lock = threading.Lock()
+# One lock per table directory, so converting one table does not block the others
+_table_locks: dict[str, threading.Lock] = {}
+
+
+def _delimiter(source_path: str) -> str:
+    name = source_path[:-3] if source_path.endswith(".gz") else source_path
+    return "\t" if name.endswith((".tsv", ".txt", ".tab")) else ","
+
+
+def _read_header(source_path: str, delimiter: str) -> list[str]:
+    """Column names of a delimited file, with empty names and duplicates renamed the way pandas does."""
+    import gzip
+
+    opener = gzip.open if source_path.endswith(".gz") else open
+    with opener(source_path, "rt", newline="") as f:
+        header = next(csv.reader(f, delimiter=delimiter))
+
+    names, seen = [], {}
+    for i, name in enumerate(header):
+        name = name or f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _open_csv(source_path: str, delimiter: str, column_names: list[str], column_types: dict, block_size: int):
+    import pyarrow.csv as pacsv
+
+    return pacsv.open_csv(
+        source_path,
+        read_options=pacsv.ReadOptions(column_names=column_names, skip_rows=1, block_size=block_size),
+        parse_options=pacsv.ParseOptions(delimiter=delimiter, newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(column_types=column_types, strings_can_be_null=True),
+    )
+
+
+def infer_column_types(source_path: str, block_size: int = 64 << 20) -> dict:
+    """
+    Decide the type of every column of a delimited file from all of its values.
+
+    Returns a {column: pyarrow type} dict with int64, float64 or string per column.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    delimiter = _delimiter(source_path)
+    names = _read_header(source_path, delimiter)
+    candidates = {name: [pa.int64(), pa.float64()] for name in names}
+
+    reader = _open_csv(source_path, delimiter, names, dict.fromkeys(names, pa.string()), block_size)
+    for batch in reader:
+        for name, column in zip(names, batch.columns, strict=False):
+            types = candidates[name]
+            while types:
+                try:
+                    pc.cast(column, types[0])
+                    break
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    types.pop(0)
+    return {name: types[0] if types else pa.string() for name, types in candidates.items()}
+
+
+def convert_table(
+    source_path: str,
+    output_dir: str,
+    sort_by: list[str] | None = None,
+    partition_by: list[str] | None = None,
+    rows_per_file: int = 1_000_000,
+    row_group_size: int = 100_000,
+    column_types: dict | None = None,
+    block_size: int = 64 << 20,
+) -> dict:
+    """
+    Convert a delimited table into a Parquet dataset directory and return its manifest.
+
+    Args:
+        source_path: CSV/TSV file (optionally gzipped)
+        output_dir: Dataset directory; replaced if it exists
+        sort_by: Columns each part file is sorted by, so row-group statistics prune filters on them
+        partition_by: Low-cardinality columns written as hive-style directories
+        rows_per_file: Rows buffered, sorted and written per part file
+        row_group_size: Rows per Parquet row group
+        column_types: {column: pyarrow type} overrides; other column types are inferred from the whole file
+        block_size: Bytes of text parsed per batch
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+
+    delimiter = _delimiter(source_path)
+    names = _read_header(source_path, delimiter)
+    unknown = [c for c in (sort_by or []) + (partition_by or []) + list(column_types or {}) if c not in names]
+    if unknown:
+        raise ValueError(f"Unknown columns {unknown} in {source_path}")
+    types = infer_column_types(source_path, block_size)
+    types.update(column_types or {})
+
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    schema = pa.schema([(name, types[name]) for name in names])
+    partitioning = (
+        pads.partitioning(pa.schema([(c, types[c]) for c in partition_by]), flavor="hive") if partition_by else None
+    )
+
+    n_rows, n_parts = 0, 0
+
+    def write_part(batches):
+        nonlocal n_parts
+        table = pa.Table.from_batches(batches, schema=schema)
+        if sort_by:
+            table = table.sort_by([(c, "ascending") for c in sort_by])
+        pads.write_dataset(
+            table,
+            output_dir,
+            format="parquet",
+            partitioning=partitioning,
+            basename_template=f"part-{n_parts:05d}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            max_rows_per_group=row_group_size,
+            min_rows_per_group=min(row_group_size, len(table)),
+        )
+        n_parts += 1
+
+    buffered, buffered_rows = [], 0
+    for batch in _open_csv(source_path, delimiter, names, types, block_size):
+        buffered.append(batch)
+        buffered_rows += batch.num_rows
+        n_rows += batch.num_rows
+        if buffered_rows >= rows_per_file:
+            write_part(buffered)
+            buffered, buffered_rows = [], 0
+    if buffered or n_parts == 0:
+        write_part(buffered)
+
+    manifest = {
+        "version": TABLE_VERSION,
+        "source": os.path.abspath(source_path),
+        "n_rows": n_rows,
+        "n_parts": n_parts,
+        "columns": {name: str(types[name]) for name in names},
+        "sort_by": sort_by or [],
+        "partition_by": partition_by or [],
+        "row_group_size": row_group_size,
+    }
+    tmp_path = os.path.join(output_dir, f"{MANIFEST_NAME}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+    return manifest
+
+
+def build_filter(filters):
+    """
+    Turn a filter specification into a pyarrow dataset expression (None for no filter).
+
+    Accepted forms: a pyarrow expression; a {column: value} dict (a list, tuple or set value means
+    "is in"); a list of (column, op, value) tuples that must all hold; or a list of such lists, any
+    of which may hold; a single (column, op, value) tuple is accepted as well. Operators are those
+    of ``pyarrow.parquet.filters_to_expression`` ("==", "!=", "<", "<=", ">", ">=", "in", "not in").
+    """
+    import pyarrow.dataset as pads
+    import pyarrow.parquet as pq
+
+    if filters is None or isinstance(filters, pads.Expression):
+        return filters
+    if isinstance(filters, dict):
+        filters = [
+            (column, "in", list(value)) if isinstance(value, list | tuple | set) else (column, "==", value)
+            for column, value in filters.items()
+        ]
+    if _is_condition(filters):
+        filters = [filters]
+    if not filters:
+        return None
+    filters = [tuple(f) if _is_condition(f) else f for f in filters]
+    return pq.filters_to_expression(filters)
+
+
+def _is_condition(item) -> bool:
+    """Whether a filter item is a single (column, op, value) condition."""
+    return isinstance(item, tuple | list) and len(item) == 3 and isinstance(item[0], str) and isinstance(item[1], str)
+
+
+def _filter_columns(filters) -> list[str]:
+    """Columns named by a filter specification; pyarrow expressions are not inspected."""
+    import pyarrow.dataset as pads
+
+    if filters is None or isinstance(filters, pads.Expression):
+        return []
+    if isinstance(filters, dict):
+        return list(filters)
+    if _is_condition(filters):
+        return [filters[0]]
+    columns = []
+    for item in filters:
+        if _is_condition(item):
+            columns.append(item[0])
+        elif isinstance(item, tuple | list):
+            columns.extend(_filter_columns(item))
+    return columns
+
+
+class ColumnarTable:
+    """A converted table: column and row-group pruned scans over its Parquet dataset."""
+
+    def __init__(self, table_dir: str):
+        import pyarrow as pa
+        import pyarrow.dataset as pads
+
+        with open(os.path.join(table_dir, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != TABLE_VERSION:
+            raise ValueError(f"Columnar table {table_dir} has an unsupported version; convert it again")
+        self.table_dir = table_dir
+        partitioning = None
+        if self.manifest["partition_by"]:
+            fields = [(c, pa.type_for_alias(self.manifest["columns"][c])) for c in self.manifest["partition_by"]]
+            partitioning = pads.partitioning(pa.schema(fields), flavor="hive")
+        # The manifest is skipped by the default "_" ignore prefix
+        self.dataset = pads.dataset(table_dir, format="parquet", partitioning=partitioning)
+
+    def __len__(self) -> int:
+        return self.manifest["n_rows"]
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.manifest["columns"])
+
+    def _check_columns(self, columns):
+        for column in columns or []:
+            if column not in self.manifest["columns"]:
+                suggestions = get_close_matches(column, self.columns, n=3, cutoff=0.5)
+                hint = f"; did you mean {suggestions}?" if suggestions else ""
+                raise ValueError(f"Unknown column '{column}'{hint}")
+
+    def scan(self, columns: list[str] | None = None, filters=None, batch_size: int = 65536, arrow: bool = False):
+        """Yield the matching rows in batches of up to ``batch_size`` rows, reading only the needed columns and row groups.
+
+        Batches are DataFrames, or pyarrow record batches with ``arrow=True``.
+        """
+        self._check_columns(columns)
+        self._check_columns(_filter_columns(filters))
+        scanner = self.dataset.scanner(columns=columns, filter=build_filter(filters), batch_size=batch_size)
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield batch if arrow else batch.to_pandas()
+
+    def read(self, columns: list[str] | None = None, filters=None, limit: int | None = None) -> pd.DataFrame:
+        """Matching rows as one DataFrame, stopping after ``limit`` rows."""
+        frames, n_rows = [], 0
+        for frame in self.scan(columns, filters):
+            frames.append(frame)
+            n_rows += len(frame)
+            if limit is not None and n_rows >= limit:
+                break
+        if not frames:
+            return pd.DataFrame(columns=columns or self.columns)
+        result = pd.concat(frames, ignore_index=True)
+        return result.head(limit) if limit is not None else result
+
+    def count(self, filters=None) -> int:
+        """Number of rows matching the filters."""
+        self._check_columns(_filter_columns(filters))
+        return self.dataset.count_rows(filter=build_filter(filters))
+
+
+def default_sort_columns(source_path: str) -> list[str] | None:
+    """Sort columns used for a known data lake table when none are requested (None if unknown or absent)."""
+    name = os.path.basename(source_path)
+    for prefix, layout in LARGE_TABLE_LAYOUTS.items():
+        if name.startswith(prefix) and layout["sort_by"]:
+            header = _read_header(source_path, _delimiter(source_path))
+            return [c for c in layout["sort_by"] if c in header] or None
+    return None
+
+
+def _layout_matches(manifest: dict, sort_by, partition_by) -> bool:
+    """Whether an existing conversion satisfies the requested layout (None accepts any layout)."""
+    return (sort_by is None or manifest["sort_by"] == list(sort_by)) and (
+        partition_by is None or manifest["partition_by"] == list(partition_by)
+    )
+
+
+def get_columnar_table(
+    source_path: str,
+    sort_by: list[str] | None = None,
+    partition_by: list[str] | None = None,
+    output_dir: str | None = None,
+) -> ColumnarTable:
+    """Return the converted form of a delimited table, converting it next to the file on first use.
+
+    The conversion is redone when the source file changes or a different ``sort_by`` /
+    ``partition_by`` layout is requested; a first conversion without ``sort_by`` uses the default
+    of known tables (BindingDB is sorted by target UniProt ID). Open tables are kept per process.
+    """
+    source_path = os.path.abspath(source_path)
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"Table not found: {source_path}")
+    table_dir = output_dir or get_index_cache_path(source_path, "parquet")
+    mtime = os.path.getmtime(source_path)
+
+    def cached_table():
+        with _tables_lock:
+            cached = _tables.get(table_dir)
+        if cached is not None and cached[0] == mtime and _layout_matches(cached[1].manifest, sort_by, partition_by):
+            return cached[1]
+        return None
+
+    table = cached_table()
+    if table is not None:
+        return table
+    with _tables_lock:
+        lock = _table_locks.setdefault(table_dir, threading.Lock())
+
+    with lock:
+        # Another thread may have converted the table while this one waited
+        table = cached_table()
+        if table is not None:
+            return table
+        if not is_index_stale(os.path.join(table_dir, MANIFEST_NAME), source_path):
+            try:
+                table = ColumnarTable(table_dir)
+            except (OSError, ValueError, KeyError):
+                table = None
+        if table is None or not _layout_matches(table.manifest, sort_by, partition_by):
+            if sort_by is None:
+                sort_by = default_sort_columns(source_path)
+            convert_table(source_path, table_dir, sort_by=sort_by, partition_by=partition_by)
+            table = ColumnarTable(table_dir)
+        with _tables_lock:
+            _tables[table_dir] = (mtime, table)
+        return table
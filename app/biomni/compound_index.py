@@ -0,0 +1,436 @@
+"""
+Biomni Compound Index
+
+Similarity and substructure search over the compound libraries of the data lake (Enamine REAL,
+the Broad Repurposing Hub, BindingDB ligands or any table with a SMILES column).
+
+Each library is fingerprinted once into an index directory next to it:
+
+- ``manifest.json``: source file, fingerprint parameters and compound count (written last)
+- ``morgan.npy``: bit-packed Morgan fingerprints, one row of ``n_bits / 8`` bytes per compound
+- ``morgan_counts.npy``: set bits per Morgan fingerprint (the Tanimoto denominators)
+- ``pattern.npy``: bit-packed RDKit pattern fingerprints used to screen substructure queries
+- ``smiles.npy`` / ``ids.npy`` with ``*_offsets.npy``: UTF-8 string columns
+
+Rows follow the source table; SMILES that RDKit cannot parse keep their row with empty
+fingerprints and never match. The arrays are memory-mapped, so opening an index is instant and
+the page cache is shared between processes. Tanimoto top-k runs ``np.bitwise_count`` over
+blocks of rows on a thread pool (NumPy releases the GIL), and substructure search only runs the
+RDKit match on rows whose pattern fingerprint contains every bit of the query's.
+
+Usage:
+    from biomni.compound_index import get_library_index
+
+    index = get_library_index("./data_lake", "broad_repurposing_hub")
+    index.similarity_search("CC(=O)Oc1ccccc1C(=O)O", k=10)
+    index.substructure_search("c1ccc2[nH]ccc2c1", max_results=100)
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from biomni.utils import get_index_cache_path, is_index_stale
+
+# Bump when the on-disk layout changes so old indexes are rebuilt
+INDEX_VERSION = 1
+
+# Compound libraries shipped with the data lake
+LIBRARY_FILES = {
+    "enamine": "enamine_cloud_library_smiles.pkl",
+    "broad_repurposing_hub": "broad_repurposing_hub_molecule_with_smiles.parquet",
+    "bindingdb": "BindingDB_All_202409.tsv",
+}
+
+# Identifier columns recognized in library tables, in order of preference (compared case-insensitively,
+# with spaces read as underscores)
+ID_COLUMNS = [
+    "id",
+    "compound_id",
+    "catalog_id",
+    "idnumber",
+    "broad_id",
+    "bindingdb_monomerid",
+    "pubchem_cid",
+    "pert_iname",
+    "name",
+]
+
+_indexes: dict = {}
+_indexes_lock = threading.Lock()
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Per-row number of set bits of a 2-D uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    # NumPy < 2.0: byte lookup table
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    return table[words.view(np.uint8)].sum(axis=1, dtype=np.int64)
+
+
+def _encode_strings(values: list) -> tuple[np.ndarray, np.ndarray]:
+    """Encode strings as one UTF-8 byte buffer and offsets (None becomes an empty string)."""
+    encoded = [("" if v is None else str(v)).encode() for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _fingerprint_chunk(smiles: list[str], radius: int, n_bits: int) -> tuple[np.ndarray, np.ndarray]:
+    """Bit-packed Morgan and pattern fingerprints for a list of SMILES (zero rows for invalid SMILES)."""
+    from rdkit import Chem, DataStructs, RDLogger
+    from rdkit.Chem import rdFingerprintGenerator
+
+    RDLogger.DisableLog("rdApp.*")
+    generator = rdFingerprintGenerator.GetMorganGenerator(radius=radius, fpSize=n_bits)
+    morgan = np.zeros((len(smiles), n_bits // 8), dtype=np.uint8)
+    pattern = np.zeros((len(smiles), n_bits // 8), dtype=np.uint8)
+    bits = np.zeros(n_bits, dtype=np.uint8)
+
+    for row, smi in enumerate(smiles):
+        mol = Chem.MolFromSmiles(smi) if smi else None
+        if mol is None:
+            continue
+        morgan[row] = np.packbits(generator.GetFingerprintAsNumPy(mol).astype(np.uint8))
+        DataStructs.ConvertToNumpyArray(Chem.PatternFingerprint(mol, fpSize=n_bits), bits)
+        pattern[row] = np.packbits(bits)
+    return morgan, pattern
+
+
+def _query_fingerprints(query: str, radius: int, n_bits: int, substructure: bool = False) -> np.ndarray:
+    """Bit-packed fingerprint of a query: Morgan for similarity, pattern (SMARTS or SMILES) for substructure."""
+    from rdkit import Chem, DataStructs
+
+    if substructure:
+        mol = Chem.MolFromSmarts(query) or Chem.MolFromSmiles(query)
+        if mol is None:
+            raise ValueError(f"Cannot parse substructure query '{query}'")
+        bits = np.zeros(n_bits, dtype=np.uint8)
+        DataStructs.ConvertToNumpyArray(Chem.PatternFingerprint(mol, fpSize=n_bits), bits)
+        return np.packbits(bits)
+
+    if Chem.MolFromSmiles(query) is None:
+        raise ValueError(f"Invalid query SMILES '{query}'")
+    return _fingerprint_chunk([query], radius, n_bits)[0][0]
+
+
+def read_library(source_path: str, smiles_column: str | None = None, id_column: str | None = None):
+    """
+    Read the SMILES and identifiers of a compound library.
+
+    Pickles (DataFrame, Series or list), Parquet files and CSV/TSV tables are supported. Columns
+    are detected by name when not given: the first column containing "smiles", and the first of
+    ID_COLUMNS present (else the row number). Text tables are read in chunks with only those two
+    columns, and duplicate SMILES are dropped from them since ligand tables such as BindingDB
+    repeat a compound once per measurement.
+
+    Returns:
+        (list of SMILES, list of identifiers)
+    """
+
+    def pick_columns(columns):
+        lowered = {str(c).lower().replace(" ", "_"): c for c in columns}
+        smiles_col = smiles_column or next((c for c in columns if "smiles" in str(c).lower()), None)
+        if smiles_col is None:
+            raise ValueError(f"No SMILES column found in {source_path}; pass smiles_column")
+        id_col = id_column or next((lowered[name] for name in ID_COLUMNS if name in lowered), None)
+        return smiles_col, id_col
+
+    def from_frame(df):
+        smiles_col, id_col = pick_columns(list(df.columns))
+        ids = df[id_col] if id_col is not None else pd.Series(range(len(df)), index=df.index)
+        return df[smiles_col].astype(object).where(df[smiles_col].notna(), None).tolist(), ids.astype(str).tolist()
+
+    if source_path.endswith(".pkl"):
+        data = pd.read_pickle(source_path)
+        if isinstance(data, pd.DataFrame):
+            return from_frame(data)
+        data = pd.Series(data)
+        return data.astype(str).tolist(), data.index.astype(str).tolist()
+
+    if source_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        smiles_col, id_col = pick_columns(pq.read_schema(source_path).names)
+        columns = [smiles_col] + ([id_col] if id_col is not None else [])
+        return from_frame(pd.read_parquet(source_path, columns=columns))
+
+    sep = "\t" if source_path.endswith((".tsv", ".tsv.gz", ".txt")) else ","
+    smiles_col, id_col = pick_columns(list(pd.read_csv(source_path, sep=sep, nrows=0).columns))
+    columns = [smiles_col] + ([id_col] if id_col is not None else [])
+    seen, smiles, ids = set(), [], []
+    reader = pd.read_csv(
+        source_path, sep=sep, usecols=columns, dtype=str, chunksize=500_000, on_bad_lines="skip", low_memory=False
+    )
+    for chunk in reader:
+        chunk = chunk.dropna(subset=[smiles_col]).drop_duplicates(subset=[smiles_col])
+        chunk_ids = chunk[id_col] if id_col is not None else chunk.index.astype(str)
+        for smi, compound_id in zip(chunk[smiles_col], chunk_ids, strict=False):
+            if smi not in seen:
+                seen.add(smi)
+                smiles.append(smi)
+                ids.append(str(compound_id))
+    return smiles, ids
+
+
+def build_compound_index(
+    source_path: str,
+    index_dir: str,
+    smiles_column: str | None = None,
+    id_column: str | None = None,
+    radius: int = 2,
+    n_bits: int = 2048,
+    chunk_size: int = 20000,
+    n_workers: int | None = None,
+) -> "CompoundIndex":
+    """
+    Fingerprint a compound library into ``index_dir`` and return the opened index.
+
+    Chunks of SMILES are fingerprinted on ``n_workers`` processes (all cores by default) and written
+    straight into memory-mapped output arrays; the manifest is written last, so an interrupted
+    build leaves no index behind.
+    """
+    if n_bits % 64:
+        raise ValueError("n_bits must be a multiple of 64")
+    smiles, ids = read_library(source_path, smiles_column, id_column)
+    os.makedirs(index_dir, exist_ok=True)
+    manifest_path = os.path.join(index_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    n_bytes = n_bits // 8
+    morgan = np.lib.format.open_memmap(
+        os.path.join(index_dir, "morgan.npy"), mode="w+", dtype=np.uint8, shape=(len(smiles), n_bytes)
+    )
+    pattern = np.lib.format.open_memmap(
+        os.path.join(index_dir, "pattern.npy"), mode="w+", dtype=np.uint8, shape=(len(smiles), n_bytes)
+    )
+    starts = range(0, len(smiles), chunk_size)
+    chunks = [smiles[start : start + chunk_size] for start in starts]
+    n_workers = n_workers or os.cpu_count() or 1
+
+    if n_workers > 1 and len(chunks) > 1:
+        import multiprocessing
+
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = executor.map(_fingerprint_chunk, chunks, [radius] * len(chunks), [n_bits] * len(chunks))
+            for start, (morgan_chunk, pattern_chunk) in zip(starts, results, strict=False):
+                morgan[start : start + len(morgan_chunk)] = morgan_chunk
+                pattern[start : start + len(pattern_chunk)] = pattern_chunk
+    else:
+        for start, chunk in zip(starts, chunks, strict=False):
+            morgan[start : start + len(chunk)], pattern[start : start + len(chunk)] = _fingerprint_chunk(
+                chunk, radius, n_bits
+            )
+
+    counts = _popcount(np.asarray(morgan).view(np.uint64)).astype(np.int32)
+    morgan.flush()
+    pattern.flush()
+    del morgan, pattern
+
+    np.save(os.path.join(index_dir, "morgan_counts.npy"), counts)
+    for name, values in (("smiles", smiles), ("ids", ids)):
+        data, offsets = _encode_strings(values)
+        np.save(os.path.join(index_dir, f"{name}.npy"), data)
+        np.save(os.path.join(index_dir, f"{name}_offsets.npy"), offsets)
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "source": os.path.abspath(source_path),
+        "n_compounds": len(smiles),
+        "n_invalid": int(np.count_nonzero(counts == 0)),
+        "radius": radius,
+        "n_bits": n_bits,
+    }
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return CompoundIndex(index_dir)
+
+
+class CompoundIndex:
+    """Read-only, memory-mapped fingerprint index of one compound library."""
+
+    def __init__(self, index_dir: str, block_size: int = 131072):
+        with open(os.path.join(index_dir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != INDEX_VERSION:
+            raise ValueError(f"Compound index {index_dir} has an unsupported version; rebuild it")
+        self.index_dir = index_dir
+        self.radius = self.manifest["radius"]
+        self.n_bits = self.manifest["n_bits"]
+        self.block_size = block_size
+
+        def load(name):
+            return np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+
+        self.morgan, self.pattern, self.counts = load("morgan"), load("pattern"), load("morgan_counts")
+        self._smiles, self._smiles_offsets = load("smiles"), load("smiles_offsets")
+        self._ids, self._ids_offsets = load("ids"), load("ids_offsets")
+
+    def __len__(self) -> int:
+        return self.manifest["n_compounds"]
+
+    def smiles(self, rows) -> list[str]:
+        """SMILES of the given rows."""
+        return [self._smiles[self._smiles_offsets[r] : self._smiles_offsets[r + 1]].tobytes().decode() for r in rows]
+
+    def ids(self, rows) -> list[str]:
+        """Identifiers of the given rows."""
+        return [self._ids[self._ids_offsets[r] : self._ids_offsets[r + 1]].tobytes().decode() for r in rows]
+
+    def _blocks(self):
+        return [(start, min(start + self.block_size, len(self))) for start in range(0, len(self), self.block_size)]
+
+    def _map_blocks(self, function, n_workers: int | None):
+        """Apply ``function(start, end)`` to every row block on a thread pool, in block order."""
+        blocks = self._blocks()
+        n_workers = min(n_workers or os.cpu_count() or 1, max(1, len(blocks)))
+        if n_workers == 1:
+            return [function(start, end) for start, end in blocks]
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            return list(executor.map(lambda block: function(*block), blocks))
+
+    def _block_similarity(self, start: int, end: int, query_words: np.ndarray, query_count: int) -> np.ndarray:
+        fps = np.ascontiguousarray(self.morgan[start:end]).view(np.uint64)
+        common = _popcount(fps & query_words)
+        union = self.counts[start:end] + query_count - common
+        return np.divide(common, union, out=np.zeros(end - start), where=union > 0)
+
+    def tanimoto(self, query_fp: np.ndarray, n_workers: int | None = None) -> np.ndarray:
+        """Tanimoto similarity of a bit-packed query fingerprint to every compound (0 for invalid rows)."""
+        query_words = np.ascontiguousarray(query_fp, dtype=np.uint8).view(np.uint64)
+        query_count = int(_popcount(query_words[None, :])[0])
+        blocks = self._map_blocks(
+            lambda start, end: self._block_similarity(start, end, query_words, query_count), n_workers
+        )
+        return np.concatenate(blocks) if blocks else np.zeros(0)
+
+    def similarity_search(
+        self, query_smiles: str, k: int = 10, min_similarity: float = 0.0, n_workers: int | None = None
+    ) -> pd.DataFrame:
+        """
+        The ``k`` compounds most similar to a query SMILES by Morgan-fingerprint Tanimoto similarity.
+
+        Each block keeps its own top-k with ``np.partition``, so only ``k`` rows per block are
+        merged. Ties are broken by row order; ``k <= 0`` returns an empty table.
+        """
+        k = max(0, int(k))
+        query_words = np.ascontiguousarray(_query_fingerprints(query_smiles, self.radius, self.n_bits)).view(np.uint64)
+        query_count = int(_popcount(query_words[None, :])[0])
+
+        def block_topk(start, end):
+            similarity = self._block_similarity(start, end, query_words, query_count)
+            keep = np.flatnonzero((similarity >= min_similarity) & (similarity > 0))
+            # A block with at most k hits keeps them all; otherwise 0 < len(keep) - k < len(keep)
+            if len(keep) > k:
+                # Everything above the k-th best score, then the earliest rows tied with it
+                kth = np.partition(similarity[keep], len(keep) - k)[len(keep) - k]
+                above = keep[similarity[keep] > kth]
+                keep = np.concatenate([above, keep[similarity[keep] == kth][: k - len(above)]])
+            return keep + start, similarity[keep]
+
+        results = self._map_blocks(block_topk, n_workers) if k else []
+        rows = np.concatenate([r[0] for r in results]) if results else np.zeros(0, dtype=np.int64)
+        scores = np.concatenate([r[1] for r in results]) if results else np.zeros(0)
+        order = np.lexsort((rows, -scores))[:k]
+        rows, scores = rows[order], scores[order]
+        return pd.DataFrame(
+            {"row": rows, "id": self.ids(rows), "smiles": self.smiles(rows), "similarity": np.round(scores, 4)}
+        )
+
+    def substructure_candidates(self, query_fp: np.ndarray, n_workers: int | None = None) -> np.ndarray:
+        """Rows whose pattern fingerprint contains every bit of a bit-packed query pattern fingerprint."""
+        query = np.ascontiguousarray(query_fp, dtype=np.uint8).view(np.uint64)
+        words = np.flatnonzero(query)
+        if len(words) == 0:
+            return np.flatnonzero(np.asarray(self.counts) > 0)
+
+        def block_screen(start, end):
+            fps = np.ascontiguousarray(self.pattern[start:end]).view(np.uint64)[:, words]
+            return np.flatnonzero(((fps & query[words]) == query[words]).all(axis=1)) + start
+
+        blocks = self._map_blocks(block_screen, n_workers)
+        return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.int64)
+
+    def substructure_search(
+        self, query: str, max_results: int | None = 100, n_workers: int | None = None
+    ) -> pd.DataFrame:
+        """
+        Compounds containing a substructure given as SMARTS or SMILES, in row order.
+
+        The pattern-fingerprint screen runs on all cores; RDKit then confirms the candidates one by
+        one until ``max_results`` matches are found. The number of screened candidates is kept in
+        ``result.attrs["candidates"]``.
+        """
+        from rdkit import Chem, RDLogger
+
+        RDLogger.DisableLog("rdApp.*")
+        pattern = Chem.MolFromSmarts(query) or Chem.MolFromSmiles(query)
+        if pattern is None:
+            raise ValueError(f"Cannot parse substructure query '{query}'")
+        candidates = self.substructure_candidates(
+            _query_fingerprints(query, self.radius, self.n_bits, substructure=True), n_workers
+        )
+
+        rows = []
+        for row, smi in zip(candidates, self.smiles(candidates), strict=False):
+            mol = Chem.MolFromSmiles(smi)
+            if mol is not None and mol.HasSubstructMatch(pattern):
+                rows.append(row)
+                if max_results is not None and len(rows) >= max_results:
+                    break
+
+        result = pd.DataFrame({"row": rows, "id": self.ids(rows), "smiles": self.smiles(rows)})
+        result.attrs["candidates"] = len(candidates)
+        return result
+
+
+def load_compound_index(
+    source_path: str,
+    smiles_column: str | None = None,
+    id_column: str | None = None,
+    n_workers: int | None = None,
+) -> CompoundIndex:
+    """Return the index of a compound library, building and persisting it next to the file on first use.
+
+    The index is kept open per process and rebuilt only when the library file changes.
+    """
+    source_path = os.path.abspath(source_path)
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"Compound library not found: {source_path}")
+    mtime = os.path.getmtime(source_path)
+
+    with _indexes_lock:
+        cached = _indexes.get(source_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        index_dir = get_index_cache_path(source_path, "compounds")
+        manifest_path = os.path.join(index_dir, "manifest.json")
+        index = None
+        if not is_index_stale(manifest_path, source_path):
+            try:
+                index = CompoundIndex(index_dir)
+            except (OSError, ValueError, KeyError):
+                index = None
+        if index is None:
+            index = build_compound_index(
+                source_path, index_dir, smiles_column=smiles_column, id_column=id_column, n_workers=n_workers
+            )
+        _indexes[source_path] = (mtime, index)
+        return index
+
+
+def get_library_index(data_lake_path: str, library: str) -> CompoundIndex:
+    """Return the index of a data lake library by name (see LIBRARY_FILES) or of a library file path."""
+    if library in LIBRARY_FILES:
+        return load_compound_index(os.path.join(data_lake_path, LIBRARY_FILES[library]))
+    path = library if os.path.isabs(library) else os.path.join(data_lake_path, library)
+    return load_compound_index(path)
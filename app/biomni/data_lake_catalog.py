@@ -0,0 +1,320 @@
+"""
+Biomni Data Lake Catalog
+
+A persisted manifest of the data lake: name, size, mtime, format, columns and row count of
+every file, plus its ``data_lake_dict`` description. Agents build prompts and retrieval lists
+from it instead of globbing the directory and the model gets schema hints without opening files.
+
+Every lookup refreshes the catalog: the directory is listed once and every entry stat'ed, and
+only files whose size or mtime changed are profiled again. Profiling reads metadata only where
+the format has it: the Parquet footer, the header line of delimited text files plus a row count.
+Rows are counted exactly for small uncompressed files or when an up-to-date ``biomni.columnar``
+conversion records them; otherwise they are estimated from the first megabyte of content and,
+for gzipped files, the compressed bytes it took, so no large file is read in full. Pickles and
+other formats are listed without a schema. The manifest is rewritten, atomically, only when
+something changed.
+
+Usage:
+    from biomni.data_lake_catalog import get_data_lake_catalog
+
+    catalog = get_data_lake_catalog("./data/biomni_data/data_lake")
+    catalog.entries()              # [{"name", "size", "mtime", "format", "columns", "n_rows", ...}]
+    catalog.schema_hint("DisGeNET.parquet")
+    catalog.missing(["DisGeNET.parquet", "go-plus.json"])
+"""
+
+import csv
+import gzip
+import json
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from biomni.columnar import MANIFEST_NAME as COLUMNAR_MANIFEST
+from biomni.utils import get_index_cache_path, is_index_stale
+
+# Bump when the profile of an entry changes so every file is profiled again
+CATALOG_VERSION = 1
+
+# File formats by extension (longest match wins)
+FILE_FORMATS = {
+    ".parquet": "parquet",
+    ".csv": "csv",
+    ".csv.gz": "csv",
+    ".tsv": "tsv",
+    ".tsv.gz": "tsv",
+    ".txt": "tsv",
+    ".pkl": "pickle",
+    ".pickle": "pickle",
+    ".json": "json",
+    ".obo": "obo",
+    ".h5ad": "h5ad",
+    ".gz": "gzip",
+}
+
+# Uncompressed text tables up to this size get an exact row count; others are estimated from a sample
+EXACT_ROW_COUNT_BYTES = 16 * 1024 * 1024
+
+# Decompressed bytes read from the start of a file to estimate its row count
+ROW_SAMPLE_BYTES = 1 << 20
+
+# Columns listed in schema hints before the rest are summarized as "+N more"
+HINT_COLUMNS = 12
+
+_catalogs: dict = {}
+_catalogs_lock = threading.Lock()
+
+
+def file_format(name: str) -> str | None:
+    """Format of a data lake file from its extension (None if unknown)."""
+    for extension in sorted(FILE_FORMATS, key=len, reverse=True):
+        if name.endswith(extension):
+            return FILE_FORMATS[extension]
+    return None
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+def _count_lines(path: str) -> int:
+    n_lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while block := f.read(1 << 24):
+            n_lines += block.count(b"\n")
+            last = block[-1:]
+    return n_lines + (last != b"\n")
+
+
+def _sample_text(path: str, size: int) -> tuple[bytes, int]:
+    """Return about the first ``ROW_SAMPLE_BYTES`` of a file's content and the on-disk bytes they took.
+
+    Gzipped files are inflated block by block, member after member (bgzip writes many), so the
+    compression ratio of the sample can scale its line count up to the whole file.
+    """
+    if not path.endswith(".gz"):
+        with open(path, "rb") as f:
+            sample = f.read(ROW_SAMPLE_BYTES)
+        return sample, len(sample)
+
+    parts = []
+    n_out = consumed = 0
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    with open(path, "rb") as f:
+        while n_out < ROW_SAMPLE_BYTES and consumed < size:
+            data = f.read(1 << 16)
+            if not data:
+                break
+            consumed += len(data)
+            while data:
+                out = decompressor.decompress(data)
+                parts.append(out)
+                n_out += len(out)
+                if not decompressor.eof:
+                    break
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    return b"".join(parts), consumed
+
+
+def _profile_text(path: str, fmt: str, size: int) -> dict:
+    delimiter = "," if fmt == "csv" else "\t"
+    with _open_text(path) as f:
+        header = next(csv.reader(f, delimiter=delimiter), [])
+    profile = {"columns": header, "n_rows": None, "n_rows_estimated": False}
+
+    converted = get_index_cache_path(path, "parquet")
+    columnar_manifest = os.path.join(converted, COLUMNAR_MANIFEST)
+    if os.path.isdir(converted) and not is_index_stale(columnar_manifest, path):
+        with open(columnar_manifest) as f:
+            profile["n_rows"] = json.load(f)["n_rows"]
+    elif size <= EXACT_ROW_COUNT_BYTES and not path.endswith(".gz"):
+        profile["n_rows"] = max(_count_lines(path) - 1, 0)
+    else:
+        sample, consumed = _sample_text(path, size)
+        n_lines = sample.count(b"\n")
+        if consumed >= size:
+            # The sample is the whole file
+            profile["n_rows"] = max(n_lines + (sample[-1:] not in (b"", b"\n")) - 1, 0)
+        elif n_lines > 1:
+            profile["n_rows"] = int(size * n_lines / consumed) - 1
+            profile["n_rows_estimated"] = True
+    return profile
+
+
+def _profile_parquet(path: str) -> dict:
+    import pyarrow.parquet as pq
+
+    metadata = pq.ParquetFile(path).metadata
+    return {"columns": metadata.schema.to_arrow_schema().names, "n_rows": metadata.num_rows, "n_rows_estimated": False}
+
+
+def profile_file(path: str) -> dict:
+    """Catalog entry of one file: size, mtime, format and, where cheap to read, columns and row count."""
+    stat = os.stat(path)
+    entry = {
+        "name": os.path.basename(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "format": "directory" if os.path.isdir(path) else file_format(path),
+        "columns": None,
+        "n_rows": None,
+        "n_rows_estimated": False,
+    }
+    try:
+        if entry["format"] == "parquet":
+            entry.update(_profile_parquet(path))
+        elif entry["format"] in ("csv", "tsv"):
+            entry.update(_profile_text(path, entry["format"], stat.st_size))
+    except Exception as e:
+        entry["error"] = str(e).splitlines()[0] if str(e) else type(e).__name__
+    return entry
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return ""
+
+
+class DataLakeCatalog:
+    """Incrementally refreshed manifest of the files in one data lake directory."""
+
+    def __init__(self, data_lake_path: str, descriptions: dict | None = None, n_workers: int | None = None):
+        if descriptions is None:
+            from biomni.env_desc import data_lake_dict as descriptions
+
+        self.data_lake_path = os.path.abspath(data_lake_path)
+        self.descriptions = descriptions
+        self.n_workers = n_workers or min(8, os.cpu_count() or 1)
+        self.manifest_path = get_index_cache_path(self.data_lake_path, "catalog.json")
+        self._lock = threading.Lock()
+        self._entries = self._load_manifest()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != CATALOG_VERSION or manifest.get("data_lake_path") != self.data_lake_path:
+            return {}
+        return {entry["name"]: entry for entry in manifest["entries"]}
+
+    def _save_manifest(self) -> None:
+        manifest = {
+            "version": CATALOG_VERSION,
+            "data_lake_path": self.data_lake_path,
+            "entries": [{**entry, "description": self.description(name)} for name, entry in self._entries.items()],
+        }
+        tmp_path = f"{self.manifest_path}.tmp{os.getpid()}"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(manifest, f, indent=1)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError:
+            # A read-only cache only costs re-profiling in the next process
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def refresh(self) -> bool:
+        """Re-stat the directory and profile new or modified files; returns whether anything changed."""
+        with self._lock:
+            if not os.path.isdir(self.data_lake_path):
+                changed = bool(self._entries)
+                self._entries = {}
+                return changed
+
+            current = {}
+            stale = []
+            with os.scandir(self.data_lake_path) as it:
+                for item in it:
+                    if item.name.startswith("."):
+                        continue
+                    stat = item.stat()
+                    cached = self._entries.get(item.name)
+                    if cached and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime:
+                        current[item.name] = cached
+                    else:
+                        stale.append(item.path)
+
+            if stale:
+                with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+                    for entry in executor.map(profile_file, stale):
+                        current[entry["name"]] = entry
+
+            changed = bool(stale) or current.keys() != self._entries.keys()
+            self._entries = dict(sorted(current.items()))
+            if changed:
+                self._save_manifest()
+            return changed
+
+    def description(self, name: str) -> str:
+        return self.descriptions.get(name) or f"Data lake item: {name}"
+
+    def names(self) -> list[str]:
+        """File names in the data lake, sorted."""
+        self.refresh()
+        return list(self._entries)
+
+    def get(self, name: str) -> dict | None:
+        """Catalog entry of a file, with its description (None if the file is not in the data lake)."""
+        self.refresh()
+        entry = self._entries.get(name)
+        return None if entry is None else {**entry, "description": self.description(name)}
+
+    def entries(self) -> list[dict]:
+        """Catalog entries of all files, with descriptions and schema hints."""
+        self.refresh()
+        return [
+            {**entry, "description": self.description(name), "schema": self.schema_hint(name)}
+            for name, entry in self._entries.items()
+        ]
+
+    def __contains__(self, name: str) -> bool:
+        self.refresh()
+        return name in self._entries
+
+    def missing(self, expected_files) -> list[str]:
+        """Expected files that are not in the data lake yet."""
+        self.refresh()
+        return [name for name in expected_files if name not in self._entries]
+
+    def schema_hint(self, name: str, max_columns: int = HINT_COLUMNS) -> str:
+        """One-line summary of a file's format, size, shape and first columns (e.g. for a system prompt)."""
+        entry = self._entries.get(name)
+        if entry is None:
+            return ""
+        parts = [entry["format"] or "file", _format_size(entry["size"])]
+        if entry["n_rows"] is not None:
+            parts.append(f"{'~' if entry['n_rows_estimated'] else ''}{entry['n_rows']:,} rows")
+        hint = ", ".join(parts)
+        columns = entry["columns"]
+        if columns:
+            shown = ", ".join(columns[:max_columns])
+            more = f", +{len(columns) - max_columns} more" if len(columns) > max_columns else ""
+            hint += f"; {len(columns)} column{'s' if len(columns) != 1 else ''}: {shown}{more}"
+        return hint
+
+
+def get_data_lake_catalog(data_lake_path: str, descriptions: dict | None = None) -> DataLakeCatalog:
+    """Return the process-wide catalog of a data lake directory, refreshed when its contents change.
+
+    ``descriptions`` (e.g. an agent's ``data_lake_dict``) replaces the descriptions of a cached catalog.
+    """
+    data_lake_path = os.path.abspath(data_lake_path)
+    with _catalogs_lock:
+        catalog = _catalogs.get(data_lake_path)
+        if catalog is None:
+            catalog = DataLakeCatalog(data_lake_path, descriptions)
+            _catalogs[data_lake_path] = catalog
+        elif descriptions is not None:
+            catalog.descriptions = descriptions
+    catalog.refresh()
+    return catalog
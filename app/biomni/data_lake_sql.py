@@ -0,0 +1,271 @@
+"""
+Biomni Data Lake SQL
+
+Read-only SQL over every Parquet, CSV and TSV file of a data lake through an embedded DuckDB
+database. Each file is registered as a view named after the file (``gtex_tissue_gene_tpm``,
+``DisGeNET``, ...) together with its ``data_lake_dict`` description. Nothing is loaded up front:
+DuckDB reads only the columns and Parquet row groups a query needs and scans files on all
+cores, and results are capped before they reach the caller.
+
+Text tables converted by ``biomni.columnar`` are read from their Parquet form when it is up
+to date.
+
+Queries cannot change anything or reach files outside the data lake: only single SELECT
+statements (and their DESCRIBE, SHOW, SUMMARIZE, PRAGMA and plain EXPLAIN forms) are accepted,
+and once the views are registered external access is restricted to the data lake and index
+directories and the configuration is locked, so COPY, ATTACH and ``read_*`` on other paths fail.
+
+Usage:
+    from biomni.data_lake_sql import get_data_lake_sql
+
+    lake = get_data_lake_sql("./data/data_lake")
+    lake.tables()
+    lake.query("SELECT * FROM DisGeNET WHERE gene_symbol = 'BRCA1' LIMIT 10")
+"""
+
+import os
+import re
+import threading
+
+import pandas as pd
+
+from biomni.columnar import MANIFEST_NAME as COLUMNAR_MANIFEST
+from biomni.utils import get_index_cache_path, is_index_stale
+
+# File types registered as tables: extension -> DuckDB reader
+TABLE_EXTENSIONS = {
+    ".parquet": "parquet",
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".txt": "csv",
+    ".csv.gz": "csv",
+    ".tsv.gz": "csv",
+}
+
+# Statement types allowed through ``query``; DESCRIBE, SHOW, SUMMARIZE and PRAGMA table_info parse as SELECT.
+# EXPLAIN is allowed when it wraps a SELECT and is not EXPLAIN ANALYZE (which executes the statement).
+READ_ONLY_STATEMENTS = ("SELECT", "EXPLAIN")
+
+_engines: dict = {}
+_engines_lock = threading.Lock()
+
+
+def _import_duckdb():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("duckdb is required for data lake SQL queries. Install with: pip install duckdb") from e
+    return duckdb
+
+
+def _table_extension(file_name: str) -> str | None:
+    for extension in sorted(TABLE_EXTENSIONS, key=len, reverse=True):
+        if file_name.endswith(extension):
+            return extension
+    return None
+
+
+def table_name(file_name: str) -> str:
+    """SQL table name for a data lake file: the file name without extension, non-identifier characters as "_"."""
+    extension = _table_extension(file_name)
+    stem = file_name[: -len(extension)] if extension else file_name
+    name = re.sub(r"\W", "_", stem)
+    return f"t_{name}" if name[:1].isdigit() else name
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _statement_text(sql: str) -> str:
+    """Lowercased statement with comments and string literals blanked out, for validation."""
+    sql = re.sub(r"'(?:[^']|'')*'", "''", sql)
+    sql = re.sub(r"/\*.*?\*/", " ", sql, flags=re.S)
+    return re.sub(r"--[^\n]*", " ", sql).strip().lower()
+
+
+def _single_statement(connection, sql: str):
+    """Parse ``sql`` with DuckDB and return its only statement (ValueError for zero or several)."""
+    duckdb = _import_duckdb()
+    try:
+        statements = connection.extract_statements(sql)
+    except duckdb.Error as e:
+        raise ValueError(f"Invalid SQL: {str(e).splitlines()[0]}") from e
+    if len(statements) != 1:
+        raise ValueError("Only a single SQL statement is allowed")
+    return statements[0]
+
+
+def _check_read_only(connection, sql: str) -> str:
+    """Validate a read-only statement and return its type name ("SELECT" or "EXPLAIN")."""
+    statement_type = _single_statement(connection, sql).type.name
+    if statement_type not in READ_ONLY_STATEMENTS:
+        raise ValueError("Only read-only statements (SELECT, WITH, DESCRIBE, SHOW, SUMMARIZE, EXPLAIN) are allowed")
+    if statement_type == "EXPLAIN":
+        text = _statement_text(sql)
+        if re.match(r"explain\s+analy[sz]e\b", text):
+            raise ValueError("EXPLAIN ANALYZE executes the statement and is not allowed")
+        explained = re.sub(r"^\s*(?:--[^\n]*\n\s*|/\*.*?\*/\s*)*explain\b", "", sql, count=1, flags=re.I | re.S)
+        if _single_statement(connection, explained).type.name != "SELECT":
+            raise ValueError("Only SELECT statements can be explained")
+    return statement_type
+
+
+class DataLakeSQL:
+    """Views over the data lake files of one directory in an in-memory DuckDB database."""
+
+    def __init__(
+        self,
+        data_lake_path: str,
+        descriptions: dict | None = None,
+        threads: int | None = None,
+        memory_limit: str | None = None,
+    ):
+        duckdb = _import_duckdb()
+        if descriptions is None:
+            from biomni.env_desc import data_lake_dict as descriptions
+
+        self.data_lake_path = os.path.abspath(data_lake_path)
+        self.descriptions = descriptions
+        self._connection = duckdb.connect(database=":memory:")
+        self._connection.execute(f"SET threads = {int(threads or os.cpu_count() or 1)}")
+        if memory_limit:
+            self._connection.execute(f"SET memory_limit = {_sql_string(memory_limit)}")
+
+        self._tables = {}
+        self.errors = {}
+        for file_name in sorted(os.listdir(self.data_lake_path)):
+            path = os.path.join(self.data_lake_path, file_name)
+            if os.path.isfile(path) and _table_extension(file_name):
+                self.register(file_name, path)
+
+        # From here on files are only readable under the data lake and the index caches it may use
+        # (see ``get_index_cache_path``), and queries cannot change the settings back
+        allowed = [self.data_lake_path, os.path.join(os.path.expanduser("~"), ".cache", "biomni", "index")]
+        allowed_list = ", ".join(_sql_string(os.path.join(d, "")) for d in allowed)
+        self._connection.execute(f"SET allowed_directories = [{allowed_list}]")
+        self._connection.execute("SET enable_external_access = false")
+        self._connection.execute("SET lock_configuration = true")
+
+    def _source_expression(self, path: str) -> str:
+        """DuckDB table function reading a file (or its up-to-date columnar conversion)."""
+        extension = _table_extension(path)
+        if TABLE_EXTENSIONS[extension] == "parquet":
+            return f"read_parquet({_sql_string(path)})"
+
+        converted = get_index_cache_path(path, "parquet")
+        if os.path.isdir(converted) and not is_index_stale(os.path.join(converted, COLUMNAR_MANIFEST), path):
+            pattern = os.path.join(converted, "**", "*.parquet")
+            return f"read_parquet({_sql_string(pattern)}, hive_partitioning = true)"
+
+        delimiter = "\t" if extension in (".tsv", ".txt", ".tsv.gz") else ","
+        return f"read_csv({_sql_string(path)}, delim = {_sql_string(delimiter)}, header = true, sample_size = 20480)"
+
+    def register(self, file_name: str, path: str | None = None) -> str | None:
+        """Register a file as a view; returns the table name (None if DuckDB cannot read it)."""
+        path = path or os.path.join(self.data_lake_path, file_name)
+        name = table_name(file_name)
+        try:
+            self._connection.execute(
+                f'CREATE OR REPLACE VIEW "{name}" AS SELECT * FROM {self._source_expression(path)}'
+            )
+        except Exception as e:
+            self.errors[file_name] = str(e).splitlines()[0]
+            return None
+        self._tables[name] = {"file": file_name, "path": path, "description": self.descriptions.get(file_name, "")}
+        return name
+
+    def tables(self, pattern: str | None = None) -> pd.DataFrame:
+        """Registered tables with their file, size and data lake description, optionally filtered by a regex."""
+        rows = [
+            {
+                "table": name,
+                "file": info["file"],
+                "size_mb": round(os.path.getsize(info["path"]) / 1e6, 1),
+                "description": info["description"],
+            }
+            for name, info in self._tables.items()
+        ]
+        tables = pd.DataFrame(rows, columns=["table", "file", "size_mb", "description"])
+        if pattern:
+            text = tables["table"] + " " + tables["description"]
+            tables = tables[text.str.contains(pattern, case=False, regex=True)]
+        return tables.reset_index(drop=True)
+
+    def columns(self, table: str) -> pd.DataFrame:
+        """Column names and types of a table."""
+        if table not in self._tables:
+            raise ValueError(f"Unknown table '{table}'")
+        cursor = self._connection.cursor()
+        try:
+            return cursor.execute(f'DESCRIBE "{table}"').df()[["column_name", "column_type"]]
+        finally:
+            cursor.close()
+
+    def query(self, sql: str, max_rows: int = 1000) -> tuple[pd.DataFrame, bool]:
+        """
+        Run a read-only SQL statement and return (result, truncated).
+
+        At most ``max_rows`` rows are materialized: the statement is wrapped in a LIMIT, so DuckDB
+        stops scanning once enough rows are produced. ``truncated`` tells whether more rows exist.
+        """
+        sql = sql.strip().rstrip(";")
+        statement_type = _check_read_only(self._connection, sql)
+
+        # Each call gets its own cursor so concurrent sessions can query the same database
+        cursor = self._connection.cursor()
+        try:
+            if statement_type == "SELECT" and _statement_text(sql).startswith(("select", "with", "from")):
+                result = cursor.sql(sql).limit(max_rows + 1).df()
+            else:
+                result = cursor.execute(sql).df()
+        finally:
+            cursor.close()
+        truncated = len(result) > max_rows
+        return result.head(max_rows), truncated
+
+    def export(self, sql: str, output_file: str) -> int:
+        """Write the full result of a SELECT statement to a Parquet, CSV or TSV file; returns the row count.
+
+        The result is streamed in Arrow record batches and written from Python, since the database
+        itself cannot write files.
+        """
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+
+        sql = sql.strip().rstrip(";")
+        if _single_statement(self._connection, sql).type.name != "SELECT" or not _statement_text(sql).startswith(
+            ("select", "with", "from")
+        ):
+            raise ValueError("Only a single SELECT statement can be exported")
+
+        cursor = self._connection.cursor()
+        try:
+            reader = cursor.sql(sql).fetch_record_batch()
+            if output_file.endswith(".parquet"):
+                writer = pq.ParquetWriter(output_file, reader.schema)
+            else:
+                delimiter = "\t" if output_file.endswith((".tsv", ".txt")) else ","
+                writer = pa_csv.CSVWriter(
+                    output_file, reader.schema, write_options=pa_csv.WriteOptions(delimiter=delimiter)
+                )
+            n_rows = 0
+            with writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    n_rows += batch.num_rows
+            return n_rows
+        finally:
+            cursor.close()
+
+
+def get_data_lake_sql(data_lake_path: str) -> DataLakeSQL:
+    """Return the process-wide SQL engine of a data lake, re-registering its files when the directory changes."""
+    data_lake_path = os.path.abspath(data_lake_path)
+    mtime = os.path.getmtime(data_lake_path)
+    with _engines_lock:
+        cached = _engines.get(data_lake_path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, DataLakeSQL(data_lake_path))
+            _engines[data_lake_path] = cached
+        return cached[1]
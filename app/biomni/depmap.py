@@ -0,0 +1,380 @@
+"""
+Biomni DepMap Matrices
+
+Memory-mapped access to the DepMap cell line x gene matrices of the data lake (CRISPR gene
+effect, CRISPR gene dependency probability and log TPM expression). Each CSV is converted
+once into an index directory next to it:
+
+- ``manifest.json``: source file, shape and index version (written last)
+- ``values.npy``: float32 matrix, one row per model and one column per gene, stored gene-major
+  (Fortran order) so the scores of a gene across all models are contiguous
+- ``models.npy`` / ``genes.npy``: row (ModelID) and column ("SYMBOL (Entrez)") labels
+
+Opening a matrix maps these files, so sessions share one copy through the page cache and
+pulling a few genes touches only their columns. Rows are joined to ``DepMap_Model.csv``
+(lineage, primary disease, cell line names) for lineage-filtered subsets, and correlations of
+one profile against every gene run as blocked, NaN-aware matrix products on a thread pool.
+
+Usage:
+    from biomni.depmap import get_depmap_matrix
+
+    effect = get_depmap_matrix("./data/data_lake", "gene_effect")
+    effect.genes(["KRAS", "BRAF"], lineage="Skin")
+    effect.correlate("BRAF", top_n=20)
+"""
+
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from biomni.utils import get_index_cache_path, is_index_stale
+
+# Bump when the on-disk layout changes so old conversions are rebuilt
+INDEX_VERSION = 1
+
+# DepMap matrices shipped with the data lake
+DEPMAP_DATASETS = {
+    "gene_effect": "DepMap_CRISPRGeneEffect.csv",
+    "gene_dependency": "DepMap_CRISPRGeneDependency.csv",
+    "expression": "DepMap_OmicsExpressionProteinCodingGenesTPMLogp1.csv",
+}
+MODEL_FILE = "DepMap_Model.csv"
+
+# Model metadata columns across DepMap releases: (current name, legacy name)
+MODEL_ID_COLUMNS = ("ModelID", "DepMap_ID")
+LINEAGE_COLUMNS = ("OncotreeLineage", "lineage")
+DISEASE_COLUMNS = ("OncotreePrimaryDisease", "primary_disease")
+NAME_COLUMNS = ("StrippedCellLineName", "CellLineName", "stripped_cell_line_name", "cell_line_name")
+
+_GENE_LABEL = re.compile(r"^(.+?) \((\w+)\)$")
+
+_matrices: dict = {}
+_matrices_lock = threading.Lock()
+
+
+def _first_present(columns, candidates) -> str | None:
+    return next((c for c in candidates if c in columns), None)
+
+
+def convert_depmap_matrix(source_path: str, index_dir: str) -> "DepMapMatrix":
+    """
+    Convert a DepMap matrix CSV into ``index_dir`` and return the opened matrix.
+
+    The row label is the ModelID column (the first column in releases that leave it unnamed).
+    When gene columns are labelled "SYMBOL (Entrez)", other columns (sequencing IDs, default-entry
+    flags) are dropped.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    header = list(pd.read_csv(source_path, nrows=0).columns)
+    label_column = _first_present(header, MODEL_ID_COLUMNS) or header[0]
+    genes = [c for c in header if c != label_column and not c.startswith("Unnamed:")]
+    if any(_GENE_LABEL.match(c) for c in genes):
+        genes = [c for c in genes if _GENE_LABEL.match(c)]
+
+    # Read with the pandas column names so an unnamed first column is addressable as "Unnamed: 0"
+    table = pacsv.read_csv(
+        source_path,
+        read_options=pacsv.ReadOptions(column_names=header, skip_rows=1),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=[label_column] + genes,
+            column_types={label_column: pa.string(), **{gene: pa.float32() for gene in genes}},
+        ),
+    )
+
+    os.makedirs(index_dir, exist_ok=True)
+    manifest_path = os.path.join(index_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    values = np.lib.format.open_memmap(
+        os.path.join(index_dir, "values.npy"),
+        mode="w+",
+        dtype=np.float32,
+        shape=(table.num_rows, len(genes)),
+        fortran_order=True,
+    )
+    for j, gene in enumerate(genes):
+        values[:, j] = table.column(gene).to_numpy(zero_copy_only=False)
+    n_missing = int(np.isnan(values).sum())
+    values.flush()
+    del values
+
+    np.save(os.path.join(index_dir, "models.npy"), np.array(table.column(label_column).to_pylist(), dtype=str))
+    np.save(os.path.join(index_dir, "genes.npy"), np.array(genes, dtype=str))
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "source": os.path.abspath(source_path),
+        "n_models": table.num_rows,
+        "n_genes": len(genes),
+        "n_missing": n_missing,
+    }
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return DepMapMatrix(index_dir)
+
+
+def read_model_metadata(model_path: str) -> pd.DataFrame:
+    """Read DepMap_Model.csv indexed by ModelID."""
+    metadata = pd.read_csv(model_path, low_memory=False)
+    id_column = _first_present(metadata.columns, MODEL_ID_COLUMNS) or metadata.columns[0]
+    return metadata.drop_duplicates(subset=[id_column]).set_index(id_column)
+
+
+def _pearson_columns(x: np.ndarray, y: np.ndarray, min_models: int) -> tuple[np.ndarray, np.ndarray]:
+    """Pearson r of ``y`` with every column of ``x`` over pairwise-complete rows, and the row counts."""
+    valid = ~np.isnan(x)
+    xz = np.where(valid, x, 0.0)
+    mask = valid.astype(np.float64)
+    n = mask.sum(axis=0)
+    sum_x, sum_xx = xz.sum(axis=0), (xz * xz).sum(axis=0)
+    sum_y, sum_yy, sum_xy = y @ mask, (y * y) @ mask, y @ xz
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = (n * sum_xy - sum_x * sum_y) / np.sqrt((n * sum_xx - sum_x**2) * (n * sum_yy - sum_y**2))
+    r[(n < min_models) | ~np.isfinite(r)] = np.nan
+    return np.clip(r, -1.0, 1.0), n.astype(np.int64)
+
+
+class DepMapMatrix:
+    """Read-only, memory-mapped DepMap matrix (models x genes) with label indexes and model metadata."""
+
+    def __init__(self, index_dir: str, metadata: pd.DataFrame | None = None, block_size: int = 2048):
+        with open(os.path.join(index_dir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != INDEX_VERSION:
+            raise ValueError(f"DepMap index {index_dir} has an unsupported version; rebuild it")
+        self.index_dir = index_dir
+        self.block_size = block_size
+        self.values = np.load(os.path.join(index_dir, "values.npy"), mmap_mode="r")
+        self.model_ids = np.load(os.path.join(index_dir, "models.npy"))
+        self.gene_labels = np.load(os.path.join(index_dir, "genes.npy"))
+
+        self.symbols = np.array([(m.group(1) if (m := _GENE_LABEL.match(g)) else g) for g in self.gene_labels])
+        self._gene_index = {}
+        for j, label in enumerate(self.gene_labels):
+            match = _GENE_LABEL.match(label)
+            keys = (label, match.group(1).upper(), match.group(2)) if match else (label, label.upper())
+            for key in keys:
+                self._gene_index.setdefault(key, j)
+        self._model_index = {model: i for i, model in enumerate(self.model_ids)}
+
+        # Model metadata aligned to the matrix rows (all NaN for models missing from DepMap_Model.csv)
+        self.metadata = metadata.reindex(self.model_ids) if metadata is not None else None
+        if self.metadata is not None:
+            for column in NAME_COLUMNS:
+                if column in self.metadata.columns:
+                    for i, name in enumerate(self.metadata[column]):
+                        if isinstance(name, str):
+                            self._model_index.setdefault(name, i)
+                            self._model_index.setdefault(name.upper(), i)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.values.shape
+
+    def gene_columns(self, genes) -> tuple[np.ndarray, list[str]]:
+        """Column indexes of genes given as symbols, "SYMBOL (Entrez)" labels or Entrez IDs, and the unmatched names."""
+        columns, missing = [], []
+        for gene in [genes] if isinstance(genes, str) else genes:
+            key = str(gene)
+            j = self._gene_index.get(key, self._gene_index.get(key.upper()))
+            if j is None:
+                missing.append(key)
+            else:
+                columns.append(j)
+        return np.array(columns, dtype=np.int64), missing
+
+    def model_rows(self, models=None, lineage=None, disease=None) -> np.ndarray:
+        """
+        Row indexes of models given by ModelID or cell line name, optionally restricted by lineage
+        and primary disease (case-insensitive, one value or a list). Unknown models are skipped.
+        """
+        if models is None:
+            rows = np.arange(self.shape[0])
+        else:
+            names = [models] if isinstance(models, str) else models
+            rows = np.array(
+                [
+                    i
+                    for name in names
+                    if (i := self._model_index.get(str(name), self._model_index.get(str(name).upper()))) is not None
+                ],
+                dtype=np.int64,
+            )
+
+        for value, candidates in ((lineage, LINEAGE_COLUMNS), (disease, DISEASE_COLUMNS)):
+            if value is None:
+                continue
+            column = None if self.metadata is None else _first_present(self.metadata.columns, candidates)
+            if column is None:
+                raise ValueError(f"No {candidates[0]} metadata available; {MODEL_FILE} was not found")
+            wanted = {v.lower() for v in ([value] if isinstance(value, str) else value)}
+            keep = self.metadata[column].astype(str).str.lower().isin(wanted).to_numpy()
+            rows = rows[keep[rows]]
+        return rows
+
+    def _frame(self, rows: np.ndarray, columns: np.ndarray, with_metadata=None) -> pd.DataFrame:
+        # Only the full gene list in stored order can skip the column gather
+        if np.array_equal(columns, np.arange(self.shape[1])):
+            values = self.values[rows]
+        else:
+            values = np.asarray(self.values[:, columns])[rows]
+        frame = pd.DataFrame(
+            values, index=pd.Index(self.model_ids[rows], name="ModelID"), columns=self.symbols[columns]
+        )
+        if with_metadata and self.metadata is not None:
+            metadata_columns = [with_metadata] if isinstance(with_metadata, str) else with_metadata
+            if metadata_columns is True:
+                metadata_columns = [
+                    c
+                    for c in (*NAME_COLUMNS[:1], *LINEAGE_COLUMNS[:1], *DISEASE_COLUMNS[:1])
+                    if c in self.metadata.columns
+                ]
+            frame = pd.concat([self.metadata.iloc[rows][list(metadata_columns)], frame], axis=1)
+        return frame
+
+    def genes(self, genes, models=None, lineage=None, disease=None, with_metadata=False) -> pd.DataFrame:
+        """Scores of the given genes (columns) across models (rows), optionally with metadata columns."""
+        columns, missing = self.gene_columns(genes)
+        frame = self._frame(self.model_rows(models, lineage, disease), columns, with_metadata)
+        frame.attrs["missing_genes"] = missing
+        return frame
+
+    def models(self, models, genes=None) -> pd.DataFrame:
+        """Scores of the given models (rows) across all genes or a gene list."""
+        columns = np.arange(self.shape[1]) if genes is None else self.gene_columns(genes)[0]
+        return self._frame(self.model_rows(models), columns)
+
+    def subset(self, lineage=None, disease=None, genes=None, with_metadata=False) -> pd.DataFrame:
+        """All models of a lineage and/or primary disease, over all genes or a gene list."""
+        columns = np.arange(self.shape[1]) if genes is None else self.gene_columns(genes)[0]
+        return self._frame(self.model_rows(lineage=lineage, disease=disease), columns, with_metadata)
+
+    def profile(self, gene) -> pd.Series:
+        """Scores of one gene across all models, indexed by ModelID."""
+        columns, missing = self.gene_columns([gene])
+        if missing:
+            raise ValueError(f"Gene '{gene}' not found")
+        return pd.Series(self.values[:, columns[0]], index=pd.Index(self.model_ids, name="ModelID"), name=gene)
+
+    def correlate(
+        self,
+        query,
+        models=None,
+        lineage=None,
+        disease=None,
+        method: str = "pearson",
+        min_models: int = 20,
+        top_n: int | None = None,
+        n_workers: int | None = None,
+    ) -> pd.DataFrame:
+        """
+        Correlate a profile with every gene of the matrix.
+
+        ``query`` is a gene of this matrix or a Series indexed by ModelID (e.g. ``profile()`` of
+        another DepMap matrix, for expression vs. dependency). Correlations use the models where
+        both values are present and at least ``min_models`` of them; "spearman" ranks each gene
+        over its non-missing models. Returns gene, r, n_models, p_value and the Benjamini-Hochberg
+        q_value, sorted by r (the ``top_n`` strongest positive and negative correlations when given).
+        """
+        from scipy import stats
+
+        if method not in ("pearson", "spearman"):
+            raise ValueError("method must be 'pearson' or 'spearman'")
+        rows = self.model_rows(models, lineage, disease)
+        query_column = None
+        if isinstance(query, pd.Series):
+            y = query.reindex(self.model_ids[rows]).to_numpy(dtype=np.float64)
+        else:
+            columns, missing = self.gene_columns([query])
+            if missing:
+                raise ValueError(f"Gene '{query}' not found")
+            query_column = columns[0]
+            y = np.asarray(self.values[:, query_column], dtype=np.float64)[rows]
+        rows, y = rows[~np.isnan(y)], y[~np.isnan(y)]
+        if len(y) < max(min_models, 3):
+            raise ValueError(f"Only {len(y)} models have a value for the query profile")
+        if method == "spearman":
+            y = stats.rankdata(y)
+
+        def block_correlation(start, end):
+            x = np.asarray(self.values[:, start:end])[rows].astype(np.float64)
+            if method == "spearman":
+                x = pd.DataFrame(x).rank().to_numpy()
+            return _pearson_columns(x, y, min_models)
+
+        blocks = [(s, min(s + self.block_size, self.shape[1])) for s in range(0, self.shape[1], self.block_size)]
+        n_workers = min(n_workers or os.cpu_count() or 1, max(1, len(blocks)))
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(lambda block: block_correlation(*block), blocks))
+        r = np.concatenate([result[0] for result in results])
+        n = np.concatenate([result[1] for result in results])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = r * np.sqrt((n - 2) / (1.0 - r**2))
+        p = np.where(np.isnan(r), np.nan, 2 * stats.t.sf(np.abs(t), np.maximum(n - 2, 1)))
+        p[np.abs(r) >= 1.0] = 0.0
+        q = np.full_like(p, np.nan)
+        tested = ~np.isnan(p)
+        if tested.any():
+            q[tested] = stats.false_discovery_control(p[tested])
+
+        result = pd.DataFrame({"gene": self.symbols, "label": self.gene_labels, "r": r, "n_models": n})
+        result["p_value"], result["q_value"] = p, q
+        if query_column is not None:
+            result = result.drop(index=query_column)
+        result = result.dropna(subset=["r"]).sort_values("r", ascending=False, kind="stable")
+        if top_n is not None and len(result) > 2 * top_n:
+            result = pd.concat([result.head(top_n), result.tail(top_n)])
+        return result.reset_index(drop=True)
+
+
+def load_depmap_matrix(source_path: str, model_path: str | None = None) -> DepMapMatrix:
+    """Return the memory-mapped form of a DepMap matrix CSV, converting it next to the file on first use.
+
+    ``model_path`` defaults to DepMap_Model.csv in the same directory. The matrix is kept open
+    per process and reconverted only when the CSV changes.
+    """
+    source_path = os.path.abspath(source_path)
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"DepMap matrix not found: {source_path}")
+    model_path = model_path or os.path.join(os.path.dirname(source_path), MODEL_FILE)
+    key = (
+        os.path.getmtime(source_path),
+        os.path.getmtime(model_path) if os.path.exists(model_path) else None,
+    )
+
+    with _matrices_lock:
+        cached = _matrices.get(source_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        metadata = read_model_metadata(model_path) if os.path.exists(model_path) else None
+        index_dir = get_index_cache_path(source_path, "depmap")
+        matrix = None
+        if not is_index_stale(os.path.join(index_dir, "manifest.json"), source_path):
+            try:
+                matrix = DepMapMatrix(index_dir, metadata=metadata)
+            except (OSError, ValueError, KeyError):
+                matrix = None
+        if matrix is None:
+            convert_depmap_matrix(source_path, index_dir)
+            matrix = DepMapMatrix(index_dir, metadata=metadata)
+        _matrices[source_path] = (key, matrix)
+        return matrix
+
+
+def get_depmap_matrix(data_lake_path: str, dataset: str = "gene_effect") -> DepMapMatrix:
+    """Return a data lake DepMap matrix by name (see DEPMAP_DATASETS) or file name."""
+    file_name = DEPMAP_DATASETS.get(dataset, dataset)
+    path = file_name if os.path.isabs(file_name) else os.path.join(data_lake_path, file_name)
+    return load_depmap_matrix(path)
@@ -0,0 +1,385 @@
+"""
+Biomni Gene Set Enrichment
+
+Offline over-representation analysis against gene set libraries: the MSigDB and MouseMine
+gene set tables of the data lake, GMT files, or any {set: genes} mapping (for example GO term
+gene sets from ``OntologyIndex.propagate_annotations``).
+
+A library is loaded once into a sparse set x gene membership matrix, persisted next to its
+source file and kept in memory for the lifetime of the process. Enrichment of many query lists
+is one sparse product giving every query x set overlap, followed by vectorized hypergeometric
+tail probabilities (the one-sided Fisher exact test) and Benjamini-Hochberg FDR per query over
+all tested sets. Genes are matched case-insensitively; a custom background restricts both the
+sets and the queries to the background genes.
+
+Usage:
+    from biomni.enrichment import get_gene_set_library
+
+    library = get_gene_set_library(data_lake_path, "hallmark")
+    results = library.enrich({"cluster_0": ["CDK1", "CCNB1", ...], "cluster_1": [...]}, max_fdr=0.05)
+"""
+
+import os
+import pickle
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from biomni.utils import get_index_cache_path, is_index_stale
+
+# Bump when the persisted layout changes so stale libraries are rebuilt
+INDEX_VERSION = 1
+
+# Gene set libraries of the data lake by short name
+LIBRARY_FILES = {
+    "hallmark": "msigdb_human_h_hallmark_geneset.parquet",
+    "positional": "msigdb_human_c1_positional_geneset.parquet",
+    "curated": "msigdb_human_c2_curated_geneset.parquet",
+    "regulatory_target": "msigdb_human_c3_regulatory_target_geneset.parquet",
+    "tf_targets": "msigdb_human_c3_subset_transcription_factor_targets_from_GTRD.parquet",
+    "computational": "msigdb_human_c4_computational_geneset.parquet",
+    "ontology": "msigdb_human_c5_ontology_geneset.parquet",
+    "oncogenic": "msigdb_human_c6_oncogenic_signature_geneset.parquet",
+    "immunologic": "msigdb_human_c7_immunologic_signature_geneset.parquet",
+    "celltype": "msigdb_human_c8_celltype_signature_geneset.parquet",
+    "mouse_hallmark": "mousemine_mh_hallmark_geneset.parquet",
+    "mouse_positional": "mousemine_m1_positional_geneset.parquet",
+    "mouse_curated": "mousemine_m2_curated_geneset.parquet",
+    "mouse_regulatory_target": "mousemine_m3_regulatory_target_geneset.parquet",
+    "mouse_ontology": "mousemine_m5_ontology_geneset.parquet",
+    "mouse_celltype": "mousemine_m8_celltype_signature_geneset.parquet",
+}
+
+# Enrichr database names of gene_set_enrichment_analysis with an offline counterpart
+LIBRARY_ALIASES = {
+    "pathway": "curated",
+    "transcription": "tf_targets",
+    "celltypes": "celltype",
+}
+
+# Candidate column names (matched case-insensitively) of gene set tables
+SET_COLUMNS = ("gene_set", "gene_set_name", "geneset", "standard_name", "set_name", "name", "term", "pathway")
+GENE_COLUMNS = ("genes", "gene_symbols", "genesymbols", "gene_symbol", "members", "gene", "symbol")
+DESCRIPTION_COLUMNS = ("description", "exactsource", "brief_description")
+
+_libraries: dict = {}
+_libraries_lock = threading.Lock()
+
+
+def read_gmt(file_path: str) -> tuple[dict[str, list[str]], dict[str, str]]:
+    """Read a GMT file into ({set: genes}, {set: description})."""
+    gene_sets, descriptions = {}, {}
+    with open(file_path) as f:
+        for line in f:
+            fields = line.rstrip("\n\r").split("\t")
+            if len(fields) < 3:
+                continue
+            gene_sets[fields[0]] = [g for g in fields[2:] if g]
+            descriptions[fields[0]] = fields[1]
+    return gene_sets, descriptions
+
+
+def _find_column(columns, candidates) -> str | None:
+    by_lower = {str(c).lower(): c for c in columns}
+    return next((by_lower[c] for c in candidates if c in by_lower), None)
+
+
+def _split_genes(value) -> list[str]:
+    if isinstance(value, str):
+        return [g for g in re.split(r"[,;\s]+", value) if g]
+    if isinstance(value, list | tuple | np.ndarray):
+        return [str(g) for g in value]
+    return [] if pd.isna(value) else [str(value)]
+
+
+def _bh_fdr(p_values: np.ndarray, groups: np.ndarray, n_tests: int) -> np.ndarray:
+    """Benjamini-Hochberg q-values within each group, for ``n_tests`` tests per group.
+
+    Tests not in ``p_values`` (no overlap) have p = 1 and only add to the number of tests.
+    """
+    order = np.lexsort((p_values, groups))
+    p_sorted, g_sorted = p_values[order], groups[order]
+    starts = np.flatnonzero(np.r_[True, g_sorted[1:] != g_sorted[:-1]])
+    ranks = np.arange(len(p_sorted)) - np.repeat(starts, np.diff(np.r_[starts, len(p_sorted)])) + 1
+    q_sorted = p_sorted * n_tests / ranks
+    for start, end in zip(starts, np.r_[starts[1:], len(q_sorted)], strict=True):
+        q_sorted[start:end] = np.minimum.accumulate(q_sorted[start:end][::-1])[::-1]
+    q_values = np.empty_like(q_sorted)
+    q_values[order] = np.minimum(q_sorted, 1.0)
+    return q_values
+
+
+class GeneSetLibrary:
+    """Gene sets as a sparse set x gene membership matrix."""
+
+    def __init__(self, state: dict):
+        from scipy import sparse
+
+        self._state = state
+        self.names = state["names"]
+        self.genes = state["genes"]
+        self.descriptions = state["descriptions"]
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(state["indices"]), dtype=np.int32), state["indices"], state["indptr"]),
+            shape=(len(self.names), len(self.genes)),
+        )
+        self._gene_index = {g.upper(): i for i, g in enumerate(self.genes)}
+        self._set_index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_gene_sets(cls, gene_sets: dict, descriptions: dict | None = None) -> "GeneSetLibrary":
+        """Build a library from a {set name: iterable of gene symbols} mapping."""
+        gene_index = {}
+        genes, indptr, indices = [], [0], []
+        for members in gene_sets.values():
+            columns = set()
+            for gene in members:
+                key = str(gene).upper()
+                if key not in gene_index:
+                    gene_index[key] = len(genes)
+                    genes.append(str(gene))
+                columns.add(gene_index[key])
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+        descriptions = descriptions or {}
+        state = {
+            "version": INDEX_VERSION,
+            "names": np.array([str(name) for name in gene_sets], dtype=object),
+            "genes": np.array(genes, dtype=object),
+            "descriptions": [descriptions.get(name, "") for name in gene_sets] if descriptions else None,
+            "indptr": np.array(indptr, dtype=np.int64),
+            "indices": np.array(indices, dtype=np.int32),
+        }
+        return cls(state)
+
+    @classmethod
+    def from_table(cls, table: pd.DataFrame) -> "GeneSetLibrary":
+        """Build a library from a gene set table: one row per set with a gene list, or one row per (set, gene)."""
+        set_column = _find_column(table.columns, SET_COLUMNS)
+        if set_column is None and not isinstance(table.index, pd.RangeIndex):
+            table = table.rename_axis("gene_set").reset_index()
+            set_column = "gene_set"
+        gene_column = _find_column(table.columns, GENE_COLUMNS)
+        if set_column is None or gene_column is None:
+            raise ValueError(f"No gene set and gene columns among: {', '.join(map(str, table.columns))}")
+        description_column = _find_column(table.columns, DESCRIPTION_COLUMNS)
+
+        gene_sets, descriptions = {}, {}
+        for name, value in zip(table[set_column].astype(str), table[gene_column], strict=True):
+            gene_sets.setdefault(name, []).extend(_split_genes(value))
+        if description_column is not None:
+            firsts = table.drop_duplicates(set_column)
+            descriptions = dict(
+                zip(firsts[set_column].astype(str), firsts[description_column].fillna("").astype(str), strict=True)
+            )
+        return cls.from_gene_sets(gene_sets, descriptions)
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "GeneSetLibrary":
+        """Build a library from a GMT, Parquet, CSV or TSV file."""
+        if file_path.endswith(".gmt"):
+            return cls.from_gene_sets(*read_gmt(file_path))
+        if file_path.endswith(".parquet"):
+            return cls.from_table(pd.read_parquet(file_path))
+        return cls.from_table(pd.read_csv(file_path, sep="\t" if file_path.endswith((".tsv", ".txt")) else ","))
+
+    def save(self, path: str) -> None:
+        """Persist the library atomically."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self._state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "GeneSetLibrary | None":
+        """Load a persisted library, returning None if it is unreadable or from another version."""
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except Exception:
+            return None
+        if not isinstance(state, dict) or state.get("version") != INDEX_VERSION:
+            return None
+        return cls(state)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._set_index
+
+    def gene_set(self, name: str) -> list[str]:
+        """Genes of one set."""
+        i = self._set_index[name]
+        return list(self.genes[self.matrix.indices[self.matrix.indptr[i] : self.matrix.indptr[i + 1]]])
+
+    def _gene_columns(self, genes) -> tuple[set[str], np.ndarray]:
+        keys = {str(g).upper() for g in genes}
+        columns = np.array(sorted(self._gene_index[k] for k in keys if k in self._gene_index), dtype=np.int64)
+        return keys, columns
+
+    def enrich(
+        self,
+        queries,
+        background=None,
+        min_set_size: int = 1,
+        max_set_size: int | None = None,
+        min_overlap: int = 1,
+        max_fdr: float | None = None,
+        top_k: int | None = None,
+    ) -> pd.DataFrame:
+        """
+        Over-representation analysis of one or many gene lists.
+
+        Args:
+            queries: A list of gene symbols, or {query name: list of gene symbols}
+            background: Background gene symbols (default: every gene in the library)
+            min_set_size: Smallest set size (within the background) tested
+            max_set_size: Largest set size (within the background) tested
+            min_overlap: Only report sets sharing at least this many genes with a query
+            max_fdr: Only report results with an FDR at or below this value
+            top_k: Only report the top_k most significant sets per query
+
+        Returns:
+            DataFrame with query, gene_set, overlap, query_size, set_size, background_size,
+            fold_enrichment, p_value, fdr and the overlapping genes, sorted by query and p-value.
+            ``attrs["unmapped_genes"]`` lists, per query, the genes outside the background.
+
+        """
+        from scipy import sparse
+        from scipy.stats import hypergeom
+
+        if not isinstance(queries, dict):
+            queries = {"query": list(queries)}
+        if not queries:
+            raise ValueError("No query gene lists given")
+        query_names = list(queries)
+
+        in_background = np.ones(len(self.genes), dtype=bool)
+        n_outside_library = 0
+        background_keys = None
+        if background is not None:
+            background_keys, background_columns = self._gene_columns(background)
+            in_background[:] = False
+            in_background[background_columns] = True
+            n_outside_library = len(background_keys) - len(background_columns)
+        n_background = int(in_background.sum()) + n_outside_library
+
+        set_sizes = np.asarray(self.matrix @ in_background.astype(np.int32)).ravel()
+        tested = (set_sizes >= max(min_set_size, 1)) & (set_sizes <= (max_set_size or np.inf))
+
+        # Query x gene membership, restricted to the background
+        rows, columns, query_sizes, unmapped = [], [], [], {}
+        for i, name in enumerate(query_names):
+            keys, query_columns = self._gene_columns(queries[name])
+            query_columns = query_columns[in_background[query_columns]]
+            if background_keys is None:
+                mapped = {self.genes[c].upper() for c in query_columns}
+            else:
+                mapped = keys & background_keys
+            unmapped[name] = sorted(keys - mapped)
+            query_sizes.append(len(mapped))
+            rows.append(np.full(len(query_columns), i))
+            columns.append(query_columns)
+        query_matrix = sparse.csr_matrix(
+            (np.ones(sum(map(len, rows)), dtype=np.int32), (np.concatenate(rows), np.concatenate(columns))),
+            shape=(len(query_names), len(self.genes)),
+        )
+        query_sizes = np.array(query_sizes)
+
+        overlaps = (query_matrix @ self.matrix.T).tocoo()
+        keep = tested[overlaps.col]
+        query_idx, set_idx, overlap = overlaps.row[keep], overlaps.col[keep], overlaps.data[keep]
+        p_values = hypergeom.sf(overlap - 1, n_background, set_sizes[set_idx], query_sizes[query_idx])
+        fdr = _bh_fdr(p_values, query_idx, int(tested.sum())) if len(p_values) else p_values
+
+        results = pd.DataFrame(
+            {
+                "query_index": query_idx,
+                "set_index": set_idx,
+                "overlap": overlap,
+                "query_size": query_sizes[query_idx],
+                "set_size": set_sizes[set_idx],
+                "background_size": n_background,
+                "fold_enrichment": (overlap / query_sizes[query_idx]) / (set_sizes[set_idx] / n_background),
+                "p_value": p_values,
+                "fdr": fdr,
+            }
+        )
+        results = results[results["overlap"] >= min_overlap]
+        if max_fdr is not None:
+            results = results[results["fdr"] <= max_fdr]
+        results = results.sort_values(["query_index", "p_value", "overlap"], ascending=[True, True, False])
+        if top_k is not None:
+            results = results.groupby("query_index", sort=False).head(top_k)
+
+        # Overlapping genes only for the reported rows
+        results["genes"] = [
+            ",".join(
+                self.genes[
+                    np.intersect1d(
+                        query_matrix.indices[query_matrix.indptr[q] : query_matrix.indptr[q + 1]],
+                        self.matrix.indices[self.matrix.indptr[s] : self.matrix.indptr[s + 1]],
+                    )
+                ]
+            )
+            for q, s in zip(results["query_index"], results["set_index"], strict=True)
+        ]
+        set_index = results["set_index"].to_numpy()
+        results.insert(0, "query", np.array(query_names, dtype=object)[results["query_index"].to_numpy()])
+        results.insert(1, "gene_set", self.names[set_index])
+        if self.descriptions is not None:
+            results.insert(2, "description", np.array(self.descriptions, dtype=object)[set_index])
+        results = results.drop(columns=["query_index", "set_index"]).reset_index(drop=True)
+        results.attrs["unmapped_genes"] = unmapped
+        return results
+
+
+def load_gene_set_library(file_path: str) -> GeneSetLibrary:
+    """Return the gene set library of a GMT, Parquet, CSV or TSV file, building and persisting it on first use."""
+    file_path = os.path.abspath(file_path)
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Gene set file not found: {file_path}")
+    mtime = os.path.getmtime(file_path)
+
+    with _libraries_lock:
+        cached = _libraries.get(file_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        index_path = get_index_cache_path(file_path, "genesets.pkl")
+        library = None if is_index_stale(index_path, file_path) else GeneSetLibrary.load(index_path)
+        if library is None:
+            library = GeneSetLibrary.from_file(file_path)
+            try:
+                library.save(index_path)
+            except OSError:
+                pass  # Read-only data lake and cache: keep the in-memory library only
+        _libraries[file_path] = (mtime, library)
+        return library
+
+
+def resolve_library(data_lake_path: str | None, library: str) -> str | None:
+    """Path of a gene set library given by short name (see ``LIBRARY_FILES``), data lake file name or path.
+
+    Returns None if the library is not available offline.
+    """
+    library = LIBRARY_ALIASES.get(library, library)
+    if os.path.isfile(library):
+        return library
+    if data_lake_path is None:
+        return None
+    path = os.path.join(data_lake_path, LIBRARY_FILES.get(library, library))
+    return path if os.path.isfile(path) else None
+
+
+def get_gene_set_library(data_lake_path: str | None, library: str) -> GeneSetLibrary:
+    """Return a gene set library by short name (e.g. "hallmark", "ontology"), data lake file name or path."""
+    path = resolve_library(data_lake_path, library)
+    if path is None:
+        raise FileNotFoundError(
+            f"Gene set library '{library}' not found. Use a GMT/Parquet path or one of: {', '.join(LIBRARY_FILES)}"
+        )
+    return load_gene_set_library(path)
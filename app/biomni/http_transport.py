@@ -0,0 +1,258 @@
+"""
+Biomni HTTP Transport
+
+Connection-pooled ``requests`` sessions used by the database, literature and OpenFDA tools,
+one per thread and host so cookies and auth state never cross threads or services, all
+sharing a pluggable transport that can record and replay HTTP traffic:
+
+- ``passthrough`` (default): requests go to the network unchanged
+- ``record``: requests go to the network and every request/response pair is saved to a
+  cassette directory
+- ``replay``: responses are served from the cassette directory without network access,
+  optionally with simulated latency
+
+The mode is read from ``BIOMNI_HTTP_MODE``, ``BIOMNI_HTTP_CASSETTE_DIR`` and
+``BIOMNI_HTTP_REPLAY_LATENCY`` (seconds, or "recorded" to replay the recorded response
+times), or set at runtime with ``configure_http_transport``.
+
+Usage:
+    from biomni.http_transport import configure_http_transport
+
+    configure_http_transport(mode="replay", cassette_dir="./cassettes", latency=0.05)
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+TRANSPORT_MODES = ("passthrough", "record", "replay")
+
+# Credentials and client identifiers that must not influence cassette matching or be stored
+_IGNORED_QUERY_PARAMS = {"api_key", "apikey", "key", "token", "email", "tool"}
+
+
+def _normalize_url(url: str) -> str:
+    """Return the URL with sorted query parameters and credentials removed."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _IGNORED_QUERY_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+def _normalize_body(body) -> bytes:
+    """Return the request body as bytes, with form-encoded credentials removed."""
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        body = body.encode()
+    try:
+        pairs = parse_qsl(body.decode(), keep_blank_values=True, strict_parsing=True)
+        return urlencode(sorted((k, v) for k, v in pairs if k not in _IGNORED_QUERY_PARAMS)).encode()
+    except (UnicodeDecodeError, ValueError):
+        return body
+
+
+def request_fingerprint(request: requests.PreparedRequest) -> str:
+    """Return a stable key identifying a request by method, normalized URL and body."""
+    digest = hashlib.sha256()
+    digest.update(request.method.upper().encode())
+    digest.update(b"\n" + _normalize_url(request.url).encode() + b"\n")
+    digest.update(_normalize_body(request.body))
+    return digest.hexdigest()
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter that records responses to, or replays them from, a cassette directory."""
+
+    def __init__(
+        self,
+        mode: str = "passthrough",
+        cassette_dir: str | None = None,
+        latency: float | str | None = None,
+        pool_maxsize: int = 32,
+    ):
+        if mode not in TRANSPORT_MODES:
+            raise ValueError(f"Unknown HTTP transport mode: {mode}. Choose from {TRANSPORT_MODES}")
+        if mode != "passthrough" and not cassette_dir:
+            raise ValueError(f"A cassette directory is required for '{mode}' mode")
+
+        super().__init__(pool_connections=32, pool_maxsize=pool_maxsize)
+        self.mode = mode
+        self.cassette_dir = cassette_dir
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "recorded": 0, "replayed": 0, "misses": 0, "network_seconds": 0.0}
+        if cassette_dir:
+            os.makedirs(cassette_dir, exist_ok=True)
+
+    def _cassette_path(self, request: requests.PreparedRequest) -> str:
+        host = urlsplit(request.url).hostname or "unknown"
+        return os.path.join(self.cassette_dir, host, f"{request_fingerprint(request)}.json")
+
+    def _count(self, key: str, value: float = 1) -> None:
+        with self._lock:
+            self.stats[key] += value
+
+    def send(self, request, **kwargs):
+        self._count("requests")
+        if self.mode == "replay":
+            return self._replay(request)
+
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        # Session.send sets response.elapsed only after the adapter returns, so time the call here
+        elapsed = time.perf_counter() - start
+        self._count("network_seconds", elapsed)
+
+        if self.mode == "record":
+            # Reading the content here also makes streamed responses replayable
+            self._record(request, response, elapsed)
+        return response
+
+    def _record(self, request: requests.PreparedRequest, response: requests.Response, elapsed: float) -> None:
+        path = self._cassette_path(request)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "request": {
+                "method": request.method,
+                "url": _normalize_url(request.url),
+                "body": base64.b64encode(_normalize_body(request.body)).decode(),
+            },
+            "response": {
+                "status_code": response.status_code,
+                "reason": response.reason,
+                "url": _normalize_url(response.url),
+                "headers": dict(response.headers),
+                "encoding": response.encoding,
+                "body": base64.b64encode(response.content).decode(),
+                "elapsed": elapsed,
+            },
+            "recorded_at": time.time(),
+        }
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        self._count("recorded")
+
+    def _replay(self, request: requests.PreparedRequest) -> requests.Response:
+        path = self._cassette_path(request)
+        if not os.path.exists(path):
+            self._count("misses")
+            raise requests.exceptions.ConnectionError(
+                f"No recorded response for {request.method} {_normalize_url(request.url)} in {self.cassette_dir}",
+                request=request,
+            )
+
+        with open(path) as f:
+            recorded = json.load(f)["response"]
+
+        if self.latency == "recorded":
+            time.sleep(recorded.get("elapsed", 0.0))
+        elif self.latency:
+            time.sleep(float(self.latency))
+
+        response = requests.Response()
+        response.status_code = recorded["status_code"]
+        response.reason = recorded.get("reason")
+        response.url = request.url
+        response.headers = CaseInsensitiveDict(recorded.get("headers", {}))
+        # The body is stored decoded, so compression headers no longer apply
+        response.headers.pop("Content-Encoding", None)
+        response.encoding = recorded.get("encoding")
+        response._content = base64.b64decode(recorded["body"])
+        response._content_consumed = True
+        response.elapsed = timedelta(seconds=recorded.get("elapsed", 0.0))
+        response.request = request
+        response.connection = self
+        self._count("replayed")
+        return response
+
+
+_adapter: CassetteAdapter | None = None
+_session_lock = threading.Lock()
+# Per-thread {host: session}; every session mounts the shared adapter and its connection pool
+_local_sessions = threading.local()
+
+
+def _adapter_from_env() -> CassetteAdapter:
+    latency = os.getenv("BIOMNI_HTTP_REPLAY_LATENCY")
+    if latency and latency != "recorded":
+        latency = float(latency)
+    return CassetteAdapter(
+        mode=os.getenv("BIOMNI_HTTP_MODE", "passthrough").lower(),
+        cassette_dir=os.getenv("BIOMNI_HTTP_CASSETTE_DIR"),
+        latency=latency,
+    )
+
+
+def _get_adapter() -> CassetteAdapter:
+    """Return the active transport adapter, creating it from the environment on first use."""
+    global _adapter
+    if _adapter is None:
+        _adapter = _adapter_from_env()
+    return _adapter
+
+
+def mount_transport(session: requests.Session) -> requests.Session:
+    """Mount the active transport on a session that manages its own headers or lifetime."""
+    with _session_lock:
+        adapter = _get_adapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_http_session(url: str | None = None) -> requests.Session:
+    """Return this thread's pooled session for the host of ``url``, routed through the active transport.
+
+    ``requests.Session`` is not thread-safe and keeps cookies per session, so each thread gets its
+    own session per host. They all share the transport adapter, whose connection pool is.
+    """
+    host = (urlsplit(url).hostname or "").lower() if url else ""
+    sessions = getattr(_local_sessions, "sessions", None)
+    if sessions is None:
+        sessions = _local_sessions.sessions = {}
+    with _session_lock:
+        adapter = _get_adapter()
+    session = sessions.get(host)
+    # A session still on the adapter of a previous configure_http_transport call is replaced
+    if session is None or session.get_adapter("https://") is not adapter:
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        sessions[host] = session
+    return session
+
+
+def configure_http_transport(
+    mode: str = "passthrough", cassette_dir: str | None = None, latency: float | str | None = None
+) -> CassetteAdapter:
+    """Switch the shared transport to passthrough, record or replay mode.
+
+    Sessions from ``get_http_session`` pick up the new transport on their next use; sessions
+    set up by ``mount_transport`` before this call keep their previous transport.
+    """
+    global _adapter
+    adapter = CassetteAdapter(mode=mode, cassette_dir=cassette_dir, latency=latency)
+    with _session_lock:
+        _adapter = adapter
+    return adapter
+
+
+def get_http_transport_stats() -> dict:
+    """Return request, record, replay and miss counts for the active transport."""
+    with _session_lock:
+        adapter = _adapter
+    if adapter is None:
+        return {}
+    with adapter._lock:
+        return {"mode": adapter.mode, "cassette_dir": adapter.cassette_dir, **adapter.stats}
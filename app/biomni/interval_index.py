@@ -0,0 +1,275 @@
+"""
+Biomni Interval Index
+
+Per-chromosome sorted interval arrays for annotating many genomic regions at once, used for
+the ENCODE cCRE registry and gene TSS tables.
+
+Overlap queries use the sorted starts and the running maximum of the ends (an implicit
+interval tree): for a query [start, end) the candidate rows are those between the first row
+whose running maximum end exceeds ``start`` and the last row starting before ``end``, so a
+whole peak set is resolved with two ``np.searchsorted`` calls per chromosome. Nearest-feature
+queries look at the ``k`` features on each side of the query in position order.
+
+Parsed tables are persisted next to their source files and cached per process.
+
+Usage:
+    from biomni.interval_index import load_interval_index, read_regions
+
+    ccres = load_interval_index("GRCh38-cCREs.bed", kind="ccre")
+    overlaps = ccres.overlaps(read_regions("peaks.bed"))
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from biomni.utils import get_index_cache_path, is_index_stale
+
+# Bump when the persisted table layout changes
+INDEX_VERSION = 1
+
+# Column layout of the ENCODE SCREEN cCRE registry BED files
+CCRE_COLUMNS = ["chrom", "start", "end", "dhs_accession", "accession", "classification"]
+
+
+def _normalize_chroms(chroms) -> pd.Series:
+    """Use the "chr" prefix convention of the ENCODE and UCSC files."""
+    chroms = pd.Series(chroms, dtype=str).str.strip()
+    return chroms.where(chroms.str.lower().str.startswith("chr"), "chr" + chroms)
+
+
+def read_regions(regions) -> pd.DataFrame:
+    """Return query regions as a DataFrame with chrom, start, end and name columns.
+
+    Args:
+        regions: Path of a BED file, a DataFrame with chrom/start/end columns, or a list of
+            (chrom, start, end[, name]) tuples or "chrom:start-end" strings.
+
+    """
+    if isinstance(regions, str) and os.path.exists(regions):
+        table = pd.read_csv(regions, sep="\t", header=None, comment="#", dtype={0: str})
+        if table.shape[1] < 3:
+            raise ValueError(f"{regions} is not a BED file: expected at least 3 columns")
+        if str(table.iloc[0, 1]).lower() in ("start", "chromstart"):
+            table = table.iloc[1:]
+        frame = pd.DataFrame({"chrom": table[0], "start": table[1].astype(np.int64), "end": table[2].astype(np.int64)})
+        frame["name"] = table[3].astype(str) if table.shape[1] > 3 else None
+    elif isinstance(regions, pd.DataFrame):
+        frame = regions.rename(columns=str.lower)
+        frame = frame[[c for c in ("chrom", "start", "end", "name") if c in frame]].copy()
+    else:
+        rows = []
+        for region in [regions] if isinstance(regions, str) else regions:
+            if isinstance(region, str):
+                chrom, _, span = region.replace(",", "").partition(":")
+                start, _, end = span.partition("-")
+                rows.append((chrom, int(start), int(end), region))
+            else:
+                rows.append((*region[:3], region[3] if len(region) > 3 else None))
+        frame = pd.DataFrame(rows, columns=["chrom", "start", "end", "name"])
+
+    frame = frame.reset_index(drop=True)
+    if "name" not in frame:
+        frame["name"] = None
+    frame["chrom"] = _normalize_chroms(frame["chrom"])
+    frame["start"] = frame["start"].astype(np.int64)
+    frame["end"] = frame["end"].astype(np.int64)
+    return frame
+
+
+def _read_ccre_bed(path: str) -> pd.DataFrame:
+    table = pd.read_csv(path, sep="\t", header=None, comment="#", dtype={0: str})
+    table = table.iloc[:, : len(CCRE_COLUMNS)]
+    table.columns = CCRE_COLUMNS[: table.shape[1]]
+    return table
+
+
+def _read_genes(path: str) -> pd.DataFrame:
+    """Read gene TSS positions from a GTF or a TSV with chrom/start/end/strand/gene_name columns."""
+    lower = path.lower()
+    if lower.endswith((".gtf", ".gtf.gz")):
+        gtf = pd.read_csv(
+            path,
+            sep="\t",
+            header=None,
+            comment="#",
+            usecols=[0, 2, 3, 4, 6, 8],
+            names=["chrom", "feature", "start", "end", "strand", "attributes"],
+            dtype={"chrom": str},
+        )
+        gtf = gtf[gtf["feature"] == "gene"]
+        attributes = gtf["attributes"]
+        genes = pd.DataFrame(
+            {
+                "chrom": gtf["chrom"],
+                # GTF is 1-based inclusive
+                "start": gtf["start"] - 1,
+                "end": gtf["end"],
+                "strand": gtf["strand"],
+                "gene_name": attributes.str.extract(r'gene_name "([^"]+)"')[0],
+                "gene_id": attributes.str.extract(r'gene_id "([^"]+)"')[0],
+                "gene_type": attributes.str.extract(r'gene_(?:bio)?type "([^"]+)"')[0],
+            }
+        )
+    else:
+        genes = pd.read_csv(path, sep="," if lower.endswith(".csv") else "\t", dtype={"chrom": str})
+        genes = genes.rename(columns={"chr": "chrom", "chromosome": "chrom", "name": "gene_name", "txStart": "start"})
+        if "tss" in genes and "start" not in genes:
+            genes["start"] = genes["tss"]
+        if "end" not in genes:
+            genes["end"] = genes["start"] + 1
+        if "strand" not in genes:
+            genes["strand"] = "+"
+
+    genes = genes.dropna(subset=["start"]).reset_index(drop=True)
+    # Features are indexed at the TSS: start on the + strand, end on the - strand
+    tss = np.where(genes["strand"] == "-", genes["end"] - 1, genes["start"]).astype(np.int64)
+    genes["gene_start"], genes["gene_end"] = genes["start"], genes["end"]
+    genes["start"], genes["end"] = tss, tss + 1
+    return genes
+
+
+class IntervalIndex:
+    """Sorted intervals per chromosome with vectorized overlap and k-nearest queries."""
+
+    def __init__(self, table: pd.DataFrame):
+        table = table.copy()
+        table["chrom"] = _normalize_chroms(table["chrom"])
+        table["start"] = table["start"].astype(np.int64)
+        table["end"] = table["end"].astype(np.int64)
+        self.table = table.sort_values(["chrom", "start", "end"], kind="stable").reset_index(drop=True)
+
+        self._chroms: dict[str, tuple[int, int]] = {}
+        self.starts = self.table["start"].to_numpy()
+        self.ends = self.table["end"].to_numpy()
+        self.running_end = np.empty_like(self.ends)
+        codes, uniques = pd.factorize(self.table["chrom"], sort=False)
+        boundaries = np.concatenate([[0], np.nonzero(np.diff(codes))[0] + 1, [len(codes)]])
+        for i in range(len(boundaries) - 1):
+            a, b = int(boundaries[i]), int(boundaries[i + 1])
+            if b > a:
+                self._chroms[uniques[codes[a]]] = (a, b)
+                self.running_end[a:b] = np.maximum.accumulate(self.ends[a:b])
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def overlap_pairs(self, chroms, starts, ends) -> tuple[np.ndarray, np.ndarray]:
+        """Return (query index, row index) pairs for all overlaps of half-open intervals."""
+        chroms = _normalize_chroms(chroms).to_numpy()
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        query_parts, row_parts = [], []
+        for chrom in pd.unique(chroms):
+            if chrom not in self._chroms:
+                continue
+            a, b = self._chroms[chrom]
+            queries = np.nonzero(chroms == chrom)[0]
+            lo = a + np.searchsorted(self.running_end[a:b], starts[queries], side="right")
+            hi = a + np.searchsorted(self.starts[a:b], ends[queries], side="left")
+            counts = np.maximum(hi - lo, 0)
+            if not counts.sum():
+                continue
+            # Expand each query's candidate range [lo, hi) into flat index arrays
+            query_idx = np.repeat(queries, counts)
+            row_idx = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            keep = self.ends[row_idx] > starts[query_idx]
+            query_parts.append(query_idx[keep])
+            row_parts.append(row_idx[keep])
+        if not query_parts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(query_parts), np.concatenate(row_parts)
+
+    def overlaps(self, regions: pd.DataFrame) -> pd.DataFrame:
+        """Join query regions with every overlapping interval, with the overlap length in bp."""
+        query_idx, row_idx = self.overlap_pairs(regions["chrom"], regions["start"], regions["end"])
+        left = regions.iloc[query_idx].reset_index(drop=True).add_prefix("region_")
+        right = self.table.iloc[row_idx].reset_index(drop=True)
+        result = pd.concat([left, right], axis=1)
+        result["overlap_bp"] = np.minimum(left["region_end"], right["end"]) - np.maximum(
+            left["region_start"], right["start"]
+        )
+        return result
+
+    def nearest(self, regions: pd.DataFrame, k: int = 1, max_distance: int | None = None) -> pd.DataFrame:
+        """Return the ``k`` nearest intervals to each region (distance 0 when overlapping)."""
+        chroms = regions["chrom"].to_numpy()
+        starts = regions["start"].to_numpy(dtype=np.int64)
+        ends = regions["end"].to_numpy(dtype=np.int64)
+        query_parts, row_parts, distance_parts = [], [], []
+        for chrom in pd.unique(chroms):
+            if chrom not in self._chroms:
+                continue
+            a, b = self._chroms[chrom]
+            queries = np.nonzero(chroms == chrom)[0]
+            # Features are point-like (TSS) or short, so the k nearest lie within k rows on either side
+            center = a + np.searchsorted(self.starts[a:b], starts[queries], side="left")
+            window = center[:, None] + np.arange(-k, k)[None, :]
+            valid = (window >= a) & (window < b)
+            window = np.clip(window, a, b - 1)
+            q_start, q_end = starts[queries][:, None], ends[queries][:, None]
+            distance = np.maximum(0, np.maximum(self.starts[window] - q_end + 1, q_start - self.ends[window] + 1))
+            distance = np.where(valid, distance, np.iinfo(np.int64).max)
+            take = min(k, window.shape[1])
+            order = np.argsort(distance, axis=1, kind="stable")[:, :take]
+            picked_rows = np.take_along_axis(window, order, axis=1)
+            picked_distance = np.take_along_axis(distance, order, axis=1)
+            picked_valid = np.take_along_axis(valid, order, axis=1)
+            if max_distance is not None:
+                picked_valid &= picked_distance <= max_distance
+            query_parts.append(np.broadcast_to(queries[:, None], picked_rows.shape)[picked_valid])
+            row_parts.append(picked_rows[picked_valid])
+            distance_parts.append(picked_distance[picked_valid])
+
+        if not query_parts:
+            return pd.DataFrame(columns=[*regions.add_prefix("region_").columns, *self.table.columns, "distance"])
+        query_idx, row_idx = np.concatenate(query_parts), np.concatenate(row_parts)
+        result = pd.concat(
+            [
+                regions.iloc[query_idx].reset_index(drop=True).add_prefix("region_"),
+                self.table.iloc[row_idx].reset_index(drop=True),
+            ],
+            axis=1,
+        )
+        result["distance"] = np.concatenate(distance_parts)
+        return result.sort_values(["region_chrom", "region_start", "distance"], kind="stable").reset_index(drop=True)
+
+
+_interval_indexes: dict[str, tuple[float, IntervalIndex]] = {}
+_interval_indexes_lock = threading.Lock()
+
+
+def load_interval_index(path: str, kind: str = "ccre") -> IntervalIndex:
+    """Return the cached index for a cCRE registry BED ("ccre") or gene annotation file ("genes")."""
+    readers = {"ccre": _read_ccre_bed, "genes": _read_genes}
+    if kind not in readers:
+        raise ValueError(f"Unknown interval index kind: {kind}. Choose from {list(readers)}")
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+    key = f"{path}|{kind}"
+    with _interval_indexes_lock:
+        cached = _interval_indexes.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        index_path = get_index_cache_path(path, f"{kind}.intervals.pkl")
+        table = None
+        if not is_index_stale(index_path, path):
+            try:
+                stored = pd.read_pickle(index_path)
+                if stored.attrs.get("version") == INDEX_VERSION:
+                    table = stored
+            except Exception:
+                table = None
+        if table is None:
+            table = IntervalIndex(readers[kind](path)).table
+            table.attrs["version"] = INDEX_VERSION
+            try:
+                table.to_pickle(index_path)
+            except OSError:
+                pass
+        index = IntervalIndex(table)
+        _interval_indexes[key] = (mtime, index)
+        return index
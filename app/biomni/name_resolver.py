@@ -0,0 +1,261 @@
+"""
+Biomni Drug Name Resolver
+
+Maps free-text drug names (brand names, salt forms, misspellings) onto a fixed vocabulary such
+as the DDInter drug list. Every vocabulary entry is indexed under its normalized name, its
+salt-stripped form and any synonyms pointing at it; exact alias hits are a dict lookup.
+
+Fuzzy matches use a character trigram inverted index: the trigrams of a query select the
+vocabulary entries sharing the most trigrams (Dice coefficient, one ``np.bincount`` over the
+posting lists), and only those candidates are scored with ``difflib.SequenceMatcher``. Scores
+and the default cutoff therefore match ``difflib.get_close_matches`` without comparing the
+query against the whole vocabulary.
+
+Usage:
+    from biomni.name_resolver import DrugNameResolver
+
+    resolver = DrugNameResolver(["warfarin", "metformin hydrochloride", "atorvastatin"])
+    resolver.resolve_many(["Coumadin", "metformin", "atorvastatn"])
+"""
+
+import re
+from difflib import SequenceMatcher
+
+import numpy as np
+
+# Salt, ester and hydrate words dropped from the end of drug names
+SALT_SUFFIXES = [
+    "hydrochloride",
+    "hcl",
+    "dihydrochloride",
+    "hydrobromide",
+    "hydrate",
+    "monohydrate",
+    "dihydrate",
+    "trihydrate",
+    "sodium",
+    "potassium",
+    "calcium",
+    "magnesium",
+    "sulfate",
+    "phosphate",
+    "acetate",
+    "citrate",
+    "mesylate",
+    "besylate",
+    "maleate",
+    "fumarate",
+    "tartrate",
+    "succinate",
+    "bromide",
+    "chloride",
+    "nitrate",
+    "lactate",
+    "gluconate",
+    "hyclate",
+]
+
+# Common brand and alternative names mapped to their generic name
+COMMON_DRUG_SYNONYMS = {
+    "acetylsalicylic acid": "aspirin",
+    "paracetamol": "acetaminophen",
+    "tylenol": "acetaminophen",
+    "advil": "ibuprofen",
+    "motrin": "ibuprofen",
+    "aleve": "naproxen",
+    "coumadin": "warfarin",
+    "jantoven": "warfarin",
+    "eliquis": "apixaban",
+    "xarelto": "rivaroxaban",
+    "pradaxa": "dabigatran",
+    "plavix": "clopidogrel",
+    "lipitor": "atorvastatin",
+    "zocor": "simvastatin",
+    "crestor": "rosuvastatin",
+    "glucophage": "metformin",
+    "lasix": "furosemide",
+    "norvasc": "amlodipine",
+    "zestril": "lisinopril",
+    "prinivil": "lisinopril",
+    "lopressor": "metoprolol",
+    "toprol": "metoprolol",
+    "synthroid": "levothyroxine",
+    "prilosec": "omeprazole",
+    "nexium": "esomeprazole",
+    "zantac": "ranitidine",
+    "prozac": "fluoxetine",
+    "zoloft": "sertraline",
+    "lexapro": "escitalopram",
+    "xanax": "alprazolam",
+    "valium": "diazepam",
+    "ambien": "zolpidem",
+    "viagra": "sildenafil",
+    "zithromax": "azithromycin",
+    "cipro": "ciprofloxacin",
+    "biaxin": "clarithromycin",
+    "diflucan": "fluconazole",
+    "lanoxin": "digoxin",
+    "cordarone": "amiodarone",
+    "dilantin": "phenytoin",
+    "tegretol": "carbamazepine",
+    "neurontin": "gabapentin",
+    "lyrica": "pregabalin",
+    "gleevec": "imatinib",
+    "glivec": "imatinib",
+    "tamiflu": "oseltamivir",
+    "benadryl": "diphenhydramine",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_SALT_WORDS = frozenset(SALT_SUFFIXES)
+
+
+def normalize_drug_name(name) -> str:
+    """Lowercase a drug name and collapse punctuation and whitespace to single spaces."""
+    if name is None:
+        return ""
+    return _NON_ALNUM.sub(" ", str(name).lower()).strip()
+
+
+def strip_salt_forms(name: str) -> str:
+    """Drop trailing salt and hydrate words from a normalized drug name ("x sodium hydrate" -> "x")."""
+    words = name.split()
+    while len(words) > 1 and words[-1] in _SALT_WORDS:
+        words.pop()
+    return " ".join(words)
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class DrugNameResolver:
+    """
+    Resolve drug names against a vocabulary by alias lookup, then trigram-filtered fuzzy matching.
+
+    Resolution results are dicts with the query, the matched vocabulary ``name``, its position
+    ``index`` in the vocabulary, a ``score`` in [0, 1] and the ``method`` ("exact", "salt",
+    "synonym" or "fuzzy").
+    """
+
+    def __init__(self, names, synonyms=None, aliases=None, candidates: int = 25):
+        """
+        Build the alias table and trigram index.
+
+        Args:
+            names: Vocabulary of canonical drug names
+            synonyms: Mapping of alternative name -> canonical name; defaults to COMMON_DRUG_SYNONYMS.
+                Synonyms whose canonical name is not in the vocabulary are ignored.
+            aliases: Extra (alias, vocabulary index) pairs, e.g. the original spellings of standardized names
+            candidates: Number of trigram candidates rescored with SequenceMatcher per fuzzy query
+        """
+        self.names = list(names)
+        self.candidates = candidates
+        self._alias = {}
+        self._method = {}
+
+        for i, name in enumerate(self.names):
+            self._add_alias(normalize_drug_name(name), i, "exact")
+        for alias, i in aliases or []:
+            self._add_alias(normalize_drug_name(alias), i, "exact")
+        for alias, i in list(self._alias.items()):
+            self._add_alias(strip_salt_forms(alias), i, "salt")
+        for synonym, canonical in (COMMON_DRUG_SYNONYMS if synonyms is None else synonyms).items():
+            target = self._alias.get(normalize_drug_name(canonical))
+            if target is not None:
+                self._add_alias(normalize_drug_name(synonym), target, "synonym")
+
+        # Trigram inverted index over the alias keys, in CSR layout
+        self._keys = list(self._alias)
+        grams_per_key = [_trigrams(k) for k in self._keys]
+        self._key_gram_counts = np.array([len(g) for g in grams_per_key], dtype=np.int64)
+        self._gram_ids = {}
+        gram_column, key_column = [], []
+        for key_id, grams in enumerate(grams_per_key):
+            for gram in grams:
+                gram_column.append(self._gram_ids.setdefault(gram, len(self._gram_ids)))
+                key_column.append(key_id)
+        gram_column = np.asarray(gram_column, dtype=np.int64)
+        order = np.argsort(gram_column, kind="stable")
+        self._postings = np.asarray(key_column, dtype=np.int64)[order]
+        self._posting_indptr = np.zeros(len(self._gram_ids) + 1, dtype=np.int64)
+        self._posting_indptr[1:] = np.cumsum(np.bincount(gram_column, minlength=len(self._gram_ids)))
+
+    def _add_alias(self, alias, index, method):
+        if alias and alias not in self._alias:
+            self._alias[alias] = index
+            self._method[alias] = method
+
+    def __len__(self):
+        return len(self.names)
+
+    def _match(self, query, key, score, method):
+        index = self._alias[key]
+        return {"query": query, "name": self.names[index], "index": index, "score": score, "method": method}
+
+    def candidates_for(self, key: str, limit: int | None = None) -> list[str]:
+        """Alias keys sharing the most trigrams with ``key`` (by Dice coefficient)."""
+        gram_ids = [self._gram_ids[g] for g in _trigrams(key) if g in self._gram_ids]
+        if not gram_ids:
+            return []
+        starts, ends = self._posting_indptr[gram_ids], self._posting_indptr[np.add(gram_ids, 1)]
+        hits = np.concatenate([self._postings[s:e] for s, e in zip(starts, ends, strict=False)])
+        overlap = np.bincount(hits, minlength=len(self._keys))
+        dice = 2.0 * overlap / (len(_trigrams(key)) + self._key_gram_counts)
+        limit = min(limit or self.candidates, int(np.count_nonzero(overlap)))
+        top = np.argpartition(-dice, limit - 1)[:limit]
+        top = top[np.argsort(-dice[top], kind="stable")]
+        return [self._keys[i] for i in top]
+
+    def resolve(self, name, cutoff: float = 0.8) -> dict | None:
+        """Resolve one name; returns the best match dict or None when nothing scores >= cutoff."""
+        matches = self.lookup(name, cutoff=cutoff, top_k=1)
+        return matches[0] if matches else None
+
+    def lookup(self, name, cutoff: float = 0.8, top_k: int = 1) -> list[dict]:
+        """Return up to ``top_k`` matches for a name (distinct vocabulary entries), best first."""
+        key = normalize_drug_name(name)
+        if not key:
+            return []
+        matches, seen = [], set()
+        for alias in (key, strip_salt_forms(key)):
+            if alias in self._alias:
+                method = self._method[alias] if alias == key else "salt"
+                matches.append(self._match(name, alias, 1.0, method))
+                seen.add(self._alias[alias])
+                break
+        if len(matches) >= top_k:
+            return matches
+
+        scored = []
+        for candidate in self.candidates_for(key):
+            matcher = SequenceMatcher(None, key, candidate)
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                score = matcher.ratio()
+                if score >= cutoff:
+                    scored.append((score, candidate))
+        scored.sort(key=lambda x: -x[0])
+
+        for score, candidate in scored:
+            index = self._alias[candidate]
+            if index in seen:
+                continue
+            seen.add(index)
+            method = "exact" if score == 1.0 else "fuzzy"
+            matches.append(self._match(name, candidate, round(score, 4), method))
+            if len(matches) == top_k:
+                break
+        return matches
+
+    def resolve_many(self, names, cutoff: float = 0.8) -> list[dict | None]:
+        """Resolve a batch of names (repeated names are resolved once); None for unresolved names."""
+        cache = {}
+        results = []
+        for name in names:
+            key = normalize_drug_name(name)
+            if key not in cache:
+                cache[key] = self.resolve(name, cutoff=cutoff)
+            match = cache[key]
+            results.append(None if match is None else {**match, "query": name})
+        return results
@@ -0,0 +1,685 @@
+"""
+Biomni Ontology Store
+
+Parses an ontology (e.g. the HPO release ``hp.obo`` or the Gene Ontology ``go-plus.json`` in
+the data lake) once, persists the result as a compact pickle of numpy arrays next to the source
+file, and keeps it resident in memory for the lifetime of the process. OBO files and OBO Graphs
+JSON files are supported.
+
+The store exposes term names, synonyms and namespaces, integer-indexed CSR adjacency for each
+relation type (is_a, part_of, regulates, ...), and the precomputed transitive closure of
+ancestors/descendants over the propagating relations (is_a, plus part_of for GO). On top of the
+closure it propagates gene annotations to ancestor terms (true-path rule) and scores term and
+profile similarity with information content (IC) based measures.
+
+Usage:
+    from biomni.ontology import get_go_ontology, get_hpo_ontology
+
+    hpo = get_hpo_ontology(data_lake_path)
+    hpo.get_names(["HP:0001250", "HP:0001263"])
+    hpo.set_similarity(["HP:0001250"], [["HP:0002069"], ["HP:0000365"]])
+
+    go = get_go_ontology(data_lake_path)
+    go.ancestors_many(["GO:0006915", "GO:0007049"])
+    go.propagate_annotations({"TP53": ["GO:0006915"], "CDK1": ["GO:0007049"]})
+"""
+
+import os
+import pickle
+import threading
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+
+from biomni.utils import get_index_cache_path, is_index_stale
+
+# Bump when the persisted layout changes so stale indexes are rebuilt
+INDEX_VERSION = 2
+
+# Relation IRIs of OBO Graphs edges mapped to their OBO names; other relations keep their CURIE
+RELATION_NAMES = {
+    "is_a": "is_a",
+    "BFO:0000050": "part_of",
+    "BFO:0000051": "has_part",
+    "RO:0002211": "regulates",
+    "RO:0002212": "negatively_regulates",
+    "RO:0002213": "positively_regulates",
+    "RO:0002091": "starts_during",
+    "RO:0002092": "happens_during",
+    "RO:0002093": "ends_during",
+    "BFO:0000066": "occurs_in",
+}
+
+# Relations followed by the ancestor closure (and hence annotation propagation) by default
+DEFAULT_CLOSURE_RELATIONS = {"GO:": ("is_a", "part_of")}
+
+_OBO_IN_OWL = "http://www.geneontology.org/formats/oboInOwl#"
+_REPLACED_BY = "http://purl.obolibrary.org/obo/IAO_0100001"
+
+
+def parse_obo_terms(file_path: str, id_prefix: str | None = None) -> list[dict]:
+    """Parse the [Term] stanzas of an OBO file.
+
+    Args:
+        file_path: Path to the OBO file
+        id_prefix: Only keep terms whose ID starts with this prefix (e.g. "HP:")
+
+    Returns:
+        List of dicts with id, name, namespace, synonyms, parents, relations (relation -> target
+        IDs), alt_ids, obsolete and replaced_by
+
+    """
+    terms = []
+    current = None
+
+    def _flush():
+        if current is not None and current["id"] and (id_prefix is None or current["id"].startswith(id_prefix)):
+            terms.append(current)
+
+    with open(file_path) as file:
+        for line in file:
+            line = line.strip()
+            if line.startswith("["):
+                _flush()
+                current = (
+                    {
+                        "id": None,
+                        "name": None,
+                        "namespace": None,
+                        "synonyms": [],
+                        "parents": [],
+                        "relations": {},
+                        "alt_ids": [],
+                        "obsolete": False,
+                        "replaced_by": None,
+                    }
+                    if line == "[Term]"
+                    else None
+                )
+                continue
+            if current is None or ": " not in line:
+                continue
+
+            tag, value = line.split(": ", 1)
+            if tag == "id":
+                current["id"] = value
+            elif tag == "name":
+                current["name"] = value
+            elif tag == "namespace":
+                current["namespace"] = value
+            elif tag == "synonym":
+                # synonym: "Seizures" EXACT []
+                if value.startswith('"'):
+                    current["synonyms"].append(value[1:].split('"', 1)[0])
+            elif tag == "is_a":
+                current["parents"].append(value.split(" ! ")[0].split(" {")[0].strip())
+            elif tag == "relationship":
+                # relationship: part_of GO:0005634 ! nucleus
+                relation, _, target = value.split(" ! ")[0].split(" {")[0].strip().partition(" ")
+                current["relations"].setdefault(relation, []).append(target.strip())
+            elif tag == "alt_id":
+                current["alt_ids"].append(value)
+            elif tag == "is_obsolete":
+                current["obsolete"] = value == "true"
+            elif tag == "replaced_by":
+                current["replaced_by"] = value
+        _flush()
+
+    return terms
+
+
+def _curie(iri: str) -> str:
+    """Compact an OBO PURL ("http://purl.obolibrary.org/obo/GO_0008150") to a CURIE ("GO:0008150")."""
+    if "/obo/" not in iri:
+        return iri
+    local = iri.rsplit("/", 1)[-1]
+    prefix, _, number = local.partition("_")
+    return f"{prefix}:{number}" if number else local
+
+
+def parse_obographs_terms(file_path: str, id_prefix: str | None = None) -> list[dict]:
+    """Parse the classes and edges of an OBO Graphs JSON file (e.g. go-plus.json).
+
+    Args:
+        file_path: Path to the JSON file
+        id_prefix: Only keep terms whose ID starts with this prefix (e.g. "GO:"); edges to other
+            terms are dropped
+
+    Returns:
+        List of term dicts in the same layout as ``parse_obo_terms``
+
+    """
+    import json
+
+    with open(file_path) as f:
+        document = json.load(f)
+
+    terms, by_id = [], {}
+    for graph in document.get("graphs", []):
+        for node in graph.get("nodes", []):
+            term_id = _curie(node.get("id", ""))
+            if node.get("type", "CLASS") != "CLASS" or (id_prefix and not term_id.startswith(id_prefix)):
+                continue
+            if term_id in by_id:
+                continue
+            meta = node.get("meta") or {}
+            properties = meta.get("basicPropertyValues") or []
+            term = {
+                "id": term_id,
+                "name": node.get("lbl"),
+                "namespace": next(
+                    (p["val"] for p in properties if p.get("pred") == f"{_OBO_IN_OWL}hasOBONamespace"), None
+                ),
+                "synonyms": [s["val"] for s in meta.get("synonyms") or [] if s.get("val")],
+                "parents": [],
+                "relations": {},
+                "alt_ids": [p["val"] for p in properties if p.get("pred") == f"{_OBO_IN_OWL}hasAlternativeId"],
+                "obsolete": bool(meta.get("deprecated", False)),
+                "replaced_by": next((_curie(p["val"]) for p in properties if p.get("pred") == _REPLACED_BY), None),
+            }
+            terms.append(term)
+            by_id[term_id] = term
+
+        for edge in graph.get("edges", []):
+            child, parent = _curie(edge.get("sub", "")), _curie(edge.get("obj", ""))
+            if child not in by_id or parent not in by_id:
+                continue
+            predicate = edge.get("pred", "")
+            relation = RELATION_NAMES.get(predicate, RELATION_NAMES.get(_curie(predicate), _curie(predicate)))
+            if relation == "is_a":
+                by_id[child]["parents"].append(parent)
+            else:
+                by_id[child]["relations"].setdefault(relation, []).append(parent)
+    return terms
+
+
+def read_gene_annotations(annotations) -> pd.DataFrame:
+    """Return gene-to-term annotations as a DataFrame with gene and term columns.
+
+    Args:
+        annotations: Mapping of gene -> term IDs, a list of (gene, term) pairs, a DataFrame whose
+            first two columns are gene and term, or the path of a GAF file (NOT-qualified
+            annotations are skipped) or a two-column TSV/CSV file
+
+    """
+    if isinstance(annotations, str):
+        if annotations.endswith((".gaf", ".gaf.gz")):
+            gaf = pd.read_csv(annotations, sep="\t", comment="!", header=None, usecols=[2, 3, 4], dtype=str)
+            gaf = gaf[~gaf[3].fillna("").str.contains("NOT")]
+            return pd.DataFrame({"gene": gaf[2].to_numpy(), "term": gaf[4].to_numpy()})
+        sep = "," if annotations.endswith(".csv") else "\t"
+        annotations = pd.read_csv(annotations, sep=sep, dtype=str)
+    if isinstance(annotations, dict):
+        pairs = [(gene, term) for gene, terms in annotations.items() for term in terms]
+        return pd.DataFrame(pairs, columns=["gene", "term"])
+    if isinstance(annotations, pd.DataFrame):
+        frame = annotations.iloc[:, :2]
+        frame.columns = ["gene", "term"]
+        return frame.dropna()
+    return pd.DataFrame(list(annotations), columns=["gene", "term"])
+
+
+def _build_csr(rows: list[list[int]]) -> tuple[np.ndarray, np.ndarray]:
+    """Pack lists of integer neighbours into CSR (indptr, indices) arrays."""
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(r) for r in rows])
+    indices = np.fromiter((i for r in rows for i in r), dtype=np.int32, count=int(indptr[-1]))
+    return indptr, indices
+
+
+class OntologyIndex:
+    """In-memory ontology with precomputed transitive closure and information content.
+
+    Terms are addressed by integer position; ``ancestors``/``descendants`` closures include the
+    term itself and follow ``closure_relations``. Intrinsic IC follows Seco et al.:
+    ``1 - log(n_descendants) / log(n_terms)``.
+    """
+
+    def __init__(self, state: dict):
+        self.source = state["source"]
+        self.ids: list[str] = state["ids"]
+        self.names: list[str | None] = state["names"]
+        self.synonyms: list[list[str]] = state["synonyms"]
+        self.obsolete: np.ndarray = state["obsolete"]
+        self.replaced_by: dict[str, str] = state["replaced_by"]
+        self.parent_indptr, self.parent_indices = state["parents"]
+        self.relations: dict[str, tuple[np.ndarray, np.ndarray]] = state["relations"]
+        self.closure_relations: tuple[str, ...] = tuple(state["closure_relations"])
+        self.namespaces: list[str | None] = state["namespaces"]
+        self.anc_indptr, self.anc_indices = state["ancestors"]
+        self.desc_indptr, self.desc_indices = state["descendants"]
+        self.ic: np.ndarray = state["ic"]
+        self._state = state
+        self._index = {term_id: i for i, term_id in enumerate(self.ids)}
+        # Alternative IDs resolve to their primary term
+        for alt_id, primary in state["alt_ids"].items():
+            if primary in self._index:
+                self._index.setdefault(alt_id, self._index[primary])
+        self._name_index = None
+
+    @classmethod
+    def from_obo(
+        cls, file_path: str, id_prefix: str | None = None, closure_relations: Iterable[str] = ("is_a",)
+    ) -> "OntologyIndex":
+        """Build the index from an OBO file."""
+        return cls.from_terms(parse_obo_terms(file_path, id_prefix), file_path, closure_relations)
+
+    @classmethod
+    def from_obographs(
+        cls, file_path: str, id_prefix: str | None = None, closure_relations: Iterable[str] = ("is_a",)
+    ) -> "OntologyIndex":
+        """Build the index from an OBO Graphs JSON file."""
+        return cls.from_terms(parse_obographs_terms(file_path, id_prefix), file_path, closure_relations)
+
+    @classmethod
+    def from_terms(
+        cls, terms: list[dict], file_path: str, closure_relations: Iterable[str] = ("is_a",)
+    ) -> "OntologyIndex":
+        """Build the index from parsed terms; the closure follows is_a and the other ``closure_relations``."""
+        closure_relations = tuple(closure_relations)
+        ids = [t["id"] for t in terms]
+        position = {term_id: i for i, term_id in enumerate(ids)}
+        relation_rows = {"is_a": [[position[p] for p in t["parents"] if p in position] for t in terms]}
+        for relation in sorted({r for t in terms for r in t.get("relations", {})}):
+            relation_rows[relation] = [
+                [position[p] for p in t.get("relations", {}).get(relation, []) if p in position] for t in terms
+            ]
+        parent_rows = [
+            list(
+                dict.fromkeys(
+                    p
+                    for relation in ("is_a", *closure_relations)
+                    if relation in relation_rows
+                    for p in relation_rows[relation][i]
+                )
+            )
+            for i in range(len(terms))
+        ]
+
+        # Ancestor closure in topological order (parents before children)
+        n_terms = len(ids)
+        children = [[] for _ in range(n_terms)]
+        pending = np.array([len(r) for r in parent_rows])
+        for child, parents in enumerate(parent_rows):
+            for parent in parents:
+                children[parent].append(child)
+        order = [i for i in range(n_terms) if pending[i] == 0]
+        ancestors: list[set[int] | None] = [None] * n_terms
+        for i in order:
+            closure = {i}
+            for parent in parent_rows[i]:
+                closure |= ancestors[parent]
+            ancestors[i] = closure
+            for child in children[i]:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    order.append(child)
+        # Terms on a cycle (malformed input) only get themselves and their direct parents
+        for i in range(n_terms):
+            if ancestors[i] is None:
+                ancestors[i] = {i, *parent_rows[i]}
+
+        descendant_rows = [[] for _ in range(n_terms)]
+        for i, closure in enumerate(ancestors):
+            for ancestor in closure:
+                descendant_rows[ancestor].append(i)
+
+        n_descendants = np.array([len(r) for r in descendant_rows], dtype=np.float64)
+        ic = 1.0 - np.log(n_descendants) / np.log(max(n_terms, 2))
+
+        state = {
+            "version": INDEX_VERSION,
+            "source": os.path.abspath(file_path),
+            "ids": ids,
+            "names": [t["name"] for t in terms],
+            "namespaces": [t.get("namespace") for t in terms],
+            "synonyms": [t["synonyms"] for t in terms],
+            "obsolete": np.array([t["obsolete"] for t in terms], dtype=bool),
+            "replaced_by": {t["id"]: t["replaced_by"] for t in terms if t["replaced_by"]},
+            "alt_ids": {alt: t["id"] for t in terms for alt in t["alt_ids"]},
+            "parents": _build_csr(relation_rows["is_a"]),
+            "relations": {relation: _build_csr(rows) for relation, rows in relation_rows.items()},
+            "closure_relations": closure_relations,
+            "ancestors": _build_csr([sorted(c) for c in ancestors]),
+            "descendants": _build_csr(descendant_rows),
+            "ic": ic.astype(np.float32),
+        }
+        return cls(state)
+
+    def save(self, path: str) -> None:
+        """Persist the index atomically."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self._state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "OntologyIndex | None":
+        """Load a persisted index, returning None if it is unreadable or from another version."""
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except Exception:
+            return None
+        if not isinstance(state, dict) or state.get("version") != INDEX_VERSION:
+            return None
+        return cls(state)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, term_id: str) -> bool:
+        return term_id in self._index
+
+    def lookup(self, term_id: str) -> int | None:
+        """Return the position of a term (or alternative ID), or None if unknown."""
+        return self._index.get(term_id)
+
+    def _positions(self, term_ids: Iterable[str]) -> np.ndarray:
+        return np.array([i for i in (self._index.get(t) for t in term_ids) if i is not None], dtype=np.int64)
+
+    def get_name(self, term_id: str) -> str | None:
+        i = self._index.get(term_id)
+        return None if i is None else self.names[i]
+
+    def get_names(self, term_ids: Iterable[str], default: str | None = None) -> list[str | None]:
+        """Return names for many terms; unknown terms map to ``default``."""
+        names = []
+        for term_id in term_ids:
+            i = self._index.get(term_id)
+            names.append(default if i is None else self.names[i])
+        return names
+
+    def get_term(self, term_id: str) -> dict | None:
+        """Return the name, synonyms, parents, obsolescence and IC of a term, and its namespace if any.
+
+        ``relations`` maps every other relation type (e.g. "part_of") to the term's direct targets;
+        it is empty for ontologies with is_a edges only.
+        """
+        i = self._index.get(term_id)
+        if i is None:
+            return None
+        primary = self.ids[i]
+        info = {
+            "id": primary,
+            "name": self.names[i],
+            "synonyms": list(self.synonyms[i]),
+            "parents": self.parents(primary),
+            "is_obsolete": bool(self.obsolete[i]),
+            "replaced_by": self.replaced_by.get(primary),
+            "information_content": float(self.ic[i]),
+            "n_ancestors": int(self.anc_indptr[i + 1] - self.anc_indptr[i]) - 1,
+            "n_descendants": int(self.desc_indptr[i + 1] - self.desc_indptr[i]) - 1,
+        }
+        if self.namespaces[i]:
+            info["namespace"] = self.namespaces[i]
+        relations = {r: self.related(primary, r) for r in self.relations if r != "is_a"}
+        info["relations"] = {r: targets for r, targets in relations.items() if targets}
+        return info
+
+    def find_by_name(self, name: str) -> list[str]:
+        """Return IDs of terms whose name or synonym matches ``name`` (case-insensitive)."""
+        if self._name_index is None:
+            name_index: dict[str, list[int]] = {}
+            for i, (term_name, synonyms) in enumerate(zip(self.names, self.synonyms, strict=False)):
+                for label in [term_name, *synonyms]:
+                    if label:
+                        name_index.setdefault(label.lower(), []).append(i)
+            self._name_index = name_index
+        return [self.ids[i] for i in dict.fromkeys(self._name_index.get(name.strip().lower(), []))]
+
+    def _slice(self, indptr: np.ndarray, indices: np.ndarray, i: int) -> np.ndarray:
+        return indices[indptr[i] : indptr[i + 1]]
+
+    def parents(self, term_id: str) -> list[str]:
+        i = self._index.get(term_id)
+        return [] if i is None else [self.ids[j] for j in self._slice(self.parent_indptr, self.parent_indices, i)]
+
+    def ancestors(self, term_id: str, include_self: bool = False) -> list[str]:
+        """Return all ancestors of a term from the precomputed closure."""
+        i = self._index.get(term_id)
+        if i is None:
+            return []
+        return [self.ids[j] for j in self._slice(self.anc_indptr, self.anc_indices, i) if include_self or j != i]
+
+    def descendants(self, term_id: str, include_self: bool = False) -> list[str]:
+        """Return all descendants of a term from the precomputed closure."""
+        i = self._index.get(term_id)
+        if i is None:
+            return []
+        return [self.ids[j] for j in self._slice(self.desc_indptr, self.desc_indices, i) if include_self or j != i]
+
+    def related(self, term_id: str, relation: str = "is_a") -> list[str]:
+        """Return the direct targets of one relation type (e.g. "part_of") from a term."""
+        i = self._index.get(term_id)
+        if i is None or relation not in self.relations:
+            return []
+        return [self.ids[j] for j in self._slice(*self.relations[relation], i)]
+
+    def _closure_many(self, indptr, indices, term_ids, include_self, namespace) -> dict[str, list[str]]:
+        result = {}
+        for term_id in term_ids:
+            i = self._index.get(term_id)
+            if i is None:
+                result[term_id] = []
+                continue
+            closure = self._slice(indptr, indices, i)
+            if not include_self:
+                closure = closure[closure != i]
+            result[term_id] = [self.ids[j] for j in closure if namespace is None or self.namespaces[j] == namespace]
+        return result
+
+    def ancestors_many(
+        self, term_ids: Iterable[str], include_self: bool = False, namespace: str | None = None
+    ) -> dict[str, list[str]]:
+        """Return the ancestors of many terms, optionally restricted to one namespace."""
+        return self._closure_many(self.anc_indptr, self.anc_indices, term_ids, include_self, namespace)
+
+    def descendants_many(
+        self, term_ids: Iterable[str], include_self: bool = False, namespace: str | None = None
+    ) -> dict[str, list[str]]:
+        """Return the descendants of many terms, optionally restricted to one namespace."""
+        return self._closure_many(self.desc_indptr, self.desc_indices, term_ids, include_self, namespace)
+
+    def propagate_positions(self, term_positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Expand term positions to their ancestor closures.
+
+        Returns:
+            (source index, ancestor position) arrays: for every input position ``k``, one row per
+            ancestor of ``term_positions[k]`` (including itself)
+
+        """
+        term_positions = np.asarray(term_positions, dtype=np.int64)
+        starts = self.anc_indptr[term_positions]
+        counts = self.anc_indptr[term_positions + 1] - starts
+        source = np.repeat(np.arange(len(term_positions)), counts)
+        # Offset of each expanded row within its closure, added to the closure start
+        within = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        return source, self.anc_indices[np.repeat(starts, counts) + within].astype(np.int64)
+
+    def propagate_annotations(
+        self,
+        annotations,
+        namespace: str | None = None,
+        min_genes: int = 1,
+        max_genes: int | None = None,
+    ) -> dict[str, list[str]]:
+        """Propagate gene annotations to every ancestor term (true-path rule).
+
+        Args:
+            annotations: Gene-to-term annotations in any form accepted by ``read_gene_annotations``.
+                Terms are resolved through alternative IDs; unknown terms are ignored.
+            namespace: Only return terms of this namespace (e.g. "biological_process")
+            min_genes: Smallest gene set to return
+            max_genes: Largest gene set to return
+
+        Returns:
+            Mapping of term ID -> sorted genes annotated to the term or any of its descendants
+
+        """
+        pairs = read_gene_annotations(annotations)
+        positions = np.array([self._index.get(t, -1) for t in pairs["term"]], dtype=np.int64)
+        known = positions >= 0
+        gene_codes, genes = pd.factorize(pairs["gene"].to_numpy()[known])
+        source, terms = self.propagate_positions(positions[known])
+        keys = np.unique(terms * max(len(genes), 1) + gene_codes[source])
+        terms, gene_codes = keys // max(len(genes), 1), keys % max(len(genes), 1)
+
+        bounds = np.flatnonzero(np.diff(terms)) + 1
+        result = {}
+        for term_block, gene_block in zip(np.split(terms, bounds), np.split(gene_codes, bounds), strict=False):
+            if len(term_block) == 0:
+                continue
+            term = int(term_block[0])
+            if namespace is not None and self.namespaces[term] != namespace:
+                continue
+            if len(gene_block) < min_genes or (max_genes is not None and len(gene_block) > max_genes):
+                continue
+            result[self.ids[term]] = sorted(genes[gene_block].tolist())
+        return result
+
+    def is_ancestor(self, ancestor_id: str, term_id: str) -> bool:
+        a, i = self._index.get(ancestor_id), self._index.get(term_id)
+        if a is None or i is None:
+            return False
+        closure = self._slice(self.anc_indptr, self.anc_indices, i)
+        position = np.searchsorted(closure, a)
+        return bool(position < len(closure) and closure[position] == a)
+
+    def resnik(self, term_a: str, term_b: str) -> float:
+        """IC of the most informative common ancestor of two terms."""
+        a, b = self._index.get(term_a), self._index.get(term_b)
+        if a is None or b is None:
+            return 0.0
+        common = np.intersect1d(
+            self._slice(self.anc_indptr, self.anc_indices, a),
+            self._slice(self.anc_indptr, self.anc_indices, b),
+            assume_unique=True,
+        )
+        return float(self.ic[common].max()) if len(common) else 0.0
+
+    def _similarity_vector(self, i: int) -> np.ndarray:
+        """Resnik similarity of term ``i`` against every term in the ontology."""
+        vector = np.zeros(len(self.ids), dtype=np.float32)
+        ancestors = self._slice(self.anc_indptr, self.anc_indices, i)
+        # IC never decreases towards the leaves, so assigning in ascending IC order keeps the maximum
+        for a in ancestors[np.argsort(self.ic[ancestors], kind="stable")]:
+            vector[self._slice(self.desc_indptr, self.desc_indices, a)] = self.ic[a]
+        return vector
+
+    def term_similarity(
+        self, terms_a: Iterable[str], terms_b: Iterable[str] | None = None, method: str = "resnik"
+    ) -> np.ndarray:
+        """Pairwise similarity matrix between two term lists (rows: ``terms_a``).
+
+        ``method`` is "resnik" (IC of the most informative common ancestor) or "lin"
+        (``2 * resnik / (IC(a) + IC(b))``). Unknown terms get 0 similarity.
+        """
+        if method not in ("resnik", "lin"):
+            raise ValueError("method must be 'resnik' or 'lin'")
+        terms_a = list(terms_a)
+        terms_b = terms_a if terms_b is None else list(terms_b)
+        a = np.array([self._index.get(t, -1) for t in terms_a], dtype=np.int64)
+        b = np.array([self._index.get(t, -1) for t in terms_b], dtype=np.int64)
+        matrix = np.zeros((len(a), len(b)), dtype=np.float64)
+        known_b = b >= 0
+        for row, i in enumerate(a):
+            if i >= 0:
+                matrix[row, known_b] = self._similarity_vector(i)[b[known_b]]
+        if method == "lin":
+            denominator = self.ic[np.maximum(a, 0)][:, None].astype(np.float64) + self.ic[np.maximum(b, 0)][None, :]
+            matrix = np.divide(2 * matrix, denominator, out=np.zeros_like(matrix), where=denominator > 0)
+            # Identical terms are maximally similar even when their IC is 0 (the root)
+            matrix[(a[:, None] == b[None, :]) & (a[:, None] >= 0)] = 1.0
+        return matrix
+
+    def set_similarity(
+        self, query_terms: Iterable[str], candidate_sets: list[Iterable[str]], symmetric: bool = True
+    ) -> np.ndarray:
+        """Score a query phenotype profile against many candidate profiles.
+
+        Uses best-match-average Resnik similarity. With ``symmetric`` the score is the mean of
+        the query-to-candidate and candidate-to-query averages; otherwise only the former.
+
+        Returns:
+            Array of scores aligned with ``candidate_sets`` (0 for empty or unknown sets)
+
+        """
+        query = np.unique(self._positions(query_terms))
+        candidates = [np.unique(self._positions(c)) for c in candidate_sets]
+        scores = np.zeros(len(candidates), dtype=np.float64)
+        non_empty = [k for k, c in enumerate(candidates) if len(c)]
+        if len(query) == 0 or not non_empty:
+            return scores
+
+        flat = np.concatenate([candidates[k] for k in non_empty])
+        lengths = np.array([len(candidates[k]) for k in non_empty])
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+        # One row per query term: similarity to every ontology term
+        matrix = np.vstack([self._similarity_vector(i) for i in query])
+        at_candidates = matrix[:, flat]  # (n_query, n_flat)
+        query_to_candidate = np.maximum.reduceat(at_candidates, offsets, axis=1).mean(axis=0)
+        if symmetric:
+            candidate_to_query = np.add.reduceat(at_candidates.max(axis=0), offsets) / lengths
+            result = (query_to_candidate + candidate_to_query) / 2
+        else:
+            result = query_to_candidate
+        scores[non_empty] = result
+        return scores
+
+
+_ontologies: dict[str, tuple[float, OntologyIndex]] = {}
+_ontologies_lock = threading.Lock()
+
+
+def load_ontology(
+    file_path: str, id_prefix: str | None = None, closure_relations: Iterable[str] | None = None
+) -> OntologyIndex:
+    """Return the ontology for an OBO or OBO Graphs JSON file, building and persisting its index on first use.
+
+    ``closure_relations`` are the relations followed by the ancestor closure besides is_a
+    (default: part_of for GO, none otherwise). The index is kept in memory per process and
+    rebuilt only when the file changes.
+    """
+    file_path = os.path.abspath(file_path)
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Ontology file not found: {file_path}")
+    if closure_relations is None:
+        closure_relations = DEFAULT_CLOSURE_RELATIONS.get(id_prefix, ("is_a",))
+    closure_relations = tuple(dict.fromkeys(("is_a", *closure_relations)))
+    mtime = os.path.getmtime(file_path)
+    key = f"{file_path}|{id_prefix}|{','.join(closure_relations)}"
+
+    with _ontologies_lock:
+        cached = _ontologies.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        suffix = (id_prefix or "all").rstrip(":").lower()
+        if closure_relations != ("is_a",):
+            suffix += "." + "+".join(r for r in closure_relations if r != "is_a")
+        index_path = get_index_cache_path(file_path, f"{suffix}.ontology.pkl")
+        ontology = None if is_index_stale(index_path, file_path) else OntologyIndex.load(index_path)
+        if ontology is None:
+            builder = OntologyIndex.from_obographs if file_path.endswith(".json") else OntologyIndex.from_obo
+            ontology = builder(file_path, id_prefix, closure_relations)
+            try:
+                ontology.save(index_path)
+            except OSError:
+                pass  # Read-only data lake and cache: keep the in-memory index only
+        _ontologies[key] = (mtime, ontology)
+        return ontology
+
+
+def get_hpo_ontology(data_lake_path: str) -> OntologyIndex:
+    """Return the Human Phenotype Ontology from ``hp.obo`` in the data lake."""
+    return load_ontology(os.path.join(data_lake_path, "hp.obo"), id_prefix="HP:")
+
+
+def get_go_ontology(data_lake_path: str, closure_relations: Iterable[str] | None = None) -> OntologyIndex:
+    """Return the Gene Ontology from ``go-plus.json`` in the data lake (closure over is_a and part_of by default)."""
+    return load_ontology(
+        os.path.join(data_lake_path, "go-plus.json"), id_prefix="GO:", closure_relations=closure_relations
+    )
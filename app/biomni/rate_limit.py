@@ -0,0 +1,337 @@
+"""
+Biomni Rate Limiting
+
+Process-wide registry of per-host token buckets shared by every tool that talks to an
+external web service. Each host gets a quota (requests per second, burst size and an
+optional cap on concurrent requests); callers from different sessions are served in
+round-robin order so one busy session cannot starve the others.
+
+Quotas can be overridden with the ``BIOMNI_RATE_LIMITS`` environment variable, e.g.
+``BIOMNI_RATE_LIMITS="rest.uniprot.org=20,api.fda.gov=4:8:2"`` (rate[:burst[:concurrency]]).
+Setting ``BIOMNI_RATE_LIMIT_DIR`` to a directory shares the token state between processes
+on the same machine through lock files.
+
+Usage:
+    from biomni.rate_limit import rate_limited
+
+    with rate_limited("https://rest.ensembl.org/lookup/id"):
+        response = requests.post(...)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-process sharing is unavailable
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RateLimitQuota:
+    """Quota for a single host."""
+
+    rate: float  # sustained requests per second
+    burst: float | None = None  # bucket capacity, defaults to ``rate``
+    max_concurrency: int | None = None  # maximum in-flight requests, unlimited if None
+
+    def __post_init__(self):
+        if not self.rate > 0:
+            raise ValueError(f"Rate limit must be a positive number of requests per second, got {self.rate}")
+        if self.burst is not None and not self.burst > 0:
+            raise ValueError(f"Rate limit burst must be positive, got {self.burst}")
+        if self.max_concurrency is not None and self.max_concurrency < 1:
+            raise ValueError(f"Rate limit concurrency must be at least 1, got {self.max_concurrency}")
+
+
+# Published or conservative limits for services used by the tools
+DEFAULT_QUOTAS = {
+    "eutils.ncbi.nlm.nih.gov": RateLimitQuota(rate=10 if os.getenv("NCBI_API_KEY") else 3),
+    "api.fda.gov": RateLimitQuota(rate=4, burst=4),
+    "rest.ensembl.org": RateLimitQuota(rate=15, burst=15),
+    "rest.uniprot.org": RateLimitQuota(rate=10, burst=10, max_concurrency=4),
+    "data.rcsb.org": RateLimitQuota(rate=10, burst=10),
+    "search.rcsb.org": RateLimitQuota(rate=10, burst=10),
+    "www.ebi.ac.uk": RateLimitQuota(rate=10, burst=10),
+    "blast.ncbi.nlm.nih.gov": RateLimitQuota(rate=0.1, burst=1, max_concurrency=1),
+    "export.arxiv.org": RateLimitQuota(rate=1 / 3, burst=1, max_concurrency=1),
+    "scholar.google.com": RateLimitQuota(rate=0.2, burst=1, max_concurrency=1),
+    "www.google.com": RateLimitQuota(rate=0.5, burst=1, max_concurrency=1),
+}
+FALLBACK_QUOTA = RateLimitQuota(rate=5, burst=5)
+
+# Cleared by ``set_rate_limiting(False)``, e.g. while recorded HTTP traffic is replayed offline
+_limiting_enabled = True
+
+
+def _parse_quota_overrides(spec: str | None) -> dict[str, RateLimitQuota]:
+    """Parse ``host=rate[:burst[:concurrency]]`` entries separated by commas.
+
+    Malformed entries are logged and skipped so a typo cannot stop the package from importing.
+    """
+    overrides = {}
+    for entry in (spec or "").split(","):
+        if not entry.strip():
+            continue
+        if "=" not in entry:
+            logger.warning("Ignoring invalid rate limit '%s' in BIOMNI_RATE_LIMITS: expected host=rate", entry.strip())
+            continue
+        host, values = entry.split("=", 1)
+        parts = values.split(":")
+        try:
+            overrides[host.strip().lower()] = RateLimitQuota(
+                rate=float(parts[0]),
+                burst=float(parts[1]) if len(parts) > 1 and parts[1] else None,
+                max_concurrency=int(parts[2]) if len(parts) > 2 and parts[2] else None,
+            )
+        except ValueError as e:
+            logger.warning("Ignoring invalid rate limit '%s' in BIOMNI_RATE_LIMITS: %s", entry.strip(), e)
+    return overrides
+
+
+def _host_of(url_or_host: str) -> str:
+    """Extract the lowercase host name from a URL, or return a bare host unchanged."""
+    if "://" in url_or_host:
+        return (urlparse(url_or_host).hostname or url_or_host).lower()
+    return url_or_host.split("/")[0].split(":")[0].lower()
+
+
+class _LocalTokenState:
+    """Token bucket state held in process memory."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+
+    def take(self) -> float:
+        """Consume one token if available; otherwise return the seconds until one will be."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _FileTokenState:
+    """Token bucket state stored in a lock-protected file, shared by all processes on the host."""
+
+    def __init__(self, rate: float, burst: float, path: str):
+        self.rate = rate
+        self.burst = burst
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def take(self) -> float:
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                content = f.read()
+                state = json.loads(content) if content else {}
+                # Wall-clock time is the only clock comparable across processes
+                now = time.time()
+                tokens = min(self.burst, state.get("tokens", self.burst) + (now - state.get("ts", now)) * self.rate)
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({"tokens": tokens, "ts": now}))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return wait
+
+
+class HostRateLimiter:
+    """Token bucket for one host with fair round-robin queuing between sessions.
+
+    Waiters are grouped by session (the calling thread unless given explicitly). Whenever a
+    token becomes available it goes to the oldest request of the next session in rotation.
+    """
+
+    def __init__(self, host: str, quota: RateLimitQuota, state_dir: str | None = None):
+        self.host = host
+        self.quota = quota
+        burst = max(1.0, float(quota.burst if quota.burst is not None else quota.rate))
+        if state_dir and fcntl is not None:
+            self._state = _FileTokenState(quota.rate, burst, os.path.join(state_dir, f"{host}.bucket"))
+        else:
+            self._state = _LocalTokenState(quota.rate, burst)
+        self._cond = threading.Condition()
+        self._queues: dict = {}
+        self._rotation: deque = deque()
+        self._next_ticket = 0
+        self._concurrency = threading.BoundedSemaphore(quota.max_concurrency) if quota.max_concurrency else None
+
+        # Metrics
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self, session=None) -> float:
+        """Block until this session may send one request; return the seconds spent waiting."""
+        if not _limiting_enabled:
+            with self._cond:
+                self.requests += 1
+            return 0.0
+        session = session if session is not None else threading.get_ident()
+        start = time.monotonic()
+
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            if session not in self._queues:
+                self._queues[session] = deque()
+                self._rotation.append(session)
+            self._queues[session].append(ticket)
+
+            while True:
+                is_next = self._rotation[0] == session and self._queues[session][0] == ticket
+                if is_next:
+                    delay = self._state.take()
+                    if delay == 0.0:
+                        break
+                    self._cond.wait(timeout=delay)
+                else:
+                    self._cond.wait()
+
+            # Hand the turn to the next session in rotation
+            self._queues[session].popleft()
+            self._rotation.popleft()
+            if self._queues[session]:
+                self._rotation.append(session)
+            else:
+                del self._queues[session]
+            self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            self.requests += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if waited > 0.001:
+                self.throttled += 1
+
+        return waited
+
+    @contextmanager
+    def slot(self, session=None):
+        """Context manager that acquires a token and, if capped, a concurrency slot."""
+        capped = self._concurrency is not None and _limiting_enabled
+        if capped:
+            self._concurrency.acquire()
+        try:
+            self.acquire(session)
+            yield
+        finally:
+            if capped:
+                self._concurrency.release()
+
+    def metrics(self) -> dict:
+        """Return request counts and wait-time statistics for this host."""
+        with self._cond:
+            return {
+                "host": self.host,
+                "rate": self.quota.rate,
+                "burst": self.quota.burst,
+                "max_concurrency": self.quota.max_concurrency,
+                "requests": self.requests,
+                "throttled_requests": self.throttled,
+                "total_wait_seconds": round(self.total_wait, 4),
+                "mean_wait_seconds": round(self.total_wait / self.requests, 4) if self.requests else 0.0,
+                "max_wait_seconds": round(self.max_wait, 4),
+                "queued": sum(len(q) for q in self._queues.values()),
+            }
+
+
+class RateLimiterRegistry:
+    """Registry of per-host rate limiters, created lazily on first use."""
+
+    def __init__(self, overrides: dict[str, RateLimitQuota] | None = None, state_dir: str | None = None):
+        # User overrides win over caller-supplied defaults, which win over DEFAULT_QUOTAS
+        self.overrides = dict(overrides or {})
+        self.state_dir = state_dir
+        self._limiters: dict[str, HostRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def configure(
+        self, host: str, rate: float, burst: float | None = None, max_concurrency: int | None = None
+    ) -> HostRateLimiter:
+        """Set the quota for a host, replacing any existing limiter for it."""
+        host = _host_of(host)
+        with self._lock:
+            self.overrides[host] = RateLimitQuota(rate=rate, burst=burst, max_concurrency=max_concurrency)
+            self._limiters[host] = HostRateLimiter(host, self.overrides[host], self.state_dir)
+            return self._limiters[host]
+
+    def get(self, url_or_host: str, default_quota: RateLimitQuota | None = None) -> HostRateLimiter:
+        """Return the limiter for a URL's host.
+
+        ``default_quota`` is used when the limiter is first created and the user has not
+        overridden the host's quota.
+        """
+        host = _host_of(url_or_host)
+        with self._lock:
+            if host not in self._limiters:
+                quota = self.overrides.get(host) or default_quota or DEFAULT_QUOTAS.get(host) or FALLBACK_QUOTA
+                self._limiters[host] = HostRateLimiter(host, quota, self.state_dir)
+            return self._limiters[host]
+
+    def metrics(self) -> dict[str, dict]:
+        """Return metrics for every host that has been used."""
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.host: limiter.metrics() for limiter in limiters}
+
+
+# Global registry shared by all tools in the process
+registry = RateLimiterRegistry(
+    overrides=_parse_quota_overrides(os.getenv("BIOMNI_RATE_LIMITS")),
+    state_dir=os.getenv("BIOMNI_RATE_LIMIT_DIR"),
+)
+
+
+def get_rate_limiter(url_or_host: str, default_quota: RateLimitQuota | None = None) -> HostRateLimiter:
+    """Return the shared limiter for a URL or host name."""
+    return registry.get(url_or_host, default_quota)
+
+
+@contextmanager
+def rate_limited(url_or_host: str, session=None):
+    """Wait for the host's quota (and concurrency slot) before the enclosed request."""
+    with registry.get(url_or_host).slot(session):
+        yield
+
+
+def configure_rate_limit(
+    url_or_host: str, rate: float, burst: float | None = None, max_concurrency: int | None = None
+) -> HostRateLimiter:
+    """Override the quota for a host at runtime."""
+    return registry.configure(url_or_host, rate, burst, max_concurrency)
+
+
+def set_rate_limiting(enabled: bool) -> None:
+    """Turn throttling on or off for every host; requests are still counted while it is off."""
+    global _limiting_enabled
+    _limiting_enabled = bool(enabled)
+
+
+def get_rate_limit_metrics() -> dict[str, dict]:
+    """Return per-host request counts and wait-time statistics."""
+    return registry.metrics()
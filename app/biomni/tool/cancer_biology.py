@@ -1290,3 +1290,160 @@ def analyze_copy_number_purity_ploidy_and_focal_events(
     log.append("- Visualize CNV profiles using CNVkit's built-in plotting functions")
 
     return "\n".join(log)
+
+
+# Score cutoffs above which a model counts as dependent on / expressing a gene
+_DEPMAP_CUTOFFS = {
+    "gene_effect": ("effect <= -0.5", lambda values: values <= -0.5),
+    "gene_dependency": ("probability >= 0.5", lambda values: values >= 0.5),
+    "expression": ("log2(TPM+1) >= 1", lambda values: values >= 1.0),
+}
+
+
+def query_depmap_gene_scores(genes, data_lake_path, dataset="gene_effect", lineage=None, output_file=None):
+    """Summarizes DepMap scores (CRISPR gene effect, dependency probability or expression) of genes
+    across cancer cell lines, overall and per lineage, without loading the full matrix.
+
+    Parameters
+    ----------
+    genes : list of str
+        Gene symbols, "SYMBOL (Entrez)" labels or Entrez IDs.
+    data_lake_path : str
+        Directory containing the DepMap CSV files and DepMap_Model.csv.
+    dataset : str, default="gene_effect"
+        "gene_effect", "gene_dependency" or "expression".
+    lineage : str or list of str, optional
+        Restrict to models of these Oncotree lineages (e.g. "Skin", "Lung").
+    output_file : str, optional
+        CSV file to save the per-model scores with cell line name, lineage and disease.
+
+    Returns
+    -------
+    str
+        Research log with per-gene summaries and the most affected lineages.
+
+    """
+    import numpy as np
+
+    from biomni.depmap import get_depmap_matrix
+
+    genes = [genes] if isinstance(genes, str) else list(dict.fromkeys(genes))
+    log = [f"DEPMAP GENE SCORES ({dataset})"]
+    try:
+        matrix = get_depmap_matrix(data_lake_path, dataset)
+        scores = matrix.genes(genes, lineage=lineage, with_metadata=True)
+    except Exception as e:
+        log.append(f"ERROR: Could not read DepMap {dataset} matrix: {e}")
+        return "\n".join(log)
+
+    columns, missing = matrix.gene_columns(genes)
+    gene_columns = list(dict.fromkeys(matrix.symbols[columns]))
+    log.append(f"Matrix: {matrix.shape[0]} models x {matrix.shape[1]} genes")
+    log.append(f"Models analyzed: {len(scores)}" + (f" (lineage: {lineage})" if lineage else ""))
+    if missing:
+        log.append(f"WARNING: Genes not found in the matrix: {', '.join(missing)}")
+    if not gene_columns or scores.empty:
+        log.append("No scores to summarize.")
+        return "\n".join(log)
+
+    cutoff_label, is_hit = _DEPMAP_CUTOFFS.get(dataset, (None, None))
+    lineage_column = next((c for c in ("OncotreeLineage", "lineage") if c in scores.columns), None)
+    log.append("\nPER-GENE SUMMARY:")
+    for gene in gene_columns:
+        values = scores[gene].to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            log.append(f"- {gene}: no values")
+            continue
+        line = (
+            f"- {gene}: n={len(values)}, mean={values.mean():.3f}, median={np.median(values):.3f}, "
+            f"min={values.min():.3f}, max={values.max():.3f}"
+        )
+        if is_hit is not None:
+            line += f", models with {cutoff_label}: {int(is_hit(values).sum())} ({100 * is_hit(values).mean():.1f}%)"
+        log.append(line)
+
+        if lineage_column is not None and lineage is None:
+            by_lineage = scores.groupby(lineage_column)[gene].agg(["mean", "count"])
+            by_lineage = by_lineage[by_lineage["count"] >= 5]
+            ascending = dataset == "gene_effect"
+            top = by_lineage.sort_values("mean", ascending=ascending).head(5)
+            lineages = ", ".join(f"{name} ({row['mean']:.3f}, n={int(row['count'])})" for name, row in top.iterrows())
+            log.append(f"  Most {'dependent' if dataset != 'expression' else 'expressing'} lineages: {lineages}")
+
+    if output_file:
+        scores.to_csv(output_file)
+        log.append(f"\nSaved per-model scores ({len(scores)} models) to {output_file}")
+    return "\n".join(log)
+
+
+def find_depmap_codependencies(
+    gene,
+    data_lake_path,
+    dataset="gene_effect",
+    query_dataset=None,
+    lineage=None,
+    method="pearson",
+    top_n=20,
+    output_file=None,
+):
+    """Finds genes whose DepMap profiles correlate with a gene's profile across cancer cell lines
+    (co-dependencies), correlating against every gene of the matrix at once.
+
+    Parameters
+    ----------
+    gene : str
+        Query gene symbol, "SYMBOL (Entrez)" label or Entrez ID.
+    data_lake_path : str
+        Directory containing the DepMap CSV files and DepMap_Model.csv.
+    dataset : str, default="gene_effect"
+        Matrix whose genes are scanned: "gene_effect", "gene_dependency" or "expression".
+    query_dataset : str, optional
+        Matrix the query profile is taken from, if different (e.g. "expression" to find
+        dependencies associated with the query gene's expression).
+    lineage : str or list of str, optional
+        Restrict to models of these Oncotree lineages.
+    method : str, default="pearson"
+        "pearson" or "spearman".
+    top_n : int, default=20
+        Number of top positive and top negative correlations reported.
+    output_file : str, optional
+        CSV file to save the correlations with all genes.
+
+    Returns
+    -------
+    str
+        Research log with the strongest positive and negative correlations.
+
+    """
+    from biomni.depmap import get_depmap_matrix
+
+    query_dataset = query_dataset or dataset
+    log = [f"DEPMAP CO-DEPENDENCY ANALYSIS: {gene} ({query_dataset}) vs all genes ({dataset})"]
+    try:
+        matrix = get_depmap_matrix(data_lake_path, dataset)
+        query = gene if query_dataset == dataset else get_depmap_matrix(data_lake_path, query_dataset).profile(gene)
+        result = matrix.correlate(query, lineage=lineage, method=method)
+    except Exception as e:
+        log.append(f"ERROR: {e}")
+        return "\n".join(log)
+
+    log.append(f"Method: {method}" + (f", lineage: {lineage}" if lineage else ""))
+    log.append(f"Genes tested: {len(result)}")
+    if result.empty:
+        return "\n".join(log)
+    log.append(f"Models per test: {result['n_models'].min()}-{result['n_models'].max()}")
+
+    def format_rows(rows):
+        return [f"  {row.gene:<15} r={row.r:+.3f}  q={row.q_value:.2e}  n={row.n_models}" for row in rows.itertuples()]
+
+    log.append(f"\nTOP {top_n} POSITIVE CORRELATIONS:")
+    log.extend(format_rows(result.head(top_n)))
+    log.append(f"\nTOP {top_n} NEGATIVE CORRELATIONS:")
+    # With fewer than 2 * top_n genes the tail starts after the head, so no gene is listed twice
+    log.extend(format_rows(result.iloc[max(top_n, len(result) - top_n) :].iloc[::-1]))
+
+    if output_file:
+        result.to_csv(output_file, index=False)
+        log.append(f"\nSaved correlations with {len(result)} genes to {output_file}")
+    return "\n".join(log)
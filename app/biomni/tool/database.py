@@ -1,16 +1,31 @@
+import hashlib
+import io
 import json
 import os
 import pickle
+import re
+import shutil
+import subprocess
+import tempfile
 import time
 from typing import Any
 
+import numpy as np
+import pandas as pd
 import requests
-from Bio.Blast import NCBIWWW, NCBIXML
+from Bio.Blast import NCBIXML
 from Bio.Seq import Seq
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from biomni.association_index import get_association_index
+from biomni.columnar import LARGE_TABLE_LAYOUTS, get_columnar_table
+from biomni.data_lake_sql import get_data_lake_sql
+from biomni.http_transport import get_http_session, mount_transport
+from biomni.interval_index import load_interval_index, read_regions
 from biomni.llm import get_llm
-from biomni.utils import parse_hpo_obo
+from biomni.ontology import get_go_ontology, get_hpo_ontology
+from biomni.rate_limit import RateLimitQuota, get_rate_limiter, rate_limited
+from biomni.variant_index import build_variant_index, default_variant_index_root, open_variant_index, parse_variant
 
 
 # Function to map HPO terms to names
@@ -24,13 +39,207 @@ def get_hpo_names(hpo_terms: list[str], data_lake_path: str) -> list[str]:
         List[str]: A list of corresponding HPO term names.
 
     """
-    hp_dict = parse_hpo_obo(data_lake_path + "/hp.obo")
+    hpo = get_hpo_ontology(data_lake_path)
+    return [name or f"Unknown term: {term}" for term, name in zip(hpo_terms, hpo.get_names(hpo_terms), strict=False)]
 
-    hpo_names = []
+
+def get_hpo_term_info(hpo_terms: list[str], data_lake_path: str, include_ancestors: bool = False) -> dict:
+    """Retrieve names, synonyms, parents and information content for HPO terms.
+
+    Args:
+        hpo_terms (List[str]): HPO term IDs (e.g., ['HP:0001250']). Alternative IDs are resolved.
+        data_lake_path (str): Path to the data lake containing hp.obo.
+        include_ancestors (bool): Also return the full ancestor closure of each term.
+
+    Returns:
+        dict: Term details keyed by the requested ID, and the list of unknown IDs.
+
+    """
+    try:
+        hpo = get_hpo_ontology(data_lake_path)
+    except FileNotFoundError as e:
+        return {"success": False, "error": str(e)}
+
+    terms = {}
+    unknown = []
     for term in hpo_terms:
-        name = hp_dict.get(term, f"Unknown term: {term}")
-        hpo_names.append(name)
-    return hpo_names
+        info = hpo.get_term(term)
+        if info is None:
+            unknown.append(term)
+            continue
+        if include_ancestors:
+            info["ancestors"] = hpo.ancestors(term)
+        terms[term] = info
+    return {"success": True, "terms": terms, "unknown_terms": unknown}
+
+
+def compute_hpo_similarity(
+    query_terms: list[str],
+    candidate_term_sets: dict[str, list[str]] | list[list[str]],
+    data_lake_path: str,
+    top_k: int | None = None,
+    symmetric: bool = True,
+) -> dict:
+    """Rank candidate phenotype profiles (e.g. diseases or genes) by similarity to a patient's HPO terms.
+
+    Similarity is the best-match-average Resnik score using the intrinsic information content of
+    the HPO graph, computed in one vectorized pass over all candidates.
+
+    Args:
+        query_terms (List[str]): The patient's HPO term IDs.
+        candidate_term_sets (dict or list): Candidate name -> HPO term IDs, or a list of term ID lists.
+        data_lake_path (str): Path to the data lake containing hp.obo.
+        top_k (int, optional): Only return the best ``top_k`` candidates.
+        symmetric (bool): Average both matching directions instead of only query-to-candidate.
+
+    Returns:
+        dict: Ranked candidates with their scores and the query terms that were not recognised.
+
+    """
+    try:
+        hpo = get_hpo_ontology(data_lake_path)
+    except FileNotFoundError as e:
+        return {"success": False, "error": str(e)}
+
+    if isinstance(candidate_term_sets, dict):
+        names = list(candidate_term_sets.keys())
+        term_sets = list(candidate_term_sets.values())
+    else:
+        names = list(range(len(candidate_term_sets)))
+        term_sets = list(candidate_term_sets)
+
+    scores = hpo.set_similarity(query_terms, term_sets, symmetric=symmetric)
+    order = np.argsort(-scores, kind="stable")
+    if top_k is not None:
+        order = order[:top_k]
+    return {
+        "success": True,
+        "unknown_query_terms": [t for t in query_terms if t not in hpo],
+        "ranking": [{"candidate": names[i], "score": round(float(scores[i]), 6)} for i in order],
+    }
+
+
+def get_go_term_info(
+    go_terms: list[str], data_lake_path: str, include_ancestors: bool = False, include_descendants: bool = False
+) -> dict:
+    """Retrieve names, namespaces, relations and information content for Gene Ontology terms.
+
+    Args:
+        go_terms (List[str]): GO term IDs (e.g., ['GO:0006915']). Alternative IDs are resolved.
+        data_lake_path (str): Path to the data lake containing go-plus.json.
+        include_ancestors (bool): Also return the ancestor closure (is_a and part_of) of each term.
+        include_descendants (bool): Also return the descendant closure of each term.
+
+    Returns:
+        dict: Term details keyed by the requested ID, and the list of unknown IDs.
+
+    """
+    try:
+        go = get_go_ontology(data_lake_path)
+    except FileNotFoundError as e:
+        return {"success": False, "error": str(e)}
+
+    terms = {}
+    unknown = []
+    for term in go_terms:
+        info = go.get_term(term)
+        if info is None:
+            unknown.append(term)
+            continue
+        if include_ancestors:
+            info["ancestors"] = go.ancestors(term)
+        if include_descendants:
+            info["descendants"] = go.descendants(term)
+        terms[term] = info
+    return {"success": True, "terms": terms, "unknown_terms": unknown}
+
+
+def propagate_go_annotations(
+    annotations,
+    data_lake_path: str,
+    namespace: str | None = None,
+    min_genes: int = 1,
+    max_genes: int | None = None,
+    output_file: str | None = None,
+) -> dict:
+    """Propagate gene-to-GO annotations up the ontology (true-path rule) to build GO term gene sets.
+
+    A gene annotated to a term is also annotated to all its is_a and part_of ancestors. The
+    resulting term -> genes sets can be used for enrichment analysis or annotation summaries.
+
+    Args:
+        annotations (dict or str): Gene -> list of GO term IDs, or the path of a GAF file (NOT
+            annotations are skipped) or of a two-column gene/term TSV or CSV file.
+        data_lake_path (str): Path to the data lake containing go-plus.json.
+        namespace (str, optional): Only keep terms of "biological_process", "molecular_function" or
+            "cellular_component".
+        min_genes (int): Smallest gene set kept.
+        max_genes (int, optional): Largest gene set kept.
+        output_file (str, optional): Save the gene sets as a TSV file (term, name, namespace, n_genes, genes).
+
+    Returns:
+        dict: Number of gene sets, the largest sets with their names and gene counts, and the output file.
+
+    """
+    try:
+        go = get_go_ontology(data_lake_path)
+        gene_sets = go.propagate_annotations(annotations, namespace=namespace, min_genes=min_genes, max_genes=max_genes)
+    except (OSError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+
+    table = pd.DataFrame(
+        {
+            "term": list(gene_sets),
+            "name": go.get_names(gene_sets),
+            "namespace": [go.get_term(t).get("namespace") for t in gene_sets],
+            "n_genes": [len(genes) for genes in gene_sets.values()],
+            "genes": [",".join(genes) for genes in gene_sets.values()],
+        }
+    ).sort_values("n_genes", ascending=False, kind="stable")
+    result = {
+        "success": True,
+        "n_gene_sets": len(table),
+        "largest_gene_sets": table.drop(columns="genes").head(20).to_dict("records"),
+    }
+    if output_file:
+        table.to_csv(output_file, sep="\t", index=False)
+        result["output_file"] = output_file
+    return result
+
+
+def compute_go_term_similarity(
+    go_terms_a: list[str], data_lake_path: str, go_terms_b: list[str] | None = None, method: str = "resnik"
+) -> dict:
+    """Compute pairwise semantic similarity between Gene Ontology terms.
+
+    Uses the intrinsic information content of the GO graph (is_a and part_of), computed in one
+    vectorized pass per term.
+
+    Args:
+        go_terms_a (List[str]): GO term IDs (rows of the similarity matrix).
+        data_lake_path (str): Path to the data lake containing go-plus.json.
+        go_terms_b (List[str], optional): GO term IDs for the columns; defaults to ``go_terms_a``.
+        method (str): "resnik" (IC of the most informative common ancestor) or "lin" (normalized to [0, 1]).
+
+    Returns:
+        dict: Similarity matrix as {term_a: {term_b: score}} and the unknown term IDs.
+
+    """
+    try:
+        go = get_go_ontology(data_lake_path)
+        go_terms_b = go_terms_a if go_terms_b is None else go_terms_b
+        matrix = go.term_similarity(go_terms_a, go_terms_b, method=method)
+    except (OSError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+
+    return {
+        "success": True,
+        "method": method,
+        "similarity": {
+            a: {b: round(float(matrix[i, j]), 6) for j, b in enumerate(go_terms_b)} for i, a in enumerate(go_terms_a)
+        },
+        "unknown_terms": sorted({t for t in [*go_terms_a, *go_terms_b] if t not in go}),
+    }
 
 
 def _query_llm_for_api(prompt, schema, system_template):
@@ -136,11 +345,13 @@ def _query_rest_api(endpoint, method="GET", params=None, headers=None, json_data
     url_error = None
 
     try:
-        # Make the API request
+        # Make the API request, waiting for the host's shared rate limit first
         if method.upper() == "GET":
-            response = requests.get(endpoint, params=params, headers=headers)
+            with rate_limited(endpoint):
+                response = get_http_session(endpoint).get(endpoint, params=params, headers=headers)
         elif method.upper() == "POST":
-            response = requests.post(endpoint, params=params, headers=headers, json=json_data)
+            with rate_limited(endpoint):
+                response = get_http_session(endpoint).post(endpoint, params=params, headers=headers, json=json_data)
         else:
             return {"error": f"Unsupported HTTP method: {method}"}
 
@@ -206,6 +417,237 @@ def _query_rest_api(endpoint, method="GET", params=None, headers=None, json_data
         }
 
 
+def _iter_paginated(endpoint, params=None, headers=None, max_pages=None):
+    """Iterate over the pages of a cursor-paginated REST API.
+
+    Follows ``Link: <...>; rel="next"`` response headers (as returned by UniProt) until the
+    last page is reached, yielding one response per page so callers can stream records to
+    disk instead of holding the full result set in memory.
+
+    Parameters
+    ----------
+    endpoint (str): Full URL of the first page
+    params (dict, optional): Query parameters for the first page (cursor URLs already carry them)
+    headers (dict, optional): HTTP headers sent with every page request
+    max_pages (int, optional): Stop after this many pages
+
+    Yields
+    ------
+    requests.Response: The response for each page
+
+    """
+    if headers is None:
+        headers = {"Accept": "application/json"}
+
+    session = get_http_session(endpoint)
+    url = endpoint
+    pages = 0
+    while url and (max_pages is None or pages < max_pages):
+        with rate_limited(url):
+            response = session.get(url, params=params, headers=headers)
+        response.raise_for_status()
+        yield response
+
+        pages += 1
+        url = response.links.get("next", {}).get("url")
+        params = None
+
+
+def _chunked(items, size):
+    """Split a sequence into consecutive lists of at most ``size`` items."""
+    items = list(items)
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+class NCBIEutilsClient:
+    """
+    Client for the NCBI E-utilities API.
+
+    All instances in a process share the E-utilities host limiter from biomni.rate_limit, so
+    concurrent tools stay under NCBI's quota (3 req/s, or 10 req/s with an API key). IDs are sent in batches through EPost and the History server
+    (WebEnv/query_key), and large result sets are streamed in pages instead of being
+    truncated at a fixed ``retmax``.
+    """
+
+    BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        email: str | None = None,
+        batch_size: int = 200,
+        retry_attempts: int = 4,
+        timeout: int = 30,
+    ):
+        self.api_key = api_key or os.getenv("NCBI_API_KEY")
+        self.email = email or os.getenv("NCBI_EMAIL")
+        # E-utilities accept up to 500 UIDs per ESummary request in JSON mode
+        self.batch_size = max(1, min(int(batch_size), 500))
+        self.retry_attempts = retry_attempts
+        self.timeout = timeout
+        self.rate_limiter = get_rate_limiter(self.BASE_URL, RateLimitQuota(rate=10 if self.api_key else 3))
+        self.session = mount_transport(requests.Session())
+        self.session.headers.update({"User-Agent": "Biomni-Agent/1.0 (https://biomni.stanford.edu)"})
+
+    def _request(self, utility: str, params: dict, method: str = "GET") -> requests.Response:
+        """Send a rate-limited E-utilities request, retrying on 429, 5xx and network errors."""
+        params = {k: v for k, v in params.items() if v is not None}
+        params["tool"] = "biomni"
+        if self.api_key:
+            params["api_key"] = self.api_key
+        if self.email:
+            params["email"] = self.email
+
+        url = f"{self.BASE_URL}/{utility}.fcgi"
+        for attempt in range(self.retry_attempts):
+            try:
+                with self.rate_limiter.slot():
+                    if method == "POST":
+                        response = self.session.post(url, data=params, timeout=self.timeout)
+                    else:
+                        response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                if attempt == self.retry_attempts - 1:
+                    raise
+                time.sleep(2**attempt)
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.retry_attempts - 1:
+                    response.raise_for_status()
+                retry_after = response.headers.get("Retry-After")
+                time.sleep(float(retry_after) if retry_after and retry_after.isdigit() else 2**attempt)
+                continue
+
+            response.raise_for_status()
+            return response
+
+        raise requests.exceptions.RetryError(f"E-utilities {utility} failed after {self.retry_attempts} attempts")
+
+    def esearch(self, database: str, term: str, retmax: int = 0, usehistory: bool = True) -> dict:
+        """Run ESearch and return the ``esearchresult`` block (count, idlist, webenv, querykey)."""
+        params = {
+            "db": database,
+            "term": term,
+            "retmode": "json",
+            "retmax": retmax,
+            "usehistory": "y" if usehistory else None,
+        }
+        return self._request("esearch", params).json().get("esearchresult", {})
+
+    def epost(self, database: str, ids: list[str], webenv: str | None = None) -> tuple[str, str]:
+        """Upload IDs to the History server and return ``(webenv, query_key)``."""
+        params = {"db": database, "id": ",".join(str(i) for i in ids), "WebEnv": webenv}
+        text = self._request("epost", params, method="POST").text
+        # EPost only returns XML
+        if "<WebEnv>" not in text or "<QueryKey>" not in text:
+            raise requests.exceptions.RequestException(f"EPost did not return a WebEnv: {text[:200]}")
+        new_webenv = text.split("<WebEnv>")[1].split("</WebEnv>")[0]
+        query_key = text.split("<QueryKey>")[1].split("</QueryKey>")[0]
+        return new_webenv, query_key
+
+    def esummary(
+        self,
+        database: str,
+        ids: list[str] | None = None,
+        webenv: str | None = None,
+        query_key: str | None = None,
+        retstart: int = 0,
+        retmax: int | None = None,
+    ) -> dict:
+        """Run a single ESummary request, either for explicit IDs or a History server query."""
+        params = {"db": database, "retmode": "json"}
+        if ids is not None:
+            params["id"] = ",".join(str(i) for i in ids)
+        else:
+            params.update({"WebEnv": webenv, "query_key": query_key, "retstart": retstart, "retmax": retmax})
+        # Long ID lists exceed URL limits, so send them in the request body
+        method = "POST" if ids is not None and len(ids) > 50 else "GET"
+        return self._request("esummary", params, method=method).json()
+
+    def iter_esummary(
+        self,
+        database: str,
+        ids: list[str] | None = None,
+        webenv: str | None = None,
+        query_key: str | None = None,
+        count: int | None = None,
+        max_records: int | None = None,
+    ):
+        """Stream document summaries in batches of ``batch_size``.
+
+        Either pass ``ids`` (uploaded once with EPost) or an existing ``webenv``/``query_key``
+        pair with the total ``count`` from ESearch.
+
+        Yields
+        ------
+        tuple: ``(uid, summary)`` for every record
+
+        """
+        if ids is not None:
+            ids = list(dict.fromkeys(str(i) for i in ids))
+            if len(ids) <= self.batch_size:
+                batch = self.esummary(database, ids=ids).get("result", {})
+                for uid in batch.get("uids", [])[:max_records]:
+                    yield uid, batch.get(uid, {})
+                return
+            webenv, query_key = self.epost(database, ids)
+            count = len(ids)
+
+        total = count if max_records is None else min(count or 0, max_records)
+        for retstart in range(0, total, self.batch_size):
+            retmax = min(self.batch_size, total - retstart)
+            batch = self.esummary(database, webenv=webenv, query_key=query_key, retstart=retstart, retmax=retmax)
+            batch = batch.get("result", {})
+            for uid in batch.get("uids", []):
+                yield uid, batch.get(uid, {})
+
+    def iter_efetch(
+        self,
+        database: str,
+        ids: list[str] | None = None,
+        webenv: str | None = None,
+        query_key: str | None = None,
+        count: int | None = None,
+        rettype: str | None = None,
+        retmode: str = "xml",
+    ):
+        """Stream raw EFetch output (XML, FASTA, ...) in batches of ``batch_size`` records.
+
+        Yields
+        ------
+        str: The raw response text for each batch
+
+        """
+        if ids is not None:
+            ids = list(dict.fromkeys(str(i) for i in ids))
+            webenv, query_key = self.epost(database, ids)
+            count = len(ids)
+
+        for retstart in range(0, count or 0, self.batch_size):
+            params = {
+                "db": database,
+                "WebEnv": webenv,
+                "query_key": query_key,
+                "retstart": retstart,
+                "retmax": self.batch_size,
+                "rettype": rettype,
+                "retmode": retmode,
+            }
+            yield self._request("efetch", params).text
+
+
+_ncbi_client = None
+
+
+def _get_ncbi_client() -> NCBIEutilsClient:
+    """Return the process-wide E-utilities client."""
+    global _ncbi_client
+    if _ncbi_client is None:
+        _ncbi_client = NCBIEutilsClient()
+    return _ncbi_client
+
+
 def _query_ncbi_database(
     database: str,
     search_term: str,
@@ -214,114 +656,141 @@ def _query_ncbi_database(
 ) -> dict[str, Any]:
     """Core function to query NCBI databases using Claude for query interpretation and NCBI eutils.
 
+    The search is stored on the History server and summaries are fetched in rate-limited
+    batches through the shared NCBIEutilsClient, so large ``max_results`` values are streamed
+    rather than capped.
+
     Parameters
     ----------
     database (str): NCBI database to query (e.g., "clinvar", "gds", "geoprofiles")
+    search_term (str): Search term in the database's Entrez syntax
     result_formatter (callable): Function to format results from the database
-    api_key (str): Anthropic API key. If None, will look for ANTHROPIC_API_KEY environment variable
-    model (str): Anthropic model to use
     max_results (int): Maximum number of results to return
-    verbose (bool): Whether to return verbose results
 
     Returns
     -------
     dict: Dictionary containing both the structured query and the results
 
     """
-    # Query NCBI API using the structured search term
-    esearch_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-    esearch_params = {
-        "db": database,
-        "term": search_term,
-        "retmode": "json",
-        "retmax": 100,
-        "usehistory": "y",  # Use history server to store results
-    }
+    client = _get_ncbi_client()
 
-    # Get IDs of matching entries
-    search_response = _query_rest_api(
-        endpoint=esearch_url,
-        method="GET",
-        params=esearch_params,
-        description="NCBI ESearch API query",
-    )
+    try:
+        search_data = client.esearch(database, search_term, retmax=max_results)
+        total_results = int(search_data.get("count", 0))
 
-    if not search_response["success"]:
-        return search_response
+        if total_results == 0:
+            return {
+                "database": database,
+                "query_interpretation": search_term,
+                "total_results": 0,
+                "formatted_results": [],
+            }
 
-    search_data = search_response["result"]
+        webenv = search_data.get("webenv", "")
+        query_key = search_data.get("querykey", "")
+        if webenv and query_key:
+            records = client.iter_esummary(
+                database, webenv=webenv, query_key=query_key, count=total_results, max_records=max_results
+            )
+        else:
+            # Fall back to direct ID fetch
+            id_list = search_data.get("idlist", [])[:max_results]
+            records = client.iter_esummary(database, ids=id_list)
 
-    # If we have results, fetch the details
-    if "esearchresult" in search_data and int(search_data["esearchresult"]["count"]) > 0:
-        # Extract WebEnv and query_key from the search results
-        webenv = search_data["esearchresult"].get("webenv", "")
-        query_key = search_data["esearchresult"].get("querykey", "")
+        # Keep the ESummary JSON layout: {"result": {"uids": [...], uid: summary, ...}}
+        summaries = {"uids": []}
+        for uid, summary in records:
+            summaries["uids"].append(uid)
+            summaries[uid] = summary
+        results = {"result": summaries}
 
-        # Use WebEnv and query_key if available
-        if webenv and query_key:
-            # Get details using eSummary
-            esummary_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
-            esummary_params = {
-                "db": database,
-                "query_key": query_key,
-                "WebEnv": webenv,
-                "retmode": "json",
-                "retmax": max_results,
-            }
+    except requests.exceptions.RequestException as e:
+        return {
+            "success": False,
+            "error": f"API error: {str(e)}",
+            "query_info": {"database": database, "search_term": search_term, "description": "NCBI E-utilities query"},
+        }
 
-            details_response = _query_rest_api(
-                endpoint=esummary_url,
-                method="GET",
-                params=esummary_params,
-                description="NCBI ESummary API query",
-            )
+    # Format results using the provided formatter
+    formatted_results = result_formatter(results) if result_formatter else results
 
-            if not details_response["success"]:
-                return details_response
+    # Return the combined information
+    return {
+        "database": database,
+        "query_interpretation": search_term,
+        "total_results": total_results,
+        "formatted_results": formatted_results,
+    }
 
-            results = details_response["result"]
 
-        else:
-            # Fall back to direct ID fetch
-            id_list = search_data["esearchresult"]["idlist"][:max_results]
+def query_ncbi_batch(database, ids, output_file=None, batch_size=200):
+    """Retrieve document summaries for many NCBI records at once.
 
-            # Get details for each ID
-            esummary_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
-            esummary_params = {
-                "db": database,
-                "id": ",".join(id_list),
-                "retmode": "json",
-            }
+    IDs are uploaded with a single EPost and summaries are fetched in rate-limited batches
+    through the History server, so sweeps over hundreds of ClinVar variations or dbSNP rsIDs
+    take a handful of requests instead of one per record.
 
-            details_response = _query_rest_api(
-                endpoint=esummary_url,
-                method="GET",
-                params=esummary_params,
-                description="NCBI ESummary API query",
-            )
+    Parameters
+    ----------
+    database (str): NCBI database (e.g., "clinvar", "snp", "gene", "gds", "pubmed")
+    ids (list): NCBI UIDs to summarize. For dbSNP, rsIDs such as "rs6025" are also accepted
+    output_file (str, optional): If provided, summaries are streamed to this file as JSON lines
+    batch_size (int): Number of records per ESummary request (at most 500)
 
-            if not details_response["success"]:
-                return details_response
+    Returns
+    -------
+    dict: Dictionary with the summaries keyed by UID (or the output file path) and missing IDs
 
-            results = details_response["result"]
+    Examples
+    --------
+    - query_ncbi_batch("snp", ["rs6025", "rs1800562", "rs334"])
+    - query_ncbi_batch("clinvar", ["12345", "17661"], output_file="clinvar_summaries.jsonl")
 
-        # Format results using the provided formatter
-        formatted_results = result_formatter(results) if result_formatter else results
+    """
+    if not ids:
+        return {"error": "No identifiers provided"}
 
-        # Return the combined information
-        return {
+    uids = [str(i).strip() for i in ids]
+    if database == "snp":
+        uids = [uid[2:] if uid.lower().startswith("rs") else uid for uid in uids]
+    uids = list(dict.fromkeys(uid for uid in uids if uid))
+
+    client = _get_ncbi_client()
+    if batch_size != client.batch_size:
+        client = NCBIEutilsClient(api_key=client.api_key, email=client.email, batch_size=batch_size)
+
+    results = {}
+    found = set()
+    out = open(output_file, "w") if output_file else None
+
+    try:
+        for uid, summary in client.iter_esummary(database, ids=uids):
+            found.add(uid)
+            if out:
+                out.write(json.dumps({"uid": uid, **summary}) + "\n")
+            else:
+                results[uid] = summary
+    except requests.exceptions.RequestException as e:
+        return {"success": False, "error": f"API error: {str(e)}", "records_retrieved": len(found)}
+    finally:
+        if out:
+            out.close()
+
+    api_result = {
+        "success": True,
+        "query_info": {
             "database": database,
-            "query_interpretation": search_term,
-            "total_results": int(search_data["esearchresult"]["count"]),
-            "formatted_results": formatted_results,
-        }
+            "description": f"NCBI EPost/ESummary batch retrieval of {len(uids)} records",
+        },
+        "records_retrieved": len(found),
+        "missing_ids": [uid for uid in uids if uid not in found],
+    }
+    if output_file:
+        api_result["output_file"] = output_file
     else:
-        return {
-            "database": database,
-            "query_interpretation": search_term,
-            "total_results": 0,
-            "formatted_results": [],
-        }
+        api_result["results"] = results
+
+    return api_result
 
 
 def _format_query_results(result, options=None):
@@ -551,6 +1020,310 @@ def query_uniprot(
     return api_result
 
 
+def query_uniprot_batch(accessions, fields=None, batch_size=500, output_file=None):
+    """Retrieve many UniProtKB entries at once using the bulk ``accessions`` endpoint.
+
+    Parameters
+    ----------
+    accessions (list): UniProt accessions to retrieve (e.g., ["P01308", "P04637"])
+    fields (list, optional): UniProt return fields (e.g., ["accession", "gene_names", "length"]).
+                             If None, full entries are returned
+    batch_size (int): Number of accessions sent per request (UniProt accepts at most 1000)
+    output_file (str, optional): If provided, entries are streamed to this file as JSON lines
+                                 instead of being kept in memory
+
+    Returns
+    -------
+    dict: Dictionary containing the retrieved entries (or the output file path), and the
+          accessions that UniProt did not return
+
+    Examples
+    --------
+    - query_uniprot_batch(["P01308", "P04637"], fields=["accession", "gene_names", "organism_name"])
+
+    """
+    if not accessions:
+        return {"error": "No accessions provided"}
+
+    requested = list(dict.fromkeys(a.strip() for a in accessions if a and a.strip()))
+    batch_size = max(1, min(int(batch_size), 1000))
+    endpoint = "https://rest.uniprot.org/uniprotkb/accessions"
+
+    results = []
+    found = set()
+    n_records = 0
+    out = open(output_file, "w") if output_file else None
+
+    try:
+        for batch in _chunked(requested, batch_size):
+            params = {"accessions": ",".join(batch), "format": "json", "size": len(batch)}
+            if fields:
+                params["fields"] = ",".join(fields)
+
+            for response in _iter_paginated(endpoint, params=params):
+                for record in response.json().get("results", []):
+                    found.add(record.get("primaryAccession"))
+                    found.update(record.get("secondaryAccessions", []))
+                    n_records += 1
+                    if out:
+                        out.write(json.dumps(record) + "\n")
+                    else:
+                        results.append(record)
+    except requests.exceptions.RequestException as e:
+        return {"success": False, "error": f"API error: {str(e)}", "records_retrieved": n_records}
+    finally:
+        if out:
+            out.close()
+
+    api_result = {
+        "success": True,
+        "query_info": {
+            "endpoint": endpoint,
+            "method": "GET",
+            "description": f"Batch retrieval of {len(requested)} UniProt accessions",
+        },
+        "records_retrieved": n_records,
+        "missing_accessions": [a for a in requested if a not in found],
+    }
+    if output_file:
+        api_result["output_file"] = output_file
+    else:
+        api_result["results"] = results
+
+    return api_result
+
+
+def iter_uniprot_records(query, fields=None, dataset="uniprotkb", page_size=500, max_records=None):
+    """Lazily iterate over every record matching a UniProt search query.
+
+    Pages are fetched on demand by following the ``Link: rel=next`` cursor, so arbitrarily
+    large result sets can be processed with constant memory.
+
+    Parameters
+    ----------
+    query (str): UniProt query string (e.g., "gene_exact:TP53 AND reviewed:true")
+    fields (list, optional): UniProt return fields to include in each record
+    dataset (str): UniProt dataset to search ("uniprotkb", "uniref", "uniparc", ...)
+    page_size (int): Number of records fetched per page (UniProt accepts at most 500)
+    max_records (int, optional): Stop after yielding this many records
+
+    Yields
+    ------
+    dict: One UniProt record per iteration
+
+    """
+    params = {"query": query, "format": "json", "size": max(1, min(int(page_size), 500))}
+    if fields:
+        params["fields"] = ",".join(fields)
+
+    n_yielded = 0
+    for response in _iter_paginated(f"https://rest.uniprot.org/{dataset}/search", params=params):
+        for record in response.json().get("results", []):
+            if max_records is not None and n_yielded >= max_records:
+                return
+            yield record
+            n_yielded += 1
+
+
+def stream_uniprot_results(
+    query,
+    output_file,
+    fields=None,
+    dataset="uniprotkb",
+    file_format="tsv",
+    page_size=500,
+    max_records=None,
+):
+    """Stream all results of a UniProt search to disk, following pagination cursors.
+
+    Unlike query_uniprot, which returns a single page, this writes every matching record
+    page by page so that memory usage stays bounded regardless of the result size.
+
+    Parameters
+    ----------
+    query (str): UniProt query string (e.g., "organism_id:9606 AND reviewed:true")
+    output_file (str): Path of the file to write
+    fields (list, optional): UniProt return fields (e.g., ["accession", "gene_names", "length"])
+    dataset (str): UniProt dataset to search ("uniprotkb", "uniref", "uniparc", ...)
+    file_format (str): "tsv" for UniProt's tabular output or "jsonl" for one JSON record per line
+    page_size (int): Number of records fetched per page (UniProt accepts at most 500)
+    max_records (int, optional): Stop after writing this many records
+
+    Returns
+    -------
+    dict: Summary with the output file path, records written, pages fetched and total hits
+
+    """
+    if file_format not in ("tsv", "jsonl"):
+        return {"error": f"Unsupported file_format: {file_format}. Use 'tsv' or 'jsonl'"}
+
+    endpoint = f"https://rest.uniprot.org/{dataset}/search"
+    params = {
+        "query": query,
+        "format": "tsv" if file_format == "tsv" else "json",
+        "size": max(1, min(int(page_size), 500)),
+    }
+    if fields:
+        params["fields"] = ",".join(fields)
+
+    n_records = 0
+    n_pages = 0
+    total_results = None
+
+    try:
+        with open(output_file, "w") as out:
+            for response in _iter_paginated(endpoint, params=params):
+                n_pages += 1
+                if total_results is None and "X-Total-Results" in response.headers:
+                    total_results = int(response.headers["X-Total-Results"])
+
+                if file_format == "tsv":
+                    lines = response.text.splitlines()
+                    # Every page repeats the header line; keep it only once
+                    if n_pages > 1:
+                        lines = lines[1:]
+                    elif lines:
+                        out.write(lines[0] + "\n")
+                        lines = lines[1:]
+                    records = lines
+                else:
+                    records = [json.dumps(record) for record in response.json().get("results", [])]
+
+                if max_records is not None:
+                    records = records[: max_records - n_records]
+                for record in records:
+                    out.write(record + "\n")
+                n_records += len(records)
+
+                if max_records is not None and n_records >= max_records:
+                    break
+    except requests.exceptions.RequestException as e:
+        return {
+            "success": False,
+            "error": f"API error: {str(e)}",
+            "output_file": output_file,
+            "records_written": n_records,
+        }
+
+    return {
+        "success": True,
+        "query_info": {"endpoint": endpoint, "method": "GET", "description": f"Streamed UniProt search: {query}"},
+        "output_file": output_file,
+        "records_written": n_records,
+        "pages_fetched": n_pages,
+        "total_results": total_results,
+    }
+
+
+def map_uniprot_ids(
+    ids,
+    from_db="UniProtKB_AC-ID",
+    to_db="UniProtKB",
+    taxon_id=None,
+    poll_interval=2,
+    timeout=300,
+    output_file=None,
+):
+    """Map a batch of identifiers between databases using a UniProt ID-mapping job.
+
+    Submits a single asynchronous job for all identifiers, polls it until it finishes and
+    then pages through the results, instead of issuing one request per identifier.
+
+    Parameters
+    ----------
+    ids (list): Identifiers to map (up to 100,000 per job)
+    from_db (str): Source database (e.g., "UniProtKB_AC-ID", "Gene_Name", "Ensembl", "GeneID", "PDB")
+    to_db (str): Target database (e.g., "UniProtKB", "UniProtKB-Swiss-Prot", "Ensembl", "GeneID", "PDB")
+    taxon_id (int, optional): Restrict the mapping to an organism (e.g., 9606); useful with Gene_Name
+    poll_interval (float): Seconds between job status checks
+    timeout (float): Maximum number of seconds to wait for the job to finish
+    output_file (str, optional): If provided, mapped records are streamed here as JSON lines
+
+    Returns
+    -------
+    dict: Dictionary with the mapped records (or output file path), failed IDs and the job ID
+
+    Examples
+    --------
+    - map_uniprot_ids(["TP53", "BRCA1"], from_db="Gene_Name", to_db="UniProtKB-Swiss-Prot", taxon_id=9606)
+
+    """
+    if not ids:
+        return {"error": "No identifiers provided"}
+
+    base_url = "https://rest.uniprot.org/idmapping"
+    form = {"from": from_db, "to": to_db, "ids": ",".join(ids)}
+    if taxon_id is not None:
+        form["taxId"] = str(taxon_id)
+
+    try:
+        with rate_limited(base_url):
+            response = get_http_session(base_url).post(f"{base_url}/run", data=form)
+        response.raise_for_status()
+        job_id = response.json()["jobId"]
+
+        # Poll until the job has finished
+        start_time = time.time()
+        while True:
+            with rate_limited(base_url):
+                status = get_http_session(base_url).get(f"{base_url}/status/{job_id}", allow_redirects=False)
+            status.raise_for_status()
+            status_data = status.json() if status.content else {}
+            job_status = status_data.get("jobStatus")
+            if status.is_redirect or "results" in status_data or job_status == "FINISHED":
+                break
+            if job_status not in (None, "NEW", "RUNNING"):
+                return {"success": False, "error": f"ID mapping job {job_id} failed: {status_data}", "job_id": job_id}
+            if time.time() - start_time > timeout:
+                return {"success": False, "error": f"ID mapping job {job_id} timed out", "job_id": job_id}
+            time.sleep(poll_interval)
+
+        with rate_limited(base_url):
+            details = get_http_session(base_url).get(f"{base_url}/details/{job_id}")
+        details.raise_for_status()
+        results_url = details.json().get("redirectURL", f"{base_url}/results/{job_id}")
+
+        results = []
+        failed_ids = []
+        n_records = 0
+        out = open(output_file, "w") if output_file else None
+        try:
+            for page in _iter_paginated(results_url, params={"format": "json", "size": 500}):
+                page_data = page.json()
+                failed_ids.extend(page_data.get("failedIds", []))
+                for record in page_data.get("results", []):
+                    n_records += 1
+                    if out:
+                        out.write(json.dumps(record) + "\n")
+                    else:
+                        results.append(record)
+        finally:
+            if out:
+                out.close()
+    except requests.exceptions.RequestException as e:
+        return {"success": False, "error": f"API error: {str(e)}"}
+    except (KeyError, ValueError) as e:
+        return {"success": False, "error": f"Unexpected ID mapping response: {str(e)}"}
+
+    api_result = {
+        "success": True,
+        "query_info": {
+            "endpoint": f"{base_url}/run",
+            "method": "POST",
+            "description": f"UniProt ID mapping of {len(ids)} identifiers from {from_db} to {to_db}",
+        },
+        "job_id": job_id,
+        "records_mapped": n_records,
+        "failed_ids": failed_ids,
+    }
+    if output_file:
+        api_result["output_file"] = output_file
+    else:
+        api_result["results"] = results
+
+    return api_result
+
+
 def query_alphafold(
     uniprot_id,
     endpoint="prediction",
@@ -611,7 +1384,8 @@ def query_alphafold(
 
     try:
         # Make the API request
-        response = requests.get(url)
+        with rate_limited(url):
+            response = get_http_session(url).get(url)
         response.raise_for_status()
 
         # Parse the response as JSON
@@ -634,7 +1408,8 @@ def query_alphafold(
             download_url = f"https://alphafold.ebi.ac.uk/files/{filename}"
 
             # Download the file
-            download_response = requests.get(download_url)
+            with rate_limited(download_url):
+                download_response = get_http_session(download_url).get(download_url)
             if download_response.status_code == 200:
                 with open(file_path, "wb") as f:
                     f.write(download_response.content)
@@ -971,7 +1746,8 @@ def query_pdb_identifiers(identifiers, return_type="entry", download=False, attr
                     data_url = f"https://data.rcsb.org/rest/v1/core/chem_comp/{identifier}"
 
                 # Fetch data
-                data_response = requests.get(data_url)
+                with rate_limited(data_url):
+                    data_response = get_http_session(data_url).get(data_url)
                 data_response.raise_for_status()
                 entity_data = data_response.json()
 
@@ -1010,7 +1786,8 @@ def query_pdb_identifiers(identifiers, return_type="entry", download=False, attr
                 try:
                     # Download PDB file
                     pdb_url = f"https://files.rcsb.org/download/{pdb_id}.pdb"
-                    pdb_response = requests.get(pdb_url)
+                    with rate_limited(pdb_url):
+                        pdb_response = get_http_session(pdb_url).get(pdb_url)
 
                     if pdb_response.status_code == 200:
                         # Create data directory if it doesn't exist
@@ -1037,6 +1814,116 @@ def query_pdb_identifiers(identifiers, return_type="entry", download=False, attr
         return {"error": f"Error retrieving PDB details: {str(e)}"}
 
 
+# RCSB Data API GraphQL root fields for multi-identifier lookups, with a default selection set
+_PDB_GRAPHQL_BATCH_QUERIES = {
+    "entry": (
+        "entries",
+        "entry_ids",
+        "rcsb_id struct { title } exptl { method } "
+        "rcsb_entry_info { resolution_combined polymer_entity_count deposited_atom_count } "
+        "rcsb_accession_info { initial_release_date }",
+    ),
+    "polymer_entity": (
+        "polymer_entities",
+        "entity_ids",
+        "rcsb_id rcsb_polymer_entity { pdbx_description formula_weight } "
+        "entity_poly { pdbx_seq_one_letter_code_can rcsb_entity_polymer_type } "
+        "rcsb_entity_source_organism { scientific_name } "
+        "rcsb_polymer_entity_container_identifiers { reference_sequence_identifiers { database_name database_accession } }",
+    ),
+    "nonpolymer_entity": (
+        "nonpolymer_entities",
+        "entity_ids",
+        "rcsb_id rcsb_nonpolymer_entity { pdbx_description formula_weight } "
+        "nonpolymer_comp { chem_comp { id name formula } }",
+    ),
+    "polymer_instance": (
+        "polymer_entity_instances",
+        "instance_ids",
+        "rcsb_id rcsb_polymer_entity_instance_container_identifiers { entity_id auth_asym_id }",
+    ),
+    "assembly": (
+        "assemblies",
+        "assembly_ids",
+        "rcsb_id rcsb_assembly_info { polymer_entity_instance_count } pdbx_struct_assembly { oligomeric_details }",
+    ),
+    "mol_definition": (
+        "chem_comps",
+        "comp_ids",
+        "rcsb_id chem_comp { id name formula formula_weight type } rcsb_chem_comp_descriptor { SMILES InChIKey }",
+    ),
+}
+
+
+def query_pdb_entries_batch(identifiers, return_type="entry", fields=None, batch_size=200):
+    """Retrieve data for many PDB identifiers with RCSB GraphQL multi-entry queries.
+
+    A single GraphQL request fetches up to ``batch_size`` identifiers, replacing the one
+    REST request per identifier made by query_pdb_identifiers.
+
+    Parameters
+    ----------
+    identifiers (list): PDB identifiers matching return_type (e.g., ["4HHB", "1TUP"] for entries,
+                        ["4HHB_1"] for polymer entities, ["4HHB-1"] for assemblies, ["ATP"] for ligands)
+    return_type (str): "entry", "polymer_entity", "nonpolymer_entity", "polymer_instance", "assembly" or "mol_definition"
+    fields (str, optional): GraphQL selection set to return for each identifier
+                            (e.g., "rcsb_id struct { title } rcsb_entry_info { resolution_combined }").
+                            A compact default selection is used if None
+    batch_size (int): Number of identifiers per GraphQL request
+
+    Returns
+    -------
+    dict: Dictionary with the records, keyed by identifier, and any identifiers not found
+
+    """
+    if not identifiers:
+        return {"error": "No identifiers provided"}
+    if return_type not in _PDB_GRAPHQL_BATCH_QUERIES:
+        return {
+            "error": f"Unsupported return_type: {return_type}. Choose from {list(_PDB_GRAPHQL_BATCH_QUERIES.keys())}"
+        }
+
+    root_field, id_argument, default_fields = _PDB_GRAPHQL_BATCH_QUERIES[return_type]
+    graphql_query = f"query($ids: [String!]!) {{ {root_field}({id_argument}: $ids) {{ {fields or default_fields} }} }}"
+    endpoint = "https://data.rcsb.org/graphql"
+
+    requested = list(dict.fromkeys(i.strip().upper() for i in identifiers if i and i.strip()))
+    records = {}
+    errors = []
+
+    for batch in _chunked(requested, max(1, int(batch_size))):
+        api_result = _query_rest_api(
+            endpoint=endpoint,
+            method="POST",
+            json_data={"query": graphql_query, "variables": {"ids": batch}},
+            description=f"RCSB GraphQL batch query for {len(batch)} {return_type} identifiers",
+        )
+        if not api_result["success"]:
+            return api_result
+
+        result = api_result["result"]
+        if result.get("errors"):
+            errors.extend(err.get("message", str(err)) for err in result["errors"])
+        for record in (result.get("data") or {}).get(root_field) or []:
+            if record:
+                records[record.get("rcsb_id", "").upper()] = record
+
+    response = {
+        "success": True,
+        "query_info": {
+            "endpoint": endpoint,
+            "method": "POST",
+            "description": f"RCSB GraphQL batch query for {len(requested)} {return_type} identifiers",
+        },
+        "results": records,
+        "missing_identifiers": [i for i in requested if i not in records],
+    }
+    if errors:
+        response["errors"] = errors
+
+    return response
+
+
 def query_kegg(prompt, endpoint=None, verbose=True):
     """Take a natural language prompt and convert it to a structured KEGG API query.
 
@@ -1230,7 +2117,8 @@ def query_stringdb(
         if download_image:
             # For images, we need to handle the download manually
             try:
-                response = requests.get(endpoint, stream=True)
+                with rate_limited(endpoint):
+                    response = get_http_session(endpoint).get(endpoint, stream=True)
                 response.raise_for_status()
 
                 # Create output directory if needed
@@ -1495,7 +2383,8 @@ def query_paleobiology(
     if is_image:
         # For image queries, we need special handling
         try:
-            response = requests.get(endpoint)
+            with rate_limited(endpoint):
+                response = get_http_session(endpoint).get(endpoint)
             response.raise_for_status()
 
             # Return image metadata without the binary data
@@ -2322,6 +3211,90 @@ def query_ensembl(
     return api_result
 
 
+# Ensembl REST endpoints that accept a POST body of identifiers: (path, body key, max ids per request)
+_ENSEMBL_BATCH_ENDPOINTS = {
+    "lookup/id": ("lookup/id", "ids", 1000),
+    "lookup/symbol": ("lookup/symbol/{species}", "symbols", 1000),
+    "sequence/id": ("sequence/id", "ids", 50),
+    "variation": ("variation/{species}", "ids", 200),
+    "vep/id": ("vep/{species}/id", "ids", 200),
+    "vep/hgvs": ("vep/{species}/hgvs", "hgvs_notations", 200),
+    "archive/id": ("archive/id", "id", 1000),
+}
+
+
+def query_ensembl_batch(identifiers, endpoint="lookup/id", species="homo_sapiens", params=None, batch_size=None):
+    """Query the Ensembl REST API for many identifiers at once using its POST batch endpoints.
+
+    Parameters
+    ----------
+    identifiers (list): Identifiers to look up (Ensembl stable IDs, gene symbols, rsIDs or HGVS
+                        notations depending on the endpoint)
+    endpoint (str): Batch endpoint: "lookup/id", "lookup/symbol", "sequence/id", "variation",
+                    "vep/id", "vep/hgvs" or "archive/id"
+    species (str): Species name used by species-specific endpoints
+    params (dict, optional): Extra query parameters (e.g., {"expand": 1} or {"type": "protein"})
+    batch_size (int, optional): Identifiers per request; defaults to the endpoint's maximum
+
+    Returns
+    -------
+    dict: Dictionary with the merged results and any identifiers Ensembl did not return
+
+    Examples
+    --------
+    - query_ensembl_batch(["ENSG00000157764", "ENSG00000141510"])
+    - query_ensembl_batch(["BRCA2", "TP53"], endpoint="lookup/symbol")
+
+    """
+    if not identifiers:
+        return {"error": "No identifiers provided"}
+    if endpoint not in _ENSEMBL_BATCH_ENDPOINTS:
+        return {"error": f"Unsupported endpoint: {endpoint}. Choose from {list(_ENSEMBL_BATCH_ENDPOINTS.keys())}"}
+
+    path, body_key, max_batch = _ENSEMBL_BATCH_ENDPOINTS[endpoint]
+    url = f"https://rest.ensembl.org/{path.format(species=species)}"
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    batch_size = min(int(batch_size or max_batch), max_batch)
+
+    requested = list(dict.fromkeys(identifiers))
+    merged = None
+
+    for batch in _chunked(requested, batch_size):
+        api_result = _query_rest_api(
+            endpoint=url,
+            method="POST",
+            params=params,
+            headers=headers,
+            json_data={body_key: batch},
+            description=f"Ensembl batch {endpoint} for {len(batch)} identifiers",
+        )
+        if not api_result["success"]:
+            return api_result
+
+        result = api_result["result"]
+        # Lookup-style endpoints return a dict keyed by identifier, the others a list
+        if isinstance(result, dict):
+            merged = {} if merged is None else merged
+            merged.update(result)
+        else:
+            merged = [] if merged is None else merged
+            merged.extend(result)
+
+    response = {
+        "success": True,
+        "query_info": {
+            "endpoint": url,
+            "method": "POST",
+            "description": f"Ensembl batch {endpoint} for {len(requested)} identifiers",
+        },
+        "result": merged,
+    }
+    if isinstance(merged, dict):
+        response["missing_identifiers"] = [i for i in requested if merged.get(i) is None]
+
+    return response
+
+
 def query_opentarget(
     prompt=None,
     query=None,
@@ -2942,19 +3915,916 @@ def query_gnomad(
     return api_result
 
 
-def blast_sequence(sequence: str, database: str, program: str) -> dict[str, str | float] | str:
+def _local_variant_indexes(index_root, sources=None):
+    """Open the per-source variant indexes found under ``index_root``."""
+    indexes = {}
+    if not os.path.isdir(index_root):
+        return indexes
+    for name in sorted(os.listdir(index_root)):
+        if sources is not None and name not in sources:
+            continue
+        if os.path.exists(os.path.join(index_root, name, "manifest.json")):
+            indexes[name] = open_variant_index(os.path.join(index_root, name))
+    return indexes
+
+
+# gnomAD release queried for variants in each assembly's coordinates
+_GNOMAD_DATASETS = {"grch37": "gnomad_r2_1", "hg19": "gnomad_r2_1", "grch38": "gnomad_r4", "hg38": "gnomad_r4"}
+
+
+def _gnomad_dataset_for(indexes):
+    """Return the gnomAD dataset matching the assembly of the local indexes (GRCh38 when there are none)."""
+    index = indexes.get("gnomad") or next(iter(indexes.values()), None)
+    assembly = index.manifest["assembly"] if index is not None else "GRCh38"
+    return _GNOMAD_DATASETS.get(str(assembly).lower())
+
+
+def _query_gnomad_variants(variant_ids, dataset="gnomad_r4"):
+    """Fetch allele counts for gnomAD variant IDs (chrom-pos-ref-alt) from the GraphQL API."""
+    base_url = "https://gnomad.broadinstitute.org/api"
+    query = """
+    query Variant($variantId: String!, $dataset: DatasetId!) {
+      variant(variantId: $variantId, dataset: $dataset) {
+        variant_id rsids
+        exome { ac an af homozygote_count }
+        genome { ac an af homozygote_count }
+      }
+    }
+    """
+    results = {}
+    for variant_id in variant_ids:
+        try:
+            with rate_limited(base_url):
+                response = get_http_session(base_url).post(
+                    base_url,
+                    json={"query": query, "variables": {"variantId": variant_id, "dataset": dataset}},
+                    timeout=30,
+                )
+            response.raise_for_status()
+            variant = (response.json().get("data") or {}).get("variant")
+        except (requests.exceptions.RequestException, ValueError):
+            continue
+        if variant:
+            results[variant_id] = variant
+    return results
+
+
+def build_local_variant_index(
+    input_files, source, data_lake_path=None, output_dir=None, assembly="GRCh38", fields=None
+):
+    """Ingest gnomAD, ClinVar or dbSNP bulk dumps into a local variant index for offline annotation.
+
+    Parameters
+    ----------
+    input_files (list): VCF (.vcf, .vcf.gz, .vcf.bgz) or tab-separated files with chrom/pos/ref/alt columns
+    source (str): Source name: "gnomad", "clinvar", "dbsnp" or any custom name
+    data_lake_path (str, optional): Data lake path; the index is written to <data_lake_path>/variant_index/<source>
+    output_dir (str, optional): Explicit index directory (overrides data_lake_path and BIOMNI_VARIANT_INDEX_DIR)
+    assembly (str): Genome assembly of the input coordinates
+    fields (list, optional): INFO fields or table columns to keep (defaults to the source presets)
+
+    Returns
+    -------
+    dict: Index location, number of variants and chunks, and kept fields
+
+    Examples
+    --------
+    - build_local_variant_index(["clinvar.vcf.gz"], "clinvar", data_lake_path="./data/data_lake")
+
+    """
+    if isinstance(input_files, str):
+        input_files = [input_files]
+    missing = [p for p in input_files if not os.path.exists(p)]
+    if missing:
+        return {"success": False, "error": f"Input files not found: {missing}"}
+
+    output_dir = output_dir or os.path.join(default_variant_index_root(data_lake_path), source.lower())
+    start = time.perf_counter()
+    try:
+        manifest = build_variant_index(input_files, output_dir, source=source, assembly=assembly, fields=fields)
+    except (OSError, ValueError) as e:
+        return {"success": False, "error": f"Failed to build variant index: {str(e)}"}
+
+    return {
+        "success": True,
+        "index_dir": output_dir,
+        "source": manifest["source"],
+        "assembly": manifest["assembly"],
+        "n_variants": manifest["n_variants"],
+        "n_chunks": len(manifest["chunks"]),
+        "fields": list(manifest["fields"]),
+        "build_seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def annotate_variants_local(variants, data_lake_path=None, sources=None, online_fallback=False, max_online_queries=50):
+    """Annotate many variants at once from the local gnomAD/ClinVar/dbSNP indexes.
+
+    Variants are matched by (chrom, pos, ref, alt) or by rsID. Variants missing from every
+    local index can optionally be looked up online (dbSNP via NCBI E-utilities for rsIDs,
+    gnomAD GraphQL for positional variants).
+
+    Parameters
+    ----------
+    variants (list): Variants as "chrom:pos:ref:alt" / "chrom-pos-ref-alt" strings, rsIDs (e.g. "rs6025"),
+        or dicts with chrom, pos, ref and alt
+    data_lake_path (str, optional): Data lake path holding variant_index/<source> directories
+    sources (list, optional): Restrict to these indexes (e.g. ["gnomad", "clinvar"])
+    online_fallback (bool): Query the online databases for variants not found locally
+    max_online_queries (int): Maximum number of variants looked up online
+
+    Returns
+    -------
+    dict: Annotations per input variant keyed by source, and the variants not found
+
+    Examples
+    --------
+    - annotate_variants_local(["17:43045712:T:C", "rs6025"], data_lake_path="./data/data_lake")
+
+    """
+    if isinstance(variants, str):
+        variants = [variants]
+    index_root = default_variant_index_root(data_lake_path)
+    indexes = _local_variant_indexes(index_root, sources)
+    if not indexes and not online_fallback:
+        return {
+            "success": False,
+            "error": f"No local variant indexes found in {index_root}. Build them with build_local_variant_index.",
+        }
+
+    rsid_queries = [v for v in variants if isinstance(v, str) and v.lower().startswith("rs")]
+    positional = [v for v in variants if not (isinstance(v, str) and v.lower().startswith("rs"))]
+    annotations = {str(v): {} for v in variants}
+    invalid = []
+
+    keys = []
+    for variant in positional:
+        try:
+            keys.append((str(variant), parse_variant(variant)))
+        except (ValueError, KeyError, TypeError):
+            invalid.append(str(variant))
+    start = time.perf_counter()
+    for name, index in indexes.items():
+        for (label, _), record in zip(keys, index.lookup([k for _, k in keys]), strict=False):
+            if record is not None:
+                annotations[label][name] = record
+        for rsid, records in index.lookup_rsids(rsid_queries).items():
+            annotations[rsid][name] = records if len(records) > 1 else records[0]
+    lookup_seconds = time.perf_counter() - start
+
+    online = {}
+    if online_fallback:
+        missing_rsids = [v for v in rsid_queries if not annotations[v]][:max_online_queries]
+        if missing_rsids:
+            result = query_ncbi_batch("snp", missing_rsids)
+            for uid, summary in (result.get("results") or {}).items():
+                annotations.setdefault(f"rs{uid}", {})["dbsnp_online"] = summary
+                online[f"rs{uid}"] = "dbsnp"
+        missing_positional = [(label, key) for label, key in keys if not annotations[label]]
+        budget = max(0, max_online_queries - len(missing_rsids))
+        # Positions are in the coordinates of the local indexes; unknown assemblies are not looked up
+        dataset = _gnomad_dataset_for(indexes)
+        gnomad_ids = {f"{k[0]}-{k[1]}-{k[2]}-{k[3]}": label for label, k in missing_positional[:budget] if dataset}
+        for variant_id, variant in _query_gnomad_variants(list(gnomad_ids), dataset=dataset).items():
+            annotations[gnomad_ids[variant_id]]["gnomad_online"] = variant
+            online[gnomad_ids[variant_id]] = "gnomad"
+
+    not_found = [label for label, found in annotations.items() if not found and label not in invalid]
+    return {
+        "success": True,
+        "indexes": {name: index.manifest["assembly"] for name, index in indexes.items()},
+        "annotations": {label: found for label, found in annotations.items() if found},
+        "not_found": not_found,
+        "invalid_variants": invalid,
+        "online_lookups": online,
+        "lookup_seconds": round(lookup_seconds, 4),
+    }
+
+
+def scan_variant_region(chrom, start, end, data_lake_path=None, sources=None, limit=1000, output_file=None):
+    """List all locally indexed gnomAD/ClinVar/dbSNP variants in a genomic region.
+
+    Parameters
+    ----------
+    chrom (str): Chromosome (with or without "chr")
+    start (int): Region start (1-based, inclusive)
+    end (int): Region end (1-based, inclusive)
+    data_lake_path (str, optional): Data lake path holding variant_index/<source> directories
+    sources (list, optional): Restrict to these indexes
+    limit (int): Maximum number of variants returned per source
+    output_file (str, optional): Write all variants in the region to this TSV file instead
+
+    Returns
+    -------
+    dict: Variants per source (or the output file path) and per-source counts
+
+    """
+    indexes = _local_variant_indexes(default_variant_index_root(data_lake_path), sources)
+    if not indexes:
+        return {"success": False, "error": "No local variant indexes found. Build them with build_local_variant_index."}
+
+    frames = {}
+    for name, index in indexes.items():
+        frames[name] = index.scan_region(chrom, int(start), int(end), limit=None if output_file else limit)
+
+    counts = {name: len(frame) for name, frame in frames.items()}
+    if output_file:
+        combined = pd.concat([frame.assign(source=name) for name, frame in frames.items()], ignore_index=True)
+        combined.to_csv(output_file, sep="\t", index=False)
+        return {"success": True, "region": f"{chrom}:{start}-{end}", "counts": counts, "output_file": output_file}
+
+    return {
+        "success": True,
+        "region": f"{chrom}:{start}-{end}",
+        "counts": counts,
+        "variants": {name: frame.to_dict("records") for name, frame in frames.items()},
+    }
+
+
+def _data_lake_table_path(table, data_lake_path):
+    return table if os.path.isabs(table) or data_lake_path is None else os.path.join(data_lake_path, table)
+
+
+def convert_data_lake_tables(data_lake_path, tables=None, sort_by=None, partition_by=None):
+    """Convert large CSV/TSV data lake tables once into typed Parquet datasets for filtered queries.
+
+    Each table is written next to the file (``.biomni_index/<file>.parquet``) with column types
+    inferred from the whole file, row-group statistics, and parts sorted by ``sort_by`` so that
+    query_data_lake_table only reads the row groups a filter can match.
+
+    Parameters
+    ----------
+    data_lake_path (str): Data lake directory
+    tables (list, optional): File names to convert; defaults to every BindingDB_*, DepMap_* and evebio_* text table
+    sort_by (list, optional): Columns the parts are sorted by (BindingDB defaults to the target UniProt ID)
+    partition_by (list, optional): Low-cardinality columns written as one directory per value
+
+    Returns
+    -------
+    dict: Dataset directory, row count, part files and column types per table
+
+    Examples
+    --------
+    - convert_data_lake_tables("./data/data_lake", ["BindingDB_All_202409.tsv"])
+
+    """
+    if tables is None:
+        tables = sorted(
+            name
+            for name in os.listdir(data_lake_path)
+            if name.startswith(tuple(LARGE_TABLE_LAYOUTS))
+            and name.endswith((".csv", ".tsv", ".txt", ".csv.gz", ".tsv.gz"))
+        )
+    elif isinstance(tables, str):
+        tables = [tables]
+
+    converted, errors = {}, {}
+    for table in tables:
+        start = time.perf_counter()
+        try:
+            dataset = get_columnar_table(_data_lake_table_path(table, data_lake_path), sort_by, partition_by)
+        except (OSError, ValueError) as e:
+            errors[table] = str(e)
+            continue
+        converted[table] = {
+            "dataset_dir": dataset.table_dir,
+            "n_rows": dataset.manifest["n_rows"],
+            "n_parts": dataset.manifest["n_parts"],
+            "sort_by": dataset.manifest["sort_by"],
+            "partition_by": dataset.manifest["partition_by"],
+            "columns": dataset.manifest["columns"],
+            "seconds": round(time.perf_counter() - start, 2),
+        }
+    return {"success": not errors, "tables": converted, "errors": errors}
+
+
+def query_data_lake_table(table, data_lake_path=None, columns=None, filters=None, limit=1000, output_file=None):
+    """Query a large CSV/TSV data lake table without loading it, reading only the needed columns and row groups.
+
+    The table is converted to Parquet on first use (see convert_data_lake_tables). Filters are
+    pushed down to the Parquet row-group statistics, and matching rows are streamed in batches.
+
+    Parameters
+    ----------
+    table (str): File name in the data lake (e.g. "BindingDB_All_202409.tsv") or an absolute path
+    data_lake_path (str, optional): Data lake directory
+    columns (list, optional): Columns to return (all columns if None)
+    filters (dict or list, optional): {column: value or list of values}, or (column, op, value) conditions
+        that must all hold, with op one of ==, !=, <, <=, >, >=, in, not in
+    limit (int): Maximum number of rows returned (ignored when output_file is given)
+    output_file (str, optional): Stream all matching rows to this CSV, TSV or Parquet file instead
+
+    Returns
+    -------
+    dict: Matching rows (or the output file and row count) and the table's column names
+
+    Examples
+    --------
+    - query_data_lake_table("BindingDB_All_202409.tsv", "./data/data_lake",
+      columns=["Ligand SMILES", "Ki (nM)"], filters={"UniProt (SwissProt) Primary ID of Target Chain": "P00533"})
+
+    """
+    start = time.perf_counter()
+    try:
+        dataset = get_columnar_table(_data_lake_table_path(table, data_lake_path))
+        if output_file is None:
+            rows = dataset.read(columns=columns, filters=filters, limit=limit)
+            return {
+                "success": True,
+                "table": table,
+                "n_rows": len(rows),
+                "truncated": len(rows) == limit and dataset.count(filters) > limit,
+                # Listed even when no row matched
+                "columns": list(rows.columns),
+                "rows": rows.to_dict("records"),
+                "query_seconds": round(time.perf_counter() - start, 4),
+            }
+
+        n_rows, writer = 0, None
+        for batch in dataset.scan(columns=columns, filters=filters, arrow=True):
+            if output_file.endswith(".parquet"):
+                import pyarrow.parquet as pq
+
+                writer = writer or pq.ParquetWriter(output_file, batch.schema)
+                writer.write_batch(batch)
+            else:
+                sep = "\t" if output_file.endswith((".tsv", ".txt")) else ","
+                frame = batch.to_pandas()
+                frame.to_csv(output_file, sep=sep, index=False, mode="a" if n_rows else "w", header=not n_rows)
+            n_rows += batch.num_rows
+        if writer is not None:
+            writer.close()
+        elif not n_rows:
+            # No match: still write the header so the file carries the column names
+            empty = pd.DataFrame(columns=list(columns or dataset.columns))
+            if output_file.endswith(".parquet"):
+                empty.to_parquet(output_file, index=False)
+            else:
+                empty.to_csv(output_file, sep="\t" if output_file.endswith((".tsv", ".txt")) else ",", index=False)
+        return {
+            "success": True,
+            "table": table,
+            "n_rows": n_rows,
+            "columns": list(columns or dataset.columns),
+            "output_file": output_file,
+            "query_seconds": round(time.perf_counter() - start, 4),
+        }
+    except (OSError, ValueError, TypeError) as e:
+        return {"success": False, "table": table, "error": str(e)}
+
+
+def list_data_lake_tables(data_lake_path, pattern=None, include_columns=False):
+    """List the data lake files that can be queried with query_data_lake_sql, with their SQL table names.
+
+    Parameters
+    ----------
+    data_lake_path (str): Data lake directory
+    pattern (str, optional): Regular expression matched (case-insensitively) against table names and descriptions
+    include_columns (bool): Also return the column names and types of each listed table
+
+    Returns
+    -------
+    dict: Tables with their file, size in MB and data lake description
+
+    Examples
+    --------
+    - list_data_lake_tables("./data/data_lake", pattern="gwas|genebass")
+
+    """
+    try:
+        lake = get_data_lake_sql(data_lake_path)
+        tables = lake.tables(pattern)
+        records = tables.to_dict("records")
+        if include_columns:
+            for record in records:
+                columns = lake.columns(record["table"])
+                record["columns"] = dict(zip(columns["column_name"], columns["column_type"], strict=False))
+        return {"success": True, "n_tables": len(records), "tables": records, "unreadable_files": lake.errors}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def query_data_lake_sql(sql, data_lake_path, max_rows=200, output_file=None):
+    """Run a read-only SQL query over the data lake files without loading them into memory.
+
+    Every Parquet, CSV and TSV file of the data lake is a table named after the file without its
+    extension (see list_data_lake_tables), e.g. DisGeNET, gtex_tissue_gene_tpm or
+    BindingDB_All_202409. Queries run on DuckDB: only the referenced columns are read, filters
+    skip Parquet row groups, and scans and joins use all cores.
+
+    Parameters
+    ----------
+    sql (str): A single SELECT (or WITH, DESCRIBE, SHOW, SUMMARIZE) statement
+    data_lake_path (str): Data lake directory
+    max_rows (int): Maximum number of rows returned (ignored when output_file is given)
+    output_file (str, optional): Write the full result to this Parquet, CSV or TSV file instead
+
+    Returns
+    -------
+    dict: Result rows and whether they were truncated (or the output file and row count)
+
+    Examples
+    --------
+    - query_data_lake_sql("SELECT gene_symbol, count(*) AS n FROM DisGeNET GROUP BY 1 ORDER BY n DESC",
+      "./data/data_lake", max_rows=20)
+
+    """
+    start = time.perf_counter()
+    try:
+        lake = get_data_lake_sql(data_lake_path)
+        if output_file is not None:
+            n_rows = lake.export(sql, output_file)
+            return {
+                "success": True,
+                "n_rows": n_rows,
+                "output_file": output_file,
+                "query_seconds": round(time.perf_counter() - start, 4),
+            }
+
+        result, truncated = lake.query(sql, max_rows=max_rows)
+        return {
+            "success": True,
+            "n_rows": len(result),
+            "truncated": truncated,
+            "columns": list(result.columns),
+            "rows": json.loads(result.to_json(orient="records", date_format="iso")),
+            "query_seconds": round(time.perf_counter() - start, 4),
+        }
+    except Exception as e:
+        return {"success": False, "sql": sql, "error": str(e)}
+
+
+def _query_association_index(index, genes, traits, rsids, regions, trait_match, max_p, flank, limit):
+    """Run gene, trait, rsID and region lookups on an association index; returns one frame per query type."""
+    lookups = [
+        ("gene", genes, lambda: index.by_gene(genes, max_p=max_p, limit=limit)),
+        ("trait", traits, lambda: index.by_trait(traits, match=trait_match, max_p=max_p, limit=limit)),
+        ("rsid", rsids and not flank, lambda: index.by_rsid(rsids, max_p=max_p, limit=limit)),
+        ("rsid_window", rsids and flank, lambda: index.window(rsids, flank=flank, max_p=max_p, limit=limit)),
+        ("region", regions, lambda: index.regions(regions, max_p=max_p, limit=limit)),
+    ]
+    frames = []
+    for query_type, requested, lookup in lookups:
+        if requested:
+            frame = lookup()
+            frame = frame.rename(columns={frame.columns[0]: "query"})
+            frame.insert(1, "query_type", query_type)
+            frames.append(frame)
+    return frames
+
+
+def _association_response(frames, pvalue_column, limit, output_file, start, **fields):
+    """Combine association lookups into the tool response: most significant rows first, capped at ``limit``."""
+    result = pd.concat(frames) if frames else pd.DataFrame(columns=["query", "query_type"])
+    if pvalue_column in result:
+        pvalues = pd.to_numeric(result[pvalue_column], errors="coerce").to_numpy(dtype=float)
+        result = result.iloc[np.argsort(pvalues, kind="stable")]
+
+    response = {
+        "success": True,
+        **fields,
+        "n_rows": len(result),
+        "rows_per_query": {str(k): int(v) for k, v in result["query"].value_counts(sort=False).items()},
+    }
+    if output_file:
+        result.to_csv(output_file, sep="\t" if output_file.endswith((".tsv", ".txt")) else ",", index=False)
+        response["output_file"] = output_file
+    else:
+        response["truncated"] = len(result) > limit
+        response["rows"] = json.loads(result.head(limit).to_json(orient="records"))
+    response["query_seconds"] = round(time.perf_counter() - start, 4)
+    return response
+
+
+def query_gwas_associations(
+    data_lake_path,
+    genes=None,
+    traits=None,
+    rsids=None,
+    regions=None,
+    trait_match="contains",
+    max_p=None,
+    flank=None,
+    limit=200,
+    output_file=None,
+):
+    """Look up GWAS Catalog associations from the data lake by gene, trait, rsID or genomic region.
+
+    gwas_catalog.pkl is indexed once by gene, trait, EFO term, rsID and position, so each lookup
+    reads only the matching rows instead of unpickling the whole catalog.
+
+    Parameters
+    ----------
+    data_lake_path (str): Data lake directory
+    genes (list, optional): Mapped or reported gene symbols
+    traits (list, optional): Trait names (e.g. "type 2 diabetes") or ontology terms (e.g. "EFO_0001360")
+    rsids (list, optional): Variant rsIDs
+    regions (list, optional): Regions as "chrom:start-end" strings or (chrom, start, end) tuples (GRCh38)
+    trait_match (str): "contains" matches every trait containing the given name, "exact" only identical names
+    max_p (float, optional): Keep associations with a p-value at or below this threshold (e.g. 5e-8)
+    flank (int, optional): With rsids, return all associations within this many bp of each variant instead
+    limit (int): Maximum number of rows returned per query and in total (most significant first)
+    output_file (str, optional): Save all matching rows to this CSV or TSV file instead of returning them
+
+    Returns
+    -------
+    dict: Matching associations, most significant first, and the number of rows per query
+
+    Examples
+    --------
+    - query_gwas_associations("./data/data_lake", traits=["type 2 diabetes"], max_p=5e-8)
+    - query_gwas_associations("./data/data_lake", genes=["TCF7L2", "FTO"])
+    - query_gwas_associations("./data/data_lake", rsids=["rs7903146"], flank=250000)
+
+    """
+    start = time.perf_counter()
+    try:
+        index = get_association_index(data_lake_path, "gwas_catalog")
+        per_query = None if output_file else limit
+        frames = _query_association_index(index, genes, traits, rsids, regions, trait_match, max_p, flank, per_query)
+        return _association_response(frames, index.pvalue_column, limit, output_file, start, table="gwas_catalog")
+    except (OSError, ValueError, TypeError) as e:
+        return {"success": False, "table": "gwas_catalog", "error": str(e)}
+
+
+def query_genebass_associations(
+    data_lake_path,
+    genes=None,
+    traits=None,
+    annotations=None,
+    trait_match="contains",
+    max_p=None,
+    limit=200,
+    output_file=None,
+):
+    """Look up GeneBass gene-level burden associations (UK Biobank exomes) from the data lake.
+
+    The genebass_*_filtered.pkl tables are indexed once by gene, phenotype description and
+    phenocode, so each lookup reads only the matching rows.
+
+    Parameters
+    ----------
+    data_lake_path (str): Data lake directory
+    genes (list, optional): Gene symbols or Ensembl gene IDs
+    traits (list, optional): Phenotype descriptions (e.g. "LDL") or phenocodes (e.g. "30780")
+    annotations (list, optional): Variant classes to search: "pLoF", "missense_LC" and/or "synonymous" (default: all)
+    trait_match (str): "contains" matches every phenotype containing the given name, "exact" only identical names
+    max_p (float, optional): Keep associations with a p-value at or below this threshold
+    limit (int): Maximum number of rows returned per query and in total (most significant first)
+    output_file (str, optional): Save all matching rows to this CSV or TSV file instead of returning them
+
+    Returns
+    -------
+    dict: Matching associations with their variant class, most significant first
+
+    Examples
+    --------
+    - query_genebass_associations("./data/data_lake", genes=["PCSK9"], annotations=["pLoF"], max_p=1e-6)
+
+    """
+    start = time.perf_counter()
+    annotations = annotations or ["pLoF", "missense_LC", "synonymous"]
+    per_query = None if output_file else limit
+    try:
+        frames, pvalue_column = [], None
+        for annotation in annotations:
+            index = get_association_index(data_lake_path, f"genebass_{annotation}")
+            pvalue_column = pvalue_column or index.pvalue_column
+            lookups = _query_association_index(index, genes, traits, None, None, trait_match, max_p, None, per_query)
+            for frame in lookups:
+                frame.insert(2, "variant_class", annotation)
+                frames.append(frame)
+        return _association_response(frames, pvalue_column, limit, output_file, start, annotations=annotations)
+    except (OSError, ValueError, TypeError) as e:
+        return {"success": False, "annotations": annotations, "error": str(e)}
+
+
+# Columns requested from BLAST+ tabular output (-outfmt 6)
+_BLAST_TABULAR_FIELDS = [
+    "qseqid",
+    "sseqid",
+    "pident",
+    "length",
+    "mismatch",
+    "gapopen",
+    "qstart",
+    "qend",
+    "sstart",
+    "send",
+    "evalue",
+    "bitscore",
+    "qlen",
+    "slen",
+    "stitle",
+]
+
+# Built databases are cached per process by (path, size, mtime) to avoid re-hashing large FASTA files
+_blast_db_paths: dict[tuple, str] = {}
+
+
+def _blast_db_cache_dir() -> str:
+    """Return the directory that holds BLAST databases built from FASTA files."""
+    cache_dir = os.getenv("BIOMNI_BLAST_DB_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "biomni", "blast_db"
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+# Index, sequence and alias files of formatted protein and nucleotide databases. ".pdb" alone is not one:
+# it is also the suffix of structure files.
+_BLAST_DB_EXTENSIONS = (".pin", ".psq", ".pal", ".nin", ".nsq", ".nal")
+
+
+def _is_blast_db(path: str) -> bool:
+    """Return True if ``path`` is the prefix of a formatted BLAST database."""
+    return any(os.path.exists(path + ext) for ext in _BLAST_DB_EXTENSIONS)
+
+
+def _prepare_blast_db(fasta_path: str, dbtype: str) -> str:
+    """Build (once) a BLAST database for a FASTA file and return its path prefix.
+
+    Databases are keyed by the SHA-256 of the FASTA content, so the same sequences are only
+    indexed once even if the file is copied or renamed.
+    """
+    # Already a formatted BLAST database
+    if _is_blast_db(fasta_path):
+        return fasta_path
+
+    stat = os.stat(fasta_path)
+    key = (os.path.abspath(fasta_path), stat.st_size, stat.st_mtime, dbtype)
+    if key in _blast_db_paths:
+        return _blast_db_paths[key]
+
+    digest = hashlib.sha256()
+    with open(fasta_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+
+    db_dir = os.path.join(_blast_db_cache_dir(), f"{digest.hexdigest()[:32]}_{dbtype}")
+    db_prefix = os.path.join(db_dir, "db")
+    if not os.path.exists(os.path.join(db_dir, ".complete")):
+        # Build into a temporary directory and rename, so concurrent builders never see a partial database
+        tmp_dir = tempfile.mkdtemp(dir=_blast_db_cache_dir())
+        subprocess.run(
+            ["makeblastdb", "-in", fasta_path, "-dbtype", dbtype, "-out", os.path.join(tmp_dir, "db")],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        open(os.path.join(tmp_dir, ".complete"), "w").close()
+        try:
+            os.rename(tmp_dir, db_dir)
+        except OSError:
+            # Another process finished the same database first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    _blast_db_paths[key] = db_prefix
+    return db_prefix
+
+
+def _write_blast_queries(queries, path: str) -> list[str]:
+    """Write queries (sequence, list, dict of id -> sequence, or FASTA path) to a FASTA file.
+
+    Returns the query IDs in input order.
+    """
+    if isinstance(queries, str) and os.path.isfile(queries):
+        shutil.copyfile(queries, path)
+        with open(path) as f:
+            return [line[1:].split()[0] for line in f if line.startswith(">") and line[1:].strip()]
+
+    if isinstance(queries, str):
+        queries = {"query_1": queries}
+    elif not isinstance(queries, dict):
+        queries = {f"query_{i + 1}": seq for i, seq in enumerate(queries)}
+
+    with open(path, "w") as f:
+        for query_id, seq in queries.items():
+            f.write(f">{query_id}\n{''.join(str(seq).split())}\n")
+    return list(queries.keys())
+
+
+def _iter_blast_tabular(path: str):
+    """Stream hits from a BLAST+ tabular output file as dictionaries."""
+    numeric = {"pident": float, "evalue": float, "bitscore": float}
+    with open(path) as f:
+        for line in f:
+            values = line.rstrip("\n").split("\t")
+            if len(values) < len(_BLAST_TABULAR_FIELDS):
+                continue
+            hit = dict(zip(_BLAST_TABULAR_FIELDS, values, strict=False))
+            for field in ("length", "mismatch", "gapopen", "qstart", "qend", "sstart", "send", "qlen", "slen"):
+                hit[field] = int(hit[field])
+            for field, cast in numeric.items():
+                hit[field] = cast(hit[field])
+            hit["query_coverage"] = (abs(hit["qend"] - hit["qstart"]) + 1) / hit["qlen"] * 100 if hit["qlen"] else 0.0
+            yield hit
+
+
+def blast_sequences_local(
+    queries,
+    database_fasta: str,
+    program: str = "blastn",
+    evalue: float = 10.0,
+    max_target_seqs: int = 500,
+    max_hsps: int | None = None,
+    num_threads: int | None = None,
+    output_file: str | None = None,
+    return_hits: bool = True,
+) -> dict[str, Any]:
+    """Search one or many sequences against a local FASTA database with BLAST+.
+
+    The database is built once with ``makeblastdb`` and cached by content hash, all queries are
+    searched in a single multithreaded BLAST+ run, and every hit/HSP is reported.
+
+    Args:
+        queries: A sequence string, a list of sequences, a dict of {query_id: sequence}, or a path to a
+                 multi-query FASTA file
+        database_fasta (str): FASTA file (e.g., from the data lake) or prefix of an existing BLAST database
+        program (str): BLAST+ program: blastn, blastp, blastx, tblastn or tblastx
+        evalue (float): E-value threshold
+        max_target_seqs (int): Maximum number of subject sequences reported per query
+        max_hsps (int, optional): Maximum HSPs per subject; all HSPs are reported if None
+        num_threads (int, optional): CPU threads for the search; defaults to all available cores
+        output_file (str, optional): Path to save all hits as a TSV file
+        return_hits (bool): Whether to include the hit list in the returned dictionary (set False for
+                            very large searches and read output_file instead)
+
+    Returns:
+        dict: Summary of the search with the hit list, queries without hits and the output file path
+
+    """
+    program = program.lower()
+    if program not in ("blastn", "blastp", "blastx", "tblastn", "tblastx"):
+        return {"success": False, "error": f"Unsupported BLAST program: {program}"}
+    if shutil.which(program) is None:
+        return {"success": False, "error": f"BLAST+ executable '{program}' was not found on PATH"}
+
+    dbtype = "prot" if program in ("blastp", "blastx") else "nucl"
+    start_time = time.time()
+
+    try:
+        db_prefix = _prepare_blast_db(database_fasta, dbtype)
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, "stderr", "") or ""
+        return {"success": False, "error": f"Failed to build BLAST database: {str(e)} {stderr}".strip()}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        query_path = os.path.join(tmp_dir, "queries.fasta")
+        query_ids = _write_blast_queries(queries, query_path)
+        hits_path = os.path.join(tmp_dir, "hits.tsv")
+
+        command = [
+            program,
+            "-query",
+            query_path,
+            "-db",
+            db_prefix,
+            "-outfmt",
+            "6 " + " ".join(_BLAST_TABULAR_FIELDS),
+            "-evalue",
+            str(evalue),
+            "-max_target_seqs",
+            str(max_target_seqs),
+            "-num_threads",
+            str(num_threads or os.cpu_count() or 1),
+            "-out",
+            hits_path,
+        ]
+        if max_hsps is not None:
+            command += ["-max_hsps", str(max_hsps)]
+
+        result = subprocess.run(command, capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            return {"success": False, "error": f"BLAST+ search failed: {result.stderr.strip()}"}
+
+        hits = []
+        queries_with_hits = set()
+        n_hits = 0
+        out = open(output_file, "w") if output_file else None
+        try:
+            if out:
+                out.write("\t".join([*_BLAST_TABULAR_FIELDS, "query_coverage"]) + "\n")
+            for hit in _iter_blast_tabular(hits_path):
+                n_hits += 1
+                queries_with_hits.add(hit["qseqid"])
+                if out:
+                    out.write("\t".join(str(hit[field]) for field in [*_BLAST_TABULAR_FIELDS, "query_coverage"]) + "\n")
+                if return_hits:
+                    hits.append(hit)
+        finally:
+            if out:
+                out.close()
+
+    summary = {
+        "success": True,
+        "program": program,
+        "database": db_prefix,
+        "n_queries": len(query_ids),
+        "n_hits": n_hits,
+        "queries_without_hits": [q for q in query_ids if q not in queries_with_hits],
+        "runtime_seconds": round(time.time() - start_time, 2),
+    }
+    if output_file:
+        summary["output_file"] = output_file
+    if return_hits:
+        summary["hits"] = hits
+    return summary
+
+
+NCBI_BLAST_URL = "https://blast.ncbi.nlm.nih.gov/Blast.cgi"
+
+
+def _run_remote_blast(
+    program: str, database: str, sequence: str, max_runtime: float = 600, poll_interval: float = 60, **params
+) -> io.StringIO:
+    """Submit a search to the NCBI BLAST URL API and poll until its XML report is ready.
+
+    Only the submit, status and report requests hold the blast.ncbi.nlm.nih.gov rate limit slot;
+    the waits between polls happen outside it, so other searches can submit or poll meanwhile.
+    NCBI asks clients not to poll a request ID more than once a minute.
+    """
+    form = {"CMD": "Put", "PROGRAM": program, "DATABASE": database, "QUERY": sequence, **params}
+    with rate_limited(NCBI_BLAST_URL):
+        response = get_http_session(NCBI_BLAST_URL).post(NCBI_BLAST_URL, data=form)
+    response.raise_for_status()
+    rid = re.search(r"RID = (\S+)", response.text)
+    if rid is None:
+        raise RuntimeError("NCBI BLAST did not return a request ID")
+    rid = rid.group(1)
+    rtoe = re.search(r"RTOE = (\d+)", response.text)
+
+    deadline = time.time() + max_runtime
+    time.sleep(min(float(rtoe.group(1)) if rtoe else poll_interval, max(0.0, deadline - time.time())))
+    while True:
+        with rate_limited(NCBI_BLAST_URL):
+            status = get_http_session(NCBI_BLAST_URL).get(
+                NCBI_BLAST_URL, params={"CMD": "Get", "FORMAT_OBJECT": "SearchInfo", "RID": rid}
+            )
+        status.raise_for_status()
+        state = re.search(r"Status=(\w+)", status.text)
+        state = state.group(1) if state else "UNKNOWN"
+        if state == "READY":
+            break
+        if state != "WAITING":
+            raise RuntimeError(f"NCBI BLAST search {rid} ended with status {state}")
+        if time.time() + poll_interval > deadline:
+            raise TimeoutError(f"NCBI BLAST search {rid} did not finish within {max_runtime} seconds")
+        time.sleep(poll_interval)
+
+    with rate_limited(NCBI_BLAST_URL):
+        report = get_http_session(NCBI_BLAST_URL).get(
+            NCBI_BLAST_URL, params={"CMD": "Get", "FORMAT_TYPE": "XML", "RID": rid}
+        )
+    report.raise_for_status()
+    return io.StringIO(report.text)
+
+
+def blast_sequence(
+    sequence: str,
+    database: str,
+    program: str,
+    backend: str = "auto",
+    num_threads: int | None = None,
+) -> dict[str, str | float] | str:
     """Identifies a DNA sequence using NCBI BLAST with improved error handling, timeout management, and debugging.
 
     Args:
         sequence (str): The sequence to identify. If DNA, use database: core_nt, program: blastn;
                         if protein, use database: nr, program: blastp
-        database (str): The BLAST database to search against
+        database (str): The BLAST database to search against: an NCBI database name for the remote
+                        service, or a local FASTA file / BLAST database prefix for the local BLAST+ backend
         program (str): The BLAST program to use
+        backend (str): "local" to run BLAST+ against a local database, "remote" to submit to NCBI, or
+                       "auto" to use the local backend whenever ``database`` is a local file
+        num_threads (int, optional): CPU threads for the local backend
 
     Returns:
-        dict: A dictionary containing the title, e-value, identity percentage, and coverage percentage of the best alignment
+        dict: A dictionary containing the title, e-value, identity percentage, and coverage percentage of the best alignment,
+              plus every alignment found under "hits"
 
     """
+    is_local_db = os.path.isfile(database) or _is_blast_db(database)
+    if backend == "local" or (backend == "auto" and is_local_db):
+        local_result = blast_sequences_local(
+            {"query": sequence}, database, program=program, num_threads=num_threads, max_target_seqs=50
+        )
+        if not local_result["success"]:
+            return local_result["error"]
+        hits = sorted(local_result["hits"], key=lambda h: (h["evalue"], -h["bitscore"]))
+        if not hits:
+            return "No alignments found - sequence might be too short or low complexity"
+        best = hits[0]
+        return {
+            "hit_id": best["sseqid"],
+            "hit_def": best["stitle"],
+            "accession": best["sseqid"],
+            "e_value": best["evalue"],
+            "identity": best["pident"],
+            "coverage": best["query_coverage"],
+            "hits": hits,
+        }
+
     max_attempts = 1  # One initial attempt plus one retry
     attempts = 0
     max_runtime = 600  # 10 minutes in seconds
@@ -2969,13 +4839,14 @@ def blast_sequence(sequence: str, database: str, program: str) -> dict[str, str
 
             # Submit BLAST job
             print(f"Submitting BLAST job (attempt {attempts}/{max_attempts})...")
-            result_handle = NCBIWWW.qblast(
+            result_handle = _run_remote_blast(
                 program,
                 database,
-                query_sequence,
-                expect=100,
-                word_size=7,
-                megablast=True,
+                str(query_sequence),
+                max_runtime=max_runtime,
+                EXPECT=100,
+                WORD_SIZE=7,
+                MEGABLAST="on",
             )
 
             # Parse results with timeout check
@@ -3013,24 +4884,33 @@ def blast_sequence(sequence: str, database: str, program: str) -> dict[str, str
             print(f"Number of alignments found: {len(blast_record.alignments)}")
 
             if blast_record.alignments:
+                hits = []
                 for alignment in blast_record.alignments:
-                    print("\nAlignment:")
-                    print(f"hit_id: {alignment.hit_id}")
-                    print(f"hit_def: {alignment.hit_def}")
-                    print(f"accession: {alignment.accession}")
                     for hsp in alignment.hsps:
-                        print(f"E-value: {hsp.expect}")
-                        print(f"Score: {hsp.score}")
-                        print(f"Identities: {hsp.identities}/{hsp.align_length}")
-
-                        return {
-                            "hit_id": alignment.hit_id,
-                            "hit_def": alignment.hit_def,
-                            "accession": alignment.accession,
-                            "e_value": hsp.expect,
-                            "identity": (hsp.identities / float(hsp.align_length)) * 100,
-                            "coverage": len(hsp.query) / len(sequence) * 100,
-                        }
+                        hits.append(
+                            {
+                                "hit_id": alignment.hit_id,
+                                "hit_def": alignment.hit_def,
+                                "accession": alignment.accession,
+                                "e_value": hsp.expect,
+                                "score": hsp.score,
+                                "identity": (hsp.identities / float(hsp.align_length)) * 100,
+                                "coverage": len(hsp.query) / len(sequence) * 100,
+                            }
+                        )
+
+                # The first HSP of the first alignment is NCBI's best hit
+                best = hits[0]
+                print(f"Best hit: {best['hit_id']} (E-value: {best['e_value']})")
+                return {
+                    "hit_id": best["hit_id"],
+                    "hit_def": best["hit_def"],
+                    "accession": best["accession"],
+                    "e_value": best["e_value"],
+                    "identity": best["identity"],
+                    "coverage": best["coverage"],
+                    "hits": hits,
+                }
             else:
                 return "No alignments found - sequence might be too short or low complexity"
 
@@ -3185,7 +5065,8 @@ def query_reactome(
         if pathway_id and output_dir:
             diagram_url = f"{content_base_url}/data/pathway/{pathway_id}/diagram"
             try:
-                diagram_response = requests.get(diagram_url)
+                with rate_limited(diagram_url):
+                    diagram_response = get_http_session(diagram_url).get(diagram_url)
                 diagram_response.raise_for_status()
 
                 # Save diagram file
@@ -3492,7 +5373,9 @@ def query_gtopdb(
     return api_result
 
 
-def region_to_ccre_screen(coord_chrom: str, coord_start: int, coord_end: int, assembly: str = "GRCh38") -> str:
+def region_to_ccre_screen(
+    coord_chrom: str, coord_start: int, coord_end: int, assembly: str = "GRCh38", ccre_bed: str | None = None
+) -> str:
     """Given starting and ending coordinates, this function retrieves information of intersecting cCREs.
 
     Args:
@@ -3500,6 +5383,8 @@ def region_to_ccre_screen(coord_chrom: str, coord_start: int, coord_end: int, as
         coord_chrom (str): Chromosome of the gene, formatted like 'chr12'.
         coord_start (int): Starting chromosome coordinate.
         coord_end (int): Ending chromosome coordinate.
+        ccre_bed (str, optional): Local ENCODE cCRE registry BED file for the assembly. If given, the
+            region is intersected locally instead of querying the SCREEN API (no z-scores).
 
     Returns:
         str: A detailed string explaining the steps and the intersecting cCRE data or any error encountered.
@@ -3511,6 +5396,20 @@ def region_to_ccre_screen(coord_chrom: str, coord_start: int, coord_end: int, as
             f"Starting cCRE data retrieval for coordinates: {coord_chrom}:{coord_start}-{coord_end} (Assembly: {assembly})."
         )
 
+        if ccre_bed:
+            steps.append(f"Intersecting the region with the local cCRE registry {ccre_bed}...")
+            overlaps = annotate_regions_with_ccres([(coord_chrom, coord_start, coord_end)], ccre_bed)
+            if overlaps.empty:
+                steps.append(f"No intersecting cCREs found for coordinates: {coord_chrom}:{coord_start}-{coord_end}.")
+                return "\n".join(steps + ["No cCRE data available for this genomic region."])
+            columns = ["chrom", "start", "end", "accession", "classification", "overlap_bp"]
+            table = overlaps[[c for c in columns if c in overlaps]].to_string(index=False)
+            steps.append(f"Found {len(overlaps)} intersecting cCREs.")
+            return "\n".join(
+                steps
+                + [f"Intersecting cCREs for {coord_chrom}:{coord_start}-{coord_end} (Assembly: {assembly}):", table]
+            )
+
         # Build the URL and request payload
         url = "https://screen-beta-api.wenglab.org/dataws/cre_table"
         data = {
@@ -3524,7 +5423,8 @@ def region_to_ccre_screen(coord_chrom: str, coord_start: int, coord_end: int, as
         steps.append(str(data))
 
         # Make the request
-        response = requests.post(url, json=data)
+        with rate_limited(url):
+            response = get_http_session(url).post(url, json=data)
 
         # Check if the response is successful
         if not response.ok:
@@ -3599,7 +5499,14 @@ def region_to_ccre_screen(coord_chrom: str, coord_start: int, coord_end: int, as
         return "\n".join(steps + [f"Error: {str(e)}"])
 
 
-def get_genes_near_ccre(accession: str, assembly: str, chromosome: str, k: int = 10) -> str:
+def get_genes_near_ccre(
+    accession: str,
+    assembly: str,
+    chromosome: str,
+    k: int = 10,
+    ccre_bed: str | None = None,
+    gene_annotation_file: str | None = None,
+) -> str:
     """Given a cCRE (Candidate cis-Regulatory Element), this function returns a string containing the
     steps it performs and the k nearest genes sorted by distance.
 
@@ -3609,6 +5516,9 @@ def get_genes_near_ccre(accession: str, assembly: str, chromosome: str, k: int =
     - assembly (str): Assembly of the gene, e.g., 'GRCh38'.
     - chromosome (str): Chromosome of the gene, e.g., 'chr12'.
     - k (int): Number of nearby genes to return, sorted by distance. Default is 10.
+    - ccre_bed (str, optional): Local ENCODE cCRE registry BED file. Together with gene_annotation_file,
+      the nearest genes are computed locally instead of querying the SCREEN API.
+    - gene_annotation_file (str, optional): GTF or TSV of genes (chrom, start, end, strand, gene_name).
 
     Returns
     -------
@@ -3619,11 +5529,30 @@ def get_genes_near_ccre(accession: str, assembly: str, chromosome: str, k: int =
         f"Starting process with accession: {accession}, assembly: {assembly}, chromosome: {chromosome}, k: {k}\n"
     )
 
+    if ccre_bed and gene_annotation_file:
+        steps_log += "Looking up the cCRE in the local registry.\n"
+        ccres = load_interval_index(ccre_bed, kind="ccre").table
+        match = ccres[(ccres["accession"] == accession) | (ccres.get("dhs_accession") == accession)]
+        if match.empty:
+            steps_log += "Accession not found in the local cCRE registry.\n"
+            return steps_log
+        nearest = find_nearest_genes(match[["chrom", "start", "end"]].head(1), gene_annotation_file, k=k)
+        steps_log += f"Returning the top {k} nearest genes (distance to TSS).\n"
+        steps_log += "Result:\n"
+        for gene in nearest.to_dict("records"):
+            steps_log += (
+                f"Gene: {gene.get('gene_name', 'Unknown')}, Distance: {gene['distance']}, "
+                f"Ensembl ID: {gene.get('gene_id', 'N/A')}, Chromosome: {gene['chrom']}, "
+                f"Start: {gene.get('gene_start', 'N/A')}, Stop: {gene.get('gene_end', 'N/A')}\n"
+            )
+        return steps_log
+
     url = "https://screen-beta-api.wenglab.org/dataws/re_detail/nearbyGenomic"
     data = {"accession": accession, "assembly": assembly, "coord_chrom": chromosome}
 
     steps_log += "Sending POST request to API with given data.\n"
-    response = requests.post(url, json=data)
+    with rate_limited(url):
+        response = get_http_session(url).post(url, json=data)
 
     if not response.ok:
         steps_log += f"API request failed with response: {response.text}\n"
@@ -3658,6 +5587,56 @@ def get_genes_near_ccre(accession: str, assembly: str, chromosome: str, k: int =
     return steps_log
 
 
+def annotate_regions_with_ccres(regions, ccre_bed, classification=None, output_file=None):
+    """Intersect many genomic regions (e.g. a ChIP-seq or ATAC-seq peak set) with the ENCODE cCRE registry locally.
+
+    Parameters
+    ----------
+    regions (str, list or DataFrame): BED file path, list of (chrom, start, end[, name]) tuples or
+        "chrom:start-end" strings, or a DataFrame with chrom/start/end columns (0-based, half-open)
+    ccre_bed (str): ENCODE SCREEN cCRE registry BED file (e.g. GRCh38-cCREs.bed)
+    classification (str, optional): Only keep cCREs whose classification contains this label (e.g. "dELS", "PLS")
+    output_file (str, optional): Also write the overlaps to this TSV file
+
+    Returns
+    -------
+    pd.DataFrame: One row per (region, overlapping cCRE) pair with the overlap length in bp
+
+    """
+    query = read_regions(regions)
+    overlaps = load_interval_index(ccre_bed, kind="ccre").overlaps(query)
+    if classification and "classification" in overlaps:
+        overlaps = overlaps[overlaps["classification"].str.contains(classification, regex=False, na=False)]
+    overlaps = overlaps.reset_index(drop=True)
+    if output_file:
+        overlaps.to_csv(output_file, sep="\t", index=False)
+    return overlaps
+
+
+def find_nearest_genes(regions, gene_annotation_file, k=1, max_distance=None, output_file=None):
+    """Find the k genes whose TSS is nearest to each of many genomic regions, without web API calls.
+
+    Parameters
+    ----------
+    regions (str, list or DataFrame): BED file path, list of (chrom, start, end[, name]) tuples or
+        "chrom:start-end" strings, or a DataFrame with chrom/start/end columns (0-based, half-open)
+    gene_annotation_file (str): GTF (e.g. GENCODE) or TSV with chrom, start, end, strand and gene_name columns
+    k (int): Number of nearest genes per region
+    max_distance (int, optional): Ignore genes whose TSS is further away than this (bp)
+    output_file (str, optional): Also write the result to this TSV file
+
+    Returns
+    -------
+    pd.DataFrame: One row per (region, gene) pair with the distance to the TSS (0 if the region contains it)
+
+    """
+    query = read_regions(regions)
+    nearest = load_interval_index(gene_annotation_file, kind="genes").nearest(query, k=k, max_distance=max_distance)
+    if output_file:
+        nearest.to_csv(output_file, sep="\t", index=False)
+    return nearest
+
+
 def query_remap(
     prompt=None,
     endpoint=None,
@@ -18,8 +18,6 @@ def liftover_coordinates(
         str: A detailed string explaining the steps and the final result or any error encountered.
 
     """
-    from pyliftover import LiftOver
-
     steps = []
 
     try:
@@ -27,35 +25,28 @@ def liftover_coordinates(
             f"Starting liftover process for chromosome {chromosome}, position {position} from {input_format} to {output_format}."
         )
 
-        # Load the liftover chain files
-        steps.append("Loading liftover chain files...")
-        hg19_to_hg38_liftover = LiftOver(data_path + "/liftover/hg19ToHg38.over.chain.gz")
-        hg38_to_hg19_liftover = LiftOver(data_path + "/liftover/hg38ToHg19.over.chain.gz")
-        steps.append("Liftover chain files loaded successfully.")
-
-        # Choose the appropriate LiftOver object
-        if input_format == "hg19" and output_format == "hg38":
-            lo = hg19_to_hg38_liftover
-            steps.append("Selected liftover chain: hg19 to hg38.")
-        elif input_format == "hg38" and output_format == "hg19":
-            lo = hg38_to_hg19_liftover
-            steps.append("Selected liftover chain: hg38 to hg19.")
-        else:
+        if (input_format, output_format) not in _LIFTOVER_CHAINS:
             steps.append("Error: Unsupported format conversion.")
             return "\n".join(
                 steps
                 + ["Error: Unsupported format conversion. Supported formats are 'hg19' to 'hg38' or 'hg38' to 'hg19'."]
             )
 
+        # Parsed chain files are cached on disk and in memory after the first call
+        steps.append("Loading liftover chain index...")
+        chain_index = _get_chain_index(data_path, input_format, output_format)
+        steps.append("Liftover chain index loaded successfully.")
+        steps.append(f"Selected liftover chain: {input_format} to {output_format}.")
+
         # Perform the liftover conversion
         steps.append(f"Performing liftover for chr{chromosome}, position {position}...")
-        lifted_coordinates = lo.convert_coordinate(f"chr{chromosome}", position)
+        lifted = chain_index.lift(_normalize_liftover_chroms([chromosome]), np.array([position], dtype=np.int64))
 
-        if lifted_coordinates:
+        if lifted["mapped"][0]:
             result = (
                 f"Successfully lifted coordinates from {input_format} to {output_format}.\n"
                 f"Original: chr{chromosome}, position {position}.\n"
-                f"Lifted: chromosome {lifted_coordinates[0][0]}, position {lifted_coordinates[0][1]}, strand {lifted_coordinates[0][2]}."
+                f"Lifted: chromosome {lifted['chrom'][0]}, position {lifted['pos'][0]}, strand {lifted['strand'][0]}."
             )
             steps.append(result)
             return "\n".join(steps)
@@ -68,7 +59,9 @@ def liftover_coordinates(
         return "\n".join(steps)
 
 
+import gzip
 import os
+import threading
 from datetime import datetime
 
 import numpy as np
@@ -76,6 +69,433 @@ import pandas as pd
 import torch
 from torch import nn, optim
 
+# Chain files shipped in <data_path>/liftover, keyed by (input build, output build)
+_LIFTOVER_CHAINS = {
+    ("hg19", "hg38"): "hg19ToHg38.over.chain.gz",
+    ("hg38", "hg19"): "hg38ToHg19.over.chain.gz",
+}
+
+
+class _ChainIndex:
+    """Vectorized liftover over the aligned blocks of a UCSC chain file.
+
+    Blocks are stored as sorted numpy arrays per source chromosome, so millions of positions are
+    mapped with one ``np.searchsorted`` per chromosome. Positions are 0-based like pyliftover. When
+    chains overlap, the mapping from the highest-scoring chain is returned.
+    """
+
+    def __init__(self, arrays: dict):
+        self.arrays = arrays
+        self.chroms = {str(c): i for i, c in enumerate(arrays["chrom_names"])}
+        self.block_end = arrays["t_start"] + arrays["size"]
+        # Running maximum of block ends per chromosome detects positions covered by several chains
+        self.running_end = np.empty_like(self.block_end)
+        offsets = arrays["chrom_offsets"]
+        for i in range(len(offsets) - 1):
+            a, b = offsets[i], offsets[i + 1]
+            self.running_end[a:b] = np.maximum.accumulate(self.block_end[a:b])
+
+    @staticmethod
+    def parse(chain_path: str) -> dict:
+        """Parse a (gzipped) chain file into block and chain arrays."""
+        chain_t_name, chain_q_name, chain_q_minus, chain_q_size, chain_score = [], [], [], [], []
+        t_start, q_start, size, chain = [], [], [], []
+        opener = gzip.open if chain_path.endswith(".gz") else open
+        with opener(chain_path, "rt") as f:
+            t = q = 0
+            for line in f:
+                fields = line.split()
+                if not fields:
+                    continue
+                if fields[0] == "chain":
+                    chain_score.append(float(fields[1]))
+                    chain_t_name.append(fields[2])
+                    chain_q_name.append(fields[7])
+                    chain_q_size.append(int(fields[8]))
+                    chain_q_minus.append(fields[9] == "-")
+                    t, q = int(fields[5]), int(fields[10])
+                    continue
+                block = int(fields[0])
+                t_start.append(t)
+                q_start.append(q)
+                size.append(block)
+                chain.append(len(chain_score) - 1)
+                if len(fields) == 3:
+                    t += block + int(fields[1])
+                    q += block + int(fields[2])
+
+        chain = np.array(chain, dtype=np.int32)
+        t_start = np.array(t_start, dtype=np.int64)
+        chain_t_name = np.array(chain_t_name)
+        chrom_names, chrom_codes = np.unique(chain_t_name[chain], return_inverse=True)
+        order = np.lexsort((t_start, chrom_codes))
+        return {
+            "chrom_names": chrom_names,
+            "chrom_offsets": np.concatenate([[0], np.cumsum(np.bincount(chrom_codes, minlength=len(chrom_names)))]),
+            "t_start": t_start[order],
+            "q_start": np.array(q_start, dtype=np.int64)[order],
+            "size": np.array(size, dtype=np.int64)[order],
+            "chain": chain[order],
+            "chain_q_name": np.array(chain_q_name),
+            "chain_q_minus": np.array(chain_q_minus, dtype=bool),
+            "chain_q_size": np.array(chain_q_size, dtype=np.int64),
+            "chain_score": np.array(chain_score, dtype=np.float64),
+        }
+
+    def _best_block(self, a: int, j: int, position: int) -> int:
+        """Return the highest-scoring block containing ``position``, scanning back from block ``j``."""
+        best, best_score = -1, -np.inf
+        while j >= a and self.running_end[j] > position:
+            if self.arrays["t_start"][j] <= position < self.block_end[j]:
+                score = self.arrays["chain_score"][self.arrays["chain"][j]]
+                if score > best_score:
+                    best, best_score = j, score
+            j -= 1
+        return best
+
+    def lift(self, chroms: np.ndarray, positions: np.ndarray) -> dict:
+        """Map 0-based positions; returns arrays chrom, pos, strand, chain and mapped."""
+        n = len(positions)
+        blocks = np.full(n, -1, dtype=np.int64)
+        chrom_codes, chrom_values = pd.factorize(pd.Series(chroms, dtype=str))
+        offsets = self.arrays["chrom_offsets"]
+
+        for code, chrom in enumerate(chrom_values):
+            if chrom not in self.chroms:
+                continue
+            c = self.chroms[chrom]
+            a, b = offsets[c], offsets[c + 1]
+            rows = np.nonzero(chrom_codes == code)[0]
+            p = positions[rows]
+            idx = a + np.searchsorted(self.arrays["t_start"][a:b], p, side="right") - 1
+            valid = idx >= a
+            safe = np.where(valid, idx, a)
+            contained = valid & (p < self.block_end[safe])
+            blocks[rows[contained]] = safe[contained]
+            # Positions also covered by an earlier-starting block need the score comparison
+            previous_end = np.where(safe > a, self.running_end[np.maximum(safe - 1, a)], -1)
+            for k in np.nonzero(valid & (previous_end > p))[0]:
+                blocks[rows[k]] = self._best_block(a, int(safe[k]), int(p[k]))
+
+        mapped = blocks >= 0
+        block = np.where(mapped, blocks, 0)
+        chain = self.arrays["chain"][block]
+        minus = self.arrays["chain_q_minus"][chain]
+        q = self.arrays["q_start"][block] + (positions - self.arrays["t_start"][block])
+        q = np.where(minus, self.arrays["chain_q_size"][chain] - 1 - q, q)
+        return {
+            "mapped": mapped,
+            "chrom": np.where(mapped, self.arrays["chain_q_name"][chain], None),
+            "pos": np.where(mapped, q, -1),
+            "strand": np.where(mapped, np.where(minus, "-", "+"), None),
+            "chain": np.where(mapped, chain, -1),
+        }
+
+    def lift_intervals(self, chroms: np.ndarray, starts: np.ndarray, ends: np.ndarray, strands=None) -> dict:
+        """Map 0-based half-open intervals; both ends must map through the same chain."""
+        first = self.lift(chroms, starts)
+        last = self.lift(chroms, ends - 1)
+        mapped = first["mapped"] & last["mapped"] & (first["chain"] == last["chain"])
+        new_start = np.minimum(first["pos"], last["pos"])
+        new_end = np.maximum(first["pos"], last["pos"]) + 1
+        minus = first["strand"] == "-"
+        if strands is None:
+            strands = np.full(len(starts), "+")
+        strands = np.asarray(strands, dtype=object)
+        flipped = np.where(strands == "+", "-", np.where(strands == "-", "+", strands))
+        reason = np.select(
+            [mapped, ~first["mapped"] & ~last["mapped"], ~first["mapped"] | ~last["mapped"]],
+            ["", "deleted in new", "partially deleted in new"],
+            default="split in new",
+        )
+        return {
+            "mapped": mapped,
+            "chrom": np.where(mapped, first["chrom"], None),
+            "start": np.where(mapped, new_start, -1),
+            "end": np.where(mapped, new_end, -1),
+            "strand": np.where(mapped, np.where(minus, flipped, strands), None),
+            "reason": reason,
+        }
+
+
+_chain_indexes: dict[str, _ChainIndex] = {}
+_chain_indexes_lock = threading.Lock()
+
+
+def _get_chain_index(data_path: str, input_format: str, output_format: str) -> _ChainIndex:
+    """Return the cached chain index for a build conversion, parsing the chain file at most once."""
+    from biomni.utils import get_index_cache_path, is_index_stale
+
+    chain_path = os.path.join(data_path, "liftover", _LIFTOVER_CHAINS[(input_format, output_format)])
+    with _chain_indexes_lock:
+        if chain_path in _chain_indexes:
+            return _chain_indexes[chain_path]
+
+        index_path = get_index_cache_path(chain_path, "chain.npz")
+        if is_index_stale(index_path, chain_path):
+            arrays = _ChainIndex.parse(chain_path)
+            try:
+                tmp_path = f"{index_path}.{os.getpid()}.tmp.npz"
+                np.savez(tmp_path, **arrays)
+                os.replace(tmp_path, index_path)
+            except OSError:
+                pass  # Keep the in-memory index only
+        else:
+            with np.load(index_path) as data:
+                arrays = {name: data[name] for name in data.files}
+
+        _chain_indexes[chain_path] = _ChainIndex(arrays)
+        return _chain_indexes[chain_path]
+
+
+def _normalize_liftover_chroms(chroms) -> np.ndarray:
+    """Prefix chromosome names with "chr" as used in UCSC chain files (the mitochondrion is "chrM")."""
+    chroms = pd.Series(chroms, dtype=str).str.strip()
+    chroms = pd.Series(np.where(chroms.str.lower().str.startswith("chr"), chroms, "chr" + chroms), dtype=str)
+    return chroms.replace({"chrMT": "chrM", "chrmt": "chrM"}).to_numpy(dtype=object)
+
+
+_COMPLEMENT = str.maketrans("ACGTNacgtn", "TGCANtgcan")
+
+
+def _reverse_complement_alleles(alleles: pd.Series) -> pd.Series:
+    """Reverse-complement comma-separated VCF alleles."""
+    return alleles.str.split(",").map(lambda values: ",".join(a[::-1].translate(_COMPLEMENT) for a in values))
+
+
+def _parse_positions(values: pd.Series, minimum: int) -> tuple[np.ndarray, np.ndarray]:
+    """Integer positions of a text column and a mask of the valid ones (empty, "NA" or fractional are invalid)."""
+    numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    valid = np.isfinite(numbers) & (numbers == np.floor(numbers)) & (numbers >= minimum)
+    return np.where(valid, numbers, minimum).astype(np.int64), valid
+
+
+def liftover_coordinates_batch(
+    chromosomes,
+    positions,
+    input_format: str,
+    output_format: str,
+    data_path: str,
+    ends=None,
+    strands=None,
+    one_based: bool = False,
+    output_file: str | None = None,
+) -> dict:
+    """Lift over many positions or intervals between hg19 and hg38 in one vectorized pass.
+
+    Args:
+        chromosomes (list): Chromosome of each position (e.g., '1', 'chrX').
+        positions (list): Positions, or interval starts when ``ends`` is given.
+        input_format (str): Input genome build ('hg19' or 'hg38').
+        output_format (str): Output genome build ('hg19' or 'hg38').
+        data_path (str): Path to liftover chain files.
+        ends (list, optional): Interval ends (exclusive), to lift intervals instead of positions.
+        strands (list, optional): Interval strands ('+' or '-'), flipped when the chain is reversed.
+        one_based (bool): Positions are 1-based (e.g. VCF, GWAS summary statistics) instead of 0-based.
+        output_file (str, optional): Write the lifted table as TSV instead of returning the records.
+
+    Returns:
+        dict: Counts of mapped/unmapped entries and the lifted records (or the output file path).
+
+    """
+    if (input_format, output_format) not in _LIFTOVER_CHAINS:
+        return {
+            "success": False,
+            "error": "Unsupported format conversion. Supported formats are 'hg19' to 'hg38' or 'hg38' to 'hg19'.",
+        }
+    if len(chromosomes) != len(positions) or (ends is not None and len(ends) != len(positions)):
+        return {"success": False, "error": "chromosomes, positions and ends must have the same length"}
+
+    try:
+        chain_index = _get_chain_index(data_path, input_format, output_format)
+    except OSError as e:
+        return {"success": False, "error": f"Could not load liftover chain file: {str(e)}"}
+
+    shift = 1 if one_based else 0
+    chroms = _normalize_liftover_chroms(chromosomes)
+    starts = np.asarray(positions, dtype=np.int64) - shift
+    table = pd.DataFrame({"chrom": np.asarray(chromosomes, dtype=str), "pos": np.asarray(positions, dtype=np.int64)})
+
+    if ends is None:
+        lifted = chain_index.lift(chroms, starts)
+        table[f"chrom_{output_format}"] = lifted["chrom"]
+        table[f"pos_{output_format}"] = np.where(lifted["mapped"], lifted["pos"] + shift, -1)
+        table["strand"] = lifted["strand"]
+        table["unmapped_reason"] = np.where(lifted["mapped"], "", "deleted in new")
+    else:
+        table["end"] = np.asarray(ends, dtype=np.int64)
+        lifted = chain_index.lift_intervals(chroms, starts, table["end"].to_numpy() - shift, strands)
+        table[f"chrom_{output_format}"] = lifted["chrom"]
+        table[f"start_{output_format}"] = np.where(lifted["mapped"], lifted["start"] + shift, -1)
+        table[f"end_{output_format}"] = np.where(lifted["mapped"], lifted["end"] + shift, -1)
+        table["strand"] = lifted["strand"]
+        table["unmapped_reason"] = lifted["reason"]
+
+    n_mapped = int(lifted["mapped"].sum())
+    result = {
+        "success": True,
+        "input_format": input_format,
+        "output_format": output_format,
+        "n_input": len(table),
+        "n_mapped": n_mapped,
+        "n_unmapped": len(table) - n_mapped,
+    }
+    if output_file:
+        table.to_csv(output_file, sep="\t", index=False)
+        result["output_file"] = output_file
+    else:
+        result["results"] = table.to_dict("records")
+    return result
+
+
+# Column names recognised when lifting over delimited summary-statistics files
+_LIFTOVER_CHROM_COLUMNS = ("chrom", "chr", "CHR", "CHROM", "#CHROM", "chromosome", "Chromosome", "#chrom")
+_LIFTOVER_POS_COLUMNS = ("pos", "POS", "bp", "BP", "position", "Position", "base_pair_location", "start")
+
+
+def liftover_file(
+    input_file: str,
+    output_file: str,
+    input_format: str,
+    output_format: str,
+    data_path: str,
+    file_format: str | None = None,
+    unmapped_file: str | None = None,
+) -> dict:
+    """Lift over a whole BED, VCF or tab-separated GWAS summary statistics file between hg19 and hg38.
+
+    Args:
+        input_file (str): BED, VCF (optionally gzipped) or TSV/CSV file with chromosome and position columns.
+        output_file (str): Path of the lifted file (same format as the input; unmapped rows are dropped).
+        input_format (str): Input genome build ('hg19' or 'hg38').
+        output_format (str): Output genome build ('hg19' or 'hg38').
+        data_path (str): Path to liftover chain files.
+        file_format (str, optional): 'bed', 'vcf' or 'tsv'; inferred from the file extension if omitted.
+        unmapped_file (str, optional): Write rows that could not be lifted, with the reason, to this file.
+
+    Returns:
+        dict: Counts of mapped and unmapped rows and the output paths.
+
+    """
+    if (input_format, output_format) not in _LIFTOVER_CHAINS:
+        return {
+            "success": False,
+            "error": "Unsupported format conversion. Supported formats are 'hg19' to 'hg38' or 'hg38' to 'hg19'.",
+        }
+
+    name = input_file.lower().removesuffix(".gz")
+    if file_format is None:
+        file_format = "bed" if name.endswith(".bed") else "vcf" if name.endswith(".vcf") else "tsv"
+
+    try:
+        chain_index = _get_chain_index(data_path, input_format, output_format)
+        header_lines = []
+        if file_format == "vcf":
+            opener = gzip.open if input_file.endswith(".gz") else open
+            with opener(input_file, "rt") as f:
+                for line in f:
+                    if not line.startswith("##"):
+                        break
+                    header_lines.append(line)
+            table = pd.read_csv(input_file, sep="\t", skiprows=len(header_lines), dtype=str, keep_default_na=False)
+            chrom_col, pos_col = table.columns[0], table.columns[1]
+            header_lines.append(f"##liftover={input_format}To{output_format.capitalize()}\n")
+        elif file_format == "bed":
+            # Track, browser and comment lines have a different number of fields than the records
+            opener = gzip.open if input_file.endswith(".gz") else open
+            with opener(input_file, "rt") as f:
+                skip = [i for i, line in enumerate(f) if line.startswith(("track", "browser", "#"))]
+            table = pd.read_csv(input_file, sep="\t", header=None, skiprows=skip, dtype=str, keep_default_na=False)
+            chrom_col, pos_col = 0, 1
+        else:
+            sep = "," if name.endswith(".csv") else "\t"
+            table = pd.read_csv(input_file, sep=sep, dtype=str, keep_default_na=False)
+            chrom_col = next((c for c in _LIFTOVER_CHROM_COLUMNS if c in table.columns), None)
+            pos_col = next((c for c in _LIFTOVER_POS_COLUMNS if c in table.columns), None)
+            if chrom_col is None or pos_col is None:
+                return {"success": False, "error": f"Could not find chromosome and position columns in {input_file}"}
+    except (OSError, ValueError) as e:
+        return {"success": False, "error": f"Could not read input: {str(e)}"}
+
+    had_prefix = table[chrom_col].str.lower().str.startswith("chr").any()
+    chroms = _normalize_liftover_chroms(table[chrom_col])
+    # Rows with a missing or malformed position are reported as unmapped instead of failing the file
+    if file_format == "bed":
+        starts, valid_start = _parse_positions(table[1], 0)
+        ends, valid_end = _parse_positions(table[2], 1)
+        valid = valid_start & valid_end & (ends > starts)
+        strands = table[5].to_numpy() if table.shape[1] > 5 else None
+        lifted = chain_index.lift_intervals(chroms, np.where(valid, starts, 0), np.where(valid, ends, 1), strands)
+        mapped, reason = lifted["mapped"] & valid, lifted["reason"].astype(object)
+        new_pos = {1: lifted["start"], 2: lifted["end"]}
+        if strands is not None:
+            table.loc[mapped, 5] = lifted["strand"][mapped]
+    else:
+        # VCF and summary statistics use 1-based positions
+        positions, valid = _parse_positions(table[pos_col], 1)
+        positions = positions - 1
+        lifted = chain_index.lift(chroms, positions)
+        mapped = lifted["mapped"] & valid
+        reason = np.where(lifted["mapped"], "", "deleted in new").astype(object)
+        new_pos = {pos_col: lifted["pos"] + 1}
+
+        minus = mapped & (lifted["strand"] == "-")
+        if file_format == "vcf" and minus.any():
+            # On a reversed chain the alleles are reverse-complemented and POS becomes the lifted last
+            # REF base. Records whose alleles differ in length (indels, symbolic alleles) would need the
+            # new reference to re-anchor their padding base, so they are reported as unmapped instead.
+            ref_col, alt_col = table.columns[3], table.columns[4]
+            ref_length = table[ref_col].str.len().to_numpy()
+            same_length = np.array(
+                [
+                    ref.isalpha() and all(a == "." or (len(a) == len(ref) and a.isalpha()) for a in alt.split(","))
+                    for ref, alt in zip(table[ref_col], table[alt_col], strict=True)
+                ]
+            )
+            last = chain_index.lift(chroms, positions + ref_length - 1)
+            contiguous = (
+                last["mapped"] & (last["chain"] == lifted["chain"]) & (last["pos"] == lifted["pos"] - ref_length + 1)
+            )
+            flip = minus & same_length & contiguous
+            dropped = minus & ~flip
+            mapped[dropped] = False
+            reason[dropped & ~same_length] = "indel on reversed strand"
+            reason[dropped & same_length] = "split in new"
+            new_pos[pos_col] = np.where(flip, last["pos"] + 1, new_pos[pos_col])
+            table.loc[flip, ref_col] = _reverse_complement_alleles(table.loc[flip, ref_col])
+            table.loc[flip, alt_col] = _reverse_complement_alleles(table.loc[flip, alt_col])
+
+    reason[~valid] = "invalid position"
+    if unmapped_file:
+        table.loc[~mapped].assign(unmapped_reason=reason[~mapped]).to_csv(unmapped_file, sep="\t", index=False)
+
+    lifted_chroms = pd.Series(lifted["chrom"][mapped], dtype=str)
+    if not had_prefix:
+        lifted_chroms = lifted_chroms.str.replace(r"^chr", "", regex=True).replace({"M": "MT"})
+    out = table.loc[mapped].copy()
+    out[chrom_col] = lifted_chroms.to_numpy()
+    for column, values in new_pos.items():
+        out[column] = values[mapped]
+
+    if file_format == "vcf":
+        with open(output_file, "w") as f:
+            f.writelines(header_lines)
+            out.to_csv(f, sep="\t", index=False)
+    elif file_format == "bed":
+        out.to_csv(output_file, sep="\t", header=False, index=False)
+    else:
+        out.to_csv(output_file, sep="," if name.endswith(".csv") else "\t", index=False)
+
+    return {
+        "success": True,
+        "file_format": file_format,
+        "n_input": len(table),
+        "n_mapped": int(mapped.sum()),
+        "n_unmapped": int((~mapped).sum()),
+        "output_file": output_file,
+        "unmapped_file": unmapped_file,
+    }
+
 
 def bayesian_finemapping_with_deep_vi(
     gwas_summary_path,
@@ -1024,6 +1024,7 @@ def gene_set_enrichment_analysis(
     database: str = "ontology",
     background_list: list = None,
     plot: bool = False,
+    data_lake_path: str = None,
 ) -> str:
     """Perform enrichment analysis for a list of genes, with optional background gene set and plotting functionality.
 
@@ -1043,12 +1044,18 @@ def gene_set_enrichment_analysis(
 
     - background_list (list, optional): List of background genes to use for enrichment analysis.
     - plot (bool, optional): If True, generates a bar plot of the top K enrichment results.
+    - data_lake_path (str, optional): Path to the data lake. When given, the analysis runs offline on the
+        MSigDB gene sets of the data lake if the database has a local counterpart ('ontology' -> C5,
+        'pathway' -> C2, 'transcription' -> GTRD targets, 'celltypes' -> C8, or a library name such as
+        'hallmark' or a GMT file path), and falls back to Enrichr otherwise.
 
     Returns
     -------
     - str: The steps performed and the top K enrichment results.
 
     """
+    from biomni.enrichment import get_gene_set_library, resolve_library
+
     steps_log = (
         f"Starting enrichment analysis for genes: {', '.join(genes)} using {database} database and top_k: {top_k}\n"
     )
@@ -1057,6 +1064,32 @@ def gene_set_enrichment_analysis(
         steps_log += f"Using background list with {len(background_list)} genes.\n"
 
     try:
+        library_path = resolve_library(data_lake_path, database)
+        if library_path is not None:
+            # Offline hypergeometric test against the local gene set library
+            steps_log += f"Performing offline enrichment analysis against {os.path.basename(library_path)}...\n"
+            if plot:
+                steps_log += "Plotting is only available with Enrichr; skipping the plot.\n"
+            df = get_gene_set_library(data_lake_path, database).enrich(genes, background=background_list, top_k=top_k)
+            unmapped = df.attrs["unmapped_genes"]["query"]
+            if unmapped:
+                steps_log += f"{len(unmapped)} genes are not in the library or background: {', '.join(unmapped)}\n"
+
+            output_str = ""
+            for rank, row in enumerate(df.to_dict("records"), start=1):
+                output_str += (
+                    f"Rank: {rank}\n"
+                    f"Path Name: {row['gene_set']}\n"
+                    f"P-value: {row['p_value']:.2e}\n"
+                    f"Fold Enrichment: {row['fold_enrichment']:.6f}\n"
+                    f"Overlap: {row['overlap']}/{row['set_size']}\n"
+                    f"Overlapping Genes: {row['genes'].replace(',', ', ')}\n"
+                    f"Adjusted P-value: {row['fdr']:.2e}\n"
+                    f"Database: {os.path.basename(library_path)}\n"
+                    "----------------------------------------\n"
+                )
+            return steps_log + output_str
+
         # Perform enrichment analysis with or without background list
         steps_log += f"Performing enrichment analysis using gget.enrichr with the {database} database...\n"
         df = gget.enrichr(genes, database=database, background_list=background_list, plot=plot)
@@ -1067,7 +1100,7 @@ def gene_set_enrichment_analysis(
 
         # Format the result
         output_str = ""
-        for _idx, row in df.iterrows():
+        for row in df.to_dict("records"):
             output_str += (
                 f"Rank: {row['rank']}\n"
                 f"Path Name: {row['path_name']}\n"
@@ -1088,6 +1121,81 @@ def gene_set_enrichment_analysis(
         return f"An error occurred: {e}"
 
 
+def batch_gene_set_enrichment_analysis(
+    gene_lists: dict,
+    data_lake_path: str,
+    database: str = "hallmark",
+    background_list: list = None,
+    max_fdr: float = 0.05,
+    top_k: int = 10,
+    min_set_size: int = 5,
+    max_set_size: int = 1000,
+    output_file: str = None,
+) -> str:
+    """Run offline over-representation analysis for many gene lists at once (e.g. clusters or contrasts).
+
+    All lists are tested together against a local gene set library with one sparse overlap
+    computation, hypergeometric p-values and Benjamini-Hochberg FDR per list.
+
+    Parameters
+    ----------
+    - gene_lists (dict): Mapping of list name (e.g. cluster or contrast) to a list of gene symbols.
+    - data_lake_path (str): Path to the data lake containing the MSigDB/MouseMine gene set tables.
+    - database (str): Gene set library: 'hallmark', 'curated', 'ontology', 'tf_targets', 'regulatory_target',
+        'oncogenic', 'immunologic', 'celltype', 'positional', 'computational', their 'mouse_' variants,
+        or a GMT/Parquet file path. Default is 'hallmark'.
+    - background_list (list, optional): Background genes (e.g. all expressed genes). Defaults to every gene
+        in the library.
+    - max_fdr (float): Only report gene sets with an FDR at or below this value. Default is 0.05.
+    - top_k (int): Number of top gene sets reported per list. Default is 10.
+    - min_set_size (int): Smallest gene set size tested. Default is 5.
+    - max_set_size (int): Largest gene set size tested. Default is 1000.
+    - output_file (str, optional): Save all significant results (not only the top_k) as a CSV file.
+
+    Returns
+    -------
+    - str: The steps performed and the top enriched gene sets of each list.
+
+    """
+    from biomni.enrichment import get_gene_set_library
+
+    steps_log = f"Starting offline enrichment analysis of {len(gene_lists)} gene lists against {database}\n"
+    try:
+        library = get_gene_set_library(data_lake_path, database)
+    except (OSError, ValueError) as e:
+        return f"An error occurred: {e}"
+    steps_log += f"Loaded {len(library)} gene sets covering {len(library.genes)} genes.\n"
+    if background_list:
+        steps_log += f"Using background list with {len(background_list)} genes.\n"
+
+    df = library.enrich(
+        gene_lists,
+        background=background_list,
+        min_set_size=min_set_size,
+        max_set_size=max_set_size,
+        max_fdr=max_fdr,
+        top_k=None if output_file else top_k,
+    )
+    unmapped_genes = df.attrs["unmapped_genes"]
+    if output_file:
+        df.to_csv(output_file, index=False)
+        steps_log += f"Saved {len(df)} significant results to {output_file}\n"
+        df = df.groupby("query", sort=False).head(top_k)
+
+    for name in gene_lists:
+        hits = df[df["query"] == name]
+        unmapped = unmapped_genes[name]
+        steps_log += f"\n## {name}: {len(hits)} gene sets at FDR <= {max_fdr}"
+        steps_log += f" ({len(unmapped)} genes not in the library or background)\n" if unmapped else "\n"
+        for row in hits.to_dict("records"):
+            steps_log += (
+                f"- {row['gene_set']}: overlap {row['overlap']}/{row['set_size']}, "
+                f"fold {row['fold_enrichment']:.2f}, p={row['p_value']:.2e}, FDR={row['fdr']:.2e} "
+                f"({row['genes'].replace(',', ', ')})\n"
+            )
+    return steps_log
+
+
 def analyze_chromatin_interactions(hic_file_path, regulatory_elements_bed, output_dir="./output"):
     """Analyze chromatin interactions from Hi-C data to identify enhancer-promoter interactions and TADs.
 
@@ -9,6 +9,9 @@ import requests
 from bs4 import BeautifulSoup
 from googlesearch import search
 
+from biomni.http_transport import get_http_session
+from biomni.rate_limit import get_rate_limiter, rate_limited
+
 
 def fetch_supplementary_info_from_doi(doi: str, output_dir: str = "supplementary_info"):
     """Fetches supplementary information for a paper given its DOI and returns a research log.
@@ -27,7 +30,8 @@ def fetch_supplementary_info_from_doi(doi: str, output_dir: str = "supplementary
     # CrossRef API to resolve DOI to a publisher page
     crossref_url = f"https://doi.org/{doi}"
     headers = {"User-Agent": "Mozilla/5.0"}
-    response = requests.get(crossref_url, headers=headers)
+    with rate_limited(crossref_url):
+        response = get_http_session(crossref_url).get(crossref_url, headers=headers)
 
     if response.status_code != 200:
         log_message = f"Failed to resolve DOI: {doi}. Status Code: {response.status_code}"
@@ -38,7 +42,8 @@ def fetch_supplementary_info_from_doi(doi: str, output_dir: str = "supplementary
     research_log.append(f"Resolved DOI to publisher page: {publisher_url}")
 
     # Fetch publisher page
-    response = requests.get(publisher_url, headers=headers)
+    with rate_limited(publisher_url):
+        response = get_http_session(publisher_url).get(publisher_url, headers=headers)
     if response.status_code != 200:
         log_message = f"Failed to access publisher page for DOI {doi}."
         research_log.append(log_message)
@@ -70,7 +75,8 @@ def fetch_supplementary_info_from_doi(doi: str, output_dir: str = "supplementary
     downloaded_files = []
     for link in supplementary_links:
         file_name = os.path.join(output_dir, link.split("/")[-1])
-        file_response = requests.get(link, headers=headers)
+        with rate_limited(link):
+            file_response = get_http_session(link).get(link, headers=headers)
         if file_response.status_code == 200:
             with open(file_name, "wb") as f:
                 f.write(file_response.content)
@@ -105,7 +111,10 @@ def query_arxiv(query: str, max_papers: int = 10) -> str:
     try:
         client = arxiv.Client()
         search = arxiv.Search(query=query, max_results=max_papers, sort_by=arxiv.SortCriterion.Relevance)
-        results = "\n\n".join([f"Title: {paper.title}\nSummary: {paper.summary}" for paper in client.results(search)])
+        with rate_limited("export.arxiv.org"):
+            results = "\n\n".join(
+                [f"Title: {paper.title}\nSummary: {paper.summary}" for paper in client.results(search)]
+            )
         return results if results else "No papers found on arXiv."
     except Exception as e:
         return f"Error querying arXiv: {e}"
@@ -126,8 +135,9 @@ def query_scholar(query: str) -> str:
     from scholarly import scholarly
 
     try:
-        search_query = scholarly.search_pubs(query)
-        result = next(search_query, None)
+        with rate_limited("scholar.google.com"):
+            search_query = scholarly.search_pubs(query)
+            result = next(search_query, None)
         if result:
             return f"Title: {result['bib']['title']}\nYear: {result['bib']['pub_year']}\nVenue: {result['bib']['venue']}\nAbstract: {result['bib']['abstract']}"
         else:
@@ -152,10 +162,15 @@ def query_pubmed(query: str, max_papers: int = 10, max_retries: int = 3) -> str:
     """
     from pymed import PubMed
 
+    # Each pymed query issues an ESearch and an EFetch against the shared E-utilities quota
+    eutils_limiter = get_rate_limiter("eutils.ncbi.nlm.nih.gov")
+
     try:
         pubmed = PubMed(tool="MyTool", email="your-email@example.com")  # Update with a valid email address
 
         # Initial attempt
+        eutils_limiter.acquire()
+        eutils_limiter.acquire()
         papers = list(pubmed.query(query, max_results=max_papers))
 
         # Retry with modified queries if no results
@@ -164,7 +179,8 @@ def query_pubmed(query: str, max_papers: int = 10, max_retries: int = 3) -> str:
             retries += 1
             # Simplify query with each retry by removing the last word
             simplified_query = " ".join(query.split()[:-retries]) if len(query.split()) > retries else query
-            time.sleep(1)  # Add delay between requests
+            eutils_limiter.acquire()
+            eutils_limiter.acquire()
             papers = list(pubmed.query(simplified_query, max_results=max_papers))
 
         if papers:
@@ -197,7 +213,10 @@ def search_google(query: str, num_results: int = 3, language: str = "en") -> lis
 
         print(f"Searching for {search_query} with {num_results} results and {language} language")
 
-        for res in search(search_query, num_results=num_results, lang=language, advanced=True):
+        with rate_limited("www.google.com"):
+            results = list(search(search_query, num_results=num_results, lang=language, advanced=True))
+
+        for res in results:
             print(f"Found result: {res.title}")
             title = res.title
             url = res.url
@@ -305,7 +324,8 @@ def extract_url_content(url: str) -> str:
         Text content of the webpage
 
     """
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
+    with rate_limited(url):
+        response = get_http_session(url).get(url, headers={"User-Agent": "Mozilla/5.0"})
 
     # Check if the response is in text format
     if "text/plain" in response.headers.get("Content-Type", "") or "application/json" in response.headers.get(
@@ -349,7 +369,8 @@ def extract_pdf_content(url: str) -> str:
         # Check if the URL ends with .pdf
         if not url.lower().endswith(".pdf"):
             # If not, try to find a PDF link on the page
-            response = requests.get(url, timeout=30)
+            with rate_limited(url):
+                response = get_http_session(url).get(url, timeout=30)
             if response.status_code == 200:
                 # Look for PDF links in the HTML content
                 pdf_links = re.findall(r'href=[\'"]([^\'"]+\.pdf)[\'"]', response.text)
@@ -365,7 +386,8 @@ def extract_pdf_content(url: str) -> str:
                     return f"No PDF file found at {url}. Please provide a direct link to a PDF file."
 
         # Download the PDF
-        response = requests.get(url, timeout=30)
+        with rate_limited(url):
+            response = get_http_session(url).get(url, timeout=30)
 
         # Check if we actually got a PDF file (by checking content type or magic bytes)
         content_type = response.headers.get("Content-Type", "").lower()
@@ -3,12 +3,24 @@ import pickle
 import re
 import subprocess
 import sys
+import tempfile
+import threading
 from datetime import datetime
 from difflib import get_close_matches
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
 
+from biomni.http_transport import mount_transport
+from biomni.name_resolver import DrugNameResolver
+from biomni.rate_limit import get_rate_limiter
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent campaigns cannot share a docking cache safely
+    fcntl = None
+
 
 def run_diffdock_with_smiles(pdb_path, smiles_string, local_output_dir, gpu_device=0, use_gpu=True):
     try:
@@ -93,9 +105,50 @@ def run_diffdock_with_smiles(pdb_path, smiles_string, local_output_dir, gpu_devi
         return f"An error occurred: {e}"
 
 
-def docking_autodock_vina(smiles_list, receptor_pdb_file, box_center, box_size, ncpu=1):
-    from tdc import Oracle
+# Docking oracles (receptor prepared by pyscreener) kept per process, keyed by receptor content and box
+_docking_oracles = {}
+_docking_lock = threading.Lock()
+_worker_docking_oracle = None
+
+
+def _docking_receptor_key(receptor_pdb_file, box_center, box_size):
+    """Key of a (receptor, box) pair: hash of the PDB content plus the rounded box coordinates."""
+    import hashlib
+
+    with open(receptor_pdb_file, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    box = "_".join(f"{float(v):.3f}" for v in [*box_center, *box_size])
+    return f"{digest}_{hashlib.md5(box.encode()).hexdigest()[:8]}"
+
+
+def _get_docking_oracle(receptor_pdb_file, box_center, box_size, ncpu=1):
+    """Return a pyscreener docking oracle, preparing the receptor once per process and (receptor, box)."""
+    key = (_docking_receptor_key(receptor_pdb_file, box_center, box_size), ncpu)
+    with _docking_lock:
+        if key not in _docking_oracles:
+            from tdc import Oracle
 
+            _docking_oracles[key] = Oracle(
+                name="pyscreener",
+                receptor_pdb_file=receptor_pdb_file,
+                box_center=box_center,
+                box_size=box_size,
+                ncpu=ncpu,
+            )
+        return _docking_oracles[key]
+
+
+def _init_docking_worker(receptor_pdb_file, box_center, box_size, ncpu):
+    global _worker_docking_oracle
+    _worker_docking_oracle = _get_docking_oracle(receptor_pdb_file, box_center, box_size, ncpu)
+
+
+def _dock_smiles_chunk(smiles_chunk):
+    """Score a chunk of SMILES in a pool worker (failed dockings are None)."""
+    return list(_worker_docking_oracle(list(smiles_chunk)))
+
+
+def docking_autodock_vina(smiles_list, receptor_pdb_file, box_center, box_size, ncpu=1):
     log = []
 
     # Log the start of the process
@@ -104,14 +157,8 @@ def docking_autodock_vina(smiles_list, receptor_pdb_file, box_center, box_size,
     log.append(f"Box Center: {box_center}")
     log.append(f"Box Size: {box_size}")
 
-    # Initialize the Oracle object
-    oracle = Oracle(
-        name="pyscreener",
-        receptor_pdb_file=receptor_pdb_file,
-        box_center=box_center,
-        box_size=box_size,
-        ncpu=ncpu,
-    )
+    # Initialize the Oracle object (the prepared receptor is reused across calls)
+    oracle = _get_docking_oracle(receptor_pdb_file, box_center, box_size, ncpu=ncpu)
     log.append("Oracle initialized successfully.")
 
     # Log the list of SMILES strings
@@ -133,6 +180,129 @@ def docking_autodock_vina(smiles_list, receptor_pdb_file, box_center, box_size,
     return research_log
 
 
+def _read_docking_cache(cache_file):
+    """Scores in a docking cache CSV by canonical SMILES, read under a shared lock."""
+    if not os.path.exists(cache_file):
+        return {}
+    with open(cache_file) as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_SH)
+        try:
+            cached_rows = pd.read_csv(f)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    # Caches written before failures were skipped may hold NaN scores; those ligands are docked again
+    cached_rows = cached_rows.dropna(subset=["docking_score"])
+    return dict(zip(cached_rows["canonical_smiles"], cached_rows["docking_score"], strict=False))
+
+
+def _append_docking_scores(cache_file, chunk, values):
+    """Append scores to a docking cache CSV under an exclusive lock, so concurrent campaigns can share it."""
+    rows = pd.DataFrame({"canonical_smiles": chunk, "docking_score": values})
+    with open(cache_file, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0, os.SEEK_END)
+            rows.to_csv(f, header=f.tell() == 0, index=False)
+            f.flush()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def run_docking_campaign(
+    smiles_list,
+    receptor_pdb_file,
+    box_center,
+    box_size,
+    ncpu=1,
+    n_workers=1,
+    chunk_size=32,
+    cache_file=None,
+    output_file=None,
+):
+    """
+    Dock a large ligand library against one receptor with caching, checkpointing and a process pool.
+
+    Scores are appended to a per-(receptor, box) CSV cache after every chunk, so an interrupted
+    campaign resumes where it stopped and any (receptor, box, SMILES) triple that was scored
+    before is not docked again. Failed dockings are not cached and are retried by the next
+    campaign. The cache is appended to under a file lock, so concurrent campaigns can share it.
+    The receptor is prepared once per worker process.
+
+    Args:
+        smiles_list: SMILES strings of the ligands
+        receptor_pdb_file: Path to the receptor PDB file
+        box_center: Docking box center [x, y, z]
+        box_size: Docking box dimensions [x, y, z]
+        ncpu: CPU cores used by each docking oracle
+        n_workers: Number of worker processes, each with its own oracle; 1 docks in this process
+        chunk_size: Ligands per docking call and checkpoint
+        cache_file: Score cache CSV; defaults to a file next to the receptor keyed by PDB hash and box
+        output_file: Optional CSV file the sorted result table is written to
+
+    Returns:
+        DataFrame with smiles, canonical_smiles, docking_score (kcal/mol, lower is better; NaN when
+        docking failed or the SMILES is invalid) and cached, sorted by docking_score
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    from biomni.utils import get_index_cache_path
+
+    if cache_file is None:
+        key = _docking_receptor_key(receptor_pdb_file, box_center, box_size)
+        cache_file = get_index_cache_path(receptor_pdb_file, f"docking_{key}.csv")
+
+    canonical = [_canonical_smiles(smiles) for smiles in smiles_list]
+    scores = _read_docking_cache(cache_file)
+    cached_keys = set(scores)
+
+    pending = [key for key in dict.fromkeys(canonical) if key is not None and key not in scores]
+    chunks = [pending[i : i + chunk_size] for i in range(0, len(pending), chunk_size)]
+
+    def checkpoint(chunk, chunk_scores):
+        docked = [
+            (key, float(score))
+            for key, score in zip(chunk, chunk_scores, strict=False)
+            if score is not None and np.isfinite(score)
+        ]
+        scores.update(docked)
+        if docked:
+            _append_docking_scores(cache_file, [key for key, _ in docked], [score for _, score in docked])
+
+    if chunks and n_workers > 1:
+        import multiprocessing
+
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_docking_worker,
+            initargs=(receptor_pdb_file, box_center, box_size, ncpu),
+        ) as pool:
+            futures = {pool.submit(_dock_smiles_chunk, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                checkpoint(futures[future], future.result())
+    elif chunks:
+        oracle = _get_docking_oracle(receptor_pdb_file, box_center, box_size, ncpu=ncpu)
+        for chunk in chunks:
+            checkpoint(chunk, oracle(chunk))
+
+    results = pd.DataFrame(
+        {
+            "smiles": list(smiles_list),
+            "canonical_smiles": canonical,
+            "docking_score": [scores.get(key, np.nan) for key in canonical],
+            "cached": [key in cached_keys for key in canonical],
+        }
+    ).sort_values("docking_score", kind="stable", na_position="last", ignore_index=True)
+
+    if output_file:
+        results.to_csv(output_file, index=False)
+    return results
+
+
 def run_autosite(pdb_file, output_dir, spacing=1.0):
     # Prepare the output directory
     if not os.path.exists(output_dir):
@@ -180,6 +350,259 @@ def run_autosite(pdb_file, output_dir, spacing=1.0):
     return research_log
 
 
+def search_similar_compounds(
+    query_smiles,
+    data_lake_path,
+    library="broad_repurposing_hub",
+    k=10,
+    min_similarity=0.0,
+    output_file=None,
+):
+    """
+    Find the compounds of a data lake library most similar to one or more query molecules.
+
+    Similarity is the Tanimoto coefficient of 2048-bit Morgan fingerprints (radius 2). The library
+    is fingerprinted once into a memory-mapped index next to the library file; later searches scan
+    the bit-packed fingerprints on all CPU cores.
+
+    Args:
+        query_smiles: Query SMILES string or list of SMILES strings
+        data_lake_path: Path to the data lake directory
+        library: "enamine", "broad_repurposing_hub", "bindingdb", or the path of a table with a SMILES column
+        k: Number of hits per query
+        min_similarity: Minimum Tanimoto similarity of a hit (0-1)
+        output_file: Optional CSV file the hit table is written to
+
+    Returns:
+        DataFrame with query, rank, id, smiles and similarity, best hits first for each query
+    """
+    from biomni.compound_index import get_library_index
+
+    queries = [query_smiles] if isinstance(query_smiles, str) else list(query_smiles)
+    index = get_library_index(data_lake_path, library)
+
+    hits = []
+    for query in queries:
+        result = index.similarity_search(query, k=k, min_similarity=min_similarity)
+        result.insert(0, "query", query)
+        result.insert(1, "rank", np.arange(1, len(result) + 1))
+        hits.append(result.drop(columns="row"))
+    hits = pd.concat(hits, ignore_index=True)
+
+    if output_file:
+        hits.to_csv(output_file, index=False)
+    return hits
+
+
+def search_compound_substructure(
+    query, data_lake_path, library="broad_repurposing_hub", max_results=100, output_file=None
+):
+    """
+    Find the compounds of a data lake library containing a substructure.
+
+    A pattern-fingerprint screen over the persisted library index discards most compounds on all
+    CPU cores before RDKit confirms the remaining candidates.
+
+    Args:
+        query: Substructure as SMARTS or SMILES
+        data_lake_path: Path to the data lake directory
+        library: "enamine", "broad_repurposing_hub", "bindingdb", or the path of a table with a SMILES column
+        max_results: Maximum number of matches returned (None for all)
+        output_file: Optional CSV file the matches are written to
+
+    Returns:
+        DataFrame with the id and smiles of the matching compounds, in library order
+    """
+    from biomni.compound_index import get_library_index
+
+    matches = get_library_index(data_lake_path, library).substructure_search(query, max_results=max_results)
+    matches = matches.drop(columns="row")
+
+    if output_file:
+        matches.to_csv(output_file, index=False)
+    return matches
+
+
+# Bump when the persisted TxGNN score matrix layout changes
+_TXGNN_INDEX_VERSION = 1
+
+
+class TxGNNPredictionStore:
+    """
+    TxGNN repurposing predictions as a disease x drug float32 matrix of raw scores.
+
+    Rows follow ``diseases`` and columns ``drug_ids``; drugs without a prediction for a disease
+    are NaN. The matrix is persisted as ``.npy`` and memory-mapped, so a query only touches
+    the rows it needs. Scores are kept raw because the sigmoid is monotonic: top-k selection
+    runs on raw scores with ``np.argpartition`` and the sigmoid is applied to the k results.
+    """
+
+    def __init__(self, scores, meta):
+        self.scores = scores
+        self.meta = meta
+        self.diseases = meta["diseases"]
+        self.drug_ids = meta["drug_ids"]
+        self.drug_names = meta["drug_names"]
+        self.disease_index = {name: i for i, name in enumerate(self.diseases)}
+        self._drug_resolver = None
+
+    @classmethod
+    def from_pickles(cls, data_lake_path):
+        """Build the matrix from ``txgnn_prediction.pkl`` and ``txgnn_name_mapping.pkl``."""
+        with open(os.path.join(data_lake_path, "txgnn_name_mapping.pkl"), "rb") as f:
+            mapping = pickle.load(f)
+        with open(os.path.join(data_lake_path, "txgnn_prediction.pkl"), "rb") as f:
+            result = pickle.load(f)
+
+        diseases = list(result)
+        drug_index = {}
+        for predictions in result.values():
+            for drug_id in predictions:
+                drug_index.setdefault(drug_id, len(drug_index))
+
+        scores = np.full((len(diseases), len(drug_index)), np.nan, dtype=np.float32)
+        for row, predictions in enumerate(result.values()):
+            columns = np.fromiter((drug_index[d] for d in predictions), dtype=np.int64, count=len(predictions))
+            scores[row, columns] = np.fromiter(predictions.values(), dtype=np.float64, count=len(predictions))
+
+        id2name = mapping["id2name_drug"]
+        meta = {
+            "version": _TXGNN_INDEX_VERSION,
+            "diseases": diseases,
+            "drug_ids": list(drug_index),
+            "drug_names": [id2name.get(drug_id, "Unknown Drug") for drug_id in drug_index],
+        }
+        return cls(scores, meta)
+
+    def save(self, index_dir):
+        """Persist the score matrix (memory-mappable) and the disease/drug tables."""
+        os.makedirs(index_dir, exist_ok=True)
+        np.save(os.path.join(index_dir, "scores.npy"), self.scores)
+        # The metadata file is written last and marks the index as complete
+        tmp_path = os.path.join(index_dir, f"meta.pkl.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self.meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, os.path.join(index_dir, "meta.pkl"))
+
+    @classmethod
+    def load(cls, index_dir, mmap=True):
+        """Load a persisted store, memory-mapping the score matrix by default."""
+        with open(os.path.join(index_dir, "meta.pkl"), "rb") as f:
+            meta = pickle.load(f)
+        if meta.get("version") != _TXGNN_INDEX_VERSION:
+            raise ValueError("TxGNN index version mismatch")
+        scores = np.load(os.path.join(index_dir, "scores.npy"), mmap_mode="r" if mmap else None)
+        return cls(scores, meta)
+
+    def match_disease(self, disease_name, cutoff=0.6):
+        """Return the disease name in the store closest to ``disease_name``, or None."""
+        if disease_name in self.disease_index:
+            return disease_name
+        matched = get_close_matches(disease_name, self.diseases, n=1, cutoff=cutoff)
+        return matched[0] if matched else None
+
+    def match_drug(self, drug_name, cutoff=0.8):
+        """Return the column of the drug whose name or ID best matches ``drug_name``, or None."""
+        if self._drug_resolver is None:
+            self._drug_resolver = DrugNameResolver(
+                self.drug_names, aliases=[(drug_id, i) for i, drug_id in enumerate(self.drug_ids)]
+            )
+        match = self._drug_resolver.resolve(drug_name, cutoff=cutoff)
+        return match["index"] if match else None
+
+    @staticmethod
+    def _topk(block, k):
+        """Column indices of the k largest finite values per row, best first (ties by column)."""
+        block = np.where(np.isnan(block), -np.inf, block)
+        k = min(k, block.shape[1])
+        if k < block.shape[1]:
+            candidates = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(block.shape[1]), block.shape)
+        rows = np.arange(block.shape[0])[:, None]
+        values = block[rows, candidates]
+        order = np.lexsort((candidates, -values), axis=1)
+        return candidates[rows, order], values[rows, order]
+
+    @staticmethod
+    def _sigmoid(values):
+        """Sigmoid of raw scores; picks without a score (-inf, from NaN entries) become NaN."""
+        with np.errstate(over="ignore"):
+            return np.where(np.isfinite(values), 1 / (1 + np.exp(-values)), np.nan)
+
+    def topk_drugs(self, disease_rows, k=5):
+        """Top-k drugs for each disease row; returns (drug columns, sigmoid scores), each (n, k).
+
+        Rows with fewer than k scored drugs are padded with NaN scores, which callers drop.
+        """
+        rows = np.asarray(disease_rows, dtype=np.int64)
+        order = np.argsort(rows, kind="stable")
+        # Reading rows in file order keeps memory-mapped access sequential
+        block = np.asarray(self.scores[rows[order]], dtype=np.float64)
+        columns, values = self._topk(block, k)
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        return columns[inverse], self._sigmoid(values[inverse])
+
+    def topk_diseases(self, drug_columns, k=5, block_rows=4096):
+        """Top-k diseases for each drug column, scanning the matrix once in row blocks."""
+        columns = np.asarray(drug_columns, dtype=np.int64)
+        best_rows = np.zeros((len(columns), 0), dtype=np.int64)
+        best_values = np.zeros((len(columns), 0))
+        for start in range(0, len(self.diseases), block_rows):
+            block = np.asarray(self.scores[start : start + block_rows][:, columns], dtype=np.float64).T
+            candidate_rows = np.concatenate(
+                [best_rows, np.broadcast_to(np.arange(start, start + block.shape[1]), block.shape)], axis=1
+            )
+            candidate_values = np.concatenate([best_values, np.where(np.isnan(block), -np.inf, block)], axis=1)
+            picks, best_values = self._topk(candidate_values, k)
+            best_rows = np.take_along_axis(candidate_rows, picks, axis=1)
+        return best_rows, self._sigmoid(best_values)
+
+
+_txgnn_stores = {}
+_txgnn_stores_lock = threading.Lock()
+
+
+def get_txgnn_store(data_lake_path, mmap=True):
+    """
+    Return the process-wide TxGNN prediction store for a data lake, building its index on first use.
+
+    Args:
+    - data_lake_path (str): The path to the data lake containing the TxGNN predictions.
+    - mmap (bool, optional): Memory-map the score matrix instead of reading it into memory. Defaults to True.
+
+    Returns:
+    - TxGNNPredictionStore: The shared store.
+    """
+    from biomni.utils import get_index_cache_path, is_index_stale
+
+    key = (os.path.abspath(data_lake_path), bool(mmap))
+    with _txgnn_stores_lock:
+        if key in _txgnn_stores:
+            return _txgnn_stores[key]
+
+        sources = [os.path.join(data_lake_path, f) for f in ("txgnn_prediction.pkl", "txgnn_name_mapping.pkl")]
+        index_dir = get_index_cache_path(sources[0], "scores")
+        store = None
+        if not is_index_stale(os.path.join(index_dir, "meta.pkl"), *sources):
+            try:
+                store = TxGNNPredictionStore.load(index_dir, mmap=mmap)
+            except (OSError, ValueError, pickle.UnpicklingError):
+                store = None
+        if store is None:
+            store = TxGNNPredictionStore.from_pickles(data_lake_path)
+            try:
+                store.save(index_dir)
+                if mmap:
+                    store = TxGNNPredictionStore.load(index_dir, mmap=True)
+            except OSError:
+                pass  # Read-only data lake: keep the in-memory store
+
+        _txgnn_stores[key] = store
+        return store
+
+
 # Function to get TxGNN predictions and return a summarized string output
 def retrieve_topk_repurposing_drugs_from_disease_txgnn(disease_name, data_lake_path, k=5):
     """This function computes TxGNN model predictions for drug repurposing. It takes in the paths to the data,
@@ -195,42 +618,26 @@ def retrieve_topk_repurposing_drugs_from_disease_txgnn(disease_name, data_lake_p
 
     """
 
-    # Sigmoid function to convert raw prediction scores
-    def sigmoid(x):
-        return 1 / (1 + np.exp(-x))
-
-    # Step 1: Load the mappings and prediction data from the provided paths
-    name_mapping_path = data_lake_path + "/txgnn_name_mapping.pkl"
-    result_path = data_lake_path + "/txgnn_prediction.pkl"
-
-    with open(name_mapping_path, "rb") as f:
-        mapping = pickle.load(f)
-
-    with open(result_path, "rb") as f:
-        result = pickle.load(f)
+    # Step 1: Load the memory-mapped prediction store (built from the pickles once per data lake)
+    store = get_txgnn_store(data_lake_path)
 
     # Step 2: Fuzzy match the disease name to find the closest match
-    possible_diseases = result.keys()
-    matched_disease = get_close_matches(disease_name, possible_diseases, n=1, cutoff=0.6)
+    matched_disease = store.match_disease(disease_name)
 
     if not matched_disease:
         return f"Error: No matching disease found for '{disease_name}'. Please try a different name."
 
-    matched_disease = matched_disease[0]
-
-    # Step 3: Retrieve the prediction scores for the matched disease
-    disease_predictions = result[matched_disease]
-
-    # Step 4: Apply the sigmoid function to the raw prediction scores
-    sigmoid_predictions = {drug_id: sigmoid(score) for drug_id, score in disease_predictions.items()}
-
-    # Step 5: Sort the drugs by prediction score in descending order
-    top_k_drugs = sorted(sigmoid_predictions.items(), key=lambda x: x[1], reverse=True)[:k]
+    # Step 3: Select the top K drugs on the raw scores and apply the sigmoid to them
+    columns, scores = store.topk_drugs([store.disease_index[matched_disease]], k=k)
 
-    # Step 6: Map drug IDs to their names and format the results
-    top_k_drug_names = [(mapping["id2name_drug"].get(drug_id, "Unknown Drug"), score) for drug_id, score in top_k_drugs]
+    # Step 4: Map drug IDs to their names and format the results
+    top_k_drug_names = [
+        (store.drug_names[column], score)
+        for column, score in zip(columns[0], scores[0], strict=False)
+        if np.isfinite(score)
+    ]
 
-    # Step 7: Create a human and LLM-friendly summary string
+    # Step 5: Create a human and LLM-friendly summary string
     summary = f"TxGNN Drug Repurposing Predictions for '{matched_disease}':\n"
     summary += f"Top {k} predicted drugs and their corresponding prediction scores (post-sigmoid transformation):\n"
 
@@ -245,115 +652,279 @@ def retrieve_topk_repurposing_drugs_from_disease_txgnn(disease_name, data_lake_p
     return summary
 
 
-# ADMET prediction function with research log format
-def predict_admet_properties(smiles_list, ADMET_model_type="MPNN"):
+def retrieve_topk_repurposing_drugs_batch_txgnn(disease_names, data_lake_path, k=5):
+    """Retrieve the top K TxGNN repurposing predictions for many diseases in one pass over the score matrix.
+
+    Args:
+    - disease_names (list of str): Disease names; each is fuzzy matched like in the single-disease query.
+    - data_lake_path (str): The path to the data lake containing the TxGNN predictions.
+    - k (int, optional): The number of top drug predictions per disease. Defaults to 5.
+
+    Returns:
+    - pd.DataFrame: One row per (disease, rank) with the query, matched disease, drug ID, drug name and
+      post-sigmoid prediction score. Diseases without a match are left out.
+
+    """
+    store = get_txgnn_store(data_lake_path)
+    matched = [(query, store.match_disease(query)) for query in disease_names]
+    matched = [(query, disease) for query, disease in matched if disease]
+    columns_out = ["disease_query", "matched_disease", "rank", "drug_id", "drug_name", "score"]
+    if not matched:
+        return pd.DataFrame(columns=columns_out)
+
+    columns, scores = store.topk_drugs([store.disease_index[disease] for _, disease in matched], k=k)
+    n_top = columns.shape[1]
+    drug_ids = np.asarray(store.drug_ids, dtype=object)
+    drug_names = np.asarray(store.drug_names, dtype=object)
+    table = pd.DataFrame(
+        {
+            "disease_query": np.repeat([query for query, _ in matched], n_top),
+            "matched_disease": np.repeat([disease for _, disease in matched], n_top),
+            "rank": np.tile(np.arange(1, n_top + 1), len(matched)),
+            "drug_id": drug_ids[columns.ravel()],
+            "drug_name": drug_names[columns.ravel()],
+            "score": scores.ravel(),
+        },
+        columns=columns_out,
+    )
+    # Unscored (NaN) drugs only fill the tail of a disease's ranking, so the kept ranks stay contiguous
+    return table[np.isfinite(table["score"].to_numpy(dtype=float))].reset_index(drop=True)
+
+
+def retrieve_topk_diseases_for_drug_txgnn(drug_name, data_lake_path, k=5):
+    """Retrieve the diseases with the highest TxGNN repurposing scores for a drug (the reverse direction).
+
+    Args:
+    - drug_name (str): Drug name or TxGNN drug ID; names are fuzzy matched.
+    - data_lake_path (str): The path to the data lake containing the TxGNN predictions.
+    - k (int, optional): The number of top diseases to return. Defaults to 5.
+
+    Returns:
+    - str: A summary of the top K predicted diseases with their post-sigmoid scores.
+
+    """
+    store = get_txgnn_store(data_lake_path)
+    column = store.match_drug(drug_name)
+    if column is None:
+        return f"Error: No matching drug found for '{drug_name}'. Please try a different name."
+
+    rows, scores = store.topk_diseases([column], k=k)
+    matched_drug = store.drug_names[column]
+
+    summary = f"TxGNN Disease Predictions for '{matched_drug}' ({store.drug_ids[column]}):\n"
+    summary += f"Top {k} predicted diseases and their corresponding prediction scores (post-sigmoid transformation):\n"
+    for i, (row, score) in enumerate(zip(rows[0], scores[0], strict=False), 1):
+        if np.isfinite(score):
+            summary += f"{i}. {store.diseases[row]} - Prediction Score: {score:.4f}\n"
+
+    summary += "\nProcess Summary:\n"
+    summary += f"- The input drug name was matched to '{matched_drug}'.\n"
+    summary += (
+        f"- The top {k} diseases were selected from the scores of this drug across {len(store.diseases)} diseases.\n"
+    )
+
+    return summary
+
+
+# ADMET tasks with DeepPurpose pretrained models: (task, unit, research log label), in log order.
+# Batch predictions hold the raw model outputs; "%" tasks are probabilities scaled by 100 in the log.
+_ADMET_TASKS = [
+    ("AqSolDB", "log mol/L", "Solubility"),
+    ("Lipo_AZ", "(log-ratio)", "Lipophilicity"),
+    ("Caco2", "cm/s", "Absorption (Caco-2 permeability)"),
+    ("HIA", "%", "Absorption (HIA)"),
+    ("Pgp_inhibitor", "%", "Absorption (Pgp Inhibitor)"),
+    ("Bioavailability", "%", "Absorption (Bioavailability)"),
+    ("BBB_MolNet", "%", "Distribution (BBB permeation)"),
+    ("PPBR", "%", "Distribution (PPBR)"),
+    ("CYP2C19", "%", "Metabolism (CYP2C19)"),
+    ("CYP2D6", "%", "Metabolism (CYP2D6)"),
+    ("CYP3A4", "%", "Metabolism (CYP3A4)"),
+    ("CYP1A2", "%", "Metabolism (CYP1A2)"),
+    ("CYP2C9", "%", "Metabolism (CYP2C9)"),
+    ("Half_life_eDrug3D", "h", "Excretion (Half-life)"),
+    ("Clearance_eDrug3D", "mL/min/kg", "Excretion (Clearance)"),
+    ("ClinTox", "%", "Clinical Toxicity"),
+]
+_ADMET_MODEL_TYPES = ["MPNN", "CNN", "Morgan"]
+
+# Pretrained models and predictions are kept for the lifetime of the process
+_admet_models = {}
+_admet_predictions = {}
+_admet_lock = threading.Lock()
+
+
+def _import_deeppurpose_compound():
     try:
         from DeepPurpose import CompoundPred, utils
     except Exception:
         subprocess.run([sys.executable, "-m", "pip", "install", "DeepPurpose"], check=False)
         from DeepPurpose import CompoundPred, utils
+    return CompoundPred, utils
 
-    # Define available model types
-    available_model_types = ["MPNN", "CNN", "Morgan"]
 
-    # Check if the provided model type is valid
-    if ADMET_model_type not in available_model_types:
-        return f"Error: Invalid ADMET model type '{ADMET_model_type}'. Available options are: {', '.join(available_model_types)}."
-
-    # Load pretrained ADMET models only once
-    model_ADMETs = {}
-    tasks = [
-        "AqSolDB",
-        "Caco2",
-        "HIA",
-        "Pgp_inhibitor",
-        "Bioavailability",
-        "BBB_MolNet",
-        "PPBR",
-        "CYP2C19",
-        "CYP2D6",
-        "CYP3A4",
-        "CYP1A2",
-        "CYP2C9",
-        "ClinTox",
-        "Lipo_AZ",
-        "Half_life_eDrug3D",
-        "Clearance_eDrug3D",
-    ]
+def _get_admet_model(task, model_type):
+    """Load a pretrained DeepPurpose ADMET model once per process."""
+    name = f"{task}_{model_type}_model"
+    with _admet_lock:
+        model = _admet_models.get(name)
+    if model is None:
+        # Download (and pip install) outside the lock so other models and cache lookups are not blocked
+        CompoundPred, _ = _import_deeppurpose_compound()
+        model = CompoundPred.model_pretrained(model=name)
+        with _admet_lock:
+            model = _admet_models.setdefault(name, model)
+    return model
 
-    for task in tasks:
-        model_ADMETs[task + "_" + ADMET_model_type + "_model"] = CompoundPred.model_pretrained(
-            model=task + "_" + ADMET_model_type + "_model"
-        )
 
-    # Helper function for ADMET prediction
-    def ADMET_pred(drug, task, unit):
-        model = model_ADMETs[task + "_" + ADMET_model_type + "_model"]
-        X_pred = utils.data_process(
-            X_drug=[drug],
-            y=[0],
-            drug_encoding=ADMET_model_type,
-            split_method="no_split",
+def _featurize_admet_compounds(utils, smiles, model_type):
+    """Featurize compounds in one batch, falling back to one by one to skip those DeepPurpose rejects.
+
+    Returns the indices of the featurized compounds and their features.
+    """
+
+    def featurize(batch):
+        return utils.data_process(X_drug=batch, y=[0] * len(batch), drug_encoding=model_type, split_method="no_split")
+
+    try:
+        return list(range(len(smiles))), featurize(smiles)
+    except Exception:
+        pass
+    # Without RDKit invalid SMILES reach the featurizer, so find them one by one
+    valid = []
+    for index, value in enumerate(smiles):
+        try:
+            featurize([value])
+        except Exception:
+            continue
+        valid.append(index)
+    if not valid:
+        return [], None
+    return valid, featurize([smiles[index] for index in valid])
+
+
+def _canonical_smiles(smiles):
+    """Canonical SMILES used as prediction cache key (None if RDKit rejects it; input string without RDKit)."""
+    try:
+        from rdkit import Chem, RDLogger
+    except ImportError:
+        return smiles.strip()
+    RDLogger.DisableLog("rdApp.*")
+    mol = Chem.MolFromSmiles(smiles)
+    return Chem.MolToSmiles(mol) if mol is not None else None
+
+
+def predict_admet_properties_batch(smiles_list, ADMET_model_type="MPNN", cache_file=None):
+    """
+    Predict the 16 ADMET endpoints for many compounds with batched DeepPurpose inference.
+
+    Each distinct compound is featurized once for the chosen encoding and every pretrained model
+    (loaded once per process) runs over the whole batch. Predictions are cached in memory by
+    canonical SMILES and, optionally, in a Parquet file shared across sessions.
+
+    Args:
+        smiles_list: SMILES strings of the compounds
+        ADMET_model_type: Drug encoding of the pretrained models ("MPNN", "CNN" or "Morgan")
+        cache_file: Optional Parquet file with cached predictions; new predictions are appended
+
+    Returns:
+        DataFrame with one row per input SMILES: smiles, canonical_smiles and one column per task
+        (raw model outputs; classification tasks are probabilities). Invalid SMILES get NaN and no
+        canonical_smiles.
+    """
+    if ADMET_model_type not in _ADMET_MODEL_TYPES:
+        raise ValueError(
+            f"Invalid ADMET model type '{ADMET_model_type}'. Available options are: {', '.join(_ADMET_MODEL_TYPES)}."
         )
-        y_pred = model.predict(X_pred)[0]
+    tasks = [task for task, _, _ in _ADMET_TASKS]
+    canonical = [_canonical_smiles(smiles) for smiles in smiles_list]
+
+    with _admet_lock:
+        cached = {
+            key: _admet_predictions[(ADMET_model_type, key)]
+            for key in set(canonical)
+            if (ADMET_model_type, key) in _admet_predictions
+        }
+    if cache_file and os.path.exists(cache_file):
+        stored = pd.read_parquet(cache_file)
+        stored = stored[stored["model_type"] == ADMET_model_type].drop_duplicates("canonical_smiles", keep="last")
+        for row in stored.itertuples(index=False):
+            cached.setdefault(row.canonical_smiles, {task: getattr(row, task) for task in tasks})
+
+    # Canonical SMILES only key the cache; the models featurize the first input string of each compound
+    pending = {}
+    for smiles, key in zip(smiles_list, canonical, strict=False):
+        if key is not None and key not in cached:
+            pending.setdefault(key, smiles)
+    rejected = set()
+    if pending:
+        _, utils = _import_deeppurpose_compound()
+        keys = list(pending)
+        # Featurize every new compound once for this encoding; all models share the features
+        valid, X_pred = _featurize_admet_compounds(utils, list(pending.values()), ADMET_model_type)
+        rejected = set(keys) - {keys[index] for index in valid}
+        keys = [keys[index] for index in valid]
+        new_predictions = {key: {} for key in keys}
+        if keys:
+            for task in tasks:
+                values = _get_admet_model(task, ADMET_model_type).predict(X_pred)
+                for key, value in zip(keys, values, strict=False):
+                    new_predictions[key][task] = float(value)
+
+        with _admet_lock:
+            for key, values in new_predictions.items():
+                _admet_predictions[(ADMET_model_type, key)] = values
+        cached.update(new_predictions)
+
+        if cache_file and new_predictions:
+            rows = pd.DataFrame(
+                [{"canonical_smiles": k, "model_type": ADMET_model_type, **v} for k, v in new_predictions.items()]
+            )
+            if os.path.exists(cache_file):
+                rows = pd.concat([pd.read_parquet(cache_file), rows], ignore_index=True)
+            # Write a unique temp file next to the cache and swap it in so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_file)), suffix=".tmp")
+            os.close(fd)
+            try:
+                rows.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, cache_file)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    # Compounds the featurizer rejected are reported like invalid SMILES
+    canonical = [None if key in rejected else key for key in canonical]
+    records = [
+        {"smiles": smiles, "canonical_smiles": key, **cached.get(key, dict.fromkeys(tasks, np.nan))}
+        for smiles, key in zip(smiles_list, canonical, strict=False)
+    ]
+    return pd.DataFrame(records, columns=["smiles", "canonical_smiles", *tasks])
 
-        if unit == "%":
-            y_pred = y_pred * 100
 
-        return f"{y_pred:.2f} " + unit
+# ADMET prediction function with research log format
+def predict_admet_properties(smiles_list, ADMET_model_type="MPNN"):
+    # Check if the provided model type is valid
+    if ADMET_model_type not in _ADMET_MODEL_TYPES:
+        return f"Error: Invalid ADMET model type '{ADMET_model_type}'. Available options are: {', '.join(_ADMET_MODEL_TYPES)}."
+
+    # Predict all compounds in one batch (models are loaded once per process)
+    predictions = predict_admet_properties_batch(smiles_list, ADMET_model_type=ADMET_model_type)
 
     # Initialize research log string
     research_log = "Research Log for ADMET Predictions:\n"
     research_log += "-------------------------------------\n"
 
     # Process each SMILES string in the list
-    for smiles in smiles_list:
-        research_log += f"\nCompound SMILES: {smiles}\n"
+    for row in predictions.to_dict("records"):
+        research_log += f"\nCompound SMILES: {row['smiles']}\n"
         research_log += "Predicted ADMET properties:\n"
 
-        # Physiochemical properties
-        solubility = ADMET_pred(smiles, "AqSolDB", "log mol/L")
-        lipophilicity = ADMET_pred(smiles, "Lipo_AZ", "(log-ratio)")
-        research_log += f"- Solubility: {solubility}\n"
-        research_log += f"- Lipophilicity: {lipophilicity}\n"
-
-        # Absorption
-        caco2 = ADMET_pred(smiles, "Caco2", "cm/s")
-        hia = ADMET_pred(smiles, "HIA", "%")
-        pgp = ADMET_pred(smiles, "Pgp_inhibitor", "%")
-        bioavail = ADMET_pred(smiles, "Bioavailability", "%")
-        research_log += f"- Absorption (Caco-2 permeability): {caco2}\n"
-        research_log += f"- Absorption (HIA): {hia}\n"
-        research_log += f"- Absorption (Pgp Inhibitor): {pgp}\n"
-        research_log += f"- Absorption (Bioavailability): {bioavail}\n"
-
-        # Distribution
-        bbb = ADMET_pred(smiles, "BBB_MolNet", "%")
-        ppbr = ADMET_pred(smiles, "PPBR", "%")
-        research_log += f"- Distribution (BBB permeation): {bbb}\n"
-        research_log += f"- Distribution (PPBR): {ppbr}\n"
-
-        # Metabolism
-        cyp2c19 = ADMET_pred(smiles, "CYP2C19", "%")
-        cyp2d6 = ADMET_pred(smiles, "CYP2D6", "%")
-        cyp3a4 = ADMET_pred(smiles, "CYP3A4", "%")
-        cyp1a2 = ADMET_pred(smiles, "CYP1A2", "%")
-        cyp2c9 = ADMET_pred(smiles, "CYP2C9", "%")
-        research_log += f"- Metabolism (CYP2C19): {cyp2c19}\n"
-        research_log += f"- Metabolism (CYP2D6): {cyp2d6}\n"
-        research_log += f"- Metabolism (CYP3A4): {cyp3a4}\n"
-        research_log += f"- Metabolism (CYP1A2): {cyp1a2}\n"
-        research_log += f"- Metabolism (CYP2C9): {cyp2c9}\n"
-
-        # Excretion
-        half_life = ADMET_pred(smiles, "Half_life_eDrug3D", "h")
-        clearance = ADMET_pred(smiles, "Clearance_eDrug3D", "mL/min/kg")
-        research_log += f"- Excretion (Half-life): {half_life}\n"
-        research_log += f"- Excretion (Clearance): {clearance}\n"
-
-        # Clinical Toxicity
-        clinical_toxicity = ADMET_pred(smiles, "ClinTox", "%")
-        research_log += f"- Clinical Toxicity: {clinical_toxicity}\n"
+        if pd.isna(row["canonical_smiles"]):
+            research_log += "- Error: Invalid SMILES string\n"
+        else:
+            for task, unit, label in _ADMET_TASKS:
+                value = row[task] * 100 if unit == "%" else row[task]
+                research_log += f"- {label}: {value:.2f} {unit}\n"
 
         research_log += "-------------------------------------\n"
 
@@ -1520,6 +2091,18 @@ def perform_mwas_cyp2c19_metabolizer_status(
     return "\n".join(log)
 
 
+def _count_ionizable_groups(mol):
+    """Rough (acidic, basic) group counts: O on a trivalent C, and N with fewer than four neighbours."""
+    acidic_groups = sum(
+        1
+        for atom in mol.GetAtoms()
+        if atom.GetSymbol() == "O"
+        and any(neigh.GetSymbol() == "C" and neigh.GetDegree() == 3 for neigh in atom.GetNeighbors())
+    )
+    basic_groups = sum(1 for atom in mol.GetAtoms() if atom.GetSymbol() == "N" and atom.GetDegree() < 4)
+    return acidic_groups, basic_groups
+
+
 def calculate_physicochemical_properties(smiles_string):
     """Calculate key physicochemical properties of a drug candidate molecule.
 
@@ -1567,13 +2150,7 @@ def calculate_physicochemical_properties(smiles_string):
     # This is a simplification as accurate pKa prediction requires specialized tools
     uncharger = rdMolStandardize.Uncharger()
     uncharger.uncharge(mol)
-    acidic_groups = sum(
-        1
-        for atom in mol.GetAtoms()
-        if atom.GetSymbol() == "O"
-        and any(neigh.GetSymbol() == "C" and neigh.GetDegree() == 3 for neigh in atom.GetNeighbors())
-    )
-    basic_groups = sum(1 for atom in mol.GetAtoms() if atom.GetSymbol() == "N" and atom.GetDegree() < 4)
+    acidic_groups, basic_groups = _count_ionizable_groups(mol)
     properties["Estimated Acidic Groups"] = acidic_groups
     properties["Estimated Basic Groups"] = basic_groups
 
@@ -1613,6 +2190,256 @@ Complete results saved to: {os.path.abspath(csv_filename)}
     return log
 
 
+# Descriptor panel of the batch profiler, in output column order
+_PHYSCHEM_COLUMNS = [
+    "molecular_weight",
+    "clogp",
+    "tpsa",
+    "hbd",
+    "hba",
+    "rotatable_bonds",
+    "heavy_atoms",
+    "ring_count",
+    "aromatic_rings",
+    "fraction_csp3",
+    "molar_refractivity",
+    "formal_charge",
+    "acidic_groups",
+    "basic_groups",
+]
+
+# Descriptor rows by canonical SMILES, kept for the lifetime of the process
+_physchem_cache = {}
+_physchem_lock = threading.Lock()
+
+
+def _standardize_smiles_chunk(smiles_list, standardize=True):
+    """Canonical SMILES of each input (None if invalid); standardizing keeps the neutralized largest fragment."""
+    from rdkit import Chem, RDLogger
+    from rdkit.Chem.MolStandardize import rdMolStandardize
+
+    RDLogger.DisableLog("rdApp.*")
+    uncharger = rdMolStandardize.Uncharger()
+    canonical = []
+    for smiles in smiles_list:
+        try:
+            mol = Chem.MolFromSmiles(smiles) if smiles else None
+            if mol is not None and standardize:
+                mol = uncharger.uncharge(rdMolStandardize.FragmentParent(rdMolStandardize.Cleanup(mol)))
+            canonical.append(Chem.MolToSmiles(mol) if mol is not None else None)
+        except Exception:
+            canonical.append(None)
+    return canonical
+
+
+def _physchem_descriptor_chunk(canonical_smiles):
+    """Descriptor panel for a chunk of canonical SMILES, with rule-of-five and Veber flags computed column-wise."""
+    from rdkit import Chem, RDLogger
+    from rdkit.Chem import Crippen, Descriptors, Lipinski, rdMolDescriptors
+
+    RDLogger.DisableLog("rdApp.*")
+    values = np.full((len(canonical_smiles), len(_PHYSCHEM_COLUMNS)), np.nan)
+    for row, smiles in enumerate(canonical_smiles):
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            continue
+        values[row] = [
+            Descriptors.MolWt(mol),
+            Descriptors.MolLogP(mol),
+            Descriptors.TPSA(mol),
+            Lipinski.NumHDonors(mol),
+            Lipinski.NumHAcceptors(mol),
+            Descriptors.NumRotatableBonds(mol),
+            mol.GetNumHeavyAtoms(),
+            Descriptors.RingCount(mol),
+            rdMolDescriptors.CalcNumAromaticRings(mol),
+            rdMolDescriptors.CalcFractionCSP3(mol),
+            Crippen.MolMR(mol),
+            Chem.GetFormalCharge(mol),
+            *_count_ionizable_groups(mol),
+        ]
+
+    table = pd.DataFrame(values, columns=_PHYSCHEM_COLUMNS)
+    table.insert(0, "canonical_smiles", list(canonical_smiles))
+    table["lipinski_violations"] = (
+        (table["molecular_weight"] > 500).astype(int) + (table["clogp"] > 5) + (table["hbd"] > 5) + (table["hba"] > 10)
+    )
+    table["veber_compliant"] = (table["rotatable_bonds"] <= 10) & (table["tpsa"] <= 140)
+    return table
+
+
+def _read_smiles_input(smiles_input, smiles_column=None, data_lake_path=None):
+    """SMILES from a list, a .smi/.txt file (first token per line), a table file or a data lake library name."""
+    if not isinstance(smiles_input, str):
+        return [str(s) for s in smiles_input]
+
+    from biomni.compound_index import LIBRARY_FILES, read_library
+
+    path = smiles_input
+    if smiles_input in LIBRARY_FILES and data_lake_path:
+        path = os.path.join(data_lake_path, LIBRARY_FILES[smiles_input])
+    elif not os.path.exists(path) and data_lake_path:
+        path = os.path.join(data_lake_path, smiles_input)
+    if not os.path.exists(path):
+        # A single SMILES string
+        return [smiles_input]
+    if path.endswith((".smi", ".txt")):
+        with open(path) as f:
+            return [line.split()[0] for line in f if line.strip() and not line.startswith("#")]
+    return read_library(path, smiles_column=smiles_column)[0]
+
+
+def calculate_physicochemical_properties_batch(
+    smiles_input,
+    output_file="physicochemical_properties.parquet",
+    smiles_column=None,
+    data_lake_path=None,
+    standardize=True,
+    n_workers=None,
+    chunk_size=2000,
+    cache_file=None,
+):
+    """Profile the physicochemical properties of a compound set in one call.
+
+    Molecules are parsed and standardized on a process pool, de-duplicated by canonical SMILES,
+    and only compounds missing from the result cache (in memory, and optionally a Parquet file
+    shared across sessions) have their descriptor panel computed, again chunk-wise on the pool.
+    All distinct compounds are written to a single Parquet file.
+
+    Parameters
+    ----------
+    smiles_input : list of str or str
+        SMILES strings, a .smi/.txt file with one SMILES per line, a CSV/TSV/Parquet/pickle table with a
+        SMILES column, or a data lake library name ("enamine", "broad_repurposing_hub", "bindingdb")
+    output_file : str
+        Parquet file with one row per distinct compound (throughput stats in its metadata)
+    smiles_column : str, optional
+        SMILES column of a table input (detected by name if omitted)
+    data_lake_path : str, optional
+        Data lake directory for library names and relative table names
+    standardize : bool
+        Keep the largest fragment and neutralize charges before canonicalizing
+    n_workers : int, optional
+        Worker processes (all cores by default; 1 computes in this process)
+    chunk_size : int
+        Molecules per task sent to a worker
+    cache_file : str, optional
+        Parquet file of previously computed compounds; new compounds are appended
+
+    Returns
+    -------
+    str
+        A research log with the compound counts, throughput and property summary
+
+    """
+    import json
+    import multiprocessing
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+
+    start = time.perf_counter()
+    smiles_list = _read_smiles_input(smiles_input, smiles_column, data_lake_path)
+    n_workers = n_workers or os.cpu_count() or 1
+    unique_inputs = list(dict.fromkeys(smiles_list))
+
+    def run_chunks(executor, function, items, *args):
+        chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+        if executor is None:
+            return [function(chunk, *args) for chunk in chunks]
+        return list(executor.map(function, chunks, *[[arg] * len(chunks) for arg in args]))
+
+    executor = None
+    if n_workers > 1 and len(unique_inputs) > chunk_size:
+        executor = ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        canonical = [
+            c for chunk in run_chunks(executor, _standardize_smiles_chunk, unique_inputs, standardize) for c in chunk
+        ]
+        parse_seconds = time.perf_counter() - start
+
+        input_canonical = pd.Series(smiles_list).map(dict(zip(unique_inputs, canonical, strict=False)))
+        distinct = list(dict.fromkeys(c for c in canonical if c is not None))
+
+        with _physchem_lock:
+            cached = {key: _physchem_cache[key] for key in distinct if key in _physchem_cache}
+        if cache_file and os.path.exists(cache_file):
+            stored = pd.read_parquet(cache_file).drop_duplicates("canonical_smiles", keep="last")
+            stored = stored[stored["canonical_smiles"].isin(set(distinct) - set(cached))]
+            for record in stored.to_dict("records"):
+                cached[record["canonical_smiles"]] = record
+
+        pending = [key for key in distinct if key not in cached]
+        computed = pd.concat(
+            run_chunks(executor, _physchem_descriptor_chunk, pending) or [_physchem_descriptor_chunk([])],
+            ignore_index=True,
+        )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    new_records = computed.to_dict("records")
+    with _physchem_lock:
+        for record in new_records:
+            _physchem_cache[record["canonical_smiles"]] = record
+    if cache_file and new_records:
+        rows = computed
+        if os.path.exists(cache_file):
+            rows = pd.concat([pd.read_parquet(cache_file), computed], ignore_index=True)
+        tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+        rows.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_file)
+    cached.update({record["canonical_smiles"]: record for record in new_records})
+
+    results = pd.DataFrame([cached[key] for key in distinct], columns=computed.columns)
+    first_input = dict(zip(canonical[::-1], unique_inputs[::-1], strict=False))
+    results.insert(1, "smiles", results["canonical_smiles"].map(first_input))
+    results.insert(2, "n_inputs", results["canonical_smiles"].map(input_canonical.value_counts()).astype(int))
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "n_inputs": len(smiles_list),
+        "n_unique_inputs": len(unique_inputs),
+        "n_invalid": int(input_canonical.isna().sum()),
+        "n_distinct_compounds": len(distinct),
+        "n_cached": len(distinct) - len(pending),
+        "n_computed": len(pending),
+        "n_workers": n_workers if executor is not None else 1,
+        "parse_seconds": round(parse_seconds, 3),
+        "total_seconds": round(elapsed, 3),
+        "compounds_per_second": round(len(smiles_list) / elapsed, 1) if elapsed > 0 else None,
+    }
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(results, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), b"biomni_stats": json.dumps(stats).encode()}
+    )
+    pq.write_table(table, output_file)
+
+    log = "Batch Physicochemical Profiling Research Log:\n\n"
+    log += f"Input compounds: {stats['n_inputs']:,} ({stats['n_unique_inputs']:,} unique SMILES strings)\n"
+    log += f"Invalid SMILES: {stats['n_invalid']:,}\n"
+    log += (
+        f"Distinct compounds after {'standardization and ' if standardize else ''}canonicalization: {len(distinct):,}\n"
+    )
+    log += f"Served from cache: {stats['n_cached']:,}; computed: {stats['n_computed']:,}\n"
+    log += (
+        f"Throughput: {stats['total_seconds']}s total ({stats['parse_seconds']}s parsing) on {stats['n_workers']} "
+        f"worker(s), {stats['compounds_per_second']} compounds/s\n\n"
+    )
+    if len(results):
+        log += "Property summary (median across distinct compounds):\n"
+        log += f"- Molecular Weight: {results['molecular_weight'].median():.2f} g/mol\n"
+        log += f"- cLogP: {results['clogp'].median():.2f}\n"
+        log += f"- TPSA: {results['tpsa'].median():.2f} Å²\n"
+        log += f"- Rule-of-five compliant (<= 1 violation): {(results['lipinski_violations'] <= 1).mean():.1%}\n"
+        log += f"- Veber compliant: {results['veber_compliant'].mean():.1%}\n\n"
+    log += f"Complete results saved to: {os.path.abspath(output_file)}\n"
+    return log
+
+
 def analyze_xenograft_tumor_growth_inhibition(
     data_path,
     time_column,
@@ -1967,307 +2794,456 @@ def analyze_western_blot(
 # DDInter Drug-Drug Interaction Analysis Functions
 
 
-def _load_ddinter_data(data_lake_path):
-    """
-    Load DDInter datasets from pickle files, processing if needed.
-
-    Parameters
-    ----------
-    data_lake_path : str
-        Path to data lake directory containing DDInter pickle files
+# Raw DDInter 2.0 CSV files in the data lake; the category is taken from the file name
+DDINTER_CSV_FILES = [
+    "ddinter_alimentary_tract_metabolism.csv",
+    "ddinter_antineoplastic.csv",
+    "ddinter_antiparasitic.csv",
+    "ddinter_blood_organs.csv",
+    "ddinter_dermatological.csv",
+    "ddinter_hormonal.csv",
+    "ddinter_respiratory.csv",
+    "ddinter_various.csv",
+]
 
-    Returns
-    -------
-    tuple
-        (drug_info, interaction_matrix, name_mapping) dictionaries
-    """
-    import os
-    import pickle
+# Salt forms removed when standardizing drug names
+_DRUG_NAME_SUFFIXES = [" hydrochloride", " sulfate", " sodium", " potassium", " calcium", " magnesium"]
 
-    # Define schema directory (following established pattern)
-    schema_dir = os.path.join(os.path.dirname(__file__), "schema_db")
+# Bump when the persisted DDInter index layout changes
+_DDINTER_INDEX_VERSION = 1
 
-    # Define paths to DDInter pickle files
-    drug_info_path = os.path.join(schema_dir, "ddinter_drugs.pkl")
-    interaction_path = os.path.join(schema_dir, "ddinter_interactions.pkl")
-    mapping_path = os.path.join(schema_dir, "ddinter_name_mapping.pkl")
 
-    # Check if processing is needed (lazy loading pattern)
-    pkl_files = [drug_info_path, interaction_path, mapping_path]
-    if not all(os.path.exists(f) for f in pkl_files):
-        _process_ddinter_data_inline(data_lake_path, schema_dir)
+def _standardize_drug_name_processing(drug_name):
+    """Standardize drug names for consistent matching during processing."""
+    if pd.isna(drug_name):
+        return ""
 
-    # Load data
-    try:
-        with open(drug_info_path, "rb") as f:
-            drug_info = pickle.load(f)
+    # Convert to lowercase and strip whitespace
+    standardized = str(drug_name).strip().lower()
 
-        with open(interaction_path, "rb") as f:
-            interaction_matrix = pickle.load(f)
+    # Remove common suffixes and prefixes
+    for suffix in _DRUG_NAME_SUFFIXES:
+        standardized = standardized.replace(suffix, "")
 
-        with open(mapping_path, "rb") as f:
-            name_mapping = pickle.load(f)
+    return standardized
 
-        return drug_info, interaction_matrix, name_mapping
 
-    except Exception as e:
-        raise FileNotFoundError(f"Error loading DDInter data: {e}") from e
+def _standardize_drug_names_vectorized(names):
+    """Vectorized equivalent of ``_standardize_drug_name_processing`` for a pandas Series."""
+    standardized = names.fillna("").astype(str).str.strip().str.lower()
+    for suffix in _DRUG_NAME_SUFFIXES:
+        standardized = standardized.str.replace(suffix, "", regex=False)
+    return standardized
 
 
-def _process_ddinter_data_inline(data_lake_path, output_dir):
+class DDInterEngine:
     """
-    Process DDInter CSV files into standardized pickle files.
+    In-memory DDInter drug-drug interaction index.
 
-    This function processes raw DDInter 2.0 CSV files and creates standardized
-    data structures for use in Biomni drug-drug interaction analysis.
+    Drugs are integer nodes keyed by standardized name. Interactions are stored once in
+    columnar arrays (severity and category codes, DDInter IDs) and referenced from a CSR
+    adjacency in both directions, so a drug's partners are ``indices[indptr[i]:indptr[i + 1]]``
+    and all pairwise checks for a medication list are a few vectorized array operations.
 
-    Parameters
-    ----------
-    data_lake_path : str
-        Path to data lake directory containing raw DDInter CSV files
-    output_dir : str
-        Directory to save processed pickle files
+    The arrays are persisted as ``.npy`` files and can be memory-mapped, so loading the
+    engine does not unpickle any Python objects per interaction.
     """
-    import os
-    import pickle
-    from pathlib import Path
-
-    import pandas as pd
 
-    # Create output directory
-    Path(output_dir).mkdir(exist_ok=True)
-
-    # Define CSV files to process
-    csv_files = [
-        "ddinter_alimentary_tract_metabolism.csv",
-        "ddinter_antineoplastic.csv",
-        "ddinter_antiparasitic.csv",
-        "ddinter_blood_organs.csv",
-        "ddinter_dermatological.csv",
-        "ddinter_hormonal.csv",
-        "ddinter_respiratory.csv",
-        "ddinter_various.csv",
+    _ARRAY_FIELDS = [
+        "indptr",
+        "indices",
+        "edge_ids",
+        "edge_a",
+        "edge_b",
+        "edge_level",
+        "edge_category",
+        "edge_labels",
     ]
 
-    # Load and combine all CSV files
-    dataframes = []
-    for csv_file in csv_files:
-        file_path = os.path.join(data_lake_path, csv_file)
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path)
-            # Add source category
-            category = csv_file.replace("ddinter_", "").replace(".csv", "")
-            df["category"] = category
-            dataframes.append(df)
-
-    if not dataframes:
-        raise FileNotFoundError("No DDInter CSV files found in data lake")
-
-    # Process data
-    drug_info = _build_drug_registry_inline(dataframes)
-    interaction_matrix = _create_interaction_matrix_inline(dataframes)
-    name_mapping = _create_name_mapping_inline(drug_info)
-
-    # Save processed data
-    with open(os.path.join(output_dir, "ddinter_drugs.pkl"), "wb") as f:
-        pickle.dump(drug_info, f)
+    def __init__(self, arrays, meta):
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.edge_ids = arrays["edge_ids"]
+        self.edge_a = arrays["edge_a"]
+        self.edge_b = arrays["edge_b"]
+        self.edge_level = arrays["edge_level"]
+        self.edge_category = arrays["edge_category"]
+        self.edge_labels = arrays["edge_labels"]
+        self.meta = meta
+        self.names = meta["names"]
+        self.standardized = meta["standardized"]
+        self.drug_ids = meta["drug_ids"]
+        self.categories = meta["categories"]
+        self.levels = meta["levels"]
+        self.category_names = meta["category_names"]
+        self.name_to_index = meta["name_to_index"]
+        self._resolver = None
+        self.n_partners = self._count_unique_partners()
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def n_interactions(self):
+        return len(self.edge_a)
+
+    def _count_unique_partners(self):
+        node = np.repeat(np.arange(len(self.names)), np.diff(self.indptr))
+        unique_pairs = node.astype(np.int64) * len(self.names) + self.indices
+        distinct = np.ones(len(unique_pairs), dtype=bool)
+        distinct[1:] = unique_pairs[1:] != unique_pairs[:-1]
+        return np.bincount(node[distinct], minlength=len(self.names))
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Build the engine from combined DDInter rows with a ``category`` column."""
+        df = df.reset_index(drop=True)
+        std_a = _standardize_drug_names_vectorized(df["Drug_A"])
+        std_b = _standardize_drug_names_vectorized(df["Drug_B"])
+        # Drugs are numbered in order of first appearance (A before B within a row)
+        codes, standardized = pd.factorize(np.column_stack([std_a.to_numpy(), std_b.to_numpy()]).ravel())
+        n_rows = len(df)
+        node_a, node_b = codes[0::2], codes[1::2]
+        n_drugs = len(standardized)
+
+        # Display name and DDInter ID per node are taken from its first occurrence
+        names_all = np.column_stack([df["Drug_A"].astype(str), df["Drug_B"].astype(str)]).ravel()
+        ids_all = np.column_stack([df["DDInterID_A"].astype(str), df["DDInterID_B"].astype(str)]).ravel()
+        first = pd.Series(np.arange(2 * n_rows)).groupby(codes).first().to_numpy()
+        names = names_all[first]
+        drug_ids = ids_all[first]
+        category_codes, category_names = pd.factorize(df["category"])
+        # DDInter ID and name as written in each row, as codes into a table of (ID, name) labels
+        label_codes, labels = pd.factorize(pd.Series(ids_all) + "\t" + pd.Series(names_all))
+        node_categories = (
+            pd.DataFrame({"node": codes, "category": np.repeat(category_codes, 2)})
+            .drop_duplicates()
+            .groupby("node")["category"]
+            .apply(lambda c: [category_names[i] for i in sorted(c)])
+        )
+        level_codes, levels = pd.factorize(df["Level"].fillna("Unknown"))
+
+        # CSR adjacency over both directions, sorted by (source, target)
+        src = np.concatenate([node_a, node_b])
+        dst = np.concatenate([node_b, node_a])
+        edge = np.concatenate([np.arange(n_rows), np.arange(n_rows)])
+        # Self-interactions are stored once
+        keep = np.concatenate([np.ones(n_rows, dtype=bool), node_a != node_b])
+        src, dst, edge = src[keep], dst[keep], edge[keep]
+        order = np.lexsort((edge, dst, src))
+        indptr = np.zeros(n_drugs + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(src, minlength=n_drugs))
+
+        name_to_index = {}
+        for i, (name, std) in enumerate(zip(names, standardized, strict=False)):
+            name_to_index[str(name).lower()] = i
+            name_to_index[std] = i
+
+        arrays = {
+            "indptr": indptr,
+            "indices": dst[order].astype(np.int32),
+            "edge_ids": edge[order].astype(np.int32),
+            "edge_a": node_a.astype(np.int32),
+            "edge_b": node_b.astype(np.int32),
+            "edge_level": level_codes.astype(np.int8),
+            "edge_category": category_codes.astype(np.int8),
+            "edge_labels": label_codes.reshape(-1, 2).astype(np.int32),
+        }
+        meta = {
+            "version": _DDINTER_INDEX_VERSION,
+            "names": list(names),
+            "standardized": list(standardized),
+            "drug_ids": list(drug_ids),
+            "categories": [node_categories.get(i, []) for i in range(n_drugs)],
+            "levels": list(levels),
+            "category_names": list(category_names),
+            "name_to_index": name_to_index,
+            "labels": [label.split("\t", 1) for label in labels],
+        }
+        return cls(arrays, meta)
+
+    @classmethod
+    def from_csv(cls, data_lake_path):
+        """Build the engine from the raw DDInter CSV files in the data lake."""
+        dataframes = []
+        for csv_file in DDINTER_CSV_FILES:
+            file_path = os.path.join(data_lake_path, csv_file)
+            if os.path.exists(file_path):
+                df = pd.read_csv(file_path)
+                df["category"] = csv_file.replace("ddinter_", "").replace(".csv", "")
+                dataframes.append(df)
+        if not dataframes:
+            raise FileNotFoundError("No DDInter CSV files found in data lake")
+        return cls.from_dataframe(pd.concat(dataframes, ignore_index=True))
+
+    def save(self, index_dir):
+        """Persist arrays as .npy files (memory-mappable) and the drug tables as one pickle."""
+        os.makedirs(index_dir, exist_ok=True)
+        for field in self._ARRAY_FIELDS:
+            np.save(os.path.join(index_dir, f"{field}.npy"), getattr(self, field))
+        # The metadata file is written last and marks the index as complete
+        tmp_path = os.path.join(index_dir, f"meta.pkl.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self.meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, os.path.join(index_dir, "meta.pkl"))
+
+    @classmethod
+    def load(cls, index_dir, mmap=False):
+        """Load a persisted engine, optionally memory-mapping the interaction arrays."""
+        with open(os.path.join(index_dir, "meta.pkl"), "rb") as f:
+            meta = pickle.load(f)
+        if meta.get("version") != _DDINTER_INDEX_VERSION:
+            raise ValueError("DDInter index version mismatch")
+        arrays = {
+            field: np.load(os.path.join(index_dir, f"{field}.npy"), mmap_mode="r" if mmap else None)
+            for field in cls._ARRAY_FIELDS
+        }
+        return cls(arrays, meta)
+
+    @property
+    def resolver(self):
+        """Drug name resolver over the standardized names, built on first use."""
+        if self._resolver is None:
+            self._resolver = DrugNameResolver(
+                self.standardized, aliases=[(name, i) for i, name in enumerate(self.names)]
+            )
+        return self._resolver
 
-    with open(os.path.join(output_dir, "ddinter_interactions.pkl"), "wb") as f:
-        pickle.dump(interaction_matrix, f)
+    def resolve(self, drug_name):
+        """Return the node index for a drug name (exact, synonym, then fuzzy match), or None."""
+        match = self.resolve_names([drug_name])[0]
+        return match["index"] if match else None
 
-    with open(os.path.join(output_dir, "ddinter_name_mapping.pkl"), "wb") as f:
-        pickle.dump(name_mapping, f)
+    def resolve_names(self, drug_names, cutoff=0.8):
+        """
+        Batch-resolve drug names against the DDInter vocabulary.
 
-    # Generate and save statistics
-    stats = _generate_ddinter_statistics_inline(drug_info, interaction_matrix)
-    with open(os.path.join(output_dir, "ddinter_statistics.pkl"), "wb") as f:
-        pickle.dump(stats, f)
+        Names are matched exactly (original or standardized spelling) first; the remaining ones go
+        through the trigram-indexed resolver (salt forms, brand names, misspellings) in one batch.
 
+        Parameters
+        ----------
+        drug_names : list of str
+            Drug names to resolve
+        cutoff : float, default 0.8
+            Minimum similarity score for fuzzy matches
 
-def _standardize_drug_name_processing(drug_name):
-    """Standardize drug names for consistent matching during processing."""
-    import pandas as pd
-
-    if pd.isna(drug_name):
-        return ""
-
-    # Convert to lowercase and strip whitespace
-    standardized = str(drug_name).strip().lower()
-
-    # Remove common suffixes and prefixes
-    standardized = standardized.replace(" hydrochloride", "")
-    standardized = standardized.replace(" sulfate", "")
-    standardized = standardized.replace(" sodium", "")
-    standardized = standardized.replace(" potassium", "")
-    standardized = standardized.replace(" calcium", "")
-    standardized = standardized.replace(" magnesium", "")
-
-    return standardized
-
-
-def _build_drug_registry_inline(dataframes):
-    """Build comprehensive drug registry from all interactions."""
-
-    drug_registry = {}
-
-    for df in dataframes:
-        for _, row in df.iterrows():
-            drug_a_id = row["DDInterID_A"]
-            drug_a_name = row["Drug_A"]
-            drug_b_id = row["DDInterID_B"]
-            drug_b_name = row["Drug_B"]
-
-            # Add Drug A
-            if drug_a_id not in drug_registry:
-                drug_registry[drug_a_id] = {
-                    "name": drug_a_name,
-                    "standardized_name": _standardize_drug_name_processing(drug_a_name),
-                    "categories": set(),
-                    "interactions": set(),
-                }
-            drug_registry[drug_a_id]["categories"].add(row["category"])
-
-            # Add Drug B
-            if drug_b_id not in drug_registry:
-                drug_registry[drug_b_id] = {
-                    "name": drug_b_name,
-                    "standardized_name": _standardize_drug_name_processing(drug_b_name),
-                    "categories": set(),
-                    "interactions": set(),
+        Returns
+        -------
+        list of dict or None
+            Per name: query, standardized ``name``, node ``index``, ``score`` and ``method``
+        """
+        matches = [None] * len(drug_names)
+        pending = []
+        for i, drug_name in enumerate(drug_names):
+            for key in (str(drug_name).lower(), _standardize_drug_name_processing(drug_name)):
+                if key in self.name_to_index:
+                    index = self.name_to_index[key]
+                    matches[i] = {
+                        "query": drug_name,
+                        "name": self.standardized[index],
+                        "index": index,
+                        "score": 1.0,
+                        "method": "exact",
+                    }
+                    break
+            else:
+                pending.append(i)
+        if pending:
+            resolved = self.resolver.resolve_many([drug_names[i] for i in pending], cutoff=cutoff)
+            for i, match in zip(pending, resolved, strict=False):
+                matches[i] = match
+        return matches
+
+    def resolve_many(self, drug_names):
+        """Resolve names to node indices; returns (list of (name, index), missing names)."""
+        resolved, missing = [], []
+        for name, match in zip(drug_names, self.resolve_names(drug_names), strict=False):
+            if match is None:
+                missing.append(name)
+            else:
+                resolved.append((name, match["index"]))
+        return resolved, missing
+
+    def pair_edges(self, node_a, node_b):
+        """Return the interaction ids between two drugs."""
+        start, end = self.indptr[node_a], self.indptr[node_a + 1]
+        partners = self.indices[start:end]
+        lo, hi = np.searchsorted(partners, node_b, side="left"), np.searchsorted(partners, node_b, side="right")
+        return np.asarray(self.edge_ids[start + lo : start + hi])
+
+    def pairwise(self, nodes):
+        """All interactions among a set of drugs as arrays (node_a, node_b, edge id), node_a < node_b."""
+        nodes = np.unique(np.asarray(nodes, dtype=np.int64))
+        if len(nodes) < 2:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        starts, ends = self.indptr[nodes], self.indptr[nodes + 1]
+        counts = ends - starts
+        src = np.repeat(nodes, counts)
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        dst = np.asarray(self.indices[positions], dtype=np.int64)
+        keep = (dst > src) & np.isin(dst, nodes)
+        return src[keep], dst[keep], np.asarray(self.edge_ids[positions[keep]], dtype=np.int64)
+
+    def interaction_records(self, edges):
+        """Interaction dicts (level, category, drug IDs and names) for interaction ids."""
+        labels = self.meta["labels"]
+        records = []
+        for e in (int(e) for e in edges):
+            drug_a_id, drug_a_name = labels[self.edge_labels[e, 0]]
+            drug_b_id, drug_b_name = labels[self.edge_labels[e, 1]]
+            records.append(
+                {
+                    "level": self.levels[self.edge_level[e]],
+                    "category": self.category_names[self.edge_category[e]],
+                    "drug_a_id": drug_a_id,
+                    "drug_b_id": drug_b_id,
+                    "drug_a_name": drug_a_name,
+                    "drug_b_name": drug_b_name,
                 }
-            drug_registry[drug_b_id]["categories"].add(row["category"])
-
-            # Record interactions
-            drug_registry[drug_a_id]["interactions"].add(drug_b_id)
-            drug_registry[drug_b_id]["interactions"].add(drug_a_id)
-
-    # Convert sets to lists for pickle serialization
-    for drug_id in drug_registry:
-        drug_registry[drug_id]["categories"] = list(drug_registry[drug_id]["categories"])
-        drug_registry[drug_id]["interactions"] = list(drug_registry[drug_id]["interactions"])
-
-    return drug_registry
-
+            )
+        return records
+
+    def interactions_among(self, nodes, severity_levels=None, interaction_types=None):
+        """Group the (filtered) interactions among a set of drugs by pair, in input order."""
+        src, dst, edges = self.pairwise(nodes)
+        if severity_levels:
+            allowed = [i for i, level in enumerate(self.levels) if level in severity_levels]
+            mask = np.isin(self.edge_level[edges], allowed)
+            src, dst, edges = src[mask], dst[mask], edges[mask]
+        if interaction_types:
+            allowed = [i for i, category in enumerate(self.category_names) if category in interaction_types]
+            mask = np.isin(self.edge_category[edges], allowed)
+            src, dst, edges = src[mask], dst[mask], edges[mask]
+
+        rank = {node: i for i, node in enumerate(dict.fromkeys(int(n) for n in nodes))}
+        pairs = {}
+        for a, b, e in zip(src.tolist(), dst.tolist(), edges.tolist(), strict=False):
+            key = (a, b) if rank[a] < rank[b] else (b, a)
+            pairs.setdefault(key, []).append(e)
+        return [
+            {"drug_a": key[0], "drug_b": key[1], "interactions": self.interaction_records(pairs[key])}
+            for key in sorted(pairs, key=lambda k: (rank[k[0]], rank[k[1]]))
+        ]
+
+    def cohort_pairs(self, groups, nodes):
+        """
+        Interacting drug pairs within many medication lists at once.
 
-def _create_interaction_matrix_inline(dataframes):
-    """Create interaction matrix for fast lookups using standardized drug names."""
-    from collections import defaultdict
+        ``groups`` and ``nodes`` are parallel integer arrays (list id, drug node). All CSR rows of all
+        lists are gathered in one pass and kept where the partner is in the same list, so the work is
+        proportional to the summed degree of the listed drugs rather than the number of pairs.
 
-    import pandas as pd
-
-    combined_df = pd.concat(dataframes, ignore_index=True)
-    interaction_matrix = defaultdict(lambda: defaultdict(list))
-
-    # Create bidirectional interaction matrix using standardized names
-    for _, row in combined_df.iterrows():
-        drug_a_std = _standardize_drug_name_processing(row["Drug_A"])
-        drug_b_std = _standardize_drug_name_processing(row["Drug_B"])
-        level = row["Level"]
-        category = row["category"]
-
-        interaction_data = {
-            "level": level,
-            "category": category,
-            "drug_a_id": row["DDInterID_A"],
-            "drug_b_id": row["DDInterID_B"],
-            "drug_a_name": row["Drug_A"],
-            "drug_b_name": row["Drug_B"],
+        Returns (group, node_a, node_b, counts) with node_a < node_b and ``counts[:, k]`` the number
+        of interactions of severity ``self.levels[k]`` for each pair.
+        """
+        n = len(self)
+        members = np.unique(np.asarray(groups, dtype=np.int64) * n + np.asarray(nodes, dtype=np.int64))
+        member_groups, member_nodes = members // n, members % n
+        starts, ends = self.indptr[member_nodes], self.indptr[member_nodes + 1]
+        counts = ends - starts
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        src = np.repeat(member_nodes, counts)
+        group = np.repeat(member_groups, counts)
+        dst = np.asarray(self.indices[positions], dtype=np.int64)
+
+        keep = dst > src
+        group, src, dst, positions = group[keep], src[keep], dst[keep], positions[keep]
+        partner = group * n + dst
+        found = np.searchsorted(members, partner)
+        found[found == len(members)] = 0
+        keep = members[found] == partner
+        group, src, dst = group[keep], src[keep], dst[keep]
+        levels = np.asarray(self.edge_level[self.edge_ids[positions[keep]]], dtype=np.int64)
+
+        pairs, inverse = np.unique((group * n + src) * n + dst, return_inverse=True)
+        level_counts = np.bincount(
+            inverse * len(self.levels) + levels, minlength=len(pairs) * len(self.levels)
+        ).reshape(len(pairs), len(self.levels))
+        return pairs // (n * n), (pairs // n) % n, pairs % n, level_counts
+
+    def partner_counts(self, nodes, severity_levels=None):
+        """Number of interactions every drug has with a set of drugs, optionally by severity."""
+        nodes = np.unique(np.asarray(nodes, dtype=np.int64))
+        if not len(nodes):
+            return np.zeros(len(self), dtype=np.int64)
+        starts, ends = self.indptr[nodes], self.indptr[nodes + 1]
+        counts = ends - starts
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        partners = np.asarray(self.indices[positions], dtype=np.int64)
+        if severity_levels:
+            allowed = [i for i, level in enumerate(self.levels) if level in severity_levels]
+            partners = partners[np.isin(self.edge_level[self.edge_ids[positions]], allowed)]
+        return np.bincount(partners, minlength=len(self))
+
+    def statistics(self):
+        """Summary statistics about the interaction index."""
+        level_counts = np.bincount(self.edge_level, minlength=len(self.levels))
+        category_counts = {}
+        for categories in self.categories:
+            for category in categories:
+                category_counts[category] = category_counts.get(category, 0) + 1
+        top = np.argsort(-self.n_partners, kind="stable")[:10]
+        return {
+            "total_drugs": len(self),
+            # Each interaction is counted in both directions, as in the original statistics
+            "total_interactions": int(2 * self.n_interactions),
+            "interaction_levels": {level: int(2 * level_counts[i]) for i, level in enumerate(self.levels)},
+            "drug_categories": category_counts,
+            "most_connected_drugs": [
+                {"drug_id": self.drug_ids[i], "name": self.names[i], "connections": int(self.n_partners[i])}
+                for i in top
+            ],
         }
 
-        # Add both directions using standardized names as keys
-        interaction_matrix[drug_a_std][drug_b_std].append(interaction_data)
-        interaction_matrix[drug_b_std][drug_a_std].append(interaction_data)
-
-    # Convert to regular dict for pickle
-    interaction_matrix = dict(interaction_matrix)
-    for drug in interaction_matrix:
-        interaction_matrix[drug] = dict(interaction_matrix[drug])
-
-    return interaction_matrix
-
-
-def _create_name_mapping_inline(drug_info):
-    """Create drug name to ID mapping for fuzzy matching."""
-    name_mapping = {}
 
-    for drug_id, drug_data in drug_info.items():
-        original_name = drug_data["name"]
-        standardized_name = drug_data["standardized_name"]
+_ddinter_engines = {}
+_ddinter_engines_lock = threading.Lock()
 
-        # Map both original and standardized names
-        name_mapping[original_name.lower()] = drug_id
-        name_mapping[standardized_name] = drug_id
 
-    return name_mapping
-
-
-def _generate_ddinter_statistics_inline(drug_info, interaction_matrix):
-    """Generate statistics about the processed data."""
-    from collections import defaultdict
-
-    stats = {
-        "total_drugs": len(drug_info),
-        "total_interactions": 0,
-        "interaction_levels": defaultdict(int),
-        "drug_categories": defaultdict(int),
-        "most_connected_drugs": [],
-    }
-
-    # Count interactions and levels
-    for drug_a in interaction_matrix:
-        for drug_b in interaction_matrix[drug_a]:
-            interactions = interaction_matrix[drug_a][drug_b]
-            stats["total_interactions"] += len(interactions)
-
-            for interaction in interactions:
-                stats["interaction_levels"][interaction["level"]] += 1
-
-    # Count drug categories
-    for drug_data in drug_info.values():
-        for category in drug_data["categories"]:
-            stats["drug_categories"][category] += 1
-
-    # Find most connected drugs
-    connection_counts = []
-    for drug_id, drug_data in drug_info.items():
-        connection_counts.append(
-            {"drug_id": drug_id, "name": drug_data["name"], "connections": len(drug_data["interactions"])}
-        )
-
-    connection_counts.sort(key=lambda x: x["connections"], reverse=True)
-    stats["most_connected_drugs"] = connection_counts[:10]
-
-    return stats
-
-
-def _standardize_drug_name(drug_name, name_mapping):
+def get_ddinter_engine(data_lake_path, mmap=False):
     """
-    Standardize drug names using fuzzy matching against DDInter database.
+    Return the process-wide DDInter engine for a data lake, building its index on first use.
 
     Parameters
     ----------
-    drug_name : str
-        Original drug name
-    name_mapping : dict
-        Drug name to ID mapping dictionary
+    data_lake_path : str
+        Path to data lake directory containing the raw DDInter CSV files
+    mmap : bool, default False
+        Memory-map the interaction arrays instead of reading them into memory
 
     Returns
     -------
-    str or None
-        Standardized drug name or None if not found
+    DDInterEngine
+        The shared engine
     """
-    from difflib import get_close_matches
+    from biomni.utils import get_index_cache_path, is_index_stale
 
-    # Direct match
-    if drug_name.lower() in name_mapping:
-        return drug_name.lower()
+    key = (os.path.abspath(data_lake_path), bool(mmap))
+    with _ddinter_engines_lock:
+        if key in _ddinter_engines:
+            return _ddinter_engines[key]
 
-    # Fuzzy match
-    matches = get_close_matches(drug_name.lower(), name_mapping.keys(), n=1, cutoff=0.8)
-    if matches:
-        return matches[0]
+        csv_paths = [os.path.join(data_lake_path, f) for f in DDINTER_CSV_FILES]
+        index_dir = get_index_cache_path(os.path.join(data_lake_path, "ddinter"), "csr")
+        engine = None
+        if not is_index_stale(os.path.join(index_dir, "meta.pkl"), *csv_paths):
+            try:
+                engine = DDInterEngine.load(index_dir, mmap=mmap)
+            except (OSError, ValueError, pickle.UnpicklingError):
+                engine = None
+        if engine is None:
+            engine = DDInterEngine.from_csv(data_lake_path)
+            try:
+                engine.save(index_dir)
+                if mmap:
+                    engine = DDInterEngine.load(index_dir, mmap=True)
+            except OSError:
+                pass  # Read-only data lake: keep the in-memory engine
 
-    return None
+        _ddinter_engines[key] = engine
+        return engine
 
 
 def _format_interaction_result(interaction_data, drug_name_a, drug_name_b, include_mechanisms=True):
@@ -2347,19 +3323,12 @@ def query_drug_interactions(drug_names, interaction_types=None, severity_levels=
 
     try:
         # Load DDInter data
-        drug_info, interaction_matrix, name_mapping = _load_ddinter_data(data_lake_path)
-        log += f"Successfully loaded DDInter database with {len(drug_info)} drugs\n\n"
+        engine = get_ddinter_engine(data_lake_path)
+        log += f"Successfully loaded DDInter database with {len(engine)} drugs\n\n"
 
         # Standardize drug names
-        standardized_names = []
-        missing_drugs = []
-
-        for drug_name in drug_names:
-            standardized = _standardize_drug_name(drug_name, name_mapping)
-            if standardized:
-                standardized_names.append(standardized)
-            else:
-                missing_drugs.append(drug_name)
+        resolved, missing_drugs = engine.resolve_many(drug_names)
+        standardized_names = [index for _, index in resolved]
 
         if missing_drugs:
             log += "Warning: The following drugs were not found in DDInter database:\n"
@@ -2371,36 +3340,10 @@ def query_drug_interactions(drug_names, interaction_types=None, severity_levels=
             log += "Error: No valid drugs found in DDInter database\n"
             return log
 
-        # Query interactions
-        interactions_found = []
-
-        for i, drug_a in enumerate(standardized_names):
-            for j, drug_b in enumerate(standardized_names):
-                if i >= j:  # Avoid duplicate pairs
-                    continue
-
-                if drug_a in interaction_matrix and drug_b in interaction_matrix[drug_a]:
-                    interactions = interaction_matrix[drug_a][drug_b]
-
-                    # Apply filters
-                    filtered_interactions = interactions
-
-                    if severity_levels:
-                        filtered_interactions = [
-                            int_data for int_data in filtered_interactions if int_data.get("level") in severity_levels
-                        ]
-
-                    if interaction_types:
-                        filtered_interactions = [
-                            int_data
-                            for int_data in filtered_interactions
-                            if int_data.get("category") in interaction_types
-                        ]
-
-                    if filtered_interactions:
-                        interactions_found.append(
-                            {"drug_a": drug_a, "drug_b": drug_b, "interactions": filtered_interactions}
-                        )
+        # Query interactions among all pairs at once
+        interactions_found = engine.interactions_among(
+            standardized_names, severity_levels=severity_levels, interaction_types=interaction_types
+        )
 
         # Format results
         log += "Interaction Analysis Results:\n"
@@ -2409,7 +3352,10 @@ def query_drug_interactions(drug_names, interaction_types=None, severity_levels=
         if interactions_found:
             for pair in interactions_found:
                 log += _format_interaction_result(
-                    pair["interactions"], pair["drug_a"].title(), pair["drug_b"].title(), include_mechanisms=True
+                    pair["interactions"],
+                    engine.standardized[pair["drug_a"]].title(),
+                    engine.standardized[pair["drug_b"]].title(),
+                    include_mechanisms=True,
                 )
                 log += "\n"
         else:
@@ -2475,19 +3421,12 @@ def check_drug_combination_safety(drug_list, include_mechanisms=True, include_ma
 
     try:
         # Load DDInter data
-        drug_info, interaction_matrix, name_mapping = _load_ddinter_data(data_lake_path)
+        engine = get_ddinter_engine(data_lake_path)
         log += "Successfully loaded DDInter database\n\n"
 
         # Standardize drug names
-        standardized_drugs = []
-        missing_drugs = []
-
-        for drug in drug_list:
-            standardized = _standardize_drug_name(drug, name_mapping)
-            if standardized:
-                standardized_drugs.append(standardized)
-            else:
-                missing_drugs.append(drug)
+        resolved, missing_drugs = engine.resolve_many(drug_list)
+        standardized_drugs = [index for _, index in resolved]
 
         if missing_drugs:
             log += "Warning: The following drugs were not found in DDInter database:\n"
@@ -2500,29 +3439,15 @@ def check_drug_combination_safety(drug_list, include_mechanisms=True, include_ma
             return log
 
         # Analyze all pairwise interactions
-        interactions_found = []
-        major_interactions = 0
-        moderate_interactions = 0
-        minor_interactions = 0
-
-        for i, drug_a in enumerate(standardized_drugs):
-            for j, drug_b in enumerate(standardized_drugs):
-                if i >= j:  # Avoid duplicate pairs
-                    continue
-
-                if drug_a in interaction_matrix and drug_b in interaction_matrix[drug_a]:
-                    interactions = interaction_matrix[drug_a][drug_b]
-
-                    for interaction in interactions:
-                        level = interaction.get("level", "Unknown")
-                        if level == "Major":
-                            major_interactions += 1
-                        elif level == "Moderate":
-                            moderate_interactions += 1
-                        elif level == "Minor":
-                            minor_interactions += 1
-
-                    interactions_found.append({"drug_a": drug_a, "drug_b": drug_b, "interactions": interactions})
+        interactions_found = engine.interactions_among(standardized_drugs)
+        severity_counts = {}
+        for pair in interactions_found:
+            for interaction in pair["interactions"]:
+                level = interaction.get("level", "Unknown")
+                severity_counts[level] = severity_counts.get(level, 0) + 1
+        major_interactions = severity_counts.get("Major", 0)
+        moderate_interactions = severity_counts.get("Moderate", 0)
+        minor_interactions = severity_counts.get("Minor", 0)
 
         # Overall safety assessment
         log += "Overall Safety Assessment:\n"
@@ -2559,8 +3484,8 @@ def check_drug_combination_safety(drug_list, include_mechanisms=True, include_ma
             for pair in interactions_found:
                 log += _format_interaction_result(
                     pair["interactions"],
-                    pair["drug_a"].title(),
-                    pair["drug_b"].title(),
+                    engine.standardized[pair["drug_a"]].title(),
+                    engine.standardized[pair["drug_b"]].title(),
                     include_mechanisms=include_mechanisms,
                 )
                 log += "\n"
@@ -2639,44 +3564,36 @@ def analyze_interaction_mechanisms(drug_pair, detailed_analysis=True, data_lake_
 
     try:
         # Load DDInter data
-        drug_info, interaction_matrix, name_mapping = _load_ddinter_data(data_lake_path)
+        engine = get_ddinter_engine(data_lake_path)
         log += "Successfully loaded DDInter database\n\n"
 
         # Standardize drug names
-        std_drug_a = _standardize_drug_name(drug_a, name_mapping)
-        std_drug_b = _standardize_drug_name(drug_b, name_mapping)
+        node_a = engine.resolve(drug_a)
+        node_b = engine.resolve(drug_b)
 
-        if not std_drug_a:
+        if node_a is None:
             log += f"Error: Drug '{drug_a}' not found in DDInter database\n"
             return log
-        if not std_drug_b:
+        if node_b is None:
             log += f"Error: Drug '{drug_b}' not found in DDInter database\n"
             return log
 
         # Query interactions
-        interactions = []
-        if std_drug_a in interaction_matrix and std_drug_b in interaction_matrix[std_drug_a]:
-            interactions = interaction_matrix[std_drug_a][std_drug_b]
+        interactions = engine.interaction_records(engine.pair_edges(node_a, node_b))
 
         if not interactions:
             log += f"No interactions found between {drug_a} and {drug_b}\n"
             return log
 
-        # Get drug information
-        drug_a_id = name_mapping[std_drug_a]
-        drug_b_id = name_mapping[std_drug_b]
-        drug_a_info = drug_info.get(drug_a_id, {})
-        drug_b_info = drug_info.get(drug_b_id, {})
-
         log += "Drug Profile Analysis:\n"
         log += "-" * 20 + "\n"
         log += f"{drug_a.title()}:\n"
-        log += f"- Categories: {', '.join(drug_a_info.get('categories', ['Unknown']))}\n"
-        log += f"- Total known interactions: {len(drug_a_info.get('interactions', []))}\n\n"
+        log += f"- Categories: {', '.join(engine.categories[node_a] or ['Unknown'])}\n"
+        log += f"- Total known interactions: {engine.n_partners[node_a]}\n\n"
 
         log += f"{drug_b.title()}:\n"
-        log += f"- Categories: {', '.join(drug_b_info.get('categories', ['Unknown']))}\n"
-        log += f"- Total known interactions: {len(drug_b_info.get('interactions', []))}\n\n"
+        log += f"- Categories: {', '.join(engine.categories[node_b] or ['Unknown'])}\n"
+        log += f"- Total known interactions: {engine.n_partners[node_b]}\n\n"
 
         # Analyze interaction mechanisms
         log += "Interaction Mechanism Analysis:\n"
@@ -2796,25 +3713,18 @@ def find_alternative_drugs_ddinter(target_drug, contraindicated_drugs, therapeut
 
     try:
         # Load DDInter data
-        drug_info, interaction_matrix, name_mapping = _load_ddinter_data(data_lake_path)
-        log += f"Successfully loaded DDInter database with {len(drug_info)} drugs\n\n"
+        engine = get_ddinter_engine(data_lake_path)
+        log += f"Successfully loaded DDInter database with {len(engine)} drugs\n\n"
 
         # Standardize target drug name
-        std_target = _standardize_drug_name(target_drug, name_mapping)
-        if not std_target:
+        target_node = engine.resolve(target_drug)
+        if target_node is None:
             log += f"Error: Target drug '{target_drug}' not found in DDInter database\n"
             return log
 
         # Standardize contraindicated drug names
-        std_contraindicated = []
-        missing_contraindicated = []
-
-        for drug in contraindicated_drugs:
-            std_drug = _standardize_drug_name(drug, name_mapping)
-            if std_drug:
-                std_contraindicated.append(std_drug)
-            else:
-                missing_contraindicated.append(drug)
+        resolved, missing_contraindicated = engine.resolve_many(contraindicated_drugs)
+        std_contraindicated = [index for _, index in resolved]
 
         if missing_contraindicated:
             log += "Warning: The following contraindicated drugs were not found:\n"
@@ -2823,24 +3733,23 @@ def find_alternative_drugs_ddinter(target_drug, contraindicated_drugs, therapeut
             log += "\n"
 
         # Get target drug information
-        target_id = name_mapping[std_target]
-        target_info = drug_info.get(target_id, {})
-        target_categories = target_info.get("categories", [])
+        target_categories = engine.categories[target_node]
 
         log += "Target Drug Profile:\n"
         log += f"- Drug: {target_drug}\n"
         log += f"- Categories: {', '.join(target_categories)}\n"
-        log += f"- Total interactions: {len(target_info.get('interactions', []))}\n\n"
+        log += f"- Total interactions: {engine.n_partners[target_node]}\n\n"
+
+        # Interaction counts of every drug with the contraindicated drugs, computed once over the CSR rows
+        interaction_counts = engine.partner_counts(std_contraindicated)
+        major_counts = engine.partner_counts(std_contraindicated, severity_levels=["Major"])
 
         # Find alternative drugs
         alternatives = []
 
-        for drug_id, drug_data in drug_info.items():
-            drug_name = drug_data["name"]
-            drug_categories = drug_data.get("categories", [])
-
+        for node, drug_categories in enumerate(engine.categories):
             # Skip the target drug itself
-            if drug_id == target_id:
+            if node == target_node:
                 continue
 
             # Apply therapeutic class filter
@@ -2852,36 +3761,14 @@ def find_alternative_drugs_ddinter(target_drug, contraindicated_drugs, therapeut
                 if not any(cat in target_categories for cat in drug_categories):
                     continue
 
-            # Check if this drug interacts with any contraindicated drugs
-            has_contraindicated_interactions = False
-            interaction_count = 0
-            major_interactions = 0
-
-            std_drug_name = drug_data["standardized_name"]
-
-            for contraindicated in std_contraindicated:
-                if std_drug_name in interaction_matrix and contraindicated in interaction_matrix[std_drug_name]:
-                    interactions = interaction_matrix[std_drug_name][contraindicated]
-                    interaction_count += len(interactions)
-
-                    # Check for major interactions
-                    for interaction in interactions:
-                        if interaction.get("level") == "Major":
-                            major_interactions += 1
-                            has_contraindicated_interactions = True
-                            break
-
-                    if has_contraindicated_interactions:
-                        break
-
             # Add to alternatives if no major contraindicated interactions
-            if not has_contraindicated_interactions:
+            if not major_counts[node]:
                 alternatives.append(
                     {
-                        "name": drug_name,
+                        "name": engine.names[node],
                         "categories": drug_categories,
-                        "interaction_count": interaction_count,
-                        "total_interactions": len(drug_data.get("interactions", [])),
+                        "interaction_count": int(interaction_counts[node]),
+                        "total_interactions": int(engine.n_partners[node]),
                     }
                 )
 
@@ -2959,6 +3846,293 @@ def find_alternative_drugs_ddinter(target_drug, contraindicated_drugs, therapeut
     return log
 
 
+def resolve_drug_names(drug_names, cutoff=0.8, data_lake_path=None):
+    """
+    Map free-text drug names (brand names, salt forms, misspellings) onto DDInter drugs.
+
+    Parameters
+    ----------
+    drug_names : list of str
+        Drug names to resolve, e.g. a patient's medication list
+    cutoff : float, default 0.8
+        Minimum similarity score (0-1) for fuzzy matches
+    data_lake_path : str, optional
+        Path to data lake directory containing DDInter data
+
+    Returns
+    -------
+    str
+        Research log with the matched DDInter drug, score and match method per name
+    """
+    log = "DDInter Drug Name Resolution\n"
+    log += "=" * 28 + "\n"
+    log += f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+
+    if data_lake_path is None:
+        data_lake_path = os.path.join(os.path.dirname(__file__), "schema_db")
+
+    try:
+        engine = get_ddinter_engine(data_lake_path)
+        matches = engine.resolve_names(drug_names, cutoff=cutoff)
+
+        log += f"Resolved {sum(m is not None for m in matches)} of {len(drug_names)} names (cutoff {cutoff}):\n"
+        for drug_name, match in zip(drug_names, matches, strict=False):
+            if match is None:
+                log += f"- {drug_name}: not found\n"
+            else:
+                log += f"- {drug_name} -> {match['name']} (score {match['score']:.2f}, {match['method']})\n"
+
+    except Exception as e:
+        log += f"Error during drug name resolution: {str(e)}\n"
+
+    return log
+
+
+# Severity levels in decreasing order of clinical concern
+_DDINTER_SEVERITY_ORDER = ["Major", "Moderate", "Minor", "Unknown"]
+
+
+def _read_medication_lists(cohort, patient_column, drug_column):
+    """Return a long (patient, drug) table from a DataFrame, a {patient: drugs} dict or a CSV/TSV/Parquet path.
+
+    Also returns every distinct patient of the input, including those without any medication.
+    """
+    if isinstance(cohort, str):
+        if cohort.endswith(".parquet"):
+            cohort = pd.read_parquet(cohort, columns=[patient_column, drug_column])
+        else:
+            sep = "\t" if cohort.endswith((".tsv", ".txt")) else ","
+            cohort = pd.read_csv(cohort, sep=sep, usecols=[patient_column, drug_column])
+    elif isinstance(cohort, dict):
+        cohort = pd.DataFrame({patient_column: list(cohort), drug_column: list(cohort.values())})
+
+    missing = [c for c in (patient_column, drug_column) if c not in cohort.columns]
+    if missing:
+        raise ValueError(f"Cohort table is missing columns: {', '.join(missing)}")
+
+    medications = cohort[[patient_column, drug_column]]
+    patients = pd.Index(medications[patient_column].dropna().unique())
+    # One row per patient with a list of drugs is expanded to one row per drug
+    if medications[drug_column].map(lambda v: isinstance(v, list | tuple | set | np.ndarray)).any():
+        medications = medications.explode(drug_column)
+    medications = medications.dropna(subset=[patient_column, drug_column])
+    return medications[medications[drug_column].astype(str).str.strip() != ""].reset_index(drop=True), patients
+
+
+def _prepare_cohort(engine, cohort, patient_column, drug_column, cutoff=0.8):
+    """Resolve the distinct drug names of a cohort once and encode patients and drugs as integers."""
+    medications, patient_ids = _read_medication_lists(cohort, patient_column, drug_column)
+    names = medications[drug_column].astype(str).to_numpy()
+    # Patients without (resolvable) medications keep a code, so they count in the cohort size
+    patient_codes = patient_ids.get_indexer(medications[patient_column])
+
+    unique_names, name_codes = np.unique(names, return_inverse=True)
+    matches = engine.resolve_names(list(unique_names), cutoff=cutoff)
+    name_nodes = np.array([-1 if m is None else m["index"] for m in matches], dtype=np.int64)
+    nodes = name_nodes[name_codes]
+
+    resolved = nodes >= 0
+    keys = patient_codes[resolved].astype(np.int64) * len(engine) + nodes[resolved]
+    # Input spelling of each (patient, drug), for reporting
+    queries = pd.Series(names[resolved], index=keys).groupby(level=0).first()
+    return {
+        "patient_ids": patient_ids,
+        "patient_codes": patient_codes,
+        "nodes": nodes,
+        "queries": queries,
+        "n_medications": len(names),
+        "unresolved": [str(n) for n, node in zip(unique_names, name_nodes, strict=False) if node < 0],
+    }
+
+
+def _iter_cohort_pairs(engine, prepared, patient_column, severity_levels=None, chunk_size=5000):
+    """Yield one tidy DataFrame of interacting pairs per chunk of ``chunk_size`` patients."""
+    levels = _DDINTER_SEVERITY_ORDER + [level for level in engine.levels if level not in _DDINTER_SEVERITY_ORDER]
+    level_columns = [levels.index(level) for level in engine.levels]
+    patient_codes, nodes = prepared["patient_codes"], prepared["nodes"]
+    resolved = nodes >= 0
+    n = len(engine)
+
+    for start in range(0, len(prepared["patient_ids"]), chunk_size):
+        in_chunk = resolved & (patient_codes >= start) & (patient_codes < start + chunk_size)
+        group, node_a, node_b, level_counts = engine.cohort_pairs(patient_codes[in_chunk] - start, nodes[in_chunk])
+
+        counts = np.zeros((len(group), len(levels)), dtype=np.int64)
+        counts[:, level_columns] = level_counts
+        if severity_levels:
+            selected = [levels.index(level) for level in severity_levels if level in levels]
+            keep = counts[:, selected].sum(axis=1) > 0
+            group, node_a, node_b, counts = group[keep], node_a[keep], node_b[keep], counts[keep]
+        if not len(group):
+            continue
+
+        patients = group + start
+        standardized = np.asarray(engine.standardized, dtype=object)
+        # Order each pair alphabetically so the same pair has the same (drug_a, drug_b) in every patient
+        swap = standardized[node_a] > standardized[node_b]
+        node_a, node_b = np.where(swap, node_b, node_a), np.where(swap, node_a, node_b)
+        pairs = pd.DataFrame(
+            {
+                patient_column: prepared["patient_ids"][patients],
+                "drug_a": standardized[node_a],
+                "drug_b": standardized[node_b],
+                "drug_a_query": prepared["queries"].reindex(patients * n + node_a).to_numpy(),
+                "drug_b_query": prepared["queries"].reindex(patients * n + node_b).to_numpy(),
+                "n_interactions": counts.sum(axis=1),
+            }
+        )
+        for i, level in enumerate(levels):
+            pairs[f"n_{level.lower()}"] = counts[:, i]
+        pairs["max_severity"] = np.asarray(levels, dtype=object)[np.argmax(counts > 0, axis=1)]
+        yield pairs
+
+
+def iter_cohort_drug_interactions(
+    cohort, patient_column="patient_id", drug_column="drug", severity_levels=None, chunk_size=5000, data_lake_path=None
+):
+    """
+    Stream the interacting drug pairs of many medication lists as tidy DataFrames.
+
+    Parameters
+    ----------
+    cohort : pandas.DataFrame, dict or str
+        Long table with one row per (patient, drug), a table with one list of drugs per patient,
+        a {patient_id: [drugs]} dict, or a CSV/TSV/Parquet file with the long table
+    patient_column : str, default "patient_id"
+        Column identifying the patient (or any medication list)
+    drug_column : str, default "drug"
+        Column with drug names (or lists of drug names)
+    severity_levels : list of str, optional
+        Keep only pairs with at least one interaction of these levels (e.g. ['Major'])
+    chunk_size : int, default 5000
+        Number of patients processed per yielded chunk
+    data_lake_path : str, optional
+        Path to data lake directory containing DDInter data
+
+    Yields
+    ------
+    pandas.DataFrame
+        One row per patient and interacting pair: patient, drug_a, drug_b, the input spellings,
+        n_interactions, one n_<level> count column per severity level and max_severity
+    """
+    if data_lake_path is None:
+        data_lake_path = os.path.join(os.path.dirname(__file__), "schema_db")
+
+    engine = get_ddinter_engine(data_lake_path)
+    prepared = _prepare_cohort(engine, cohort, patient_column, drug_column)
+    yield from _iter_cohort_pairs(engine, prepared, patient_column, severity_levels, chunk_size)
+
+
+def scan_cohort_drug_interactions(
+    cohort,
+    patient_column="patient_id",
+    drug_column="drug",
+    severity_levels=None,
+    output_file=None,
+    chunk_size=5000,
+    data_lake_path=None,
+):
+    """
+    Screen the medication lists of a whole cohort for drug-drug interactions from DDInter.
+
+    Parameters
+    ----------
+    cohort : pandas.DataFrame, dict or str
+        Long table with one row per (patient, drug), a table with one list of drugs per patient,
+        a {patient_id: [drugs]} dict, or a CSV/TSV/Parquet file with the long table
+    patient_column : str, default "patient_id"
+        Column identifying the patient (or any medication list)
+    drug_column : str, default "drug"
+        Column with drug names (or lists of drug names)
+    severity_levels : list of str, optional
+        Keep only pairs with at least one interaction of these levels (e.g. ['Major'])
+    output_file : str, optional
+        CSV file the tidy table of interacting pairs is streamed to, chunk by chunk
+    chunk_size : int, default 5000
+        Number of patients processed at a time
+    data_lake_path : str, optional
+        Path to data lake directory containing DDInter data
+
+    Returns
+    -------
+    str
+        Research log with cohort-level interaction statistics and the most frequent pairs
+    """
+    log = "DDInter Cohort Polypharmacy Scan\n"
+    log += "=" * 32 + "\n"
+    log += f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+
+    if data_lake_path is None:
+        data_lake_path = os.path.join(os.path.dirname(__file__), "schema_db")
+
+    log += "Scan Parameters:\n"
+    log += f"- Severity filter: {severity_levels if severity_levels else 'All levels'}\n"
+    log += f"- Output file: {output_file if output_file else 'None'}\n\n"
+
+    try:
+        engine = get_ddinter_engine(data_lake_path)
+        prepared = _prepare_cohort(engine, cohort, patient_column, drug_column)
+        n_patients = len(prepared["patient_ids"])
+        log += f"Successfully loaded DDInter database with {len(engine)} drugs\n"
+        log += f"Cohort: {n_patients} patients, {prepared['n_medications']} medication entries\n"
+
+        unresolved = prepared["unresolved"]
+        if unresolved:
+            shown = ", ".join(unresolved[:10]) + (f" and {len(unresolved) - 10} more" if len(unresolved) > 10 else "")
+            log += f"Warning: {len(unresolved)} drug names not found in DDInter database: {shown}\n"
+        log += "\n"
+
+        if output_file and os.path.exists(output_file):
+            os.remove(output_file)
+
+        total_pairs = 0
+        patients_with_pairs = 0
+        severity_totals = {}
+        patients_by_severity = {}
+        pair_frequency = None
+        severity_rank = {level: i for i, level in enumerate(_DDINTER_SEVERITY_ORDER)}
+        for pairs in _iter_cohort_pairs(engine, prepared, patient_column, severity_levels, chunk_size):
+            if output_file:
+                pairs.to_csv(output_file, mode="a", header=not os.path.exists(output_file), index=False)
+
+            total_pairs += len(pairs)
+            patients_with_pairs += pairs[patient_column].nunique()
+            for column in pairs.columns[pairs.columns.str.startswith("n_") & (pairs.columns != "n_interactions")]:
+                level = column[2:].title()
+                severity_totals[level] = severity_totals.get(level, 0) + int(pairs[column].sum())
+            # Patients are never split across chunks, so per-chunk worst severities add up
+            rank = pairs["max_severity"].map(lambda level: severity_rank.get(level, len(severity_rank)))
+            worst = rank.groupby(pairs[patient_column]).min().map(dict(enumerate(_DDINTER_SEVERITY_ORDER)))
+            for level, patients in worst.fillna("Other").value_counts().items():
+                patients_by_severity[level] = patients_by_severity.get(level, 0) + int(patients)
+            chunk_frequency = pairs.groupby(["drug_a", "drug_b"]).size()
+            pair_frequency = (
+                chunk_frequency if pair_frequency is None else pair_frequency.add(chunk_frequency, fill_value=0)
+            )
+
+        log += "Cohort Interaction Summary:\n"
+        log += f"- Patients with at least one interacting pair: {patients_with_pairs} of {n_patients}\n"
+        log += f"- Interacting drug pairs (patient level): {total_pairs}\n"
+        severity_totals = {level: count for level, count in severity_totals.items() if count}
+        log += f"- Interactions by severity: {severity_totals}\n"
+        log += f"- Patients by highest severity: {patients_by_severity}\n\n"
+
+        if pair_frequency is not None:
+            log += "Most Frequent Interacting Pairs (patients):\n"
+            for (drug_a, drug_b), count in pair_frequency.sort_values(ascending=False, kind="stable").head(20).items():
+                log += f"- {drug_a.title()} + {drug_b.title()}: {int(count)}\n"
+        else:
+            log += "No interacting drug pairs found in the cohort with the given filters\n"
+
+        if output_file:
+            log += f"\nInteracting pairs table saved to: {output_file}\n"
+
+    except Exception as e:
+        log += f"Error during cohort interaction scan: {str(e)}\n"
+
+    return log
+
+
 # OpenFDA Integration Functions
 
 
@@ -2972,29 +4146,32 @@ class OpenFDAClient:
 
     BASE_URL = "https://api.fda.gov"
 
-    def __init__(self):
+    # openFDA paging limits: records per page and terms per count query
+    MAX_PAGE_SIZE = 1000
+    MAX_COUNT_TERMS = 1000
+
+    def __init__(self, cache_dir: str | None = None, cache_ttl: float | None = 7 * 24 * 3600):
         import time
 
         import requests
 
         self.requests = requests
         self.time = time
-        self.session = requests.Session()
+        self.session = mount_transport(requests.Session())
         self.session.headers.update({"User-Agent": "Biomni-Agent/1.0 (https://biomni.stanford.edu)"})
         self.retry_attempts = 3
         self.timeout = 30
-        self.rate_limit_delay = 0.2  # 5 requests/second
-        self.last_request_time = 0
+        # Shared by every client and session in the process, so concurrent instances cannot exceed the quota
+        self.rate_limiter = get_rate_limiter(self.BASE_URL)
+        # Disk cache for count queries and bulk pages; entries older than cache_ttl seconds are refetched
+        self.cache_dir = cache_dir or os.environ.get(
+            "BIOMNI_OPENFDA_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "biomni", "openfda")
+        )
+        self.cache_ttl = cache_ttl
 
     def _handle_rate_limiting(self):
-        """Implement rate limiting to respect FDA API limits."""
-        current_time = self.time.time()
-        time_since_last = current_time - self.last_request_time
-
-        if time_since_last < self.rate_limit_delay:
-            self.time.sleep(self.rate_limit_delay - time_since_last)
-
-        self.last_request_time = self.time.time()
+        """Wait for the process-wide openFDA rate limit (and a concurrency slot, if capped) around a request."""
+        return self.rate_limiter.slot()
 
     def _validate_response(self, response_data: dict) -> dict:
         """Validate FDA API response structure and handle variations."""
@@ -3066,28 +4243,30 @@ class OpenFDAClient:
 
     def _make_request(self, endpoint: str, params: dict) -> dict:
         """Make API request with retry logic and error handling."""
-        self._handle_rate_limiting()
-
         # Build FDA API search parameters
         fda_params = self._build_fda_search_params(endpoint, params)
+        return self._fetch(f"{self.BASE_URL}/{endpoint}.json", fda_params)[0]
 
+    def _fetch(self, url: str, fda_params: dict | None = None) -> tuple[dict, str | None]:
+        """GET one openFDA page with retries; returns the validated data and the ``search_after`` next-page URL."""
         for attempt in range(self.retry_attempts):
             try:
-                response = self.session.get(f"{self.BASE_URL}/{endpoint}.json", params=fda_params, timeout=self.timeout)
+                with self._handle_rate_limiting():
+                    response = self.session.get(url, params=fda_params, timeout=self.timeout)
 
                 if response.status_code == 404:
                     return {
                         "results": [],
                         "meta": {"results": {"total": 0}},
                         "message": "No results found for the specified query",
-                    }
+                    }, None
 
                 response.raise_for_status()
 
                 # Validate and normalize response
                 data = self._validate_response(response.json())
 
-                return data
+                return data, response.links.get("next", {}).get("url")
 
             except self.requests.exceptions.Timeout:
                 if attempt == self.retry_attempts - 1:
@@ -3107,7 +4286,7 @@ class OpenFDAClient:
                     raise Exception(f"FDA API request failed: {str(e)}") from e
                 self.time.sleep(2**attempt)
 
-        return {}
+        return {}, None
 
     def query_adverse_events(self, drug_name: str, limit: int = 100) -> dict:
         """Query adverse events with robust error handling and validation."""
@@ -3151,12 +4330,124 @@ class OpenFDAClient:
 
         return self._make_request(endpoint, params)
 
+    def _cache_path(self, url: str, fda_params: dict | None) -> str:
+        import hashlib
+        import json
+
+        key = json.dumps([url, sorted((fda_params or {}).items())], default=str)
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+    def _cached_fetch(self, url: str, fda_params: dict | None = None) -> tuple[dict, str | None]:
+        """``_fetch`` through the disk cache; empty (404) results are cached as well."""
+        import json
+
+        path = self._cache_path(url, fda_params)
+        if os.path.exists(path) and (
+            self.cache_ttl is None or self.time.time() - os.path.getmtime(path) < self.cache_ttl
+        ):
+            try:
+                with open(path) as f:
+                    cached = json.load(f)
+                return cached["data"], cached["next"]
+            except (OSError, ValueError, KeyError):
+                pass  # unreadable entry, refetch below
+
+        data, next_url = self._fetch(url, fda_params)
+        if data:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"data": data, "next": next_url}, f)
+            os.replace(tmp_path, path)
+        return data, next_url
+
+    @staticmethod
+    def adverse_event_search(drug_name: str | None = None, search: str | None = None) -> str | None:
+        """openFDA search expression for reports listing ``drug_name`` as a product, ANDed with ``search``."""
+        clauses = []
+        if drug_name:
+            clauses.append(f'patient.drug.medicinalproduct:"{drug_name}"')
+        if search:
+            clauses.append(f"({search})")
+        return " AND ".join(clauses) or None
+
+    def count_adverse_events(
+        self,
+        drug_name: str | None = None,
+        count_field: str = "patient.reaction.reactionmeddrapt.exact",
+        search: str | None = None,
+        limit: int = 1000,
+    ) -> pd.DataFrame:
+        """
+        Frequency table of ``count_field`` over all matching adverse event reports.
+
+        The counting is done server-side with an openFDA ``count=`` query, so the table covers every
+        report rather than a page of raw records. Returns a DataFrame with ``term`` and ``count``
+        (reports per term) columns, most frequent first, holding at most MAX_COUNT_TERMS terms.
+        """
+        fda_params = {"count": count_field, "limit": max(1, min(limit, self.MAX_COUNT_TERMS))}
+        query = self.adverse_event_search(drug_name, search)
+        if query:
+            fda_params["search"] = query
+        data, _ = self._cached_fetch(f"{self.BASE_URL}/drug/event.json", fda_params)
+        return pd.DataFrame(data.get("results", []), columns=["term", "count"])
+
+    def count_adverse_event_reports(self, drug_name: str | None = None, search: str | None = None) -> int:
+        """Number of adverse event reports matching the query (the whole database when both are None)."""
+        fda_params = {"limit": 1}
+        query = self.adverse_event_search(drug_name, search)
+        if query:
+            fda_params["search"] = query
+        data, _ = self._cached_fetch(f"{self.BASE_URL}/drug/event.json", fda_params)
+        return int(data.get("meta", {}).get("results", {}).get("total", 0))
+
+    def fetch_adverse_events(
+        self,
+        drug_name: str | None = None,
+        search: str | None = None,
+        max_records: int | None = None,
+        page_size: int = 1000,
+    ) -> list[dict]:
+        """
+        Pull all matching adverse event reports (or the first ``max_records``), ordered by receive date.
+
+        Pages are followed through the ``search_after`` links of the responses rather than ``skip``
+        offsets: receive dates are not unique, so the server's order of same-day reports can differ
+        between independent ``skip`` requests and reports would be duplicated or dropped at page
+        boundaries. Reports are de-duplicated on ``safetyreportid``. Every page goes through the disk
+        cache, so an interrupted pull resumes without refetching the pages it already has.
+        """
+        url = f"{self.BASE_URL}/drug/event.json"
+        page_size = max(1, min(page_size, self.MAX_PAGE_SIZE))
+        base_params = {"sort": "receivedate:asc", "limit": page_size}
+        query = self.adverse_event_search(drug_name, search)
+        if query:
+            base_params["search"] = query
+
+        page, next_url = self._cached_fetch(url, base_params)
+        total = int(page.get("meta", {}).get("results", {}).get("total", 0))
+        n_records = total if max_records is None else min(total, max_records)
+
+        records = {}
+        while True:
+            for record in page.get("results", []):
+                records.setdefault(record.get("safetyreportid") or f"_{len(records)}", record)
+            # search_after cursors only link forward, so the pages are sequential
+            if not next_url or len(records) >= n_records:
+                break
+            page, next_url = self._cached_fetch(next_url)
+            if not page.get("results"):
+                break
+        return list(records.values())[:n_records]
+
 
 # Helper Functions for OpenFDA Data Processing
 
 
+@lru_cache(maxsize=65536)
 def _standardize_drug_name_fda(drug_name: str) -> str:
-    """Standardize drug names for FDA API queries."""
+    """Standardize drug names for FDA API queries (memoized: adverse event reports repeat product names)."""
     # Handle None/empty values
     if not drug_name:
         return ""
@@ -3234,6 +4525,9 @@ def _extract_fda_safety_signals(response_list: list[dict]) -> dict:
     reaction_patterns = {}
     temporal_patterns = {}
 
+    # Reaction counts per standardized drug, collected in the same pass as the report counts
+    drug_reactions = {}
+
     for response in response_list:
         if not response.get("results"):
             continue
@@ -3241,19 +4535,30 @@ def _extract_fda_safety_signals(response_list: list[dict]) -> dict:
         for result in response["results"]:
             # Extract drug information
             drugs = result.get("patient", {}).get("drug", [])
+            reactions = result.get("patient", {}).get("reaction", [])
+            report_drugs = set()
             for drug in drugs:
                 # Use the existing standardization function
                 drug_name = _standardize_drug_name_fda(drug.get("medicinalproduct", ""))
                 if drug_name:
                     if drug_name not in drug_signals:
                         drug_signals[drug_name] = {"total_reports": 0, "serious_reports": 0, "common_reactions": []}
+                        drug_reactions[drug_name] = {}
 
                     drug_signals[drug_name]["total_reports"] += 1
                     if result.get("serious") == "1":
                         drug_signals[drug_name]["serious_reports"] += 1
+                    report_drugs.add(drug_name)
+
+            # Reactions of this report count once for each distinct drug in it
+            for drug_name in report_drugs:
+                counts = drug_reactions[drug_name]
+                for reaction in reactions:
+                    reaction_name = reaction.get("reactionmeddrapt", "")
+                    if reaction_name:
+                        counts[reaction_name] = counts.get(reaction_name, 0) + 1
 
             # Extract reaction patterns
-            reactions = result.get("patient", {}).get("reaction", [])
             for reaction in reactions:
                 reaction_name = reaction.get("reactionmeddrapt", "")
                 if reaction_name:
@@ -3282,32 +4587,9 @@ def _extract_fda_safety_signals(response_list: list[dict]) -> dict:
                 if result.get("serious") == "1":
                     temporal_patterns[year_month]["serious_count"] += 1
 
-    # Build common reactions for each drug based on actual data
-    for drug_name in drug_signals:
-        # Find reactions that occurred with this specific drug
-        drug_reactions = {}
-
-        for response in response_list:
-            if not response.get("results"):
-                continue
-
-            for result in response["results"]:
-                drugs = result.get("patient", {}).get("drug", [])
-                has_this_drug = any(
-                    _standardize_drug_name_fda(drug.get("medicinalproduct", "")) == drug_name for drug in drugs
-                )
-
-                if has_this_drug:
-                    reactions = result.get("patient", {}).get("reaction", [])
-                    for reaction in reactions:
-                        reaction_name = reaction.get("reactionmeddrapt", "")
-                        if reaction_name:
-                            if reaction_name not in drug_reactions:
-                                drug_reactions[reaction_name] = 0
-                            drug_reactions[reaction_name] += 1
-
-        # Get top 3 reactions for this drug
-        top_reactions = sorted(drug_reactions.items(), key=lambda x: x[1], reverse=True)[:3]
+    # Get top 3 reactions for each drug
+    for drug_name, counts in drug_reactions.items():
+        top_reactions = sorted(counts.items(), key=lambda x: x[1], reverse=True)[:3]
         drug_signals[drug_name]["common_reactions"] = [r[0] for r in top_reactions]
 
     return {
@@ -3317,6 +4599,151 @@ def _extract_fda_safety_signals(response_list: list[dict]) -> dict:
     }
 
 
+def _aggregate_fda_safety_signals(client: OpenFDAClient, drug_names: list[str]) -> dict:
+    """Build the ``_extract_fda_safety_signals`` structure from count queries over all reports of each drug."""
+    drug_signals = {}
+    reaction_patterns = {}
+
+    for drug_name in drug_names:
+        total_reports = client.count_adverse_event_reports(drug_name)
+        if not total_reports:
+            continue
+        reactions = client.count_adverse_events(drug_name)
+        serious_reactions = client.count_adverse_events(drug_name, search="serious:1")
+        drug_signals[drug_name] = {
+            "total_reports": total_reports,
+            "serious_reports": client.count_adverse_event_reports(drug_name, search="serious:1"),
+            "common_reactions": reactions["term"].head(3).tolist(),
+        }
+
+        serious_counts = dict(zip(serious_reactions["term"], serious_reactions["count"], strict=False))
+        for reaction_name, count in zip(reactions["term"], reactions["count"], strict=False):
+            pattern = reaction_patterns.setdefault(
+                reaction_name, {"count": 0, "severity_counts": {"serious": 0, "non_serious": 0}}
+            )
+            serious = int(serious_counts.get(reaction_name, 0))
+            pattern["count"] += int(count)
+            pattern["severity_counts"]["serious"] += serious
+            pattern["severity_counts"]["non_serious"] += int(count) - serious
+
+    # The summary does not report temporal patterns; count=receivedate queries can supply them if needed
+    return {"drug_signals": drug_signals, "reaction_patterns": reaction_patterns, "temporal_patterns": {}}
+
+
+def _disproportionality_statistics(
+    drug_reaction_reports, drug_reports, reaction_reports, total_reports: int
+) -> dict[str, np.ndarray]:
+    """
+    PRR and ROR with 95% confidence intervals and Yates chi-square for a drugs x reactions count matrix.
+
+    ``drug_reaction_reports[i, j]`` counts the reports listing drug i and reaction j. The rest of each
+    2x2 table follows from the reports per drug, the reports per reaction and the database total, so
+    all drug-reaction pairs are computed at once by broadcasting.
+    """
+    a = np.asarray(drug_reaction_reports, dtype=float)
+    drug_totals = np.asarray(drug_reports, dtype=float)[:, None]
+    reaction_totals = np.asarray(reaction_reports, dtype=float)[None, :]
+
+    # Counts come from separate queries, so clip cells that rounding of the index makes negative
+    b = np.maximum(drug_totals - a, 0)
+    c = np.maximum(reaction_totals - a, 0)
+    d = np.maximum(total_reports - drug_totals - reaction_totals + a, 0)
+    n = a + b + c + d
+    z = 1.959963984540054
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prr = (a / (a + b)) / (c / (c + d))
+        ror = (a * d) / (b * c)
+        prr_se = np.sqrt(1 / a - 1 / (a + b) + 1 / c - 1 / (c + d))
+        ror_se = np.sqrt(1 / a + 1 / b + 1 / c + 1 / d)
+        chi_square = n * np.maximum(np.abs(a * d - b * c) - n / 2, 0) ** 2 / ((a + b) * (c + d) * (a + c) * (b + d))
+
+        return {
+            "prr": prr,
+            "prr_lower": prr * np.exp(-z * prr_se),
+            "prr_upper": prr * np.exp(z * prr_se),
+            "ror": ror,
+            "ror_lower": ror * np.exp(-z * ror_se),
+            "ror_upper": ror * np.exp(z * ror_se),
+            "chi_square": np.nan_to_num(chi_square, nan=0.0),
+        }
+
+
+def _fda_disproportionality_table(
+    client: OpenFDAClient,
+    drug_names: list[str],
+    reactions: list[str] | None = None,
+    top_n: int = 20,
+    min_reports: int = 3,
+    prr_threshold: float = 2.0,
+) -> pd.DataFrame:
+    """
+    Disproportionality metrics for each drug against the whole openFDA database, one row per drug-reaction pair.
+
+    Reactions default to the union of each drug's ``top_n`` most reported reactions. A pair is flagged
+    as a signal by the usual criteria: at least ``min_reports`` reports, PRR >= ``prr_threshold`` and
+    chi-square >= 4.
+    """
+    total_reports = client.count_adverse_event_reports()
+    drug_reports = np.array([client.count_adverse_event_reports(drug) for drug in drug_names], dtype=np.int64)
+    drug_counts = [client.count_adverse_events(drug).set_index("term")["count"] for drug in drug_names]
+
+    if reactions:
+        reaction_names = list(dict.fromkeys(r.strip().upper() for r in reactions if r and r.strip()))
+    else:
+        reaction_names = list(dict.fromkeys(term for counts in drug_counts for term in counts.index[:top_n]))
+    columns = [
+        "drug",
+        "reaction",
+        "reports",
+        "drug_reports",
+        "reaction_reports",
+        "prr",
+        "prr_lower",
+        "prr_upper",
+        "ror",
+        "ror_lower",
+        "ror_upper",
+        "chi_square",
+        "signal",
+    ]
+    if not reaction_names:
+        return pd.DataFrame(columns=columns)
+
+    # Background reaction frequencies: one count query, plus single lookups for terms outside its top terms
+    background = client.count_adverse_events().set_index("term")["count"]
+    reaction_reports = background.reindex(reaction_names)
+    for reaction_name in reaction_reports.index[reaction_reports.isna()]:
+        reaction_reports[reaction_name] = client.count_adverse_event_reports(
+            search=f'patient.reaction.reactionmeddrapt.exact:"{reaction_name}"'
+        )
+
+    # A reaction missing from a drug's count table is a true zero only when the table holds all of the
+    # drug's terms; a table cut at MAX_COUNT_TERMS drops rare reactions, so those cells are looked up exactly
+    counts = np.vstack([c.reindex(reaction_names).to_numpy(dtype=float) for c in drug_counts])
+    for i, j in zip(*np.nonzero(np.isnan(counts)), strict=True):
+        if len(drug_counts[i]) < client.MAX_COUNT_TERMS:
+            counts[i, j] = 0
+        else:
+            counts[i, j] = client.count_adverse_event_reports(
+                drug_names[i], search=f'patient.reaction.reactionmeddrapt.exact:"{reaction_names[j]}"'
+            )
+    stats = _disproportionality_statistics(counts, drug_reports, reaction_reports.to_numpy(dtype=float), total_reports)
+
+    table = pd.DataFrame(
+        {
+            "drug": np.repeat(drug_names, len(reaction_names)),
+            "reaction": np.tile(reaction_names, len(drug_names)),
+            "reports": counts.ravel().astype(np.int64),
+            "drug_reports": np.repeat(drug_reports, len(reaction_names)),
+            "reaction_reports": np.tile(reaction_reports.to_numpy(dtype=np.int64), len(drug_names)),
+            **{name: values.ravel() for name, values in stats.items()},
+        }
+    )
+    table["signal"] = (table["reports"] >= min_reports) & (table["prr"] >= prr_threshold) & (table["chi_square"] >= 4)
+    return table[columns]
+
+
 def _generate_fda_statistics(response_data: dict) -> dict:
     """Generate summary statistics from FDA responses."""
     stats = {
@@ -3737,7 +5164,10 @@ def check_fda_drug_recalls(
 
 
 def analyze_fda_safety_signals(
-    drug_list: list[str], comparison_period: tuple[str, str] | None = None, signal_threshold: float = 2.0
+    drug_list: list[str],
+    comparison_period: tuple[str, str] | None = None,
+    signal_threshold: float = 2.0,
+    use_counts: bool = False,
 ) -> str:
     """
     Analyze safety signals across multiple drugs.
@@ -3746,6 +5176,8 @@ def analyze_fda_safety_signals(
         drug_list: List of drug names to analyze
         comparison_period: Optional comparison time period
         signal_threshold: Threshold for signal detection
+        use_counts: Compute the statistics with openFDA count queries over all reports instead of a
+            sample of 200 reports per drug, and add PRR-based disproportionality signals
 
     Returns:
         Formatted string with safety signal analysis
@@ -3765,6 +5197,26 @@ def analyze_fda_safety_signals(
 
         client = OpenFDAClient()
 
+        if use_counts:
+            drug_names = list(dict.fromkeys(_standardize_drug_name_fda(drug) for drug in valid_drugs if drug))
+            signals = _aggregate_fda_safety_signals(client, drug_names)
+            if not signals["drug_signals"]:
+                return "Error: No adverse event data found for any of the provided drugs"
+
+            summary = _format_safety_signal_summary(signals, drug_names, comparison_period, signal_threshold)
+            table = _fda_disproportionality_table(client, drug_names, top_n=10, prr_threshold=signal_threshold)
+            summary += f"\nDisproportionality signals (PRR >= {signal_threshold}, >= 3 reports, chi-square >= 4):\n"
+            flagged = table[table["signal"]].sort_values(["drug", "prr"], ascending=[True, False])
+            if flagged.empty:
+                summary += "- None among the most reported reactions\n"
+            for drug_name, rows in flagged.groupby("drug", sort=False):
+                summary += f"- {drug_name.title()}: "
+                summary += ", ".join(
+                    f"{r.reaction} (PRR {r.prr:.2f}, n={r.reports:,})" for r in rows.head(5).itertuples()
+                )
+                summary += "\n"
+            return summary
+
         # Collect data for all drugs
         all_responses = []
 
@@ -3788,3 +5240,183 @@ def analyze_fda_safety_signals(
 
     except Exception as e:
         return f"Error analyzing FDA safety signals: {str(e)}"
+
+
+# Named openFDA adverse event fields for count queries
+_FDA_COUNT_FIELDS = {
+    "reaction": "patient.reaction.reactionmeddrapt.exact",
+    "outcome": "patient.reaction.reactionoutcome",
+    "seriousness": "serious",
+    "sex": "patient.patientsex",
+    "country": "occurcountry.exact",
+    "drug": "patient.drug.medicinalproduct.exact",
+    "indication": "patient.drug.drugindication.exact",
+    "received": "receivedate",
+}
+
+
+def query_fda_adverse_event_counts(
+    drug_name: str, count_field: str = "reaction", limit: int = 25, serious_only: bool = False
+) -> str:
+    """
+    Count FDA adverse event reports for a drug by reaction, outcome or another report field.
+
+    The frequency table is computed by openFDA over every report of the drug (a ``count=`` query),
+    and responses are cached on disk.
+
+    Args:
+        drug_name: Name of the drug to query
+        count_field: One of "reaction", "outcome", "seriousness", "sex", "country", "drug", "indication",
+            "received", or a raw openFDA field name
+        limit: Number of most frequent terms to list (at most 1000)
+        serious_only: Only count serious reports
+
+    Returns:
+        Formatted string with the frequency table
+    """
+    try:
+        if not drug_name or not drug_name.strip():
+            return "Error: Drug name cannot be empty"
+
+        standardized_name = _standardize_drug_name_fda(drug_name)
+        field = _FDA_COUNT_FIELDS.get(count_field, count_field)
+        search = "serious:1" if serious_only else None
+
+        client = OpenFDAClient()
+        total_reports = client.count_adverse_event_reports(standardized_name, search=search)
+        if not total_reports:
+            return f"No adverse event reports found for '{drug_name}'"
+        counts = client.count_adverse_events(standardized_name, count_field=field, search=search, limit=limit)
+
+        summary = "OpenFDA Adverse Event Counts\n"
+        summary += "=" * 28 + "\n"
+        summary += f"Drug: {drug_name}\n"
+        summary += f"Field: {field}\n"
+        summary += f"Reports: {total_reports:,}{' (serious only)' if serious_only else ''}\n\n"
+        for rank, (term, count) in enumerate(zip(counts["term"], counts["count"], strict=False), 1):
+            summary += f"{rank}. {term}: {count:,} ({100 * count / total_reports:.1f}% of reports)\n"
+        summary += (
+            "\nFDA Disclaimer: These data do not establish causation. "
+            "Reports are voluntary and subject to reporting bias.\n"
+        )
+        return summary
+
+    except Exception as e:
+        return f"Error counting FDA adverse events: {str(e)}"
+
+
+def compute_fda_disproportionality(
+    drug_list: list[str],
+    reactions: list[str] | None = None,
+    top_n: int = 20,
+    min_reports: int = 3,
+    prr_threshold: float = 2.0,
+    output_file: str | None = None,
+) -> str:
+    """
+    Compute disproportionality metrics (PRR, ROR) for drugs against the whole openFDA adverse event database.
+
+    Report counts come from cached openFDA count queries, and the 2x2 tables of all drug-reaction
+    pairs are evaluated together as arrays.
+
+    Args:
+        drug_list: Drug names to analyze
+        reactions: MedDRA preferred terms to evaluate; defaults to each drug's most reported reactions
+        top_n: Number of most reported reactions per drug used when ``reactions`` is not given
+        min_reports: Minimum reports of a drug-reaction pair for it to count as a signal
+        prr_threshold: Minimum PRR for a signal (chi-square >= 4 is also required)
+        output_file: Optional CSV path for the full table
+
+    Returns:
+        Formatted string with the signals per drug
+    """
+    try:
+        drug_names = list(dict.fromkeys(_standardize_drug_name_fda(d) for d in drug_list or [] if d and d.strip()))
+        if not drug_names:
+            return "Error: No valid drug names provided"
+
+        client = OpenFDAClient()
+        table = _fda_disproportionality_table(client, drug_names, reactions, top_n, min_reports, prr_threshold)
+        if table.empty:
+            return "Error: No adverse event data found for any of the provided drugs"
+
+        summary = "OpenFDA Disproportionality Analysis\n"
+        summary += "=" * 35 + "\n"
+        summary += f"Drugs analyzed: {drug_names}\n"
+        summary += f"Reactions evaluated: {table['reaction'].nunique()}\n"
+        summary += f"Signal criteria: >= {min_reports} reports, PRR >= {prr_threshold}, chi-square >= 4\n\n"
+
+        for i, drug_name in enumerate(drug_names, 1):
+            rows = table[table["drug"] == drug_name]
+            summary += f"{i}. {drug_name.title()} ({int(rows['drug_reports'].iloc[0]):,} reports)\n"
+            signals = rows[rows["signal"]].sort_values("prr", ascending=False)
+            if signals.empty:
+                summary += "   - No signals detected\n\n"
+                continue
+            for row in signals.itertuples():
+                summary += (
+                    f"   - {row.reaction}: n={row.reports:,}, PRR {row.prr:.2f} ({row.prr_lower:.2f}-{row.prr_upper:.2f}), "
+                    f"ROR {row.ror:.2f} ({row.ror_lower:.2f}-{row.ror_upper:.2f}), chi-square {row.chi_square:.1f}\n"
+                )
+            summary += "\n"
+
+        if output_file:
+            table.to_csv(output_file, index=False)
+            summary += f"Full table ({len(table)} drug-reaction pairs) saved to {output_file}\n"
+        summary += (
+            "FDA Disclaimer: These data do not establish causation. "
+            "Reports are voluntary and subject to reporting bias.\n"
+        )
+        return summary
+
+    except Exception as e:
+        return f"Error computing FDA disproportionality: {str(e)}"
+
+
+def download_fda_adverse_events(
+    drug_name: str,
+    output_file: str,
+    max_records: int | None = None,
+    serious_only: bool = False,
+) -> str:
+    """
+    Download all FDA adverse event reports for a drug to a JSON Lines file.
+
+    Pages are fetched within openFDA's rate limit by following its ``search_after`` links, and each
+    page is cached on disk so an interrupted download resumes where it stopped.
+
+    Args:
+        drug_name: Name of the drug to download reports for
+        output_file: Path of the JSON Lines file to write (one report per line)
+        max_records: Optional cap on the number of reports
+        serious_only: Only download serious reports
+
+    Returns:
+        Formatted string describing the download
+    """
+    import json
+
+    try:
+        if not drug_name or not drug_name.strip():
+            return "Error: Drug name cannot be empty"
+
+        client = OpenFDAClient()
+        standardized_name = _standardize_drug_name_fda(drug_name)
+        search = "serious:1" if serious_only else None
+        total_reports = client.count_adverse_event_reports(standardized_name, search=search)
+        records = client.fetch_adverse_events(standardized_name, search=search, max_records=max_records)
+
+        with open(output_file, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+        summary = "OpenFDA Adverse Event Download\n"
+        summary += "=" * 30 + "\n"
+        summary += f"Drug: {drug_name}\n"
+        summary += f"Matching reports: {total_reports:,}{' (serious only)' if serious_only else ''}\n"
+        summary += f"Reports downloaded: {len(records):,}\n"
+        summary += f"Saved to: {output_file}\n"
+        return summary
+
+    except Exception as e:
+        return f"Error downloading FDA adverse events: {str(e)}"
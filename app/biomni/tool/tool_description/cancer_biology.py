@@ -239,4 +239,102 @@ description = [
             },
         ],
     },
+    {
+        "description": "Summarize DepMap scores (CRISPR gene effect, gene dependency probability or expression) of "
+        "genes across cancer cell lines, overall and per lineage. The matrix is memory-mapped, so only the "
+        "requested genes are read; use this instead of loading the DepMap CSVs with pandas.",
+        "name": "query_depmap_gene_scores",
+        "optional_parameters": [
+            {
+                "default": "gene_effect",
+                "description": 'DepMap matrix: "gene_effect", "gene_dependency" or "expression"',
+                "name": "dataset",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": 'Restrict to models of these Oncotree lineages (e.g. "Skin", "Lung")',
+                "name": "lineage",
+                "type": "str or List[str]",
+            },
+            {
+                "default": None,
+                "description": "CSV file to save the per-model scores with cell line name, lineage and disease",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": 'Gene symbols, "SYMBOL (Entrez)" labels or Entrez IDs',
+                "name": "genes",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "Directory containing the DepMap CSV files and DepMap_Model.csv",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Find genes whose DepMap profiles correlate with a query gene across cancer cell lines "
+        "(co-dependencies), testing every gene of the matrix at once with BH-adjusted p-values. The query "
+        "profile can come from another matrix, e.g. expression of a gene vs. CRISPR gene effects.",
+        "name": "find_depmap_codependencies",
+        "optional_parameters": [
+            {
+                "default": "gene_effect",
+                "description": 'Matrix whose genes are scanned: "gene_effect", "gene_dependency" or "expression"',
+                "name": "dataset",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Matrix the query profile is taken from, if different from dataset",
+                "name": "query_dataset",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Restrict to models of these Oncotree lineages",
+                "name": "lineage",
+                "type": "str or List[str]",
+            },
+            {
+                "default": "pearson",
+                "description": '"pearson" or "spearman"',
+                "name": "method",
+                "type": "str",
+            },
+            {
+                "default": 20,
+                "description": "Number of top positive and top negative correlations reported",
+                "name": "top_n",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "CSV file to save the correlations with all genes",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": 'Query gene symbol, "SYMBOL (Entrez)" label or Entrez ID',
+                "name": "gene",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Directory containing the DepMap CSV files and DepMap_Model.csv",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
 ]
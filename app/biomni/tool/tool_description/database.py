@@ -23,6 +23,150 @@ description = [
             }
         ],
     },
+    {
+        "description": "Retrieve many UniProtKB entries at once using the bulk accessions endpoint, "
+        "optionally streaming them to a JSON lines file.",
+        "name": "query_uniprot_batch",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": 'UniProt return fields (e.g., ["accession", "gene_names", "length"]); full entries if None',
+                "name": "fields",
+                "type": "List[str]",
+            },
+            {
+                "default": 500,
+                "description": "Number of accessions sent per request (at most 1000)",
+                "name": "batch_size",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "If provided, entries are streamed to this file as JSON lines instead of returned",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": 'UniProt accessions to retrieve (e.g., ["P01308", "P04637"])',
+                "name": "accessions",
+                "type": "List[str]",
+            }
+        ],
+    },
+    {
+        "description": "Lazily iterate (generator) over every record matching a UniProt search query, "
+        "following pagination cursors with constant memory.",
+        "name": "iter_uniprot_records",
+        "optional_parameters": [
+            {"default": None, "description": "UniProt return fields to include", "name": "fields", "type": "List[str]"},
+            {
+                "default": "uniprotkb",
+                "description": 'UniProt dataset to search ("uniprotkb", "uniref", "uniparc")',
+                "name": "dataset",
+                "type": "str",
+            },
+            {
+                "default": 500,
+                "description": "Records fetched per page (at most 500)",
+                "name": "page_size",
+                "type": "int",
+            },
+            {"default": None, "description": "Stop after this many records", "name": "max_records", "type": "int"},
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": 'UniProt query string (e.g., "gene_exact:TP53 AND reviewed:true")',
+                "name": "query",
+                "type": "str",
+            }
+        ],
+    },
+    {
+        "description": "Stream all results of a UniProt search to a TSV or JSON lines file, following "
+        "pagination cursors instead of truncating at a single page.",
+        "name": "stream_uniprot_results",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": 'UniProt return fields (e.g., ["accession", "gene_names", "length"])',
+                "name": "fields",
+                "type": "List[str]",
+            },
+            {
+                "default": "uniprotkb",
+                "description": 'UniProt dataset to search ("uniprotkb", "uniref", "uniparc")',
+                "name": "dataset",
+                "type": "str",
+            },
+            {"default": "tsv", "description": 'Output format: "tsv" or "jsonl"', "name": "file_format", "type": "str"},
+            {
+                "default": 500,
+                "description": "Records fetched per page (at most 500)",
+                "name": "page_size",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Stop after writing this many records",
+                "name": "max_records",
+                "type": "int",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": 'UniProt query string (e.g., "organism_id:9606 AND reviewed:true")',
+                "name": "query",
+                "type": "str",
+            },
+            {"default": None, "description": "Path of the file to write", "name": "output_file", "type": "str"},
+        ],
+    },
+    {
+        "description": "Map a batch of identifiers between databases (e.g., gene names to UniProt accessions) "
+        "with a single UniProt ID-mapping job.",
+        "name": "map_uniprot_ids",
+        "optional_parameters": [
+            {
+                "default": "UniProtKB_AC-ID",
+                "description": 'Source database (e.g., "UniProtKB_AC-ID", "Gene_Name", "Ensembl", "GeneID", "PDB")',
+                "name": "from_db",
+                "type": "str",
+            },
+            {
+                "default": "UniProtKB",
+                "description": 'Target database (e.g., "UniProtKB", "UniProtKB-Swiss-Prot", "Ensembl", "GeneID")',
+                "name": "to_db",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Restrict the mapping to an organism taxonomy ID (e.g., 9606)",
+                "name": "taxon_id",
+                "type": "int",
+            },
+            {
+                "default": 2,
+                "description": "Seconds between job status checks",
+                "name": "poll_interval",
+                "type": "float",
+            },
+            {"default": 300, "description": "Maximum seconds to wait for the job", "name": "timeout", "type": "float"},
+            {
+                "default": None,
+                "description": "If provided, mapped records are streamed to this file as JSON lines",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {"default": None, "description": "Identifiers to map", "name": "ids", "type": "List[str]"}
+        ],
+    },
     {
         "description": "Query the AlphaFold Database API for protein structure predictions.",
         "name": "query_alphafold",
@@ -153,6 +297,34 @@ description = [
             }
         ],
     },
+    {
+        "description": "Retrieve data for many PDB identifiers at once using RCSB GraphQL multi-entry queries.",
+        "name": "query_pdb_entries_batch",
+        "optional_parameters": [
+            {
+                "default": "entry",
+                "description": "'entry', 'polymer_entity', 'nonpolymer_entity', 'polymer_instance', 'assembly' "
+                "or 'mol_definition'",
+                "name": "return_type",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": 'GraphQL selection set per identifier (e.g., "rcsb_id struct { title }")',
+                "name": "fields",
+                "type": "str",
+            },
+            {"default": 200, "description": "Identifiers per GraphQL request", "name": "batch_size", "type": "int"},
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": 'PDB identifiers matching return_type (e.g., ["4HHB", "1TUP"])',
+                "name": "identifiers",
+                "type": "List[str]",
+            }
+        ],
+    },
     {
         "description": "Take a natural language prompt and convert it to a structured KEGG API query.",
         "name": "query_kegg",
@@ -392,6 +564,39 @@ description = [
             }
         ],
     },
+    {
+        "description": "Retrieve NCBI document summaries for many records at once (e.g., hundreds of ClinVar "
+        "variation IDs or dbSNP rsIDs) using rate-limited EPost/ESummary batches.",
+        "name": "query_ncbi_batch",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "If provided, summaries are streamed to this file as JSON lines",
+                "name": "output_file",
+                "type": "str",
+            },
+            {
+                "default": 200,
+                "description": "Number of records per ESummary request (at most 500)",
+                "name": "batch_size",
+                "type": "int",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": 'NCBI database (e.g., "clinvar", "snp", "gene", "gds", "pubmed")',
+                "name": "database",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": 'NCBI UIDs to summarize; rsIDs such as "rs6025" are accepted for dbSNP',
+                "name": "ids",
+                "type": "List[str]",
+            },
+        ],
+    },
     {
         "description": "Query the UCSC Genome Browser API using natural language or a direct endpoint.",
         "name": "query_ucsc",
@@ -434,6 +639,41 @@ description = [
             }
         ],
     },
+    {
+        "description": "Query the Ensembl REST API for many identifiers at once using its POST batch endpoints "
+        "(lookup by ID or symbol, sequences, variations, VEP).",
+        "name": "query_ensembl_batch",
+        "optional_parameters": [
+            {
+                "default": "lookup/id",
+                "description": 'Batch endpoint: "lookup/id", "lookup/symbol", "sequence/id", "variation", '
+                '"vep/id", "vep/hgvs" or "archive/id"',
+                "name": "endpoint",
+                "type": "str",
+            },
+            {"default": "homo_sapiens", "description": "Species name", "name": "species", "type": "str"},
+            {
+                "default": None,
+                "description": 'Extra query parameters (e.g., {"expand": 1})',
+                "name": "params",
+                "type": "dict",
+            },
+            {
+                "default": None,
+                "description": "Identifiers per request; defaults to the endpoint maximum",
+                "name": "batch_size",
+                "type": "int",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Ensembl stable IDs, gene symbols, rsIDs or HGVS notations depending on the endpoint",
+                "name": "identifiers",
+                "type": "List[str]",
+            }
+        ],
+    },
     {
         "description": "Query the OpenTargets Platform API using natural language or a direct GraphQL query.",
         "name": "query_opentarget",
@@ -507,129 +747,556 @@ description = [
         ],
     },
     {
-        "description": "Identifies a DNA sequence using NCBI BLAST with improved "
-        "error handling, timeout management, and debugging",
-        "name": "blast_sequence",
-        "optional_parameters": [],
-        "required_parameters": [
+        "description": "Ingest gnomAD, ClinVar or dbSNP bulk dumps (VCF or TSV) into a local, position-sorted "
+        "and compressed variant index for fast offline annotation. Only needs to be run once per release.",
+        "name": "build_local_variant_index",
+        "optional_parameters": [
             {
                 "default": None,
-                "description": "The sequence to identify. If DNA, "
-                "use database: core_nt, program: "
-                "blastn; if protein, use database: "
-                "nr, program: blastp",
-                "name": "sequence",
+                "description": "Data lake path; the index is written to <data_lake_path>/variant_index/<source>",
+                "name": "data_lake_path",
                 "type": "str",
             },
-            {"default": None, "description": "The BLAST database to search against", "name": "database", "type": "str"},
-            {"default": None, "description": "The BLAST program to use", "name": "program", "type": "str"},
-        ],
-    },
-    {
-        "description": "Query ClinicalTrials.gov for studies using natural language, direct endpoint, or structured parameters.",
-        "name": "query_clinicaltrials",
-        "optional_parameters": [
+            {"default": None, "description": "Explicit index directory", "name": "output_dir", "type": "str"},
             {
-                "name": "endpoint",
+                "default": "GRCh38",
+                "description": "Genome assembly of the input coordinates",
+                "name": "assembly",
                 "type": "str",
-                "description": "Direct API path or full URL to ClinicalTrials.gov endpoint",
+            },
+            {
                 "default": None,
+                "description": "INFO fields or table columns to keep (defaults to the source presets)",
+                "name": "fields",
+                "type": "List[str]",
             },
-            {"name": "term", "type": "str", "description": "Free-text search term", "default": None},
+        ],
+        "required_parameters": [
             {
-                "name": "status",
-                "type": "str",
-                "description": "Overall recruitment status filter, e.g., RECRUITING",
                 "default": None,
+                "description": "VCF (.vcf/.vcf.gz) or TSV files with chrom, pos, ref and alt columns",
+                "name": "input_files",
+                "type": "List[str]",
             },
-            {"name": "condition", "type": "str", "description": "Condition/disease filter", "default": None},
-            {"name": "intervention", "type": "str", "description": "Intervention filter", "default": None},
             {
-                "name": "location",
-                "type": "str",
-                "description": "Location filter (country, city, etc.)",
                 "default": None,
+                "description": 'Source name: "gnomad", "clinvar", "dbsnp" or a custom name',
+                "name": "source",
+                "type": "str",
             },
+        ],
+    },
+    {
+        "description": "Annotate thousands of variants at once (allele frequencies, clinical significance, rsIDs) "
+        "from local gnomAD/ClinVar/dbSNP indexes, with optional online lookup of variants not found locally.",
+        "name": "annotate_variants_local",
+        "optional_parameters": [
             {
-                "name": "phase",
+                "default": None,
+                "description": "Data lake path holding the variant_index directory",
+                "name": "data_lake_path",
                 "type": "str",
-                "description": "Trial phase filter (e.g., PHASE1, PHASE2, PHASE3)",
+            },
+            {
                 "default": None,
+                "description": 'Restrict to these indexes (e.g., ["gnomad", "clinvar"])',
+                "name": "sources",
+                "type": "List[str]",
             },
-            {"name": "page_size", "type": "int", "description": "Items per page (1-100)", "default": 10},
-            {"name": "max_pages", "type": "int", "description": "Max pages to fetch for pagination", "default": 1},
-            {"name": "page_token", "type": "str", "description": "Start page token for pagination", "default": None},
             {
-                "name": "verbose",
+                "default": False,
+                "description": "Query dbSNP/gnomAD online for variants missing from the local indexes",
+                "name": "online_fallback",
                 "type": "bool",
-                "description": "Whether to return detailed response structure",
-                "default": True,
+            },
+            {
+                "default": 50,
+                "description": "Maximum number of variants looked up online",
+                "name": "max_online_queries",
+                "type": "int",
             },
         ],
         "required_parameters": [
             {
-                "name": "prompt",
-                "type": "str",
-                "description": "Natural language query about clinical trials (if no endpoint/params provided)",
                 "default": None,
+                "description": 'Variants as "chrom:pos:ref:alt" strings or rsIDs (e.g., ["17:43045712:T:C", "rs6025"])',
+                "name": "variants",
+                "type": "List[str]",
             }
         ],
     },
     {
-        "description": "Query the Reactome database using natural language or a direct endpoint.",
-        "name": "query_reactome",
+        "description": "List all locally indexed gnomAD/ClinVar/dbSNP variants in a genomic region.",
+        "name": "scan_variant_region",
         "optional_parameters": [
-            {"default": None, "description": "Direct API endpoint or full URL", "name": "endpoint", "type": "str"},
             {
-                "default": False,
-                "description": "Whether to download pathway diagrams",
-                "name": "download",
-                "type": "bool",
+                "default": None,
+                "description": "Data lake path holding the variant_index directory",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+            {"default": None, "description": "Restrict to these indexes", "name": "sources", "type": "List[str]"},
+            {
+                "default": 1000,
+                "description": "Maximum number of variants returned per source",
+                "name": "limit",
+                "type": "int",
             },
-            {"default": None, "description": "Directory to save downloaded files", "name": "output_dir", "type": "str"},
-            {"default": True, "description": "Whether to return detailed results", "name": "verbose", "type": "bool"},
-        ],
-        "required_parameters": [
             {
                 "default": None,
-                "description": "Natural language query about biological pathways",
-                "name": "prompt",
+                "description": "Write all variants in the region to this TSV file instead",
+                "name": "output_file",
                 "type": "str",
-            }
-        ],
-    },
-    {
-        "description": "Query the RegulomeDB database using natural language or "
-        "direct variant/coordinate specification.",
-        "name": "query_regulomedb",
-        "optional_parameters": [
-            {"default": None, "description": "Direct API endpoint to query", "name": "endpoint", "type": "str"},
-            {"default": False, "description": "Whether to return detailed results", "name": "verbose", "type": "bool"},
+            },
         ],
         "required_parameters": [
-            {
-                "default": None,
-                "description": "Natural language query about regulatory elements",
-                "name": "prompt",
-                "type": "str",
-            }
+            {"default": None, "description": 'Chromosome (e.g., "17" or "chr17")', "name": "chrom", "type": "str"},
+            {"default": None, "description": "Region start (1-based, inclusive)", "name": "start", "type": "int"},
+            {"default": None, "description": "Region end (1-based, inclusive)", "name": "end", "type": "int"},
         ],
     },
     {
-        "description": "Query the PRIDE (PRoteomics IDEntifications) database using "
-        "natural language or a direct endpoint.",
-        "name": "query_pride",
+        "description": "Convert large CSV/TSV data lake tables (BindingDB, DepMap matrices, evebio tables) once into typed, "
+        "sorted Parquet datasets with row-group statistics so that filtered queries read only the needed data.",
+        "name": "convert_data_lake_tables",
         "optional_parameters": [
             {
                 "default": None,
-                "description": "The full endpoint to query (e.g., "
-                '"https://www.ebi.ac.uk/pride/ws/archive/v2/projects?keyword=breast%20cancer")',
-                "name": "endpoint",
-                "type": "str",
+                "description": "File names to convert; defaults to every BindingDB_*, DepMap_* and evebio_* text table",
+                "name": "tables",
+                "type": "List[str]",
             },
-            {"default": 3, "description": "Maximum number of results to return", "name": "max_results", "type": "int"},
-            {"default": None, "description": "Whether to return detailed results", "name": "verbose", "type": "bool"},
-        ],
+            {
+                "default": None,
+                "description": "Columns the parts are sorted by (BindingDB defaults to the target UniProt ID)",
+                "name": "sort_by",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "Low-cardinality columns written as one directory per value",
+                "name": "partition_by",
+                "type": "List[str]",
+            },
+        ],
+        "required_parameters": [
+            {"default": None, "description": "Data lake directory", "name": "data_lake_path", "type": "str"},
+        ],
+    },
+    {
+        "description": "Query a large CSV/TSV data lake table such as BindingDB_All_202409.tsv or a DepMap matrix without "
+        "loading it into memory: only the requested columns and the row groups matching the filters are read, and "
+        "results are streamed in batches. Use this instead of pd.read_csv on multi-gigabyte tables.",
+        "name": "query_data_lake_table",
+        "optional_parameters": [
+            {"default": None, "description": "Data lake directory", "name": "data_lake_path", "type": "str"},
+            {
+                "default": None,
+                "description": "Columns to return (all columns if None)",
+                "name": "columns",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "{column: value or list of values}, or a list of (column, op, value) conditions that "
+                "must all hold, with op one of ==, !=, <, <=, >, >=, in, not in",
+                "name": "filters",
+                "type": "dict or list",
+            },
+            {
+                "default": 1000,
+                "description": "Maximum number of rows returned (ignored when output_file is given)",
+                "name": "limit",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Stream all matching rows to this CSV, TSV or Parquet file instead",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": 'File name in the data lake (e.g. "BindingDB_All_202409.tsv") or an absolute path',
+                "name": "table",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "List the data lake files that can be queried with query_data_lake_sql, with their SQL table "
+        "names (file name without extension), sizes and descriptions.",
+        "name": "list_data_lake_tables",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "Regular expression matched (case-insensitively) against table names and descriptions",
+                "name": "pattern",
+                "type": "str",
+            },
+            {
+                "default": False,
+                "description": "Also return the column names and types of each listed table",
+                "name": "include_columns",
+                "type": "bool",
+            },
+        ],
+        "required_parameters": [
+            {"default": None, "description": "Data lake directory", "name": "data_lake_path", "type": "str"},
+        ],
+    },
+    {
+        "description": "Run a read-only SQL query (DuckDB dialect) over the data lake: every Parquet, CSV and TSV file "
+        "is a table named after the file without its extension (e.g. DisGeNET, gtex_tissue_gene_tpm). Only the referenced "
+        "columns and matching row groups are read and scans run on all cores, so filters, joins and aggregations "
+        "across large tables are fast without loading them. Results are capped at max_rows.",
+        "name": "query_data_lake_sql",
+        "optional_parameters": [
+            {
+                "default": 200,
+                "description": "Maximum number of rows returned (ignored when output_file is given)",
+                "name": "max_rows",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Write the full result to this Parquet, CSV or TSV file instead",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "A single SELECT (or WITH, DESCRIBE, SHOW, SUMMARIZE) statement",
+                "name": "sql",
+                "type": "str",
+            },
+            {"default": None, "description": "Data lake directory", "name": "data_lake_path", "type": "str"},
+        ],
+    },
+    {
+        "description": "Look up GWAS Catalog associations from the data lake (gwas_catalog.pkl) by gene, trait or "
+        "EFO term, rsID, genomic region or a window around a variant. The catalog is indexed once, so lookups read "
+        "only matching rows; use this instead of loading gwas_catalog.pkl with pandas.",
+        "name": "query_gwas_associations",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "Mapped or reported gene symbols",
+                "name": "genes",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": 'Trait names (e.g. "type 2 diabetes") or ontology terms (e.g. "EFO_0001360")',
+                "name": "traits",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "Variant rsIDs",
+                "name": "rsids",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": 'Regions as "chrom:start-end" strings or (chrom, start, end) tuples (GRCh38)',
+                "name": "regions",
+                "type": "List[str]",
+            },
+            {
+                "default": "contains",
+                "description": '"contains" matches every trait containing the given name, "exact" only identical names',
+                "name": "trait_match",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Keep associations with a p-value at or below this threshold (e.g. 5e-8)",
+                "name": "max_p",
+                "type": "float",
+            },
+            {
+                "default": None,
+                "description": "With rsids, return all associations within this many bp of each variant instead",
+                "name": "flank",
+                "type": "int",
+            },
+            {
+                "default": 200,
+                "description": "Maximum number of rows returned per query and in total (most significant first)",
+                "name": "limit",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Save all matching rows to this CSV or TSV file instead of returning them",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {"default": None, "description": "Data lake directory", "name": "data_lake_path", "type": "str"},
+        ],
+    },
+    {
+        "description": "Look up GeneBass gene-level burden associations (UK Biobank exomes; pLoF, missense_LC and "
+        "synonymous variant classes) from the data lake by gene or phenotype. The tables are indexed once, so "
+        "lookups read only matching rows.",
+        "name": "query_genebass_associations",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "Gene symbols or Ensembl gene IDs",
+                "name": "genes",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": 'Phenotype descriptions (e.g. "LDL") or phenocodes (e.g. "30780")',
+                "name": "traits",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": 'Variant classes to search: "pLoF", "missense_LC" and/or "synonymous" (default: all)',
+                "name": "annotations",
+                "type": "List[str]",
+            },
+            {
+                "default": "contains",
+                "description": '"contains" matches every phenotype containing the given name, "exact" only identical names',
+                "name": "trait_match",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Keep associations with a p-value at or below this threshold",
+                "name": "max_p",
+                "type": "float",
+            },
+            {
+                "default": 200,
+                "description": "Maximum number of rows returned per query and in total (most significant first)",
+                "name": "limit",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Save all matching rows to this CSV or TSV file instead of returning them",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {"default": None, "description": "Data lake directory", "name": "data_lake_path", "type": "str"},
+        ],
+    },
+    {
+        "description": "Identifies a DNA sequence using NCBI BLAST with improved "
+        "error handling, timeout management, and debugging",
+        "name": "blast_sequence",
+        "optional_parameters": [
+            {
+                "default": "auto",
+                "description": '"local" to run BLAST+ against a local FASTA/BLAST database, "remote" to submit to NCBI, '
+                'or "auto" to use the local backend whenever database is a local file',
+                "name": "backend",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "CPU threads for the local BLAST+ backend",
+                "name": "num_threads",
+                "type": "int",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "The sequence to identify. If DNA, "
+                "use database: core_nt, program: "
+                "blastn; if protein, use database: "
+                "nr, program: blastp",
+                "name": "sequence",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "The BLAST database to search against: an NCBI database name (remote) "
+                "or a local FASTA file / BLAST database prefix (local)",
+                "name": "database",
+                "type": "str",
+            },
+            {"default": None, "description": "The BLAST program to use", "name": "program", "type": "str"},
+        ],
+    },
+    {
+        "description": "Search one or many sequences against a local FASTA database with BLAST+. The database is "
+        "built once and cached by content hash; all queries run in one multithreaded search and every hit is reported.",
+        "name": "blast_sequences_local",
+        "optional_parameters": [
+            {
+                "default": "blastn",
+                "description": "BLAST+ program: blastn, blastp, blastx, tblastn or tblastx",
+                "name": "program",
+                "type": "str",
+            },
+            {"default": 10.0, "description": "E-value threshold", "name": "evalue", "type": "float"},
+            {
+                "default": 500,
+                "description": "Maximum subject sequences reported per query",
+                "name": "max_target_seqs",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Maximum HSPs per subject; all HSPs if None",
+                "name": "max_hsps",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "CPU threads for the search; all cores if None",
+                "name": "num_threads",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Path to save all hits as a TSV file",
+                "name": "output_file",
+                "type": "str",
+            },
+            {
+                "default": True,
+                "description": "Include the hit list in the result (set False for very large searches)",
+                "name": "return_hits",
+                "type": "bool",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "A sequence, a list of sequences, a dict of {query_id: sequence}, or a multi-query FASTA path",
+                "name": "queries",
+                "type": "str | List[str] | dict",
+            },
+            {
+                "default": None,
+                "description": "FASTA file (e.g., from the data lake) or prefix of an existing BLAST database",
+                "name": "database_fasta",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Query ClinicalTrials.gov for studies using natural language, direct endpoint, or structured parameters.",
+        "name": "query_clinicaltrials",
+        "optional_parameters": [
+            {
+                "name": "endpoint",
+                "type": "str",
+                "description": "Direct API path or full URL to ClinicalTrials.gov endpoint",
+                "default": None,
+            },
+            {"name": "term", "type": "str", "description": "Free-text search term", "default": None},
+            {
+                "name": "status",
+                "type": "str",
+                "description": "Overall recruitment status filter, e.g., RECRUITING",
+                "default": None,
+            },
+            {"name": "condition", "type": "str", "description": "Condition/disease filter", "default": None},
+            {"name": "intervention", "type": "str", "description": "Intervention filter", "default": None},
+            {
+                "name": "location",
+                "type": "str",
+                "description": "Location filter (country, city, etc.)",
+                "default": None,
+            },
+            {
+                "name": "phase",
+                "type": "str",
+                "description": "Trial phase filter (e.g., PHASE1, PHASE2, PHASE3)",
+                "default": None,
+            },
+            {"name": "page_size", "type": "int", "description": "Items per page (1-100)", "default": 10},
+            {"name": "max_pages", "type": "int", "description": "Max pages to fetch for pagination", "default": 1},
+            {"name": "page_token", "type": "str", "description": "Start page token for pagination", "default": None},
+            {
+                "name": "verbose",
+                "type": "bool",
+                "description": "Whether to return detailed response structure",
+                "default": True,
+            },
+        ],
+        "required_parameters": [
+            {
+                "name": "prompt",
+                "type": "str",
+                "description": "Natural language query about clinical trials (if no endpoint/params provided)",
+                "default": None,
+            }
+        ],
+    },
+    {
+        "description": "Query the Reactome database using natural language or a direct endpoint.",
+        "name": "query_reactome",
+        "optional_parameters": [
+            {"default": None, "description": "Direct API endpoint or full URL", "name": "endpoint", "type": "str"},
+            {
+                "default": False,
+                "description": "Whether to download pathway diagrams",
+                "name": "download",
+                "type": "bool",
+            },
+            {"default": None, "description": "Directory to save downloaded files", "name": "output_dir", "type": "str"},
+            {"default": True, "description": "Whether to return detailed results", "name": "verbose", "type": "bool"},
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Natural language query about biological pathways",
+                "name": "prompt",
+                "type": "str",
+            }
+        ],
+    },
+    {
+        "description": "Query the RegulomeDB database using natural language or "
+        "direct variant/coordinate specification.",
+        "name": "query_regulomedb",
+        "optional_parameters": [
+            {"default": None, "description": "Direct API endpoint to query", "name": "endpoint", "type": "str"},
+            {"default": False, "description": "Whether to return detailed results", "name": "verbose", "type": "bool"},
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Natural language query about regulatory elements",
+                "name": "prompt",
+                "type": "str",
+            }
+        ],
+    },
+    {
+        "description": "Query the PRIDE (PRoteomics IDEntifications) database using "
+        "natural language or a direct endpoint.",
+        "name": "query_pride",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "The full endpoint to query (e.g., "
+                '"https://www.ebi.ac.uk/pride/ws/archive/v2/projects?keyword=breast%20cancer")',
+                "name": "endpoint",
+                "type": "str",
+            },
+            {"default": 3, "description": "Maximum number of results to return", "name": "max_results", "type": "int"},
+            {"default": None, "description": "Whether to return detailed results", "name": "verbose", "type": "bool"},
+        ],
         "required_parameters": [
             {
                 "default": None,
@@ -671,7 +1338,14 @@ description = [
                 "description": "Assembly of the genome, formatted like 'GRCh38'",
                 "name": "assembly",
                 "type": "str",
-            }
+            },
+            {
+                "default": None,
+                "description": "Local ENCODE cCRE registry BED file; if given, the region is intersected locally "
+                "instead of querying the SCREEN API",
+                "name": "ccre_bed",
+                "type": "str",
+            },
         ],
         "required_parameters": [
             {
@@ -694,7 +1368,19 @@ description = [
                 "description": "Number of nearby genes to return, sorted by distance",
                 "name": "k",
                 "type": "int",
-            }
+            },
+            {
+                "default": None,
+                "description": "Local ENCODE cCRE registry BED file (used with gene_annotation_file for offline lookup)",
+                "name": "ccre_bed",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "GTF or TSV of genes (chrom, start, end, strand, gene_name) for offline lookup",
+                "name": "gene_annotation_file",
+                "type": "str",
+            },
         ],
         "required_parameters": [
             {
@@ -712,6 +1398,73 @@ description = [
             },
         ],
     },
+    {
+        "description": "Intersect many genomic regions (e.g., a ChIP-seq or ATAC-seq peak set in BED format) with "
+        "a local ENCODE cCRE registry in one call, returning a DataFrame of overlapping cCREs per region.",
+        "name": "annotate_regions_with_ccres",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "Only keep cCREs whose classification contains this label (e.g., 'dELS', 'PLS')",
+                "name": "classification",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Also write the overlaps to this TSV file",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "BED file path, list of (chrom, start, end) tuples or 'chrom:start-end' strings",
+                "name": "regions",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "ENCODE SCREEN cCRE registry BED file (e.g., GRCh38-cCREs.bed)",
+                "name": "ccre_bed",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Find the k genes whose TSS is nearest to each of many genomic regions (e.g., a peak set "
+        "in BED format) from a local gene annotation, returning a DataFrame.",
+        "name": "find_nearest_genes",
+        "optional_parameters": [
+            {"default": 1, "description": "Number of nearest genes per region", "name": "k", "type": "int"},
+            {
+                "default": None,
+                "description": "Ignore genes whose TSS is further away than this many bp",
+                "name": "max_distance",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Also write the result to this TSV file",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "BED file path, list of (chrom, start, end) tuples or 'chrom:start-end' strings",
+                "name": "regions",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "GTF (e.g., GENCODE) or TSV with chrom, start, end, strand and gene_name columns",
+                "name": "gene_annotation_file",
+                "type": "str",
+            },
+        ],
+    },
     {
         "description": "Query the ReMap database for regulatory elements and transcription factor binding sites.",
         "name": "query_remap",
@@ -822,4 +1575,180 @@ description = [
             }
         ],
     },
+    {
+        "description": "Look up names, synonyms, parents, obsolescence and information content for HPO terms "
+        "from an indexed copy of the Human Phenotype Ontology that is built once and kept in memory.",
+        "name": "get_hpo_term_info",
+        "optional_parameters": [
+            {
+                "default": False,
+                "description": "Also return the full ancestor closure of each term",
+                "name": "include_ancestors",
+                "type": "bool",
+            }
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "HPO term IDs (e.g., ['HP:0001250', 'HP:0001263'])",
+                "name": "hpo_terms",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "Path to the data lake",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Rank candidate phenotype profiles (e.g., diseases or genes with their HPO annotations) "
+        "by best-match-average Resnik similarity to a patient's HPO terms.",
+        "name": "compute_hpo_similarity",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "Only return the top_k best-scoring candidates",
+                "name": "top_k",
+                "type": "int",
+            },
+            {
+                "default": True,
+                "description": "Average query-to-candidate and candidate-to-query matching instead of only the former",
+                "name": "symmetric",
+                "type": "bool",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "The patient's HPO term IDs",
+                "name": "query_terms",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "Candidate name -> list of HPO term IDs, or a list of HPO term ID lists",
+                "name": "candidate_term_sets",
+                "type": "dict",
+            },
+            {
+                "default": None,
+                "description": "Path to the data lake",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Retrieve names, namespaces, relations and information content for Gene Ontology terms, "
+        "optionally with their ancestor and descendant closures (is_a and part_of).",
+        "name": "get_go_term_info",
+        "optional_parameters": [
+            {
+                "default": False,
+                "description": "Also return the ancestors of each term",
+                "name": "include_ancestors",
+                "type": "bool",
+            },
+            {
+                "default": False,
+                "description": "Also return the descendants of each term",
+                "name": "include_descendants",
+                "type": "bool",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "GO term IDs (e.g., ['GO:0006915'])",
+                "name": "go_terms",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "Path to the data lake",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Propagate gene-to-GO annotations up the Gene Ontology (true-path rule) to build "
+        "GO term gene sets for enrichment analysis or annotation summaries.",
+        "name": "propagate_go_annotations",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "Only keep terms of 'biological_process', 'molecular_function' or 'cellular_component'",
+                "name": "namespace",
+                "type": "str",
+            },
+            {
+                "default": 1,
+                "description": "Smallest gene set kept",
+                "name": "min_genes",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Largest gene set kept",
+                "name": "max_genes",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Save the gene sets as a TSV file",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Gene -> list of GO term IDs, or the path of a GAF file or a two-column gene/term TSV or CSV file",
+                "name": "annotations",
+                "type": "dict",
+            },
+            {
+                "default": None,
+                "description": "Path to the data lake",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Compute pairwise Resnik or Lin semantic similarity between Gene Ontology terms.",
+        "name": "compute_go_term_similarity",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "GO term IDs for the columns of the matrix; defaults to go_terms_a",
+                "name": "go_terms_b",
+                "type": "List[str]",
+            },
+            {
+                "default": "resnik",
+                "description": "'resnik' or 'lin'",
+                "name": "method",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "GO term IDs for the rows of the matrix",
+                "name": "go_terms_a",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "Path to the data lake",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
 ]
@@ -37,6 +37,110 @@ description = [
             },
         ],
     },
+    {
+        "description": "Lift over many genomic positions or intervals between hg19 and hg38 in one "
+        "vectorized pass, reporting unmapped entries.",
+        "name": "liftover_coordinates_batch",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "Interval ends (exclusive); when given, intervals [position, end) are lifted",
+                "name": "ends",
+                "type": "List[int]",
+            },
+            {
+                "default": None,
+                "description": "Interval strands ('+' or '-'), flipped when mapped through a reversed chain",
+                "name": "strands",
+                "type": "List[str]",
+            },
+            {
+                "default": False,
+                "description": "Positions are 1-based (e.g., VCF or GWAS summary statistics) instead of 0-based",
+                "name": "one_based",
+                "type": "bool",
+            },
+            {
+                "default": None,
+                "description": "Write the lifted table as TSV to this path instead of returning records",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Chromosome of each position (e.g., ['1', 'X'])",
+                "name": "chromosomes",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "Genomic positions (or interval starts)",
+                "name": "positions",
+                "type": "List[int]",
+            },
+            {
+                "default": None,
+                "description": "Input genome build ('hg19' or 'hg38')",
+                "name": "input_format",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Output genome build ('hg19' or 'hg38')",
+                "name": "output_format",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Path to liftover chain files",
+                "name": "data_path",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Lift over a whole BED, VCF or GWAS summary statistics file between hg19 and hg38, "
+        "optionally writing unmapped rows with the reason to a separate file.",
+        "name": "liftover_file",
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "'bed', 'vcf' or 'tsv'; inferred from the file extension if omitted",
+                "name": "file_format",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Path for rows that could not be lifted",
+                "name": "unmapped_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {"default": None, "description": "Input BED, VCF or TSV/CSV file", "name": "input_file", "type": "str"},
+            {"default": None, "description": "Path of the lifted output file", "name": "output_file", "type": "str"},
+            {
+                "default": None,
+                "description": "Input genome build ('hg19' or 'hg38')",
+                "name": "input_format",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Output genome build ('hg19' or 'hg38')",
+                "name": "output_format",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Path to liftover chain files",
+                "name": "data_path",
+                "type": "str",
+            },
+        ],
+    },
     {
         "description": "Performs Bayesian fine-mapping from GWAS summary statistics "
         "using deep variational inference to compute posterior "
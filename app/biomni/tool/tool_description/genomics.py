@@ -270,6 +270,13 @@ description = [
                 "name": "plot",
                 "type": "bool",
             },
+            {
+                "default": None,
+                "description": "Path to the data lake; when given, databases with a local MSigDB counterpart "
+                "(ontology, pathway, transcription, celltypes, hallmark, ...) are analyzed offline",
+                "name": "data_lake_path",
+                "type": "str",
+            },
         ],
         "required_parameters": [
             {
@@ -280,6 +287,70 @@ description = [
             }
         ],
     },
+    {
+        "description": "Run offline over-representation analysis (hypergeometric test with FDR) for many "
+        "gene lists at once, e.g. clusters or contrasts, against a local MSigDB or MouseMine gene set library.",
+        "name": "batch_gene_set_enrichment_analysis",
+        "optional_parameters": [
+            {
+                "default": "hallmark",
+                "description": "Gene set library (hallmark, curated, ontology, tf_targets, regulatory_target, "
+                "oncogenic, immunologic, celltype, positional, computational, their mouse_ variants) or a GMT file path",
+                "name": "database",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Background genes (e.g. all expressed genes); defaults to every gene in the library",
+                "name": "background_list",
+                "type": "list",
+            },
+            {
+                "default": 0.05,
+                "description": "Only report gene sets with an FDR at or below this value",
+                "name": "max_fdr",
+                "type": "float",
+            },
+            {
+                "default": 10,
+                "description": "Number of top gene sets reported per list",
+                "name": "top_k",
+                "type": "int",
+            },
+            {
+                "default": 5,
+                "description": "Smallest gene set size tested",
+                "name": "min_set_size",
+                "type": "int",
+            },
+            {
+                "default": 1000,
+                "description": "Largest gene set size tested",
+                "name": "max_set_size",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Save all significant results as a CSV file",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Mapping of list name (e.g. cluster or contrast) to a list of gene symbols",
+                "name": "gene_lists",
+                "type": "dict",
+            },
+            {
+                "default": None,
+                "description": "Path to the data lake",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
     {
         "description": "Analyze chromatin interactions from Hi-C data to identify "
         "enhancer-promoter interactions and TADs.",
@@ -79,6 +79,150 @@ description = [
             },
         ],
     },
+    {
+        "description": "Runs a docking campaign for a ligand library against one receptor with AutoDock Vina (pyscreener): the receptor is prepared once, ligands are distributed over worker processes, scores are checkpointed to a per-(receptor, box) cache so interrupted or repeated campaigns skip already docked ligands, and a table sorted by docking score is returned.",
+        "name": "run_docking_campaign",
+        "optional_parameters": [
+            {
+                "default": 1,
+                "description": "Number of CPU cores used by each docking worker",
+                "name": "ncpu",
+                "type": "int",
+            },
+            {
+                "default": 1,
+                "description": "Number of worker processes docking in parallel",
+                "name": "n_workers",
+                "type": "int",
+            },
+            {
+                "default": 32,
+                "description": "Ligands per docking call and checkpoint",
+                "name": "chunk_size",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Score cache CSV (defaults to a file next to the receptor keyed by PDB hash and box)",
+                "name": "cache_file",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "CSV file to write the sorted result table to",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "List of SMILES strings representing small molecules to dock",
+                "name": "smiles_list",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "Path to the receptor protein structure PDB file",
+                "name": "receptor_pdb_file",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "3D coordinates [x, y, z] of the docking box center",
+                "name": "box_center",
+                "type": "List[float]",
+            },
+            {
+                "default": None,
+                "description": "Dimensions [x, y, z] of the docking box",
+                "name": "box_size",
+                "type": "List[float]",
+            },
+        ],
+    },
+    {
+        "description": "Finds the compounds of a data lake library (Enamine REAL, Broad Repurposing Hub, BindingDB ligands or any SMILES table) most similar to one or more query molecules by Morgan fingerprint Tanimoto similarity, using a persisted memory-mapped fingerprint index.",
+        "name": "search_similar_compounds",
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Query SMILES string or list of SMILES strings",
+                "name": "query_smiles",
+                "type": "str or List[str]",
+            },
+            {
+                "default": None,
+                "description": "Path to the data lake directory",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+        "optional_parameters": [
+            {
+                "default": "broad_repurposing_hub",
+                "description": "Library: enamine, broad_repurposing_hub, bindingdb, or the path of a table with a SMILES column",
+                "name": "library",
+                "type": "str",
+            },
+            {
+                "default": 10,
+                "description": "Number of hits per query",
+                "name": "k",
+                "type": "int",
+            },
+            {
+                "default": 0.0,
+                "description": "Minimum Tanimoto similarity of a hit (0-1)",
+                "name": "min_similarity",
+                "type": "float",
+            },
+            {
+                "default": None,
+                "description": "Optional CSV file the hit table is written to",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Finds the compounds of a data lake library containing a substructure (SMARTS or SMILES), screening a persisted pattern-fingerprint index on all CPU cores before confirming matches with RDKit.",
+        "name": "search_compound_substructure",
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Substructure as SMARTS or SMILES",
+                "name": "query",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Path to the data lake directory",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+        "optional_parameters": [
+            {
+                "default": "broad_repurposing_hub",
+                "description": "Library: enamine, broad_repurposing_hub, bindingdb, or the path of a table with a SMILES column",
+                "name": "library",
+                "type": "str",
+            },
+            {
+                "default": 100,
+                "description": "Maximum number of matches returned (None for all)",
+                "name": "max_results",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Optional CSV file the matches are written to",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+    },
     {
         "description": "Runs AutoSite on a PDB file to identify potential binding "
         "sites and returns a research log with the results.",
@@ -134,6 +278,58 @@ description = [
             },
         ],
     },
+    {
+        "description": "Retrieves the top K TxGNN drug repurposing predictions for many diseases at once and returns them as a table (disease query, matched disease, rank, drug ID, drug name, post-sigmoid score)",
+        "name": "retrieve_topk_repurposing_drugs_batch_txgnn",
+        "optional_parameters": [
+            {
+                "default": 5,
+                "description": "The number of top drug predictions per disease",
+                "name": "k",
+                "type": "int",
+            }
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Disease names to retrieve drug predictions for",
+                "name": "disease_names",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "Path to the data lake",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Retrieves the diseases with the highest TxGNN repurposing prediction scores for a given drug (reverse drug-to-disease query)",
+        "name": "retrieve_topk_diseases_for_drug_txgnn",
+        "optional_parameters": [
+            {
+                "default": 5,
+                "description": "The number of top disease predictions to return",
+                "name": "k",
+                "type": "int",
+            }
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Drug name or TxGNN drug ID",
+                "name": "drug_name",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Path to the data lake",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
     {
         "description": "Predicts ADMET (Absorption, Distribution, Metabolism, "
         "Excretion, Toxicity) properties for a list of compounds "
@@ -156,6 +352,32 @@ description = [
             }
         ],
     },
+    {
+        "description": "Predicts the 16 ADMET endpoints for many compounds at once with batched inference over cached pretrained models, returning a DataFrame with one row per SMILES and one column per endpoint; predictions can be cached by canonical SMILES in a Parquet file.",
+        "name": "predict_admet_properties_batch",
+        "optional_parameters": [
+            {
+                "default": "MPNN",
+                "description": "Type of model to use for ADMET prediction (options: 'MPNN', 'CNN', 'Morgan')",
+                "name": "ADMET_model_type",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Parquet file with cached predictions; new predictions are appended",
+                "name": "cache_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "List of SMILES strings representing chemical compounds to analyze",
+                "name": "smiles_list",
+                "type": "List[str]",
+            }
+        ],
+    },
     {
         "description": "Predicts binding affinity between small molecules and a "
         "protein sequence using pre-trained deep learning models.",
@@ -397,6 +619,62 @@ description = [
             }
         ],
     },
+    {
+        "description": "Calculate physicochemical properties (molecular weight, cLogP, TPSA, H-bond donors/acceptors, rotatable bonds, rings, Fsp3, molar refractivity, charge, ionizable groups, rule-of-five and Veber flags) for a whole compound set on a process pool, de-duplicating by canonical SMILES with a result cache and writing one Parquet file.",
+        "name": "calculate_physicochemical_properties_batch",
+        "optional_parameters": [
+            {
+                "default": "physicochemical_properties.parquet",
+                "description": "Parquet file with one row per distinct compound",
+                "name": "output_file",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "SMILES column of a table input (detected by name if omitted)",
+                "name": "smiles_column",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Data lake directory for library names and relative table names",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+            {
+                "default": True,
+                "description": "Keep the largest fragment and neutralize charges before canonicalizing",
+                "name": "standardize",
+                "type": "bool",
+            },
+            {
+                "default": None,
+                "description": "Worker processes (all cores by default)",
+                "name": "n_workers",
+                "type": "int",
+            },
+            {
+                "default": 2000,
+                "description": "Molecules per task sent to a worker",
+                "name": "chunk_size",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Parquet file of previously computed compounds; new compounds are appended",
+                "name": "cache_file",
+                "type": "str",
+            },
+        ],
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "List of SMILES, a .smi/.txt file, a CSV/TSV/Parquet/pickle table with a SMILES column, or a data lake library name (enamine, broad_repurposing_hub, bindingdb)",
+                "name": "smiles_input",
+                "type": "List[str] or str",
+            }
+        ],
+    },
     {
         "description": "Analyze tumor growth inhibition in xenograft models across different treatment groups.",
         "name": "analyze_xenograft_tumor_growth_inhibition",
@@ -610,6 +888,82 @@ description = [
             },
         ],
     },
+    {
+        "description": "Resolve free-text drug names (brand names, salt forms, misspellings) to DDInter drugs in one batch, reporting the matched name, similarity score and match method for each.",
+        "name": "resolve_drug_names",
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Drug names to resolve, e.g. a medication list",
+                "name": "drug_names",
+                "type": "List[str]",
+            },
+        ],
+        "optional_parameters": [
+            {
+                "default": 0.8,
+                "description": "Minimum similarity score (0-1) for fuzzy matches",
+                "name": "cutoff",
+                "type": "float",
+            },
+            {
+                "default": None,
+                "description": "Path to data lake directory containing DDInter data",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Screen the medication lists of a whole cohort (many patients) for drug-drug interactions from DDInter, streaming a tidy table of interacting pairs per patient with per-severity counts to a CSV file and summarizing cohort-level statistics.",
+        "name": "scan_cohort_drug_interactions",
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Long table with one row per (patient, drug), a table with one list of drugs per patient, a {patient_id: [drugs]} dict, or a CSV/TSV/Parquet file path",
+                "name": "cohort",
+                "type": "pandas.DataFrame | dict | str",
+            },
+        ],
+        "optional_parameters": [
+            {
+                "default": "patient_id",
+                "description": "Column identifying the patient",
+                "name": "patient_column",
+                "type": "str",
+            },
+            {
+                "default": "drug",
+                "description": "Column with drug names (or lists of drug names)",
+                "name": "drug_column",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Keep only pairs with at least one interaction of these levels (e.g. ['Major'])",
+                "name": "severity_levels",
+                "type": "List[str]",
+            },
+            {
+                "default": None,
+                "description": "CSV file the table of interacting pairs is written to",
+                "name": "output_file",
+                "type": "str",
+            },
+            {
+                "default": 5000,
+                "description": "Number of patients processed at a time",
+                "name": "chunk_size",
+                "type": "int",
+            },
+            {
+                "default": None,
+                "description": "Path to data lake directory containing DDInter data",
+                "name": "data_lake_path",
+                "type": "str",
+            },
+        ],
+    },
     {
         "description": "Query FDA adverse event reports for specific drugs from the OpenFDA database to identify potential safety signals, reaction patterns, and regulatory intelligence.",
         "name": "query_fda_adverse_events",
@@ -718,6 +1072,120 @@ description = [
                 "name": "signal_threshold",
                 "type": "float",
             },
+            {
+                "default": False,
+                "description": "Use openFDA count queries over all reports instead of a 200-report sample per drug, and add PRR-based disproportionality signals",
+                "name": "use_counts",
+                "type": "bool",
+            },
+        ],
+    },
+    {
+        "description": "Count FDA adverse event reports for a drug by reaction, outcome, seriousness, sex, country, co-reported drug, indication or receive date, using server-side openFDA count queries over all reports.",
+        "name": "query_fda_adverse_event_counts",
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Name of the drug to query",
+                "name": "drug_name",
+                "type": "str",
+            },
+        ],
+        "optional_parameters": [
+            {
+                "default": "reaction",
+                "description": "Field to count: reaction, outcome, seriousness, sex, country, drug, indication, received, or a raw openFDA field name",
+                "name": "count_field",
+                "type": "str",
+            },
+            {
+                "default": 25,
+                "description": "Number of most frequent terms to list (at most 1000)",
+                "name": "limit",
+                "type": "int",
+            },
+            {
+                "default": False,
+                "description": "Only count serious reports",
+                "name": "serious_only",
+                "type": "bool",
+            },
+        ],
+    },
+    {
+        "description": "Compute disproportionality metrics (PRR and ROR with 95% confidence intervals, chi-square) for one or more drugs against the whole openFDA adverse event database and report drug-reaction safety signals.",
+        "name": "compute_fda_disproportionality",
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "List of drug names to analyze",
+                "name": "drug_list",
+                "type": "List[str]",
+            },
+        ],
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "MedDRA preferred terms to evaluate; defaults to each drug's most reported reactions",
+                "name": "reactions",
+                "type": "List[str]",
+            },
+            {
+                "default": 20,
+                "description": "Number of most reported reactions per drug used when reactions are not given",
+                "name": "top_n",
+                "type": "int",
+            },
+            {
+                "default": 3,
+                "description": "Minimum reports of a drug-reaction pair for a signal",
+                "name": "min_reports",
+                "type": "int",
+            },
+            {
+                "default": 2.0,
+                "description": "Minimum PRR for a signal (chi-square >= 4 is also required)",
+                "name": "prr_threshold",
+                "type": "float",
+            },
+            {
+                "default": None,
+                "description": "Optional CSV path for the full drug-reaction table",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+    },
+    {
+        "description": "Download all FDA adverse event reports for a drug to a JSON Lines file, fetching pages concurrently within the openFDA rate limit with a resumable disk cache.",
+        "name": "download_fda_adverse_events",
+        "required_parameters": [
+            {
+                "default": None,
+                "description": "Name of the drug to download reports for",
+                "name": "drug_name",
+                "type": "str",
+            },
+            {
+                "default": None,
+                "description": "Path of the JSON Lines file to write",
+                "name": "output_file",
+                "type": "str",
+            },
+        ],
+        "optional_parameters": [
+            {
+                "default": None,
+                "description": "Optional cap on the number of reports",
+                "name": "max_records",
+                "type": "int",
+            },
+            {
+                "default": False,
+                "description": "Only download serious reports",
+                "name": "serious_only",
+                "type": "bool",
+            },
         ],
     },
 ]
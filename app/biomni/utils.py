@@ -1,5 +1,6 @@
 import ast
 import enum
+import hashlib
 import importlib
 import json
 import os
@@ -662,6 +663,43 @@ def load_pkl(filename):
         return pickle.load(file)
 
 
+def get_index_cache_path(source_path: str, suffix: str) -> str:
+    """Return the path where an index derived from a data lake file should be persisted.
+
+    Indexes are stored in a ``.biomni_index`` directory next to the source file so they are
+    shared by every session using the same data lake. If that directory is not writable, a
+    per-user cache under ``~/.cache/biomni/index`` is used instead.
+
+    Args:
+        source_path: Path of the data lake file (or directory) the index is built from
+        suffix: Index name appended to the source file name (e.g., "hpo.pkl")
+
+    Returns:
+        Path of the index file
+
+    """
+    source_path = os.path.abspath(source_path)
+    index_dir = os.path.join(os.path.dirname(source_path), ".biomni_index")
+    try:
+        os.makedirs(index_dir, exist_ok=True)
+        if not os.access(index_dir, os.W_OK):
+            raise PermissionError(index_dir)
+    except OSError:
+        index_dir = os.path.join(os.path.expanduser("~"), ".cache", "biomni", "index")
+        os.makedirs(index_dir, exist_ok=True)
+        # Disambiguate identically named files from different data lakes
+        suffix = f"{hashlib.md5(os.path.dirname(source_path).encode()).hexdigest()[:8]}.{suffix}"
+    return os.path.join(index_dir, f"{os.path.basename(source_path)}.{suffix}")
+
+
+def is_index_stale(index_path: str, *source_paths: str) -> bool:
+    """Check whether an index file is missing or older than any of its source files."""
+    if not os.path.exists(index_path):
+        return True
+    index_mtime = os.path.getmtime(index_path)
+    return any(os.path.exists(p) and os.path.getmtime(p) > index_mtime for p in source_paths)
+
+
 _TEXT_COLOR_MAPPING = {
     "blue": "36;1",
     "yellow": "33;1",
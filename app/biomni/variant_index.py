@@ -0,0 +1,609 @@
+"""
+Biomni Variant Index
+
+Offline variant annotation built from the public bulk dumps of gnomAD, ClinVar and dbSNP
+(VCF, optionally gzipped) or any tab-separated table with chrom/pos/ref/alt columns.
+
+Each source is ingested into its own index directory:
+
+- ``manifest.json``: source files, assembly, annotation fields and the chunk table
+- ``chunk_<n>.npz``: up to ``chunk_size`` variants of one chromosome, sorted by position and
+  stored column-wise with compression (positions, allele hashes, rsIDs, REF/ALT and the
+  annotation fields)
+- ``rsid.npy``: sorted rsID numbers pointing at (chunk, row), memory-mapped on lookup
+
+Inputs are parsed in vectorized pandas chunks. Each chunk's rsIDs are sorted and spilled to
+disk as it is written and merged into ``rsid.npy`` at the end, so building an index of a full
+dbSNP dump does not hold every rsID in memory.
+
+Lookups are keyed by (chrom, pos, ref, alt) or rsID and vectorized per chunk with
+``np.searchsorted``; region scans only decompress the chunks overlapping the region.
+
+Usage:
+    from biomni.variant_index import build_variant_index, open_variant_index
+
+    build_variant_index(["clinvar.vcf.gz"], "variant_index/clinvar", source="clinvar")
+    index = open_variant_index("variant_index/clinvar")
+    index.lookup(["17:43045712:T:C", ("chr13", 32316461, "G", "A")])
+"""
+
+import csv
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Bump when the on-disk layout changes so old indexes are rebuilt
+INDEX_VERSION = 2
+
+# INFO fields kept for the well-known dumps: name -> (type, per-ALT-allele)
+SOURCE_FIELDS = {
+    "gnomad": {
+        "AC": ("float", True),
+        "AN": ("float", False),
+        "AF": ("float", True),
+        "nhomalt": ("float", True),
+        "vep": ("str", False),
+    },
+    "clinvar": {
+        "ALLELEID": ("str", False),
+        "CLNSIG": ("str", False),
+        "CLNDN": ("str", False),
+        "CLNREVSTAT": ("str", False),
+        "CLNVC": ("str", False),
+        "GENEINFO": ("str", False),
+        "MC": ("str", False),
+    },
+    "dbsnp": {
+        "GENEINFO": ("str", False),
+        "VC": ("str", False),
+        "FREQ": ("str", False),
+        "COMMON": ("str", False),
+    },
+}
+
+# Large, rarely needed INFO fields are skipped unless requested explicitly
+_SKIPPED_BY_DEFAULT = {"vep"}
+
+
+def normalize_chrom(chrom) -> str:
+    """Return a chromosome name without the "chr" prefix, with M mapped to MT."""
+    chrom = str(chrom).strip()
+    if chrom.lower().startswith("chr"):
+        chrom = chrom[3:]
+    if chrom.upper() in ("X", "Y", "M", "MT"):
+        chrom = chrom.upper()
+    return "MT" if chrom == "M" else chrom
+
+
+def allele_hash(ref: str, alt: str) -> int:
+    """Stable signed 64-bit hash of a REF/ALT pair."""
+    digest = hashlib.blake2b(f"{ref.upper()}>{alt.upper()}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def parse_rsid(value) -> int:
+    """Return the numeric part of an rsID ("rs6025" -> 6025), or 0 if there is none."""
+    value = str(value).strip().lower()
+    if value.startswith("rs"):
+        value = value[2:]
+    return int(value) if value.isdigit() else 0
+
+
+def parse_variant(variant) -> tuple[str, int, str, str]:
+    """Parse "chrom:pos:ref:alt" / "chrom-pos-ref-alt" strings, tuples or dicts into a key."""
+    if isinstance(variant, dict):
+        return normalize_chrom(variant["chrom"]), int(variant["pos"]), variant["ref"].upper(), variant["alt"].upper()
+    if isinstance(variant, str):
+        parts = variant.replace("-", ":").replace(">", ":").split(":")
+        if len(parts) != 4:
+            raise ValueError(f"Cannot parse variant '{variant}', expected chrom:pos:ref:alt")
+        variant = parts
+    chrom, pos, ref, alt = variant
+    return normalize_chrom(chrom), int(pos), str(ref).upper(), str(alt).upper()
+
+
+def _encode_strings(values: list) -> tuple[np.ndarray, np.ndarray]:
+    """Encode strings as one UTF-8 byte buffer and offsets (None becomes an empty string)."""
+    encoded = [(v or "").encode() for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _decode_string(data: np.ndarray, offsets: np.ndarray, row: int) -> str:
+    return data[offsets[row] : offsets[row + 1]].tobytes().decode()
+
+
+# Rows per pandas chunk when parsing inputs
+_READ_CHUNK_ROWS = 200_000
+
+# Elements held in memory while merging the per-chunk rsID parts
+_RSID_MERGE_BUFFER = 1 << 23
+
+# One rsID entry: rsID number and its (chunk, row)
+_RSID_DTYPE = np.dtype([("rs", "<i8"), ("chunk", "<i4"), ("row", "<i4")])
+
+_VCF_COLUMNS = ["chrom", "pos", "id", "ref", "alt", "qual", "filter", "info"]
+
+
+def _compression(path: str) -> str | None:
+    return "gzip" if path.lower().endswith((".gz", ".bgz")) else None
+
+
+def _vcf_header_lines(path: str) -> int:
+    opener = gzip.open if _compression(path) else open
+    n_lines = 0
+    with opener(path, "rt") as f:
+        for line in f:
+            if not line.startswith("#"):
+                break
+            n_lines += 1
+    return n_lines
+
+
+def _parse_rsids(values: pd.Series) -> np.ndarray:
+    """Vectorized ``parse_rsid``: numeric part of "rs6025"/"6025" strings, 0 where there is none."""
+    digits = values.astype(str).str.strip().str.extract(r"^(?:[rR][sS])?(\d+)$", expand=False)
+    return pd.to_numeric(digits, errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+
+
+def _info_values(info: pd.Series, name: str) -> pd.Series:
+    return info.str.extract(rf"(?:^|;){re.escape(name)}=([^;]*)", expand=False)
+
+
+def _iter_vcf_frames(path: str, fields: dict):
+    """Yield one DataFrame per read chunk with a row for every ALT allele of a VCF."""
+    reader = pd.read_csv(
+        path,
+        sep="\t",
+        header=None,
+        names=_VCF_COLUMNS,
+        usecols=range(len(_VCF_COLUMNS)),
+        skiprows=_vcf_header_lines(path),
+        dtype=str,
+        keep_default_na=False,
+        quoting=csv.QUOTE_NONE,
+        compression=_compression(path),
+        chunksize=_READ_CHUNK_ROWS,
+    )
+    for chunk in reader:
+        chunk = chunk.dropna(subset=["info"])
+        alts = chunk["alt"].str.split(",")
+        counts = alts.str.len().to_numpy()
+        # Source row and ALT allele index of every exploded record
+        rows = np.repeat(np.arange(len(chunk)), counts)
+        allele_index = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        ids = chunk["id"]
+        is_rsid = ids.str.lower().str.startswith("rs")
+        frame = {
+            "chrom": chunk["chrom"].to_numpy()[rows],
+            "pos": chunk["pos"].astype(np.int64).to_numpy()[rows],
+            "ref": chunk["ref"].to_numpy()[rows],
+            "alt": alts.explode().to_numpy(),
+            "rsid": _parse_rsids(ids.where(is_rsid, _info_values(chunk["info"], "RS")))[rows],
+        }
+        for name, (_, per_allele) in fields.items():
+            values = _info_values(chunk["info"], name)
+            if per_allele:
+                split = values.str.split(",", expand=True).to_numpy(dtype=object)
+                picked = split[rows, np.minimum(allele_index, split.shape[1] - 1)]
+                frame[name] = np.where(allele_index < split.shape[1], picked, None)
+            else:
+                frame[name] = values.to_numpy(dtype=object)[rows]
+        # Non-rsID record IDs (e.g. ClinVar variation IDs) are kept as well
+        frame["ID"] = ids.where(~is_rsid & (ids != "."), "").to_numpy()[rows]
+
+        frame = pd.DataFrame(frame)
+        yield frame[~frame["alt"].isin([".", "*"])]
+
+
+# Accepted column names for the variant key in delimited tables
+_TABLE_KEY_COLUMNS = {
+    "chrom": ("chrom", "chr", "chromosome", "#chrom", "CHROM", "#CHROM", "Chromosome"),
+    "pos": ("pos", "position", "POS", "Position", "start", "PositionVCF"),
+    "ref": ("ref", "REF", "ReferenceAllele", "ReferenceAlleleVCF"),
+    "alt": ("alt", "ALT", "AlternateAllele", "AlternateAlleleVCF"),
+    "rsid": ("rsid", "rsID", "ID", "RS# (dbSNP)", "snp_id"),
+}
+
+
+def _table_key_columns(path: str, sep: str) -> tuple[dict, list[str]]:
+    """Return the key column names of a delimited table and its remaining columns."""
+    header = list(pd.read_csv(path, sep=sep, nrows=0).columns)
+    keys = {key: next((n for n in names if n in header), None) for key, names in _TABLE_KEY_COLUMNS.items()}
+    missing = [k for k in ("chrom", "pos", "ref", "alt") if keys[k] is None]
+    if missing:
+        raise ValueError(f"{path} is missing required columns: {missing}")
+    return keys, [c for c in header if c not in keys.values()]
+
+
+def _iter_table_frames(path: str, fields: list[str], sep: str):
+    """Yield one DataFrame per read chunk of a TSV/CSV with chrom, pos, ref, alt and optional rsid columns."""
+    keys, _ = _table_key_columns(path, sep)
+    for chunk in pd.read_csv(path, sep=sep, dtype=str, chunksize=_READ_CHUNK_ROWS, keep_default_na=False):
+        chunk = chunk[(chunk[keys["pos"]] != "") & (chunk[keys["alt"]] != "")]
+        frame = {
+            "chrom": chunk[keys["chrom"]],
+            "pos": chunk[keys["pos"]].astype(float).astype(np.int64),
+            "ref": chunk[keys["ref"]],
+            "alt": chunk[keys["alt"]],
+            "rsid": _parse_rsids(chunk[keys["rsid"]]) if keys["rsid"] else 0,
+        }
+        for name in fields:
+            frame[name] = chunk[name] if name in chunk else ""
+        yield pd.DataFrame(frame)
+
+
+class _ChunkWriter:
+    """Buffers record frames per chromosome and writes sorted, compressed column chunks.
+
+    The rsIDs of every written chunk are sorted and spilled to a scratch file, and merged
+    into ``rsid.npy`` on close, so the number of variants held in memory stays bounded.
+    """
+
+    def __init__(self, output_dir: str, field_types: dict, chunk_size: int):
+        self.output_dir = output_dir
+        self.field_types = field_types
+        self.chunk_size = chunk_size
+        self.buffers: dict[str, list[pd.DataFrame]] = {}
+        self.chunks: list[dict] = []
+        self.rsid_parts: list[tuple[int, int]] = []
+        self._rsid_spill_path = os.path.join(output_dir, "rsid_parts.tmp")
+        self._rsid_spill = open(self._rsid_spill_path, "wb")
+        self._n_rsids = 0
+
+    def add(self, frame: pd.DataFrame):
+        chroms = frame["chrom"].astype(str)
+        frame = frame.assign(
+            chrom=chroms.map({c: normalize_chrom(c) for c in chroms.unique()}),
+            ref=frame["ref"].str.upper(),
+            alt=frame["alt"].str.upper(),
+        )
+        for chrom, rows in frame.groupby("chrom", sort=False):
+            buffer = self.buffers.setdefault(chrom, [])
+            buffer.append(rows)
+            if sum(len(b) for b in buffer) >= self.chunk_size:
+                rows = pd.concat(buffer, ignore_index=True)
+                while len(rows) >= self.chunk_size:
+                    self._write(chrom, rows.iloc[: self.chunk_size])
+                    rows = rows.iloc[self.chunk_size :]
+                self.buffers[chrom] = [rows] if len(rows) else []
+
+    def flush(self, chrom: str):
+        buffer = self.buffers.pop(chrom, [])
+        if buffer:
+            self._write(chrom, pd.concat(buffer, ignore_index=True))
+
+    def _write(self, chrom: str, rows: pd.DataFrame):
+        if not len(rows):
+            return
+        rows = rows.sort_values(["pos", "ref", "alt"], kind="stable")
+        chunk_id = len(self.chunks)
+        refs, alts = rows["ref"].tolist(), rows["alt"].tolist()
+        columns = {
+            "pos": rows["pos"].to_numpy(dtype=np.int64),
+            "allele": np.fromiter(map(allele_hash, refs, alts), dtype=np.int64, count=len(rows)),
+            "rsid": rows["rsid"].to_numpy(dtype=np.int64),
+        }
+        columns["ref__data"], columns["ref__offsets"] = _encode_strings(refs)
+        columns["alt__data"], columns["alt__offsets"] = _encode_strings(alts)
+        for name, field_type in self.field_types.items():
+            values = rows[name] if name in rows else pd.Series("", index=rows.index)
+            if field_type == "float":
+                columns[name] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float32)
+            else:
+                values = values.where(values.notna(), None).tolist()
+                columns[f"{name}__data"], columns[f"{name}__offsets"] = _encode_strings(values)
+
+        file_name = f"chunk_{chunk_id:05d}.npz"
+        np.savez_compressed(os.path.join(self.output_dir, file_name), **columns)
+        self.chunks.append(
+            {
+                "file": file_name,
+                "chrom": chrom,
+                "min_pos": int(columns["pos"][0]),
+                "max_pos": int(columns["pos"][-1]),
+                "n_variants": len(rows),
+            }
+        )
+        has_rsid = np.nonzero(columns["rsid"])[0]
+        if len(has_rsid):
+            part = np.empty(len(has_rsid), dtype=_RSID_DTYPE)
+            part["rs"], part["chunk"], part["row"] = columns["rsid"][has_rsid], chunk_id, has_rsid
+            part.sort(order="rs", kind="stable")
+            part.tofile(self._rsid_spill)
+            self.rsid_parts.append((self._n_rsids, len(part)))
+            self._n_rsids += len(part)
+
+    def close(self):
+        for chrom in list(self.buffers):
+            self.flush(chrom)
+        self._rsid_spill.close()
+        try:
+            self._merge_rsid_parts()
+        finally:
+            os.remove(self._rsid_spill_path)
+
+    def _merge_rsid_parts(self):
+        """K-way merge of the sorted per-chunk rsID parts into ``rsid.npy``, a window per part at a time."""
+        out = np.lib.format.open_memmap(
+            os.path.join(self.output_dir, "rsid.npy"), mode="w+", dtype=_RSID_DTYPE, shape=(self._n_rsids,)
+        )
+        if not self._n_rsids:
+            del out
+            return
+        spill = np.memmap(self._rsid_spill_path, dtype=_RSID_DTYPE, mode="r")
+        window = max(1024, _RSID_MERGE_BUFFER // len(self.rsid_parts))
+        cursors = [start for start, _ in self.rsid_parts]
+        ends = [start + n for start, n in self.rsid_parts]
+        written = 0
+        while written < self._n_rsids:
+            windows = [
+                (i, spill[cursors[i] : min(cursors[i] + window, ends[i])])
+                for i in range(len(cursors))
+                if cursors[i] < ends[i]
+            ]
+            # Everything up to the smallest window maximum is final: no part has a smaller rsID left
+            threshold = min(values["rs"][-1] for _, values in windows)
+            taken = []
+            for i, values in windows:
+                n_taken = int(np.searchsorted(values["rs"], threshold, side="right"))
+                taken.append(values[:n_taken])
+                cursors[i] += n_taken
+            merged = np.concatenate(taken)
+            merged.sort(order="rs", kind="stable")
+            out[written : written + len(merged)] = merged
+            written += len(merged)
+        out.flush()
+        del spill, out
+
+
+def build_variant_index(
+    input_files: list[str],
+    output_dir: str,
+    source: str = "custom",
+    assembly: str = "GRCh38",
+    fields: list[str] | None = None,
+    chunk_size: int = 65536,
+) -> dict:
+    """Ingest VCF or TSV dumps into a chunked variant index and return its manifest.
+
+    Args:
+        input_files: VCF (.vcf/.vcf.gz/.vcf.bgz) or delimited table files
+        output_dir: Directory for the index (replaced if it already exists)
+        source: "gnomad", "clinvar", "dbsnp" (selects default INFO fields) or any other name
+        assembly: Genome assembly of the input coordinates
+        fields: INFO fields / table columns to keep; defaults to the source presets
+            (all extra columns for tables)
+        chunk_size: Maximum variants per compressed chunk
+
+    Returns:
+        The index manifest
+
+    """
+    source = source.lower()
+    preset = SOURCE_FIELDS.get(source, {})
+    if fields is not None:
+        field_specs = {f: preset.get(f, ("str", False)) for f in fields}
+    elif preset:
+        field_specs = {f: spec for f, spec in preset.items() if f not in _SKIPPED_BY_DEFAULT}
+    else:
+        field_specs = None
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(output_dir):
+        if name.startswith("chunk_") or name in ("rsid.npy", "rsid.npz", "rsid_parts.tmp", "manifest.json"):
+            os.remove(os.path.join(output_dir, name))
+
+    # Field types are fixed once the first file is seen (tables discover their columns)
+    field_types: dict[str, str] = {}
+    writer = None
+    for path in input_files:
+        lower = path.lower()
+        if lower.endswith((".vcf", ".vcf.gz", ".vcf.bgz")):
+            specs = field_specs or {}
+            frames = _iter_vcf_frames(path, specs)
+            types = {name: spec[0] for name, spec in specs.items()}
+            # Non-rsID record IDs (e.g. ClinVar variation IDs) are kept as well
+            types["ID"] = "str"
+        else:
+            sep = "," if lower.endswith((".csv", ".csv.gz")) else "\t"
+            _, extra_columns = _table_key_columns(path, sep)
+            types = (
+                {name: spec[0] for name, spec in field_specs.items()}
+                if field_specs is not None
+                else dict.fromkeys(extra_columns, "str")
+            )
+            frames = _iter_table_frames(path, list(types), sep)
+        if writer is None:
+            field_types = types
+            writer = _ChunkWriter(output_dir, field_types, chunk_size)
+        for frame in frames:
+            writer.add(frame)
+
+    if writer is None:
+        raise ValueError("No input files provided")
+    writer.close()
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "source": source,
+        "assembly": assembly,
+        "inputs": [
+            {"path": os.path.abspath(p), "size": os.path.getsize(p), "mtime": os.path.getmtime(p)} for p in input_files
+        ],
+        "fields": field_types,
+        "chunks": writer.chunks,
+        "n_variants": sum(c["n_variants"] for c in writer.chunks),
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class VariantIndex:
+    """Read-only access to a variant index directory with an LRU cache of decompressed chunks."""
+
+    def __init__(self, index_dir: str, cache_chunks: int = 64):
+        with open(os.path.join(index_dir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != INDEX_VERSION:
+            raise ValueError(f"Variant index {index_dir} has an unsupported version; rebuild it")
+        self.index_dir = index_dir
+        self.source = self.manifest["source"]
+        self.fields = self.manifest["fields"]
+        self.chunks = self.manifest["chunks"]
+        self._cache_size = cache_chunks
+        self._cache: OrderedDict[int, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._rsid = None
+
+        # Per-chromosome chunk boundaries for range selection
+        self._by_chrom: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for chrom in {c["chrom"] for c in self.chunks}:
+            ids = np.array([i for i, c in enumerate(self.chunks) if c["chrom"] == chrom])
+            mins = np.array([self.chunks[i]["min_pos"] for i in ids])
+            maxs = np.array([self.chunks[i]["max_pos"] for i in ids])
+            order = np.argsort(mins, kind="stable")
+            self._by_chrom[chrom] = (ids[order], mins[order], maxs[order])
+
+    def __len__(self) -> int:
+        return self.manifest["n_variants"]
+
+    def _chunk(self, chunk_id: int) -> dict:
+        with self._lock:
+            if chunk_id in self._cache:
+                self._cache.move_to_end(chunk_id)
+                return self._cache[chunk_id]
+        with np.load(os.path.join(self.index_dir, self.chunks[chunk_id]["file"])) as data:
+            columns = {name: data[name] for name in data.files}
+        with self._lock:
+            self._cache[chunk_id] = columns
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return columns
+
+    def _record(self, chunk_id: int, row: int) -> dict:
+        columns = self._chunk(chunk_id)
+        record = {
+            "chrom": self.chunks[chunk_id]["chrom"],
+            "pos": int(columns["pos"][row]),
+            "ref": _decode_string(columns["ref__data"], columns["ref__offsets"], row),
+            "alt": _decode_string(columns["alt__data"], columns["alt__offsets"], row),
+            "rsid": f"rs{columns['rsid'][row]}" if columns["rsid"][row] else None,
+        }
+        for name, field_type in self.fields.items():
+            if field_type == "float":
+                value = columns[name][row]
+                record[name] = None if np.isnan(value) else float(value)
+            else:
+                record[name] = _decode_string(columns[f"{name}__data"], columns[f"{name}__offsets"], row) or None
+        return record
+
+    def _chunks_overlapping(self, chrom: str, start: int, end: int) -> np.ndarray:
+        if chrom not in self._by_chrom:
+            return np.zeros(0, dtype=np.int64)
+        ids, mins, maxs = self._by_chrom[chrom]
+        candidates = np.arange(np.searchsorted(mins, end, side="right"))
+        return ids[candidates[maxs[candidates] >= start]]
+
+    def lookup(self, variants: list) -> list[dict | None]:
+        """Annotate variants by (chrom, pos, ref, alt); unknown variants map to None."""
+        keys = [parse_variant(v) for v in variants]
+        results: list[dict | None] = [None] * len(keys)
+        chroms = np.array([k[0] for k in keys], dtype=object)
+        positions = np.array([k[1] for k in keys], dtype=np.int64)
+        hashes = np.array([allele_hash(k[2], k[3]) for k in keys], dtype=np.int64)
+
+        for chrom in set(chroms.tolist()):
+            query_rows = np.nonzero(chroms == chrom)[0]
+            if chrom not in self._by_chrom:
+                continue
+            qmin, qmax = positions[query_rows].min(), positions[query_rows].max()
+            for chunk_id in self._chunks_overlapping(chrom, qmin, qmax):
+                meta = self.chunks[chunk_id]
+                in_range = query_rows[
+                    (positions[query_rows] >= meta["min_pos"]) & (positions[query_rows] <= meta["max_pos"])
+                ]
+                in_range = np.array([q for q in in_range if results[q] is None], dtype=np.int64)
+                if not len(in_range):
+                    continue
+                columns = self._chunk(chunk_id)
+                left = np.searchsorted(columns["pos"], positions[in_range], side="left")
+                right = np.searchsorted(columns["pos"], positions[in_range], side="right")
+                for q, lo, hi in zip(in_range, left, right, strict=False):
+                    if hi > lo:
+                        match = np.nonzero(columns["allele"][lo:hi] == hashes[q])[0]
+                        if len(match):
+                            results[q] = self._record(chunk_id, int(lo + match[0]))
+        return results
+
+    def lookup_rsids(self, rsids: list) -> dict[str, list[dict]]:
+        """Return all indexed alleles for each rsID (missing rsIDs are omitted)."""
+        if self._rsid is None:
+            self._rsid = np.load(os.path.join(self.index_dir, "rsid.npy"), mmap_mode="r")
+        numbers = np.array([parse_rsid(r) for r in rsids], dtype=np.int64)
+        left = np.searchsorted(self._rsid["rs"], numbers, side="left")
+        right = np.searchsorted(self._rsid["rs"], numbers, side="right")
+        results = {}
+        for rsid, number, lo, hi in zip(rsids, numbers, left, right, strict=False):
+            if number and hi > lo:
+                results[rsid] = [
+                    self._record(int(self._rsid["chunk"][i]), int(self._rsid["row"][i])) for i in range(lo, hi)
+                ]
+        return results
+
+    def scan_region(self, chrom: str, start: int, end: int, limit: int | None = None) -> pd.DataFrame:
+        """Return indexed variants with start <= pos <= end (1-based, inclusive), sorted by position.
+
+        With ``limit`` only the first ``limit`` variants by position are returned.
+        """
+        chrom = normalize_chrom(chrom)
+        records = []
+        for chunk_id in sorted(self._chunks_overlapping(chrom, start, end), key=lambda i: self.chunks[i]["min_pos"]):
+            # Chunks can overlap, so stop only once no later chunk can hold a lower position
+            if limit is not None and records and len(records) >= limit:
+                records.sort(key=lambda r: r["pos"])
+                del records[limit:]
+                if self.chunks[chunk_id]["min_pos"] > records[-1]["pos"]:
+                    break
+            columns = self._chunk(chunk_id)
+            lo = np.searchsorted(columns["pos"], start, side="left")
+            hi = np.searchsorted(columns["pos"], end, side="right")
+            records.extend(self._record(chunk_id, row) for row in range(lo, hi))
+        records.sort(key=lambda r: r["pos"])
+        return pd.DataFrame(records[:limit])
+
+
+_indexes: dict[str, tuple[float, VariantIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def open_variant_index(index_dir: str) -> VariantIndex:
+    """Return the process-wide handle for an index directory, reopening it if it was rebuilt."""
+    index_dir = os.path.abspath(index_dir)
+    mtime = os.path.getmtime(os.path.join(index_dir, "manifest.json"))
+    with _indexes_lock:
+        cached = _indexes.get(index_dir)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, VariantIndex(index_dir))
+            _indexes[index_dir] = cached
+        return cached[1]
+
+
+def default_variant_index_root(data_lake_path: str | None = None) -> str:
+    """Return the directory holding one index per source (``BIOMNI_VARIANT_INDEX_DIR`` wins)."""
+    root = os.getenv("BIOMNI_VARIANT_INDEX_DIR")
+    if root:
+        return root
+    if data_lake_path:
+        return os.path.join(data_lake_path, "variant_index")
+    return os.path.join(os.path.expanduser("~"), ".cache", "biomni", "variant_index")
@@ -0,0 +1,81 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+from biomni.tool import pharmacology
+
+MODEL_TYPE = "MPNN"
+
+
+class _Model:
+    def __init__(self, task):
+        self.offset = [task for task, _, _ in pharmacology._ADMET_TASKS].index(task)
+
+    def predict(self, drugs):
+        return [(len(drug) + self.offset) / 37 for drug in drugs]
+
+
+@pytest.fixture
+def deeppurpose(monkeypatch):
+    featurized = []
+
+    def data_process(X_drug, y, drug_encoding, split_method):
+        if any("X" in drug for drug in X_drug):
+            raise ValueError("cannot featurize")
+        featurized.extend(X_drug)
+        return list(X_drug)
+
+    def model_pretrained(model):
+        return _Model(model.removesuffix(f"_{MODEL_TYPE}_model"))
+
+    module = types.ModuleType("DeepPurpose")
+    module.CompoundPred = types.SimpleNamespace(model_pretrained=model_pretrained)
+    module.utils = types.SimpleNamespace(data_process=data_process)
+    monkeypatch.setitem(sys.modules, "DeepPurpose", module)
+    monkeypatch.setattr(pharmacology, "_admet_models", {})
+    monkeypatch.setattr(pharmacology, "_admet_predictions", {})
+    return featurized
+
+
+def _legacy_log(smiles_list):
+    # predict_admet_properties before batching: every compound featurized and predicted per task
+    log = "Research Log for ADMET Predictions:\n-------------------------------------\n"
+    for smiles in smiles_list:
+        log += f"\nCompound SMILES: {smiles}\nPredicted ADMET properties:\n"
+        for task, unit, label in pharmacology._ADMET_TASKS:
+            value = _Model(task).predict([smiles])[0]
+            value = value * 100 if unit == "%" else value
+            log += f"- {label}: {value:.2f} {unit}\n"
+        log += "-------------------------------------\n"
+    return log
+
+
+def test_research_log_matches_per_compound_predictions(deeppurpose):
+    smiles = ["CCO", "c1ccccc1O", "CC(=O)Oc1ccccc1C(=O)O", "CCO"]
+
+    assert pharmacology.predict_admet_properties(smiles, MODEL_TYPE) == _legacy_log(smiles)
+
+
+def test_models_see_the_input_smiles_not_the_cache_key(deeppurpose):
+    predictions = pharmacology.predict_admet_properties_batch(["OCC", "CCO"], MODEL_TYPE)
+
+    assert deeppurpose == ["OCC"]
+    assert predictions["canonical_smiles"].tolist() == ["CCO", "CCO"]
+
+
+def test_unfeaturizable_smiles_only_fail_their_row(deeppurpose, monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, "rdkit", None)
+    cache_file = tmp_path / "admet.parquet"
+    predictions = pharmacology.predict_admet_properties_batch(["CCO", "XX", "CCN"], MODEL_TYPE, str(cache_file))
+
+    assert predictions["canonical_smiles"].isna().tolist() == [False, True, False]
+    assert np.isnan(predictions.loc[1, "AqSolDB"])
+    assert predictions.loc[2, "AqSolDB"] == pytest.approx(3 / 37)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["admet.parquet"]
+
+
+def test_invalid_smiles_are_reported_in_the_research_log(deeppurpose):
+    log = pharmacology.predict_admet_properties(["CCO", "not a smiles"], MODEL_TYPE)
+
+    assert log.count("- Error: Invalid SMILES string") == 1
@@ -0,0 +1,26 @@
+import pandas as pd
+from biomni.tool import pharmacology
+
+
+def _engine():
+    interactions = pd.DataFrame(
+        {
+            "DDInterID_A": ["DDInter1"],
+            "Drug_A": ["Warfarin"],
+            "DDInterID_B": ["DDInter2"],
+            "Drug_B": ["Aspirin"],
+            "Level": ["Major"],
+            "category": ["blood_organs"],
+        }
+    )
+    return pharmacology.DDInterEngine.from_dataframe(interactions)
+
+
+def test_patients_without_resolved_medications_count_in_the_cohort(monkeypatch):
+    monkeypatch.setattr(pharmacology, "get_ddinter_engine", lambda data_lake_path: _engine())
+    cohort = {"p1": ["warfarin", "aspirin"], "p2": [], "p3": ["zzqxv"], "p4": ["aspirin"]}
+
+    log = pharmacology.scan_cohort_drug_interactions(cohort, data_lake_path="unused")
+
+    assert "Cohort: 4 patients, 4 medication entries" in log
+    assert "Patients with at least one interacting pair: 1 of 4" in log
@@ -0,0 +1,34 @@
+import pandas as pd
+import pyarrow.dataset as pads
+import pytest
+from biomni.columnar import get_columnar_table
+
+
+@pytest.fixture
+def table(tmp_path):
+    source = tmp_path / "scores.tsv"
+    pd.DataFrame({"gene": ["A", "B", "C", "D"], "score": [1, 5, 10, 20]}).to_csv(source, sep="\t", index=False)
+    return get_columnar_table(str(source))
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        pads.field("score") > 4,
+        ("score", ">", 4),
+        [("score", ">", 4)],
+        [["score", ">", 4]],
+        {"gene": ["B", "C", "D"]},
+    ],
+    ids=["expression", "bare-tuple", "tuple-list", "list-list", "dict"],
+)
+def test_filter_forms(table, filters):
+    rows = pd.concat(table.scan(columns=["gene"], filters=filters), ignore_index=True)
+
+    assert sorted(rows["gene"]) == ["B", "C", "D"]
+    assert table.count(filters) == 3
+
+
+def test_unknown_filter_column_is_reported(table):
+    with pytest.raises(ValueError, match="Unknown column 'scor'"):
+        table.count(("scor", ">", 4))
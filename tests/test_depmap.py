@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+from biomni.depmap import convert_depmap_matrix
+
+GENES = ["KRAS (3845)", "BRAF (673)", "TP53 (7157)"]
+
+
+def _matrix(tmp_path):
+    table = pd.DataFrame(
+        {"ModelID": ["ACH-1", "ACH-2"], GENES[0]: [0.1, 0.2], GENES[1]: [1.1, 1.2], GENES[2]: [2.1, 2.2]}
+    )
+    table.to_csv(tmp_path / "effect.csv", index=False)
+    return convert_depmap_matrix(str(tmp_path / "effect.csv"), str(tmp_path / "index"))
+
+
+def test_all_genes_in_another_order_keep_their_scores(tmp_path):
+    matrix = _matrix(tmp_path)
+    frame = matrix.genes(["TP53", "KRAS", "BRAF"])
+
+    assert list(frame.columns) == ["TP53", "KRAS", "BRAF"]
+    np.testing.assert_allclose(frame.loc["ACH-1"].to_numpy(), [2.1, 0.1, 1.1], rtol=1e-6)
+
+
+def test_repeated_genes_are_returned_for_each_request(tmp_path):
+    frame = _matrix(tmp_path).genes(["BRAF", "BRAF", "KRAS"])
+
+    np.testing.assert_allclose(frame.loc["ACH-2"].to_numpy(), [1.2, 1.2, 0.2], rtol=1e-6)
@@ -0,0 +1,37 @@
+import time
+
+import requests
+from biomni.http_transport import CassetteAdapter
+from requests.adapters import HTTPAdapter
+
+NETWORK_SECONDS = 0.2
+
+
+def _slow_send(self, request, **kwargs):
+    time.sleep(NETWORK_SECONDS)
+    response = requests.Response()
+    response.status_code = 200
+    response.url = request.url
+    response._content = b'{"ok": true}'
+    response.request = request
+    return response
+
+
+def _session(adapter):
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+def test_recorded_latency_is_replayed(tmp_path, monkeypatch):
+    monkeypatch.setattr(HTTPAdapter, "send", _slow_send)
+    _session(CassetteAdapter(mode="record", cassette_dir=str(tmp_path))).get("https://example.org/api?q=1")
+
+    replay = _session(CassetteAdapter(mode="replay", cassette_dir=str(tmp_path), latency="recorded"))
+    start = time.perf_counter()
+    response = replay.get("https://example.org/api?q=1")
+    replay_seconds = time.perf_counter() - start
+
+    assert response.json() == {"ok": True}
+    assert response.elapsed.total_seconds() >= NETWORK_SECONDS
+    assert replay_seconds >= NETWORK_SECONDS
@@ -0,0 +1,47 @@
+import gzip
+
+import pandas as pd
+import pytest
+
+genetics = pytest.importorskip("biomni.tool.genetics")
+
+# chr1 hg19 [0, 1000) maps to hg38 [100, 1100) on the same strand
+CHAIN = "chain 1000 chr1 5000 + 0 1000 chr1 5000 + 100 1100 1\n1000\n\n"
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    (tmp_path / "liftover").mkdir()
+    with gzip.open(tmp_path / "liftover" / "hg19ToHg38.over.chain.gz", "wt") as f:
+        f.write(CHAIN)
+    return str(tmp_path)
+
+
+def test_summary_statistics_with_missing_positions(data_path, tmp_path):
+    gwas = tmp_path / "gwas.tsv"
+    gwas.write_text("chr\tpos\tpval\n1\t10\t0.1\n1\tNA\t0.2\n1\t\t0.3\n1\t20\t0.4\n")
+
+    result = genetics.liftover_file(
+        str(gwas), str(tmp_path / "out.tsv"), "hg19", "hg38", data_path, unmapped_file=str(tmp_path / "unmapped.tsv")
+    )
+
+    assert result["success"]
+    assert (result["n_mapped"], result["n_unmapped"]) == (2, 2)
+    lifted = pd.read_csv(tmp_path / "out.tsv", sep="\t")
+    assert lifted["pos"].tolist() == [110, 120]
+    unmapped = pd.read_csv(tmp_path / "unmapped.tsv", sep="\t", keep_default_na=False)
+    assert unmapped["unmapped_reason"].tolist() == ["invalid position", "invalid position"]
+
+
+def test_bed_with_track_lines_and_missing_positions(data_path, tmp_path):
+    bed = tmp_path / "regions.bed"
+    bed.write_text('track name="peaks" description="test"\nbrowser position chr1:1-100\n#comment\n')
+    with open(bed, "a") as f:
+        f.write("chr1\t10\t20\ta\nchr1\tNA\t30\tb\n")
+
+    result = genetics.liftover_file(str(bed), str(tmp_path / "out.bed"), "hg19", "hg38", data_path)
+
+    assert result["success"]
+    assert (result["n_input"], result["n_mapped"], result["n_unmapped"]) == (2, 1, 1)
+    lifted = pd.read_csv(tmp_path / "out.bed", sep="\t", header=None)
+    assert lifted.iloc[0, :3].tolist() == ["chr1", 110, 120]
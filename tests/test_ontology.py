@@ -0,0 +1,41 @@
+import json
+
+from biomni.ontology import OntologyIndex
+
+
+def _go_graph(path):
+    nodes = [
+        {"id": f"http://purl.obolibrary.org/obo/GO_000000{i}", "lbl": name, "type": "CLASS"}
+        for i, name in enumerate(["cellular_component", "organelle", "nucleus", "nucleolus"], start=1)
+    ]
+    edges = [
+        {
+            "sub": "http://purl.obolibrary.org/obo/GO_0000002",
+            "pred": "is_a",
+            "obj": "http://purl.obolibrary.org/obo/GO_0000001",
+        },
+        {
+            "sub": "http://purl.obolibrary.org/obo/GO_0000003",
+            "pred": "is_a",
+            "obj": "http://purl.obolibrary.org/obo/GO_0000002",
+        },
+        {
+            "sub": "http://purl.obolibrary.org/obo/GO_0000004",
+            "pred": "http://purl.obolibrary.org/obo/BFO_0000050",
+            "obj": "http://purl.obolibrary.org/obo/GO_0000003",
+        },
+    ]
+    path.write_text(json.dumps({"graphs": [{"nodes": nodes, "edges": edges}]}))
+    return str(path)
+
+
+def test_get_term_returns_relations_after_reload(tmp_path):
+    go = OntologyIndex.from_obographs(_go_graph(tmp_path / "go.json"), closure_relations=("part_of",))
+    go.save(str(tmp_path / "go.pkl"))
+    go = OntologyIndex.load(str(tmp_path / "go.pkl"))
+
+    nucleolus = go.get_term("GO:0000004")
+    assert nucleolus["parents"] == []
+    assert nucleolus["relations"] == {"part_of": ["GO:0000003"]}
+    assert go.get_term("GO:0000003")["relations"] == {}
+    assert sorted(go.ancestors("GO:0000004")) == ["GO:0000001", "GO:0000002", "GO:0000003"]
@@ -0,0 +1,17 @@
+import pandas as pd
+from biomni.variant_index import VariantIndex, build_variant_index
+
+
+def _write(path, positions):
+    pd.DataFrame({"chrom": "1", "pos": positions, "ref": "A", "alt": "G"}).to_csv(path, sep="\t", index=False)
+    return str(path)
+
+
+def test_scan_region_limit_keeps_the_lowest_positions_across_overlapping_chunks(tmp_path):
+    # Chunks are cut in input order, so the second file's variants land in a chunk overlapping the first
+    inputs = [_write(tmp_path / "a.tsv", [100, 300, 500]), _write(tmp_path / "b.tsv", [200, 400])]
+    build_variant_index(inputs, str(tmp_path / "index"), chunk_size=3)
+    index = VariantIndex(str(tmp_path / "index"))
+
+    assert index.scan_region("1", 1, 1000, limit=3)["pos"].tolist() == [100, 200, 300]
+    assert index.scan_region("chr1", 150, 450)["pos"].tolist() == [200, 300, 400]